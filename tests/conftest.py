@@ -18,6 +18,11 @@ PARAMETRIZE_CONFIG = False
 CONNECT_TIMEOUT = 15
 CONNECT_INTERVAL = 0.2
 WINDOWS = os.name == 'nt'
+# the benchmarks are opt-in (UTILMETA_BENCHMARK=1), the timings are recorded as the test properties
+benchmark = pytest.mark.skipif(
+    not os.environ.get('UTILMETA_BENCHMARK'),
+    reason='benchmark, set UTILMETA_BENCHMARK=1 to run'
+)
 
 # if WINDOWS:
 #     try:
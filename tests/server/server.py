@@ -76,22 +76,6 @@ service.use(DatabaseConnections({
         # password=env.DB_PASSWORD,
         # port=env.DB_PORT
     ),
-    'postgresql': Database(
-        name='utilmeta_test_db',
-        engine='postgresql',
-        host='127.0.0.1',
-        port=5432,
-        user='test_user',
-        password='test-tmp-password',
-    ),
-    'mysql': Database(
-        name='utilmeta_test_db',
-        engine='mysql',
-        host='127.0.0.1',
-        port=3306,
-        user='test_user',
-        password='test-tmp-password',
-    )
 }))
 service.use(CacheConnections({
     'default': Cache(
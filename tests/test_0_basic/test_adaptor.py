@@ -0,0 +1,93 @@
+from utilmeta.utils.adaptor import BaseAdaptor
+from utilmeta.core.file.base import FileAdaptor
+from utilmeta.core.file.backends.bytesio import BytesIOFileAdaptor
+from io import BytesIO
+from tests.conftest import benchmark
+import time
+import gc
+
+
+class TestAdaptorDispatch:
+    def test_dispatch_cache(self):
+        BaseAdaptor.clear_dispatch_cache()
+        stats = BaseAdaptor.get_dispatch_stats()
+        adaptor = FileAdaptor.dispatch(BytesIO(b'1'))
+        assert isinstance(adaptor, BytesIOFileAdaptor)
+        adaptor = FileAdaptor.dispatch(BytesIO(b'2'))
+        assert isinstance(adaptor, BytesIOFileAdaptor)
+        assert adaptor.file.read() == b'2'
+        current = BaseAdaptor.get_dispatch_stats()
+        assert current['misses'] == stats['misses'] + 1
+        assert current['hits'] == stats['hits'] + 1
+        assert current['size'] == 1
+
+        # adaptor instance is returned as is
+        assert FileAdaptor.dispatch(adaptor) is adaptor
+
+        # not qualified dispatches are not cached
+        for i in range(2):
+            try:
+                FileAdaptor.dispatch(object())
+            except NotImplementedError:
+                pass
+            else:
+                raise AssertionError('not implemented adaptor')
+        assert BaseAdaptor.get_dispatch_stats()['size'] == 1
+
+    @benchmark
+    def test_dispatch_benchmark(self, record_property):
+        files = [BytesIO(b'test') for _ in range(2000)]
+        FileAdaptor.dispatch(files[0])
+
+        start = time.perf_counter()
+        for f in files:
+            FileAdaptor.dispatch(f)
+        record_property('dispatch_cached_ms', (time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        for f in files:
+            FileAdaptor.resolve_adaptor(f)(f)
+        record_property('dispatch_resolved_ms', (time.perf_counter() - start) * 1000)
+
+    def test_dispatch_cache_invalidation(self):
+        class MyFile:
+            pass
+
+        assert isinstance(FileAdaptor.dispatch(BytesIO(b'1')), BytesIOFileAdaptor)
+        assert BaseAdaptor.get_dispatch_stats()['size'] > 0
+        try:
+            FileAdaptor.dispatch(MyFile())
+        except NotImplementedError:
+            pass
+        else:
+            raise AssertionError('not implemented adaptor')
+
+        class MyFileAdaptor(FileAdaptor):
+            @classmethod
+            def qualify(cls, obj):
+                return isinstance(obj, MyFile)
+
+        try:
+            # the new adaptor class clears the dispatch cache
+            assert BaseAdaptor.get_dispatch_stats()['size'] == 0
+            assert isinstance(FileAdaptor.dispatch(MyFile()), MyFileAdaptor)
+            assert type(FileAdaptor.dispatch(BytesIO(b'1'))) is BytesIOFileAdaptor
+        finally:
+            # unregister the adaptor, the subclasses are weakly referenced
+            BaseAdaptor.clear_dispatch_cache()
+            del MyFileAdaptor
+            gc.collect()
+        assert not any(impl.__name__ == 'MyFileAdaptor' for impl in FileAdaptor.__subclasses__())
+
+    def test_value_dispatch_key(self):
+        from utilmeta.core.server.backends.base import ServerAdaptor
+
+        class Service:
+            def __init__(self, backend):
+                self.backend = backend
+
+        # server adaptors are qualified by the backend, not the type of the service
+        k1 = ServerAdaptor.get_dispatch_key(Service('django'))
+        k2 = ServerAdaptor.get_dispatch_key(Service('flask'))
+        assert k1 != k2
+        assert k1 == ServerAdaptor.get_dispatch_key(Service('django'))
@@ -33,3 +33,237 @@ class TestCache:
     #     assert await cache.aget('key') == '123'
     #     await cache.apop('key')
     #     assert await cache.aget('key') is None
+
+    def test_trace_keys(self, service):
+        import threading
+        from utilmeta.core.cache.plugins.base import BaseCacheInterface
+
+        cache = BaseCacheInterface(scope_prefix='test_trace_keys', trace_keys=True)
+        cache.clear()
+        cache.reset_stats()
+        cache.set('a', 1)
+        cache.set('b', 2)
+        assert cache.get('a') == 1
+        assert cache.get('c') is None
+        assert cache.fetch(['a', 'b', 'c']) == [1, 2, None]
+        assert cache.incr('a') == 2
+        assert sorted(cache.keys) == ['a', 'b']
+        assert cache.count == 2
+        assert cache.get_last_modified('a', 'b')
+        stats = cache.get_stats()
+        assert stats['requests'] == 6
+        assert stats['hits'] == 4
+
+        # concurrent gets do not lose hit counts
+        def worker():
+            for _ in range(200):
+                cache.get('b')
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        entity = cache.get_entity()
+        assert entity.get_key_hits(cache.encode('b')) == 1 + 1600
+        assert cache.get_stats()['requests'] == 6 + 1600
+
+        cache.delete('a', 'b')
+        assert cache.keys == []
+        assert cache.count == 0
+
+    def test_trace_keys_eviction(self, service):
+        from utilmeta.core.cache.plugins.base import BaseCacheInterface
+
+        for policy in (BaseCacheInterface.OBSOLETE_LFU, BaseCacheInterface.OBSOLETE_LRU):
+            cache = BaseCacheInterface(
+                scope_prefix=f'test_eviction_{policy}', max_entries=3, max_entries_policy=policy
+            )
+            cache.clear()
+            for key in ('a', 'b', 'c'):
+                cache.set(key, key)
+            # hit b and c, then touch a, so b is the least recently updated and a is the least frequently hit
+            cache.get('b')
+            cache.get('c')
+            cache.set('a', 'a')
+            cache.set('d', 'd')
+            expected = {'b', 'c', 'd'} if policy == BaseCacheInterface.OBSOLETE_LFU else {'a', 'c', 'd'}
+            assert set(cache.keys) == expected, policy
+            assert cache.count == 3
+
+    def test_trace_keys_benchmark(self, service):
+        import time
+        from utilmeta.core.cache.plugins.base import BaseCacheInterface
+
+        results = {}
+        for trace_keys in (False, True):
+            cache = BaseCacheInterface(scope_prefix=f'test_benchmark_{trace_keys}', trace_keys=trace_keys)
+            num = 2000
+            t0 = time.perf_counter()
+            for i in range(num):
+                cache.set(f'key-{i % 200}', i)
+                cache.get(f'key-{(i * 7) % 200}')
+            results[trace_keys] = num * 2 / (time.perf_counter() - t0)
+        print(f'cache get/set: {results[False]:.0f} ops/s, with trace_keys: {results[True]:.0f} ops/s')
+
+    def test_pipeline(self, service):
+        from utilmeta.core.cache import Cache, CachePipeline
+        cache = Cache(
+            engine='memory'
+        )
+        with cache.pipeline() as pipe:
+            assert isinstance(pipe, CachePipeline)
+            pipe.set('p1', 1)
+            pipe.update({'p2': 'a', 'p3': 'b'})
+            pipe.get('p1')
+            pipe.fetch('p2', 'p3', 'p4')
+            pipe.incr('p1', 2)
+            assert len(pipe) == 5
+        assert pipe.results[2:] == [1, ['a', 'b', None], 3]
+
+        pipe = cache.pipeline()
+        pipe.pop('p2').exists('p2', 'p3').delete('p1', 'p3')
+        assert pipe.execute()[:2] == ['a', 1]
+        assert cache.fetch(['p1', 'p2', 'p3']) == [None, None, None]
+
+        # commands are discarded on error
+        with pytest.raises(ValueError):
+            with cache.pipeline() as pipe:
+                pipe.set('p1', 1)
+                raise ValueError
+        assert pipe.results is None
+        assert cache.get('p1') is None
+
+    def test_near_cache(self, service):
+        import time
+        from utilmeta.core.cache import Cache, NearCache
+        cache = Cache(
+            engine='memory',
+            near_cache=True,
+            near_cache_max_entries=3,
+            near_cache_negative_timeout=0.2,
+        )
+        backend = cache.get_adaptor(False)
+        near = cache.get_near_cache()
+        assert isinstance(near, NearCache)
+
+        cache.set('n1', 1)
+        assert cache.get('n1') == 1
+        assert cache.get('n1') == 1
+        # served from the near cache, the backend writes outside the cache are not visible
+        backend.set('n1', 2)
+        assert cache.get('n1') == 1
+        # writes through the cache invalidate the near cache
+        cache.set('n1', 3)
+        assert cache.get('n1') == 3
+
+        # negative caching
+        assert cache.get('n2', 'default') == 'default'
+        backend.set('n2', 'v')
+        assert cache.get('n2') is None
+        time.sleep(0.25)
+        assert cache.get('n2') == 'v'
+
+        assert cache.fetch(['n1', 'n2', 'n3']) == [3, 'v', None]
+        assert cache.fetch(['n1', 'n3'], named=True) == {'n1': 3}
+        cache.delete('n1', 'n2')
+        assert cache.fetch(['n1', 'n2']) == [None, None]
+
+        # invalidation from other processes
+        cache.update({'n4': 4, 'n5': 5})
+        assert cache.get('n4') == 4
+        backend.set('n4', 40)
+        invalidator = cache.get_near_invalidator()
+        invalidator.on_message(invalidator.ident, ['n4'])
+        assert cache.get('n4') == 4
+        invalidator.on_message('other', ['n4'])
+        assert cache.get('n4') == 40
+
+        with cache.pipeline() as pipe:
+            pipe.incr('n4')
+        assert cache.get('n4') == 41
+
+        # bounded by max entries
+        for i in range(10):
+            cache.get(f'k{i}')
+        stats = cache.get_near_stats()
+        assert stats['size'] == 3
+        assert stats['evictions'] > 0
+        assert stats['hits'] > 0 and stats['negative_hits'] > 0
+        assert 0 < stats['hit_rate'] < 1
+
+    def test_redis_near_cache(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        import time
+        from utilmeta.core.cache.backends.redis import RedisCache
+
+        server = fakeredis.FakeServer()
+        caches = []
+        for _ in range(2):
+            cache = RedisCache(port=6390, db=4, near_cache=True, near_cache_channel='test:near')
+            invalidator = cache.get_near_invalidator()
+            invalidator._client = fakeredis.FakeRedis(server=server)
+            invalidator.start()
+            assert invalidator.subscribed.wait(5)
+            caches.append(cache)
+        c1, c2 = caches
+        c1.get_near_cache().set('key', 1)
+        c2.get_near_cache().set('key', 1)
+        c1.invalidate_near('key')
+        assert 'key' not in c1.get_near_cache()
+        for _ in range(50):
+            if 'key' not in c2.get_near_cache():
+                break
+            time.sleep(0.05)
+        assert 'key' not in c2.get_near_cache()
+        for cache in caches:
+            invalidator = cache.get_near_invalidator()
+            invalidator.stop()
+            assert not invalidator.available
+
+    def test_redis_round_trips(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')     # lua scripts
+        import time
+        from redis import ConnectionPool
+        from utilmeta.core.cache.backends.redis import RedisCache, RedisCacheEntity, round_trips
+        from utilmeta.core.cache.backends.redis.client import CountedRedis
+        from utilmeta.core.cache.plugins.base import BaseCacheInterface
+
+        redis_cache = RedisCache(port=6390, db=3)
+        RedisCacheEntity._connections[redis_cache.get_location()] = CountedRedis(
+            connection_pool=ConnectionPool(
+                server=fakeredis.FakeServer(),
+                connection_class=fakeredis.FakeConnection
+            )
+        )
+
+        class RedisCacheInterface(BaseCacheInterface):
+            cache_instance = redis_cache
+
+        cache = RedisCacheInterface(
+            scope_prefix='test_round_trips', trace_keys=True, entity_cls=RedisCacheEntity
+        )
+        cache.clear()
+        round_trips.reset()
+        cache.set('a', 1)
+        assert int(round_trips) == 1
+        assert cache.get('a') == 1
+        assert cache.fetch(['a', 'b']) == [1, None]
+        assert int(round_trips) == 3
+        cache.update({'b': 2, 'c': 3})
+        cache.delete('c')
+        assert int(round_trips) == 5
+        stats = cache.get_stats()
+        assert stats['requests'] == 3
+        assert stats['hits'] == 2
+
+        num = 500
+        round_trips.reset()
+        t0 = time.perf_counter()
+        for i in range(num):
+            cache.set(f'key-{i % 50}', i)
+            cache.get(f'key-{(i * 7) % 50}')
+        rate = num * 2 / (time.perf_counter() - t0)
+        assert int(round_trips) == num * 2
+        print(f'redis get/set with trace_keys: {rate:.0f} ops/s, {round_trips}')
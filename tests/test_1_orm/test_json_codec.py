@@ -0,0 +1,132 @@
+import json
+import time
+import uuid
+import decimal
+import pytest
+from datetime import datetime, timedelta
+from typing import List
+from utilmeta.core import orm
+from utilmeta.utils.codec import get_json_codec, json_normalize, json_codecs
+from tests.conftest import setup_service
+
+setup_service(__name__, async_param=False)
+
+
+def available_codecs():
+    return [get_json_codec(name) for name, cls in json_codecs.items() if cls.available()]
+
+
+def make_articles(num: int):
+    from app.models import User, Article
+
+    class AuthorSchema(orm.Schema[User]):
+        id: int
+        username: str
+        signup_time: datetime
+
+    class ArticleItem(orm.Schema[Article]):
+        id: int
+        title: str
+        slug: str
+        views: int
+        created_at: datetime
+        author: AuthorSchema
+        tags: List[str]
+
+    now = datetime(2024, 1, 1, 12, 30, 15, 123456)
+    return [
+        ArticleItem(
+            id=i + 1,
+            title=f'article {i}',
+            slug=f'article-{i}',
+            views=i * 10,
+            created_at=now + timedelta(seconds=i),
+            author=AuthorSchema(id=i % 10 + 1, username=f'user-{i % 10}', signup_time=now),
+            tags=['tech', '中文'],
+        ) for i in range(num)
+    ]
+
+
+class TestJSONCodec:
+    def test_codec_output(self):
+        from utilmeta.core.response import Response
+
+        articles = make_articles(3)
+        data = {
+            'articles': articles,
+            'uuid': uuid.UUID(int=1),
+            'decimal': decimal.Decimal('1.5'),
+            'duration': timedelta(seconds=3),
+            'ids': (1, 2),
+            1: None,
+        }
+        expected = json.loads(json.dumps(data, cls=Response.__json_encoder_cls__))
+        assert json_normalize(data) == expected
+        plain = {'a': [1, 2.5, 'b', None, True]}
+        assert json_normalize(plain) is plain
+
+        for codec in available_codecs():
+            assert json.loads(codec.dumpb(data)) == expected, codec.name
+            assert codec.loads(codec.dumps(data)) == expected, codec.name
+            assert json.loads(codec.dumps(articles, sort_keys=True, indent=4)) == expected['articles']
+            with pytest.raises(json.JSONDecodeError):
+                codec.loads(b'{invalid')
+
+    def test_codec_consistency(self):
+        import enum
+        import utype
+        from datetime import timezone
+
+        class Color(str, enum.Enum):
+            red = 'red'
+
+        class Point(utype.Schema):
+            x: int = 1
+            at: datetime = datetime(2024, 1, 1)
+
+        data = {
+            'utc': datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+            'naive': datetime(2024, 1, 1, 12, 30, 15, 123456),
+            'duration': timedelta(seconds=3),
+            'decimal': decimal.Decimal('1.50'),
+            'schema': Point(),
+            'color': Color.red,
+            'big': 2 ** 70,
+        }
+        expected = get_json_codec('json').dumps(data)
+        normalized = json_normalize(data)
+        assert type(normalized['schema']) is dict
+        assert type(normalized['color']) is str
+        assert json.loads(expected) == normalized
+        for codec in available_codecs():
+            # the same wire format whichever codec is chosen
+            assert json.loads(codec.dumps(data)) == normalized, codec.name
+            assert codec.dumps([2 ** 70]) == '[1180591620717411303424]', codec.name
+
+    def test_response_data(self):
+        from utilmeta.core.response import Response
+
+        articles = make_articles(2)
+        resp = Response(articles)
+        assert resp.is_json
+        assert resp.data == json.loads(resp.body)
+        assert resp.data[0]['created_at'] == json.loads(json.dumps(
+            articles[0].created_at, cls=Response.__json_encoder_cls__))
+
+        plain = {'a': [1, 2]}
+        assert Response(plain).data is plain
+
+        with pytest.raises(ValueError):
+            get_json_codec('not-exists')
+
+    def test_codec_benchmark(self):
+        articles = make_articles(5000)
+        expected = json.loads(get_json_codec('json').dumps(articles))
+        results = {}
+        for codec in available_codecs():
+            assert json.loads(codec.dumpb(articles)) == expected
+            t0 = time.perf_counter()
+            for _ in range(5):
+                codec.dumpb(articles)
+            results[codec.name] = time.perf_counter() - t0
+        print('serialize 5000 orm.Schema x5:', ', '.join(f'{k}: {v:.4f}s' for k, v in results.items()))
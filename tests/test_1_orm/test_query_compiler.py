@@ -0,0 +1,72 @@
+import time
+from tests.conftest import setup_service
+from utilmeta.utils import order_list
+
+setup_service(__name__, async_param=False)
+
+
+def linear_set_values(values: list, pk_orders: list):
+    # the list-based dedupe that set_values replaces
+    result = []
+    pk_list = []
+    for val in values:
+        pk = val['pk']
+        if pk is None or pk in pk_list:
+            continue
+        pk_list.append(pk)
+        result.append(val)
+    if pk_orders and result:
+        result = order_list(result, orders=pk_orders, by='pk', join_rest=True)
+    return result
+
+
+def make_values(num: int):
+    # duplicates (like rows multiplied by joins) and null pks
+    values = [{'pk': i, 'title': f'article-{i}'} for i in range(1, num + 1)]
+    values.extend([{'pk': i, 'title': f'dup-{i}'} for i in range(1, num + 1, 3)])
+    values.append({'pk': None, 'title': 'none'})
+    return values
+
+
+class TestQueryCompiler:
+    def test_set_values(self):
+        from app.schema import ArticleBase
+
+        pk_orders = [5, 3, 100, 1, 3]
+        compiler = ArticleBase.__parser__.get_compiler(pk_orders)
+        assert compiler.pk_orders == pk_orders
+        values = make_values(10)
+        expected = linear_set_values([dict(v) for v in values], pk_orders)
+        compiler.set_values(values)
+        assert compiler.values == expected
+        assert [v['pk'] for v in compiler.values] == [5, 1, 3, 2, 4, 6, 7, 8, 9, 10]
+        assert compiler.pk_list == list(range(1, 11))
+        assert compiler.pk_map[1]['title'] == 'article-1'
+        assert compiler.pk_types == {int}
+
+        # query result keys are used as-is, other key types are converted to str
+        pk_map = {1: [2], 2: [3]}
+        assert compiler.normalize_pk_keys(pk_map) == (pk_map, False)
+        assert compiler.normalize_pk_keys({'1': [2], 2: [3]}) == ({'1': [2], '2': [3]}, True)
+
+    def test_set_values_benchmark(self):
+        from app.schema import ArticleBase
+
+        for num in (1000, 10000, 100000):
+            values = make_values(num)
+            pk_orders = list(range(num, 0, -1))
+            compiler = ArticleBase.__parser__.get_compiler(pk_orders)
+            t0 = time.perf_counter()
+            compiler.set_values([dict(v) for v in values])
+            indexed = time.perf_counter() - t0
+            assert len(compiler.values) == num
+            assert compiler.values[0]['pk'] == num
+
+            if num > 10000:
+                print(f'rows: {num}, set_values: {indexed:.4f}s')
+                continue
+            t0 = time.perf_counter()
+            expected = linear_set_values([dict(v) for v in values], pk_orders)
+            linear = time.perf_counter() - t0
+            assert compiler.values == expected
+            print(f'rows: {num}, set_values: {indexed:.4f}s, list dedupe: {linear:.4f}s')
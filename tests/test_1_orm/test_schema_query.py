@@ -1,5 +1,5 @@
 import pytest
-from tests.conftest import setup_service
+from tests.conftest import setup_service, benchmark
 from utilmeta.core import orm
 from utilmeta.utils import exceptions, time_now
 from datetime import datetime
@@ -428,6 +428,155 @@ class TestSchemaQuery:
         assert articles[0].author.followers_num == 2
         assert db_using in articles[0].tags
 
+    def test_stream_users(self, service, db_using):
+        from app.schema import UserSchema, ArticleSchema
+        from app.models import User, Article
+        from django.db import models
+        qs = User.objects.using(db_using).order_by('pk')
+        users = UserSchema.serialize(qs)
+        stream = UserSchema.stream(qs, chunk_size=2)
+        assert not isinstance(stream, list)
+        streamed = list(stream)
+        assert [dict(u) for u in streamed] == [dict(u) for u in users]
+        assert all(isinstance(u, UserSchema) for u in streamed)
+
+        # duplicated rows of the joins are distinct across chunks
+        dup_qs = Article.objects.using(db_using).filter(
+            models.Q(liked_bys__in=[1, 2, 3]) | models.Q(author__in=[1, 2, 3]), pk__lte=5
+        )
+        pks = [a.pk for a in ArticleSchema.stream(dup_qs, chunk_size=1)]
+        assert len(pks) == len(set(pks))
+        assert set(pks) == {a.pk for a in ArticleSchema.serialize(dup_qs)}
+
+        assert [a.pk for a in ArticleSchema.stream([3, 1, 2])] == [3, 1, 2]
+        assert list(UserSchema.stream(User.objects.none())) == []
+
+    @pytest.mark.asyncio
+    async def test_async_stream_users(self, service, db_using):
+        await self.refresh_db(db_using)
+        from app.schema import UserSchema
+        from app.models import User
+        qs = User.objects.all()
+        users = await UserSchema.aserialize(qs, context=orm.QueryContext(using=db_using))
+        streamed = [
+            u async for u in UserSchema.astream(qs, context=orm.QueryContext(using=db_using), chunk_size=2)
+        ]
+        assert sorted(u.pk for u in streamed) == sorted(u.pk for u in users)
+        mp = {u.pk: dict(u) for u in users}
+        for u in streamed:
+            assert dict(u) == mp[u.pk]
+
+        # keyset pages for the pk orderings, offset pages for the others
+        for order in ('pk', '-pk', 'username'):
+            ordered = User.objects.order_by(order)
+            users = await UserSchema.aserialize(ordered, context=orm.QueryContext(using=db_using))
+            streamed = [
+                u async for u in UserSchema.astream(ordered, context=orm.QueryContext(using=db_using), chunk_size=2)
+            ]
+            assert [dict(u) for u in streamed] == [dict(u) for u in users]
+
+    def test_trusted_source(self, service, db_using):
+        from app.schema import UserSchema, ArticleSchema, CommentSchema, UserBase
+        for schema in (UserSchema, ArticleSchema, CommentSchema, UserBase):
+            qs = schema.__parser__.model.get_queryset().using(db_using)
+            values = schema.serialize(qs)
+            schema.__trusted_source__ = True
+            try:
+                trusted = schema.serialize(qs)
+            finally:
+                schema.__trusted_source__ = None
+            assert len(values) == len(trusted)
+            for val, inst in zip(values, trusted):
+                assert type(inst) is schema
+                assert dict(inst) == dict(val)
+                assert inst.__dict__.keys() == val.__dict__.keys()
+
+    @benchmark
+    def test_trusted_source_benchmark(self, service, record_property):
+        import time
+        from app.schema import UserSchema
+        # the conversion of the queried rows
+        compiler = UserSchema._get_compiler(UserSchema.__parser__.model.get_queryset())
+        options = compiler.serialize_options
+        rows = compiler.get_values() * 100
+        converter = UserSchema.__parser__.get_row_converter(options)
+        t0 = time.perf_counter()
+        for row in rows:
+            UserSchema.__from__(dict(row), options)
+        record_property('full_parsing_rows_per_second', len(rows) / (time.perf_counter() - t0))
+        t0 = time.perf_counter()
+        for row in rows:
+            converter(dict(row))
+        record_property('trusted_rows_per_second', len(rows) / (time.perf_counter() - t0))
+
+    def test_query_plan_cache(self, service, db_using):
+        from app.schema import UserSchema, ArticleSchema, CommentSchema
+        from utilmeta.core.orm.plan import query_plans
+        from utilmeta.conf import Preference
+        pref = Preference.get()
+
+        def serialize_all():
+            return [
+                [dict(inst) for inst in schema.serialize(
+                    schema.__parser__.model.get_queryset().using(db_using)
+                )] for schema in (UserSchema, ArticleSchema, CommentSchema)
+            ]
+
+        size = pref.orm_query_plan_cache_size
+        pref.orm_query_plan_cache_size = 0
+        try:
+            values = serialize_all()
+        finally:
+            pref.orm_query_plan_cache_size = size
+
+        query_plans.clear()
+        assert serialize_all() == values
+        misses = query_plans.plan_misses
+        hits = query_plans.plan_hits
+        assert query_plans.get_stats()['plans'] > 0
+        assert serialize_all() == values
+        assert query_plans.plan_misses == misses
+        assert query_plans.plan_hits > hits
+
+        # scope (includes / excludes) is part of the plan key
+        user = UserSchema.init(1, context=orm.QueryContext(using=db_using, includes={'username': None}))
+        assert 'username' in user and 'articles_num' not in user
+        user = UserSchema.init(1, context=orm.QueryContext(using=db_using))
+        assert 'username' in user and 'articles_num' in user
+
+        query_plans.invalidate(UserSchema)
+        assert not any(key[0] is UserSchema for key in query_plans.plans)
+        query_plans.invalidate(ArticleSchema.__model__)
+        assert not any(key[0] is ArticleSchema for key in query_plans.plans)
+
+    @pytest.mark.asyncio
+    async def test_async_query_plan_cache(self, service, db_using):
+        from app.schema import UserSchema, ArticleSchema
+        from app.models import User, Article
+        from utilmeta.core.orm.plan import query_plans
+
+        query_plans.clear()
+        for v in range(2):
+            # the same shape with different filter values
+            for pk, name in [(1, 'alice'), (2, 'bob'), (3, 'jack')]:
+                qs = User.objects.filter(username=name, id__gte=pk).values('id', 'username')
+                assert qs.get_sql() == qs.query.clone().get_compiler(qs.db).as_sql()
+                users = await UserSchema.aserialize(User.objects.filter(username=name).using(db_using))
+                assert [u.username for u in users] == [name]
+
+        stats = query_plans.get_stats()
+        assert stats['templates'] > 0
+        assert stats['template_hits'] > stats['template_misses']
+
+        articles = await ArticleSchema.aserialize(Article.objects.filter(id__in=[1, 2]).using(db_using))
+        assert {a.id for a in articles} == {1, 2}
+        articles = await ArticleSchema.aserialize(Article.objects.filter(id__in=[1, 2, 3]).using(db_using))
+        assert {a.id for a in articles} == {1, 2, 3}
+        assert await ArticleSchema.aserialize(Article.objects.filter(id__in=[]).using(db_using)) == []
+
+        query_plans.invalidate(User)
+        assert not any(key[1] is User for key in query_plans.templates)
+
     def test_save(self, service, db_using):
         from app.schema import ArticleSchema
         from app.models import Article
@@ -314,6 +314,56 @@ class TestAPIClass:
         assert resp2.headers.get('x-order-tmp') == '1,2,3,4'
         assert resp2.headers.get('x-order') == '1,2,3,4'
 
+    def test_api_plugins_chain_cache(self, service):
+        if service.asynchronous:
+            return
+
+        from utilmeta.core.request import Request
+        from utilmeta.core.response import Response
+        from utilmeta.core.api.chain import APIChainBuilder
+
+        targets = []
+
+        class TargetPlugin(api.Plugin):
+            def process_response(self, response: Response, target=None):
+                targets.append(target)
+
+        class ExtraPlugin(api.Plugin):
+            def process_response(self, response: Response):
+                response.headers['x-extra'] = '1'
+
+        @TargetPlugin
+        class SubAPI(api.API):
+            @api.get
+            def hello(self):
+                return 'world'
+
+        class RootAPI(api.API):
+            sub: SubAPI
+
+        stats = APIChainBuilder.get_cache_stats()
+        for i in range(3):
+            resp = RootAPI(Request(method='GET', url='sub/hello'))()
+            assert resp.result == 'world'
+
+        # the cached chain is called with the serving API instance
+        assert len(targets) == 3
+        assert all(isinstance(t, SubAPI) for t in targets)
+        assert len(set(id(t) for t in targets)) == 3
+
+        new_stats = APIChainBuilder.get_cache_stats()
+        assert new_stats['hits'] > stats['hits']
+        rebuilds = new_stats['rebuilds']
+
+        SubAPI._add_plugins(ExtraPlugin())
+        resp = RootAPI(Request(method='GET', url='sub/hello'))()
+        assert resp.headers.get('x-extra') == '1'
+        assert APIChainBuilder.get_cache_stats()['rebuilds'] > rebuilds
+
+        SubAPI._remove_plugins(ExtraPlugin)
+        resp = RootAPI(Request(method='GET', url='sub/hello'))()
+        assert not resp.headers.get('x-extra')
+
     @pytest.mark.asyncio
     async def test_api_async_plugins_orders(self, service):
         if not service.asynchronous:
@@ -0,0 +1,150 @@
+import time
+import pytest
+from utilmeta.core import api, request, response
+from utilmeta.core.server import ServiceMiddleware
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='fastapi', async_param=[True])
+
+
+class EchoAPI(api.API):
+    @api.post
+    def echo(self, data: dict = request.Body) -> dict:
+        return data
+
+    @api.get
+    def hello(self):
+        return 'world'
+
+    @api.get
+    def stream(self):
+        def generator():
+            for i in range(3):
+                yield response.ServerSentEvent(data={'i': i})
+        return response.SSEResponse(generator())
+
+    @api.get
+    def ndjson(self, num: int = 3) -> response.JSONStreamResponse:
+        def generator():
+            for i in range(num):
+                yield {'i': i}
+        return generator()
+
+    @api.get
+    async def array(self, num: int = 3):
+        async def generator():
+            for i in range(num):
+                yield {'i': i}
+        return response.JSONStreamResponse(generator(), array=True, buffer_size=16)
+
+
+class RecordMiddleware(ServiceMiddleware):
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+        self.responses = []
+
+    def process_request(self, req: request.Request):
+        self.requests += 1
+
+    def process_response(self, resp: response.Response):
+        self.responses.append(resp)
+        if resp.request.path.endswith('override'):
+            return response.Response('overridden', status=403)
+
+
+def make_app(asgi_middleware: bool):
+    from fastapi import FastAPI
+    from utilmeta import service
+    from utilmeta.core.server.backends.fastapi import FastAPIServerAdaptor
+    adaptor = FastAPIServerAdaptor(service)
+    adaptor.app = FastAPI()
+    adaptor.asgi_middleware = asgi_middleware
+    adaptor.add_api(adaptor.app, EchoAPI, route='/api', asynchronous=True)
+
+    @adaptor.app.get('/override')
+    async def override():
+        return 'origin'
+
+    middleware = RecordMiddleware()
+    adaptor.add_middleware(middleware)
+    adaptor.setup_middlewares()
+    return adaptor.app, middleware
+
+
+class TestASGIMiddleware:
+    @pytest.mark.asyncio
+    async def test_asgi_middleware(self):
+        import httpx
+        app, middleware = make_app(asgi_middleware=True)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+            resp = await client.post('/api/echo', json={'a': 1})
+            assert resp.status_code == 200
+            assert resp.json() == {'a': 1}
+            # request body is teed for the recording
+            assert middleware.responses[-1].request.adaptor.body == b'{"a":1}'
+
+            resp = await client.get('/api/stream')
+            assert resp.status_code == 200
+            assert resp.text.count('data:') == 3
+
+            resp = await client.get('/override')
+            assert resp.status_code == 403
+            assert resp.text == 'overridden'
+
+            resp = await client.get('/not-found')
+            assert resp.status_code == 404
+            assert middleware.responses[-1].status == 404
+
+        assert middleware.requests == 4
+        assert len(middleware.responses) == 4
+
+    @pytest.mark.asyncio
+    async def test_json_stream(self):
+        import json
+        import httpx
+        app, middleware = make_app(asgi_middleware=False)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+            resp = await client.get('/api/ndjson')
+            assert resp.status_code == 200
+            assert resp.headers['content-type'].startswith('application/x-ndjson')
+            assert [json.loads(line) for line in resp.text.splitlines()] == [{'i': i} for i in range(3)]
+
+            resp = await client.get('/api/array', params={'num': 10})
+            assert resp.status_code == 200
+            assert resp.headers['content-type'].startswith('application/json')
+            assert resp.json() == [{'i': i} for i in range(10)]
+
+            resp = await client.get('/api/array', params={'num': 0})
+            assert resp.json() == []
+
+    def test_json_stream_chunks(self):
+        import json
+        resp = response.JSONStreamResponse(({'i': i} for i in range(10)), array=True, buffer_size=16)
+        chunks = list(resp.event_stream)
+        # encoded incrementally, flushed once the buffer size is reached
+        assert len(chunks) > 1
+        assert json.loads(b''.join(chunks)) == [{'i': i} for i in range(10)]
+
+        def failed():
+            yield {'i': 0}
+            raise ValueError('failed')
+        resp = response.JSONStreamResponse(failed())
+        assert resp.content_type == 'application/x-ndjson'
+        assert b''.join(resp.event_stream) == b'{"i": 0}\n'
+
+    @pytest.mark.asyncio
+    async def test_asgi_middleware_benchmark(self):
+        import httpx
+        results = {}
+        for asgi_middleware in (False, True):
+            app, middleware = make_app(asgi_middleware=asgi_middleware)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+                num = 200
+                t0 = time.perf_counter()
+                for _ in range(num):
+                    resp = await client.get('/api/hello')
+                    assert resp.status_code == 200
+                results[asgi_middleware] = num / (time.perf_counter() - t0)
+            assert middleware.requests == num
+        print(f'http middleware: {results[False]:.1f} req/s, asgi middleware: {results[True]:.1f} req/s')
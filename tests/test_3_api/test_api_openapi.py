@@ -42,6 +42,28 @@ class TestOpenAPI:
         assert slug
         assert username
 
+    def test_cursor_pagination_query(self):
+        from app.models import Article
+        from utilmeta import service
+
+        class QueryAPI(api.API):    # noqa
+            class ArticleQuery(orm.Query[Article]):
+                order: str = orm.OrderBy([Article.created_at])
+                cursor: str = orm.Cursor()
+                limit: int = orm.Limit()
+
+            @api.get
+            def query(self, query: ArticleQuery):
+                pass
+
+        generator = OpenAPI(service)
+        generator.from_api(QueryAPI)
+        params = {p['name']: p for p in generator.paths['/query']['get'].get('parameters')}
+        cursor = params.get('cursor')
+        assert cursor
+        assert cursor['schema']['type'] == 'string'
+        assert cursor['schema'].get('x-annotation') == {'class': 'cursor'}
+
     def test_multiple_properties_body(self):
         from app.models import Article, User
         from utilmeta import service
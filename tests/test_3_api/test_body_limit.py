@@ -0,0 +1,286 @@
+import asyncio
+import pytest
+import tracemalloc
+from tempfile import SpooledTemporaryFile
+from utilmeta.core import api, request, file
+from utilmeta.utils import exceptions as exc
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='fastapi', async_param=[True])
+
+CHUNK = b'x' * 64 * 1024
+
+
+class UploadAPI(api.API):
+    @api.post
+    def echo(self, data: dict = request.Body(max_length=100)) -> dict:
+        return data
+
+    @api.post
+    def upload(self, data: file.File = request.Body(
+        max_length=1024 * 1024, content_type=request.Body.OCTET_STREAM
+    )) -> int:
+        return data.size
+
+
+def make_app():
+    from fastapi import FastAPI
+    from utilmeta import service
+    from utilmeta.core.server.backends.fastapi import FastAPIServerAdaptor
+    adaptor = FastAPIServerAdaptor(service)
+    adaptor.app = FastAPI()
+    adaptor.add_api(adaptor.app, UploadAPI, route='/api', asynchronous=True)
+    return adaptor.app
+
+
+def make_starlette_request(content_type: str, chunks: int, chunk: bytes = CHUNK):
+    from starlette.requests import Request
+    from utilmeta.core.request.backends.starlette import StarletteRequestAdaptor
+
+    state = dict(received=0)
+
+    async def receive():
+        state['received'] += 1
+        more = state['received'] < chunks
+        return {'type': 'http.request', 'body': chunk, 'more_body': more}
+
+    scope = {
+        'type': 'http',
+        'method': 'POST',
+        'path': '/',
+        'query_string': b'',
+        # chunked body without content-length
+        'headers': [(b'content-type', content_type.encode())],
+    }
+    return StarletteRequestAdaptor(Request(scope, receive)), state
+
+
+class TestBodyLimit:
+    @pytest.mark.asyncio
+    async def test_chunked_body_limit(self):
+        import httpx
+        app = make_app()
+
+        async def body(n: int):
+            for i in range(n):
+                yield CHUNK
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://testserver') as client:
+            resp = await client.post('/api/echo', json={'a': 1})
+            assert resp.status_code == 200
+            resp = await client.post('/api/echo', json={'a': 'x' * 200})
+            assert resp.status_code == 413
+
+            resp = await client.post(
+                '/api/upload', content=body(4),
+                headers={'content-type': 'application/octet-stream'}
+            )
+            assert resp.status_code == 200
+            assert resp.json() == len(CHUNK) * 4
+
+            # no content-length, the limit is enforced on the bytes read
+            resp = await client.post(
+                '/api/upload', content=body(32),
+                headers={'content-type': 'application/octet-stream'}
+            )
+            assert resp.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_early_rejection(self):
+        adaptor, state = make_starlette_request('application/octet-stream', chunks=1000)
+        adaptor.limit_length(256 * 1024)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            await adaptor.async_load()
+        # stop reading right after the limit is exceeded
+        assert state['received'] == 5
+
+    @pytest.mark.asyncio
+    async def test_file_body_spooled(self):
+        adaptor, state = make_starlette_request('application/octet-stream', chunks=320)
+        tracemalloc.start()
+        try:
+            data = await adaptor.async_load()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert isinstance(data, file.File)
+        assert isinstance(data.file, SpooledTemporaryFile)
+        assert data.size == len(CHUNK) * 320
+        assert data.read(3) == b'xxx'
+        # 20MB body is written to disk, peak memory does not grow with the payload
+        assert peak < 5 * 1024 * 1024
+        data.close()
+
+    @pytest.mark.asyncio
+    async def test_multipart_limit(self):
+        boundary = b'----boundary'
+        part = (b'--' + boundary + b'\r\nContent-Disposition: form-data; name="f"; filename="a.bin"\r\n'
+                b'Content-Type: application/octet-stream\r\n\r\n')
+        chunks = [part] + [CHUNK] * 20 + [b'\r\n--' + boundary + b'--\r\n']
+        from starlette.requests import Request
+        from utilmeta.core.request.backends.starlette import StarletteRequestAdaptor
+
+        def make(limit: int = None):
+            it = iter(chunks)
+
+            async def receive():
+                try:
+                    body = next(it)
+                except StopIteration:
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                return {'type': 'http.request', 'body': body, 'more_body': True}
+
+            scope = {
+                'type': 'http',
+                'method': 'POST',
+                'path': '/',
+                'query_string': b'',
+                'headers': [(b'content-type', b'multipart/form-data; boundary=' + boundary)],
+            }
+            adaptor = StarletteRequestAdaptor(Request(scope, receive))
+            adaptor.limit_length(limit)
+            return adaptor
+
+        form = await make().async_load()
+        assert form['f'].size == len(CHUNK) * 20
+        with pytest.raises(exc.RequestEntityTooLarge):
+            await make(len(CHUNK) * 10).async_load()
+
+    def test_django_stream_limit(self):
+        from django.core.handlers.wsgi import WSGIRequest
+        from utilmeta.core.request.backends.django import DjangoRequestAdaptor
+        from io import BytesIO
+
+        def make(body: bytes, content_type: str):
+            return DjangoRequestAdaptor(WSGIRequest({
+                'REQUEST_METHOD': 'POST',
+                'PATH_INFO': '/',
+                'SERVER_NAME': '127.0.0.1',
+                'SERVER_PORT': '80',
+                'wsgi.url_scheme': 'http',
+                'CONTENT_TYPE': content_type,
+                'CONTENT_LENGTH': str(len(body)),
+                'wsgi.input': BytesIO(body),
+            }))
+
+        adaptor = make(b'{"a": 1}', 'application/json')
+        adaptor.limit_length(100)
+        assert adaptor.content == {'a': 1}
+
+        adaptor = make(b'x' * 200, 'application/octet-stream')
+        adaptor.limit_length(100)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            _ = adaptor.content
+
+        data = make(b'x' * 200, 'application/octet-stream').content
+        assert isinstance(data.file, SpooledTemporaryFile)
+        assert data.read() == b'x' * 200
+
+    def test_werkzeug_stream_limit(self):
+        from werkzeug.test import EnvironBuilder
+        from werkzeug.wrappers import Request
+        from utilmeta.core.request.backends.werkzeug import WerkzeugRequestAdaptor
+
+        def make(body: bytes, content_type: str, content_length: bool = True):
+            environ = EnvironBuilder(method='POST', data=body, content_type=content_type).get_environ()
+            if not content_length:
+                # chunked body
+                environ.pop('CONTENT_LENGTH')
+                environ['wsgi.input_terminated'] = True
+            return WerkzeugRequestAdaptor(Request(environ))
+
+        adaptor = make(b'{"a": 1}', 'application/json')
+        adaptor.limit_length(100)
+        assert adaptor.content == {'a': 1}
+
+        # the body is not read until the limit is set by the body params
+        adaptor = make(b'x' * 200, 'application/octet-stream')
+        assert not adaptor.body_loaded
+        adaptor.limit_length(100)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            _ = adaptor.content
+
+        adaptor = make(b'x' * 200, 'application/octet-stream', content_length=False)
+        adaptor.limit_length(100)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            _ = adaptor.content
+
+        data = make(b'x' * 200, 'application/octet-stream', content_length=False).content
+        assert isinstance(data.file, SpooledTemporaryFile)
+        assert data.read() == b'x' * 200
+
+        body = (b'--b\r\nContent-Disposition: form-data; name="f"; filename="a.bin"\r\n'
+                b'Content-Type: application/octet-stream\r\n\r\n' + b'x' * 2000 + b'\r\n--b--\r\n')
+        assert make(body, 'multipart/form-data; boundary=b').content['f'][0].size == 2000
+        adaptor = make(body, 'multipart/form-data; boundary=b', content_length=False)
+        adaptor.limit_length(1000)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            _ = adaptor.content
+
+    @pytest.mark.asyncio
+    async def test_aiohttp_stream_limit(self):
+        from unittest import mock
+        from aiohttp.test_utils import make_mocked_request
+        from aiohttp.streams import StreamReader
+        from utilmeta.core.request.backends.aiohttp import AiohttpRequestAdaptor
+
+        def make(chunks: int, content_type: str):
+            protocol = mock.Mock(_reading_paused=False)
+            payload = StreamReader(protocol, 2 ** 16, loop=asyncio.get_running_loop())
+            for _ in range(chunks):
+                payload.feed_data(CHUNK)
+            payload.feed_eof()
+            # no content-length, the limit is enforced on the bytes read
+            return AiohttpRequestAdaptor(make_mocked_request(
+                'POST', '/', headers={'Content-Type': content_type}, payload=payload
+            ))
+
+        adaptor = make(4, 'application/octet-stream')
+        adaptor.limit_length(len(CHUNK) * 2)
+        with pytest.raises(exc.RequestEntityTooLarge):
+            await adaptor.async_load()
+
+        data = await make(4, 'application/octet-stream').async_load()
+        assert isinstance(data.file, SpooledTemporaryFile)
+        assert data.size == len(CHUNK) * 4
+
+        adaptor = make(4, 'text/plain')
+        adaptor.limit_length(len(CHUNK))
+        with pytest.raises(exc.RequestEntityTooLarge):
+            await adaptor.async_load()
+
+    def test_buffered_backends_limit(self):
+        # sanic and tornado buffer the body in the server,
+        # the received length is checked after the body params are loaded
+        from tornado.httputil import HTTPServerRequest, HTTPHeaders
+        from sanic import Sanic
+        from sanic.request import Request as SanicRequest
+        from sanic.compat import Header
+        from utilmeta.core.request import Request
+        from utilmeta.core.request.backends.tornado import TornadoServerRequestAdaptor
+        from utilmeta.core.request.backends.sanic import SanicRequestAdaptor
+
+        body = b'{"a": "' + b'x' * 200 + b'"}'
+
+        def make_tornado():
+            return Request(TornadoServerRequestAdaptor(HTTPServerRequest(
+                method='POST', uri='/', body=body,
+                headers=HTTPHeaders({'Content-Type': 'application/json', 'Content-Length': str(len(body))}),
+            )))
+
+        def make_sanic():
+            app = Sanic.get_app('test_body_limit', force_create=True)
+            req = SanicRequest(
+                b'/', Header({'content-type': 'application/json', 'content-length': str(len(body))}),
+                '1.1', 'POST', None, app
+            )
+            req.body = body
+            return Request(SanicRequestAdaptor(req))
+
+        for make in (make_tornado, make_sanic):
+            req = make()
+            assert req.adaptor.read_length == len(body)
+            with pytest.raises(exc.RequestEntityTooLarge):
+                request.Body(max_length=100).getter(req)
+            req = make()
+            assert request.Body(max_length=1000).getter(req) == {'a': 'x' * 200}
@@ -0,0 +1,172 @@
+import time
+import asyncio
+import threading
+import pytest
+from utilmeta.core import api
+from utilmeta.core.request import Request
+from utilmeta.core.response import Response
+from utilmeta.core.api.plugins.rate import MemoryRateLimitStore, RateLimitRule
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='django', async_param=[False])
+
+
+def tenant_key(request: Request):
+    return request.headers.get('X-Tenant')
+
+
+def serve(api_cls, request: Request) -> Response:
+    # errors are converted to response by the server adaptor
+    try:
+        return api_cls(request)()
+    except Exception as e:
+        return Response(error=e, request=request)
+
+
+async def aserve(api_cls, request: Request) -> Response:
+    try:
+        return await api_cls(request)()
+    except Exception as e:
+        return Response(error=e, request=request)
+
+
+class TestRateLimit:
+    def test_rate_limit_headers(self, service):
+        class LimitAPI(api.API):
+            @api.RateLimit(3, 60)
+            @api.get
+            def hello(self):
+                return {'hello': 'world'}
+
+        def get():
+            return serve(LimitAPI, Request(method='GET', url='hello'))
+
+        for i in range(3):
+            resp = get()
+            assert resp.status == 200
+            assert resp.headers.get('X-RateLimit-Limit') == '3'
+            assert resp.headers.get('X-RateLimit-Remaining') == str(2 - i)
+        resp = get()
+        assert resp.status == 429
+        assert int(resp.headers.get('Retry-After')) >= 1
+        assert resp.headers.get('X-RateLimit-Remaining') == '0'
+
+    def test_multiple_rules(self, service):
+        plugin = api.RateLimit(
+            rules=[
+                RateLimitRule(2, 60, key=tenant_key, algorithm=RateLimitRule.SLIDING_WINDOW),
+                RateLimitRule(3, 60, key='ip'),
+            ]
+        )
+
+        class TenantAPI(api.API):
+            @plugin
+            @api.get
+            def hello(self):
+                return {'hello': 'world'}
+
+        def get(tenant=None):
+            headers = {'X-Tenant': tenant} if tenant else {}
+            return serve(TenantAPI, Request(method='GET', url='hello', headers=headers)).status
+
+        assert [get('a'), get('a'), get('a')] == [200, 200, 429]
+        # rejected requests do not consume the quota of other rules
+        assert get('b') == 200
+        # the rules without key for the request are skipped, the ip rule is exceeded
+        assert get() == 429
+
+    def test_memory_store_algorithms(self):
+        store = MemoryRateLimitStore()
+        bucket = RateLimitRule(2, 0.2)
+        window = RateLimitRule(2, 0.2, algorithm=RateLimitRule.SLIDING_WINDOW)
+        for rule in (bucket, window):
+            key = rule.algorithm
+            assert [store.check([(key, rule)])[0].allowed for _ in range(3)] == [True, True, False]
+            state = store.check([(key, rule)])[0]
+            assert 0 < state.retry_after <= 0.2
+            time.sleep(state.retry_after + 0.01)
+            assert store.check([(key, rule)])[0].allowed
+
+        with pytest.raises(ValueError):
+            RateLimitRule(0)
+        with pytest.raises(ValueError):
+            RateLimitRule(1, key='unknown')
+        with pytest.raises(ValueError):
+            api.RateLimit()
+
+    def test_redis_store_algorithms(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')     # lua scripts
+        from utilmeta.core.cache.backends.redis import RedisCache
+        from utilmeta.core.api.plugins.rate import RedisRateLimitStore
+        store = RedisRateLimitStore(RedisCache(port=6390, db=4))
+        store._con = con = fakeredis.FakeRedis()
+
+        bucket = RateLimitRule(2, 0.2)
+        window = RateLimitRule(2, 0.2, algorithm=RateLimitRule.SLIDING_WINDOW)
+        for rule in (bucket, window):
+            key = f'rate:{rule.algorithm}'
+            assert [store.check([(key, rule)], member=str(i))[0].allowed for i in range(3)] == [True, True, False]
+            state = store.check([(key, rule)], member='3')[0]
+            assert not state.allowed
+            assert state.remaining == 0
+            assert 0 < state.retry_after <= 0.2
+            time.sleep(state.retry_after + 0.01)
+            assert store.check([(key, rule)], member='4')[0].allowed
+
+        # the rejected request does not consume the quota of the other rules
+        minute = RateLimitRule(5, 60)
+        minute_window = RateLimitRule(5, 60, algorithm=RateLimitRule.SLIDING_WINDOW)
+        single = RateLimitRule(1, 60)
+        items = [('rate:minute', minute), ('rate:minute_window', minute_window), ('rate:single', single)]
+        assert all(state.allowed for state in store.check(items, member='a'))
+        states = store.check(items, member='b')
+        assert [state.allowed for state in states] == [True, True, False]
+        assert float(con.hget('rate:minute', 'tokens')) == pytest.approx(4, abs=0.01)
+        assert con.zcard('rate:minute_window') == 1
+        states = store.check(items[:2], member='c')
+        assert [state.remaining for state in states] == [3, 3]
+
+    def test_concurrent_clients(self, service):
+        limit = 20
+        statuses = []
+        lock = threading.Lock()
+
+        class ConcurrentAPI(api.API):
+            @api.RateLimit(limit, 60, algorithm=RateLimitRule.SLIDING_WINDOW)
+            @api.get
+            def hello(self):
+                time.sleep(0.001)
+                return {'hello': 'world'}
+
+        def client():
+            for _ in range(5):
+                status = serve(ConcurrentAPI, Request(method='GET', url='hello')).status
+                with lock:
+                    statuses.append(status)
+
+        threads = [threading.Thread(target=client) for _ in range(16)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(statuses) == 80
+        assert statuses.count(200) == limit
+        assert statuses.count(429) == 80 - limit
+
+    @pytest.mark.asyncio
+    async def test_async_rate_limit(self, service):
+        class AsyncAPI(api.API):
+            @api.RateLimit(5, 60, key=tenant_key)
+            @api.get
+            async def hello(self):
+                await asyncio.sleep(0.01)
+                return {'hello': 'world'}
+
+        async def get():
+            resp = await aserve(AsyncAPI, Request(method='GET', url='hello', headers={'X-Tenant': 'a'}))
+            return resp.status
+
+        statuses = await asyncio.gather(*[get() for _ in range(12)])
+        assert statuses.count(200) == 5
+        assert statuses.count(429) == 7
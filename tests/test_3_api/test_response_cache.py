@@ -0,0 +1,120 @@
+import time
+import asyncio
+import threading
+import pytest
+from utilmeta.core import api, request
+from utilmeta.core.request import Request
+from utilmeta.core.response import Response
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='django', async_param=[False])
+
+
+class TestResponseCache:
+    def test_response_cache(self, service):
+        calls = []
+
+        class ItemAPI(api.API):
+            @api.ResponseCache(60, vary_headers=['X-Tenant'])
+            @api.get('{id}')
+            def get_item(self, id: int = request.PathParam, q: str = None):
+                calls.append(id)
+                return {'id': id, 'q': q, 'calls': len(calls)}
+
+            @api.ResponseCache(60)
+            @api.post
+            def post(self):
+                calls.append('post')
+                return len(calls)
+
+        class RootAPI(api.API):
+            items: ItemAPI
+
+        def get(url: str, **headers) -> Response:
+            path, _, q = url.partition('?q=')
+            return RootAPI(Request(method='GET', url=path, query={'q': q}, headers=headers))()
+
+        resp = get('items/1?q=a')
+        assert resp.status == 200
+        assert resp.data == {'id': 1, 'q': 'a', 'calls': 1}
+        etag = resp.headers.get('etag')
+        assert etag
+
+        # served from cache, the endpoint is not executed
+        cached = get('items/1?q=a')
+        assert cached.data == {'id': 1, 'q': 'a', 'calls': 1}
+        assert cached.headers.get('etag') == etag
+        assert calls == [1]
+        # only the cached body is decoded, the str content of other json responses is kept
+        assert Response('123', content_type='application/json').data == '123'
+
+        # path params, query and vary headers are part of the key
+        assert get('items/2?q=a').data['calls'] == 2
+        assert get('items/1?q=b').data['calls'] == 3
+        assert get('items/1?q=a', **{'X-Tenant': 't1'}).data['calls'] == 4
+        assert get('items/1?q=a').data['calls'] == 1
+
+        not_modified = get('items/1?q=a', **{'If-None-Match': etag})
+        assert not_modified.status == 304
+
+        # methods other than GET / HEAD are not cached
+        assert RootAPI(Request(method='POST', url='items'))().data == 5
+        assert RootAPI(Request(method='POST', url='items'))().data == 6
+
+    def test_response_cache_stale_and_single_flight(self, service):
+        calls = []
+        plugin = api.ResponseCache(1, stale_timeout=10, lock_timeout=5)
+
+        class StaleAPI(api.API):
+            @plugin
+            @api.get
+            def slow(self):
+                calls.append(1)
+                time.sleep(0.3)
+                return {'calls': len(calls)}
+
+        def get():
+            return StaleAPI(Request(method='GET', url='slow'))()
+
+        # concurrent misses: only one request executes the endpoint
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get().data['calls'])) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [1, 1, 1, 1]
+        assert len(calls) == 1
+
+        time.sleep(1.1)
+        # expired: one request refreshes the entry while the others get the stale one
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get().data['calls'])) for _ in range(3)]
+        for t in threads:
+            t.start()
+            time.sleep(0.05)
+        for t in threads:
+            t.join()
+        assert sorted(results) == [1, 1, 2]
+        assert len(calls) == 2
+        assert get().data == {'calls': 2}
+
+    @pytest.mark.asyncio
+    async def test_async_response_cache(self, service):
+        calls = []
+
+        class AsyncAPI(api.API):
+            @api.ResponseCache(60, vary_user=True)
+            @api.get
+            async def hello(self):
+                calls.append(1)
+                await asyncio.sleep(0.1)
+                return {'calls': len(calls)}
+
+        async def get():
+            return await AsyncAPI(Request(method='GET', url='hello'))()
+
+        results = await asyncio.gather(*[get() for _ in range(3)])
+        assert [r.data['calls'] for r in results] == [1, 1, 1]
+        assert (await get()).data['calls'] == 1
+        assert len(calls) == 1
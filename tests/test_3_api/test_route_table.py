@@ -0,0 +1,92 @@
+from utilmeta.core import api, request
+from utilmeta.core.api import API
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='django', async_param=[False])
+
+
+def linear_match(api_cls, path: str):
+    # the regex scan that the route table replaces
+    result = []
+    for route in api_cls._routes:
+        group = route.match_path(path)
+        if group is not None:
+            result.append((route, group))
+    return result
+
+
+def make_api(num: int):
+    attrs = {}
+    for i in range(num):
+        def get_item(self, id: str = request.PathParam):
+            return id
+        attrs[f'item_{i}'] = api.get(f'res{i}/{{id}}')(get_item)
+
+        def get_list(self):
+            return []
+        attrs[f'list_{i}'] = api.get(f'res{i}')(get_list)
+    return type(f'BenchAPI{num}', (API,), attrs)
+
+
+class TestRouteTable:
+    def test_match_equivalence(self):
+        class ItemAPI(API):
+            @api.get
+            def get(self):
+                pass
+
+        class SubAPI(API):
+            id: int = request.PathParam
+
+            @api.get
+            def get(self):
+                pass
+
+        class RootAPI(API):
+            items: ItemAPI
+            sub: SubAPI = api.route('sub/{id}')
+
+            @api.get('doc/{category}/{page}')
+            def get_doc(self, category: str = request.PathParam,
+                        page: int = request.PathParam(default=1)):
+                pass
+
+            @api.get('file.{ext}')
+            def get_file(self, ext: str = request.PathParam):
+                pass
+
+            @api.get('code/{code}')
+            def get_code(self, code: str = request.PathParam('[0-9]{1,3}')):
+                pass
+
+            @api.post('doc/{category}/{page}')
+            def post_doc(self, category: str = request.PathParam, page: int = request.PathParam):
+                pass
+
+            @api.get('{slug}')
+            def get_slug(self, slug: str = request.PathParam):
+                pass
+
+            @api.get
+            def get(self):
+                pass
+
+        paths = [
+            '', 'items', 'items/', 'items/1/2', 'sub', 'sub/1', 'sub/1/x', 'doc', 'doc/a',
+            'doc/a/2', 'doc/a/2/3', 'file.json', 'filexjson', 'code/12', 'code/1234',
+            'any', 'a\nb', 'items/a\nb', 'doc//2',
+        ]
+        table = RootAPI._get_route_table()
+        for path in paths:
+            assert table.match(path) == linear_match(RootAPI, path), path
+
+    def test_route_table_large(self):
+        for num in (10, 100, 1000):
+            api_cls = make_api(num)
+            table = api_cls._get_route_table()
+            paths = [f'res{i}/{i}' for i in range(0, num, max(1, num // 10))] + [f'res{num - 1}']
+            for path in paths:
+                matched = table.match(path)
+                assert matched
+                assert matched == linear_match(api_cls, path)
+            assert table.match('missing') == linear_match(api_cls, 'missing') == []
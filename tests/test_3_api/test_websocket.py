@@ -0,0 +1,250 @@
+import json
+import asyncio
+import pytest
+import utype
+from utilmeta.core import api, request
+from utilmeta.core.websocket import Websocket, WebsocketAdaptor, websocket_stats
+from utilmeta.utils import exceptions as exc
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='fastapi', async_param=[True])
+
+
+class Message(utype.Schema):
+    text: str
+    num: int = 0
+
+
+class ChatAPI(api.API):
+    @api.websocket('room/{room}')
+    async def chat(self, ws: Websocket, room: str, token: str = request.QueryParam(default=None)):
+        if token == 'invalid':
+            raise exc.PermissionDenied('invalid token')
+        ws.state['count'] = 0
+        async for message in ws.iter(Message):
+            ws.state['count'] += 1
+            await ws.send({'room': room, 'text': message.text, 'num': message.num, 'count': ws.state['count']})
+
+    @api.websocket
+    async def raw(self, ws: Websocket):
+        data = await ws.receive(bytes)
+        await ws.send(data[::-1])
+
+    @api.websocket
+    async def protocol(self, ws: Websocket):
+        await ws.send({'subprotocols': ws.subprotocols, 'subprotocol': ws.subprotocol})
+
+    @api.get
+    def hello(self):
+        return 'world'
+
+
+def make_app():
+    from fastapi import FastAPI
+    from utilmeta import service
+    from utilmeta.core.server.backends.fastapi import FastAPIServerAdaptor
+    adaptor = FastAPIServerAdaptor(service)
+    adaptor.app = FastAPI()
+    adaptor.add_api(adaptor.app, ChatAPI, route='/api', asynchronous=True)
+    return adaptor.app
+
+
+class MemoryAdaptor(WebsocketAdaptor):
+    # a slow client that never reads until released
+    def __init__(self):
+        super().__init__(None)
+        self.sent = []
+        self.release = asyncio.Event()
+        self.closed = None
+
+    async def accept(self, subprotocol: str = None, headers=None):
+        pass
+
+    async def receive(self):
+        raise exc.WebsocketDisconnect(1000)
+
+    async def send(self, data):
+        await self.release.wait()
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.closed = code
+
+
+class TestWebsocket:
+    def test_websocket_messages(self):
+        from starlette.testclient import TestClient
+        client = TestClient(make_app())
+        total = websocket_stats.total_connections
+        with client.websocket_connect('/api/room/r1') as ws:
+            ws.send_json({'text': 'hello', 'num': '3'})
+            assert ws.receive_json() == {'room': 'r1', 'text': 'hello', 'num': 3, 'count': 1}
+            ws.send_json({'text': 'world'})
+            assert ws.receive_json() == {'room': 'r1', 'text': 'world', 'num': 0, 'count': 2}
+
+        with client.websocket_connect('/api/raw') as ws:
+            ws.send_bytes(b'abc')
+            assert ws.receive_bytes() == b'cba'
+
+        metrics = websocket_stats.get_metrics()
+        assert metrics['total_connections'] == total + 2
+        assert metrics['messages_received'] >= 3
+
+    def test_websocket_close_codes(self):
+        from starlette.testclient import TestClient
+        from starlette.websockets import WebSocketDisconnect
+        client = TestClient(make_app())
+
+        with client.websocket_connect('/api/room/r1') as ws:
+            ws.send_text('not json')
+            with pytest.raises(WebSocketDisconnect) as e:
+                ws.receive_json()
+            assert e.value.code == 4400
+
+        with client.websocket_connect('/api/room/r1') as ws:
+            ws.send_json({'num': 1})
+            with pytest.raises(WebSocketDisconnect) as e:
+                ws.receive_json()
+            assert e.value.code == 4400
+
+        # rejected before accepted
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect('/api/room/r1?token=invalid') as ws:
+                ws.receive_text()
+
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect('/api/not_found') as ws:
+                ws.receive_text()
+
+    def test_websocket_http(self):
+        from starlette.testclient import TestClient
+        client = TestClient(make_app())
+        assert client.get('/api/hello').text == 'world'
+        resp = client.get('/api/room/r1')
+        assert resp.status_code == 426
+        assert resp.headers.get('upgrade') == 'websocket'
+
+    def test_websocket_openapi(self):
+        from utilmeta.core.api.specs.openapi import OpenAPI
+        from utilmeta import service
+        generator = OpenAPI(service)
+        generator.from_api(ChatAPI)
+        assert '/hello' in generator.paths
+        assert not any('room' in path or 'raw' in path for path in generator.paths)
+
+    def test_websocket_sanic_asgi(self, monkeypatch):
+        from sanic import Sanic
+        from starlette.testclient import TestClient
+        from utilmeta import service
+        from utilmeta.core.server.backends.sanic import SanicServerAdaptor
+        app = Sanic('test_websocket_sanic')
+        # use this app instead of creating the app of the service name
+        monkeypatch.setattr(service, '_application', app)
+        adaptor = SanicServerAdaptor(service)
+        adaptor.add_api(app, ChatAPI, route='/api', asynchronous=True)
+        try:
+            with TestClient(app) as client:
+                with client.websocket_connect('/api/room/r1') as ws:
+                    ws.send_json({'text': 'hello', 'num': 3})
+                    assert ws.receive_json() == {'room': 'r1', 'text': 'hello', 'num': 3, 'count': 1}
+                with client.websocket_connect('/api/raw') as ws:
+                    ws.send_bytes(b'abc')
+                    assert ws.receive_bytes() == b'cba'
+                with client.websocket_connect('/api/protocol', subprotocols=['chat']) as ws:
+                    assert ws.receive_json() == {'subprotocols': ['chat'], 'subprotocol': None}
+                assert client.get('/api/hello').text == 'world'
+        finally:
+            Sanic.unregister_app(app)
+
+    @pytest.mark.asyncio
+    async def test_websocket_tornado(self):
+        from tornado.httpserver import HTTPServer
+        from tornado.testing import bind_unused_port
+        from tornado.websocket import websocket_connect
+        from tornado.web import Application
+        from utilmeta import service
+        from utilmeta.core.server.backends.tornado import TornadoServerAdaptor
+        adaptor = TornadoServerAdaptor(service)
+        adaptor.app = Application()
+        adaptor.adapt(ChatAPI, route='api', asynchronous=True)
+        sock, port = bind_unused_port()
+        server = HTTPServer(adaptor.app)
+        server.add_sockets([sock])
+        try:
+            ws = await websocket_connect(f'ws://127.0.0.1:{port}/api/room/r1')
+            await ws.write_message(json.dumps({'text': 'hello', 'num': 3}))
+            assert json.loads(await ws.read_message()) == {'room': 'r1', 'text': 'hello', 'num': 3, 'count': 1}
+            ws.close()
+            ws = await websocket_connect(f'ws://127.0.0.1:{port}/api/protocol', subprotocols=['chat', 'json'])
+            assert json.loads(await ws.read_message()) == {'subprotocols': ['chat', 'json'], 'subprotocol': None}
+            ws.close()
+        finally:
+            server.stop()
+
+    @pytest.mark.asyncio
+    async def test_websocket_django(self, monkeypatch):
+        from utilmeta import service
+        from utilmeta.core.server.backends.django import DjangoServerAdaptor
+        adaptor = DjangoServerAdaptor(service)
+        monkeypatch.setattr(service, 'resolve', lambda: ChatAPI)
+        monkeypatch.setattr(service, 'root_url', 'api')
+
+        async def connect(path: str, *messages, subprotocols=None):
+            incoming = [{'type': 'websocket.connect'}, *messages, {'type': 'websocket.disconnect', 'code': 1000}]
+            sent = []
+
+            async def receive():
+                if len(incoming) == 1:
+                    # disconnect after the reply is sent
+                    while not any(m['type'] in ('websocket.send', 'websocket.close') for m in sent):
+                        await asyncio.sleep(0.01)
+                return incoming.pop(0)
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {
+                'type': 'websocket',
+                'path': path,
+                'query_string': b'',
+                'headers': [(b'host', b'127.0.0.1')],
+                'subprotocols': subprotocols or [],
+            }
+            await asyncio.wait_for(adaptor.websocket_application(scope, receive, send), 5)
+            return sent
+
+        sent = await connect('/api/room/r1', {'type': 'websocket.receive', 'text': json.dumps({'text': 'hello', 'num': 3})})
+        assert sent[0]['type'] == 'websocket.accept'
+        assert json.loads(sent[1]['text']) == {'room': 'r1', 'text': 'hello', 'num': 3, 'count': 1}
+
+        sent = await connect('/api/protocol', subprotocols=['chat'])
+        assert json.loads(sent[1]['text']) == {'subprotocols': ['chat'], 'subprotocol': None}
+
+        sent = await connect('/other/room/r1')
+        assert sent == [{'type': 'websocket.close', 'code': 4404, 'reason': ''}]
+
+    @pytest.mark.asyncio
+    async def test_send_overflow(self):
+        adaptor = MemoryAdaptor()
+        ws = Websocket(adaptor, send_queue_size=2, overflow='drop')
+        results = [await ws.send({'i': i}) for i in range(5)]
+        # the first message is taken by the writer and blocked on the transport
+        assert results.count(False) >= 2
+        assert ws.messages_dropped == results.count(False)
+        adaptor.release.set()
+        await ws.close()
+        assert adaptor.closed == 1000
+        assert len(adaptor.sent) == results.count(True)
+
+        adaptor = MemoryAdaptor()
+        ws = Websocket(adaptor, send_queue_size=1, overflow='close', close_timeout=0.1)
+        for i in range(5):
+            if not await ws.send(str(i)):
+                break
+        assert ws.closed
+        assert adaptor.closed == 1013
+        with pytest.raises(exc.WebsocketDisconnect):
+            await ws.send('after')
+
+        with pytest.raises(ValueError):
+            Websocket(MemoryAdaptor(), overflow='unknown')
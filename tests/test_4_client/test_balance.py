@@ -0,0 +1,163 @@
+from tests.conftest import make_server_thread, setup_service
+import pytest
+import time
+import asyncio
+
+setup_service(__name__, backend='django', async_param=[False])
+from tests.server.client import TestClient
+from utilmeta.core.cli.balance import LoadBalancer
+from utilmeta.core.api.plugins.retry import RetryPlugin
+server_thread = make_server_thread(
+    backend='django',
+    port=8668
+)
+import httpx
+
+BASE_URL = 'http://127.0.0.1:8668/api/test'
+SLOW_URL = 'http://localhost:8668/api/test'
+DEAD_URL = 'http://127.0.0.1:1/api/test'
+
+
+def make_slow_node_client(**kwargs):
+    # requests to the SLOW_URL node are delayed
+    client = TestClient(**kwargs)
+    send_request = client._send_request
+    async_send_request = client._async_send_request
+
+    def _send_request(request, **kw):
+        if request.url.startswith(SLOW_URL):
+            time.sleep(0.5)
+        return send_request(request, **kw)
+
+    async def _async_send_request(request, **kw):
+        if request.url.startswith(SLOW_URL):
+            await asyncio.sleep(0.5)
+        return await async_send_request(request, **kw)
+
+    client._send_request = _send_request
+    client._async_send_request = _async_send_request
+    return client
+
+
+class TestLoadBalancer:
+    def test_strategies(self):
+        balancer = LoadBalancer(3)
+        assert [balancer.choose().index for _ in range(6)] == [0, 1, 2, 0, 1, 2]
+
+        balancer = LoadBalancer(3, strategy='least_outstanding')
+        balancer.start(balancer.nodes[0])
+        balancer.start(balancer.nodes[1])
+        assert balancer.choose().index == 2
+        assert balancer.choose(exclude=[2]).index in (0, 1)
+
+        balancer = LoadBalancer(2, strategy='ewma')
+        balancer.finish(balancer.nodes[0], latency=0.5)
+        # unmeasured node first
+        assert balancer.choose().index == 1
+        balancer.finish(balancer.nodes[1], latency=0.1)
+        assert balancer.choose().index == 1
+        balancer.finish(balancer.nodes[1], latency=2)
+        assert balancer.choose().index == 0
+
+        with pytest.raises(ValueError):
+            LoadBalancer(2, strategy='random')
+
+    def test_ejection(self):
+        balancer = LoadBalancer(2, max_failures=2, ejection_time=0.2)
+        node = balancer.nodes[0]
+        balancer.finish(node, failed=True)
+        assert node.is_healthy()
+        balancer.finish(node, failed=True)
+        assert not node.is_healthy()
+        assert all(balancer.choose().index == 1 for _ in range(4))
+        # all the nodes are excluded / ejected: fallback
+        assert balancer.choose(exclude=[1]).index == 0
+        assert balancer.choose(exclude=[0, 1]) is None
+
+        time.sleep(0.25)
+        assert node.is_healthy()
+        # probe request failed: ejected again with a longer time
+        balancer.finish(node, failed=True)
+        assert not node.is_healthy()
+        assert node.ejected_until - time.monotonic() > 0.2
+        node.ejected_until = 0
+        balancer.finish(node, latency=0.1)
+        assert node.is_healthy() and node.ejections == 0
+
+    def test_hedge_delay(self):
+        balancer = LoadBalancer(2, min_hedge_samples=10)
+        assert balancer.get_hedge_delay() is None
+        for i in range(100):
+            balancer.finish(balancer.nodes[i % 2], latency=i / 100)
+        assert balancer.get_hedge_delay() == 0.95
+
+
+class TestBalancedClient:
+    def test_base_urls(self):
+        client = TestClient(base_url=[BASE_URL, SLOW_URL], load_balance='ewma')
+        assert client.balancer.strategy == 'ewma'
+        assert len(client.balancer) == 2
+        with pytest.raises(ValueError):
+            TestClient(base_url=[BASE_URL, 'invalid'])
+        with pytest.raises(ValueError):
+            TestClient(base_url=[BASE_URL, SLOW_URL], load_balance=LoadBalancer(3))
+        # single base url is not balanced
+        assert TestClient(base_url=[BASE_URL]).balancer is None
+
+    def test_ejection_and_retry(self, server_thread):
+        client = TestClient(
+            base_url=[DEAD_URL, BASE_URL],
+            backend=httpx,
+            fail_silently=True,
+            load_balance=LoadBalancer(2, max_failures=2, ejection_time=30),
+        )
+        results = [client.get_doc(category='finance', page=i) for i in range(6)]
+        assert [r.status for r in results].count(200) == 4
+        assert not client.balancer.nodes[0].is_healthy()
+        assert client.balancer.nodes[0].failures == 2
+
+        # retry goes to another node
+        client = TestClient(
+            base_url=[DEAD_URL, BASE_URL],
+            backend=httpx,
+            plugins=[RetryPlugin(max_retries=2)],
+        )
+        for i in range(4):
+            resp = client.get_doc(category='finance', page=i)
+            assert resp.status == 200
+            assert resp.data == {'finance': i}
+
+    def test_hedged_requests(self, server_thread):
+        balancer = LoadBalancer(2)
+        balancer.latencies.extend([0.05] * 20)
+        client = make_slow_node_client(
+            base_url=[SLOW_URL, BASE_URL],
+            backend=httpx,
+            load_balance=balancer,
+            hedged=True,
+        )
+        for i in range(4):
+            start = time.perf_counter()
+            resp = client.get_doc(category='finance', page=i)
+            assert resp.status == 200
+            assert resp.data == {'finance': i}
+            assert time.perf_counter() - start < 0.4
+        assert balancer.hedged >= 1
+
+    @pytest.mark.asyncio
+    async def test_async_hedged_requests(self, server_thread):
+        balancer = LoadBalancer(2)
+        balancer.latencies.extend([0.05] * 20)
+        client = make_slow_node_client(
+            base_url=[SLOW_URL, BASE_URL],
+            backend=httpx,
+            load_balance=balancer,
+            hedged=True,
+        )
+        for i in range(4):
+            start = time.perf_counter()
+            resp = await client.aget_doc(category='finance', page=i)
+            assert resp.status == 200
+            assert resp.data == {'finance': i}
+            assert time.perf_counter() - start < 0.4
+        assert balancer.hedged >= 1
@@ -0,0 +1,88 @@
+from tests.conftest import make_server_thread, setup_service
+import pytest
+
+setup_service(__name__, backend='django', async_param=[False])
+from tests.server.client import TestClient
+from utilmeta.core.cli.pool import pool
+server_thread = make_server_thread(
+    backend='django',
+    port=8667
+)
+import httpx
+import aiohttp
+import requests
+
+BASE_URL = 'http://127.0.0.1:8667/api/test'
+
+
+class TestTransportPool:
+    def test_pooled_transports(self, server_thread):
+        pool.close()
+        for backend in (httpx, requests):
+            client = TestClient(base_url=BASE_URL, backend=backend)
+            for i in range(3):
+                v = client.get_doc(category='finance', page=i)
+                assert v.status == 200
+                assert v.data == {'finance': i}
+        # one transport per (backend, origin)
+        assert pool.get_stats()['size'] == 2
+
+        # another client of the same origin share the transport
+        created = pool.get_stats()['created']
+        client = TestClient(base_url=BASE_URL, backend=httpx)
+        assert client.get_doc(category='finance', page=1).status == 200
+        assert pool.get_stats()['created'] == created
+
+        # not pooled
+        client = TestClient(base_url=BASE_URL, backend=httpx, pooled=False)
+        assert client.get_doc(category='finance', page=1).status == 200
+        assert pool.get_stats()['created'] == created
+
+        pool.close()
+        assert pool.get_stats()['size'] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_pooled_transports(self, server_thread):
+        await pool.aclose()
+        for backend in (httpx, aiohttp):
+            client = TestClient(base_url=BASE_URL, backend=backend)
+            for i in range(3):
+                v = await client.aget_doc(category='finance', page=i)
+                assert v.status == 200
+                assert v.data == {'finance': i}
+        assert pool.get_stats()['size'] == 2
+        await pool.aclose()
+        assert pool.get_stats()['size'] == 0
+
+    def test_fork_reset(self):
+        pool.get(('test', 'http://test', (), None), lambda: httpx.Client())
+        assert len(pool) == 1
+        pool._pid = -1
+        # the transports of the parent process are dropped
+        pool.get(('test', 'http://test', (), None), lambda: httpx.Client())
+        assert len(pool) == 1
+        assert pool.get_stats()['size'] == 1
+        pool.close()
+
+    def test_pool_benchmark(self, server_thread):
+        n = 200
+        pool.close()
+        created = pool.get_stats()['created']
+        pooled = TestClient(base_url=BASE_URL, backend=httpx)
+        unpooled = TestClient(base_url=BASE_URL, backend=httpx, pooled=False)
+        pooled.get_doc(category='finance', page=1)
+        stats = pool.get_stats()
+        assert stats['created'] == created + 1
+
+        for i in range(n):
+            assert pooled.get_doc(category='finance', page=i).status == 200
+        # every pooled request reuses the transport
+        current = pool.get_stats()
+        assert current['created'] == stats['created']
+        assert current['hits'] >= stats['hits'] + n
+
+        for i in range(n):
+            assert unpooled.get_doc(category='finance', page=i).status == 200
+        # the not pooled requests bypass the pool
+        assert pool.get_stats() == current
+        pool.close()
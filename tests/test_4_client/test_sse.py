@@ -0,0 +1,278 @@
+import time
+import asyncio
+import threading
+import pytest
+from utilmeta.core.response import SSEResponse, ServerSentEvent
+
+
+def generator(num: int, interval: float = 0):
+    for i in range(num):
+        if interval:
+            time.sleep(interval)
+        yield ServerSentEvent(data=str(i))
+
+
+async def async_generator(num: int, interval: float = 0):
+    for i in range(num):
+        if interval:
+            await asyncio.sleep(interval)
+        yield ServerSentEvent(data=str(i))
+
+
+class TestSSEIteration:
+    def test_iter_timeout_single_reader(self):
+        num = 10000
+        name = f'{SSEResponse.__name__}Reader'
+        existing = set(threading.enumerate())
+        readers = set()
+        events = 0
+        resp = SSEResponse(generator(num))
+        for event in resp.iter(read_timeout=5, total_timeout=60):
+            assert event.event != 'error'
+            events += 1
+            if events % 500 == 0:
+                readers.update(
+                    t for t in threading.enumerate() if t.name == name and t not in existing
+                )
+        assert events == num
+        # only one reader thread for the whole stream
+        assert len(readers) == 1
+        reader = readers.pop()
+        reader.join(5)
+        assert not reader.is_alive()
+
+    def test_iter_timeout(self):
+        # read timeout
+        resp = SSEResponse(generator(5, interval=0.5))
+        st = time.monotonic()
+        events = list(resp.iter(read_timeout=0.2))
+        assert len(events) == 1
+        assert events[0].event == 'error'
+        assert events[0].data['timeout']
+        assert time.monotonic() - st < 0.5
+
+        # total timeout
+        resp = SSEResponse(generator(10, interval=0.2))
+        st = time.monotonic()
+        events = list(resp.iter(read_timeout=1, total_timeout=0.7))
+        assert 0.6 < time.monotonic() - st < 1
+        assert [e.data for e in events[:-1]] == ['0', '1', '2']
+        assert events[-1].event == 'error'
+
+        resp = SSEResponse(generator(5, interval=0.5))
+        with pytest.raises(TimeoutError):
+            for _ in resp.iter(read_timeout=0.2, raise_timeout=True):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_aiter_timeout(self):
+        num = 10000
+        tasks = len(asyncio.all_tasks())
+        resp = SSEResponse(async_generator(num))
+        events = 0
+        st = time.perf_counter()
+        async for event in resp.aiter(read_timeout=5, total_timeout=60):
+            assert event.event != 'error'
+            events += 1
+            if events % 500 == 0:
+                # only one reader task for the whole stream
+                assert len(asyncio.all_tasks()) <= tasks + 1
+        assert events == num
+        print(f'async events: {num}, total: {time.perf_counter() - st:.4f}s')
+
+        resp = SSEResponse(async_generator(10, interval=0.2))
+        st = time.monotonic()
+        events = [e async for e in resp.aiter(read_timeout=1, total_timeout=0.7)]
+        assert 0.6 < time.monotonic() - st < 1
+        assert [e.data for e in events[:-1]] == ['0', '1', '2']
+        assert events[-1].event == 'error'
+        assert len(asyncio.all_tasks()) <= tasks
+
+
+class TestSSEBroadcast:
+    def test_fan_out_and_replay(self):
+        from utilmeta.core.response import Broadcast
+        broadcast = Broadcast('test', history_size=5, buffer_size=10)
+        subscribers = [broadcast.subscribe() for _ in range(3)]
+        for i in range(3):
+            assert broadcast.publish({'i': i}, event='tick') == i + 1
+        for subscriber in subscribers:
+            events = [subscriber.get(timeout=0) for _ in range(3)]
+            # encoded once, shared by all the subscribers
+            assert [e.id for e in events] == [1, 2, 3]
+            assert events[0].data == b'event: tick\ndata: {"i": 0}\nid: 1\n\n'
+            assert subscriber.get(timeout=0) is None
+        assert subscribers[0].get(timeout=0) is None
+
+        for i in range(3, 8):
+            broadcast.publish(ServerSentEvent(data=str(i)))
+        # replay from the ring buffer (the oldest events are evicted)
+        replayed = broadcast.subscribe(last_event_id='5')
+        assert [replayed.get(timeout=0).id for _ in range(3)] == [6, 7, 8]
+        assert [e.id for e in broadcast.get_history()] == [4, 5, 6, 7, 8]
+        assert broadcast.get_history('7')[0].data == b'data: 7\nid: 8\n\n'
+
+        for subscriber in subscribers + [replayed]:
+            subscriber.close()
+        assert broadcast.subscribers == 0
+        stats = broadcast.get_stats()
+        assert stats['published'] == 8
+        assert stats['replayed'] == 3
+
+        # the events dispatched out of order (like the caught up ones) are kept in the id order
+        from utilmeta.core.response.broadcast import BroadcastEvent
+        broadcast = Broadcast('test', history_size=3)
+        for i in (1, 2, 4, 5, 3, 1):
+            broadcast.dispatch(BroadcastEvent(i, 'message', b''))
+        assert [e.id for e in broadcast.get_history()] == [3, 4, 5]
+
+    def test_slow_consumer_policies(self):
+        from utilmeta.core.response import Broadcast
+        broadcast = Broadcast('test', buffer_size=3)
+        drop = broadcast.subscribe()
+        disconnect = broadcast.subscribe(policy='disconnect')
+        coalesce = broadcast.subscribe(policy='coalesce')
+        broadcast.publish('a', event='price')
+        broadcast.publish('b', event='news')
+        broadcast.publish('c', event='price')
+        broadcast.publish('d', event='price')
+        broadcast.publish('e', event='other')
+
+        assert [drop.get(timeout=0).id for _ in range(3)] == [3, 4, 5]
+        assert drop.dropped == 2
+
+        assert disconnect.closed and disconnect.overflowed
+        assert disconnect.get(timeout=0) is None
+        assert list(disconnect.stream()) == []
+
+        # the pending price events are replaced by the latest one, then the oldest is dropped
+        assert [coalesce.get(timeout=0).id for _ in range(3)] == [2, 4, 5]
+        assert coalesce.coalesced == 1
+        assert coalesce.dropped == 1
+
+        with pytest.raises(ValueError):
+            broadcast.subscribe(policy='unknown')
+        stats = broadcast.get_stats()
+        assert stats['overflowed'] == 1
+        assert stats['dropped'] == 2 + 4 + 1
+
+    def test_threaded_subscribers(self):
+        from utilmeta.core.response import Broadcast
+        broadcast = Broadcast('test', buffer_size=1000)
+        results = []
+
+        def consume():
+            subscriber = broadcast.subscribe()
+            started.release()
+            results.append([event for event in subscriber.stream(keepalive=5)])
+
+        started = threading.Semaphore(0)
+        threads = [threading.Thread(target=consume) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for _ in threads:
+            started.acquire()
+        for i in range(100):
+            broadcast.publish(i)
+        broadcast.close()
+        for thread in threads:
+            thread.join(5)
+        assert len(results) == 5
+        for events in results:
+            assert len(events) == 100
+        assert broadcast.subscribers == 0
+
+    @pytest.mark.asyncio
+    async def test_async_sse_response(self):
+        from utilmeta.core.response import Broadcast
+        broadcast = Broadcast('test')
+        for i in range(3):
+            broadcast.publish({'i': i})
+
+        resp = broadcast.response(last_event_id='1', keepalive=0.05)
+        assert isinstance(resp, SSEResponse)
+        assert resp.content_type == 'text/event-stream'
+
+        async def publish():
+            await asyncio.sleep(0.2)
+            await broadcast.apublish({'i': 3}, event='live')
+            broadcast.close()
+
+        task = asyncio.ensure_future(publish())
+        chunks = [chunk async for chunk in resp.event_stream]
+        await task
+        assert b': keepalive\n\n' in chunks
+        events = list(SSEResponse.decoder_cls().iter_bytes(chunks))
+        assert [e.id for e in events] == ['2', '3', '4']
+        assert events[-1].event == 'live'
+        assert broadcast.subscribers == 0
+
+    def test_redis_broadcast(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')     # lua scripts
+        from utilmeta.core.cache.backends.redis import RedisCache, RedisBroadcast
+
+        server = fakeredis.FakeServer()
+        broadcasts = []
+        for _ in range(2):
+            broadcast = RedisBroadcast('test:broadcast', cache=RedisCache(port=6390, db=5), history_size=10)
+            broadcast._client = fakeredis.FakeRedis(server=server)
+            broadcasts.append(broadcast)
+        b1, b2 = broadcasts
+        s2 = b2.subscribe()
+        assert b2.subscribed.wait(5)
+        assert b1.publish({'i': 1}) == 1
+        assert b1.publish({'i': 2}) == 2
+        events = [s2.get(timeout=5) for _ in range(2)]
+        assert [e.id for e in events] == [1, 2]
+        # replay from the redis history in a fresh process
+        b3 = RedisBroadcast('test:broadcast', cache=RedisCache(port=6390, db=5), history_size=10)
+        b3._client = fakeredis.FakeRedis(server=server)
+        s3 = b3.subscribe(last_event_id=1)
+        assert s3.get(timeout=5).data == b'data: {"i": 2}\nid: 2\n\n'
+        for broadcast in broadcasts + [b3]:
+            broadcast.close()
+            assert not broadcast.alive
+
+    def test_redis_broadcast_reconnect(self):
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')     # lua scripts
+        from utilmeta.core.cache.backends.redis import RedisCache, RedisBroadcast
+
+        server = fakeredis.FakeServer()
+        b1, b2 = [
+            RedisBroadcast('test:reconnect', cache=RedisCache(port=6390, db=5), history_size=10)
+            for _ in range(2)
+        ]
+        for broadcast in (b1, b2):
+            broadcast._client = fakeredis.FakeRedis(server=server)
+        subscriber = b2.subscribe()
+        assert b2.subscribed.wait(5)
+        assert b1.publish('a') == 1
+        assert subscriber.get(timeout=5).id == 1
+
+        # the subscription of b2 is dropped
+        b2.stop()
+        assert b1.publish('b') == 2
+        # published by b2 while disconnected, dispatched locally
+        assert b2.publish('c') == 3
+        assert subscriber.get(timeout=5).id == 3
+
+        # restored, the missed remote event is caught up, the own one is not dispatched again
+        b2.start()
+        assert b2.subscribed.wait(5)
+        assert subscriber.get(timeout=5).id == 2
+        assert subscriber.get(timeout=0.5) is None
+
+        # the events in the history and the channel are dispatched once
+        assert b1.publish('d') == 4
+        assert subscriber.get(timeout=5).id == 4
+        b2.catch_up()
+        b2.handle(b'4:{"data": "d"}')
+        assert subscriber.get(timeout=0.5) is None
+        # the caught up event is kept in the id order
+        assert [e.id for e in b2.get_history()] == [1, 2, 3, 4]
+        assert [e.id for e in b2.get_history(last_event_id=1)] == [2, 3, 4]
+
+        for broadcast in (b1, b2):
+            broadcast.close()
@@ -0,0 +1,144 @@
+import asyncio
+import pytest
+from tests.conftest import setup_service, benchmark
+from datetime import timedelta
+import time
+
+setup_service(__name__, backend='django', async_param=[False])
+
+SERVICE = 'test_cursor'
+
+
+@pytest.fixture
+def service_logs(service):
+    from utilmeta.ops.config import Operations
+    from utilmeta.ops.models import ServiceLog
+    from utilmeta.utils import time_now
+    Operations.config().migrate()
+
+    def create(num: int, batch_size: int = 5000):
+        now = time_now()
+        ServiceLog.objects.bulk_create([
+            ServiceLog(
+                service=SERVICE,
+                level='INFO',
+                # duplicated times and null durations to test the ties and nullable keys
+                time=now - timedelta(seconds=i // 3),
+                duration=None if i % 4 == 0 else i % 17,
+                method='get',
+                path=f'/{i}',
+                status=200,
+                ip='127.0.0.1',
+                volatile=True,
+            ) for i in range(num)
+        ], batch_size=batch_size)
+        return ServiceLog.objects.filter(service=SERVICE)
+
+    yield create
+    ServiceLog.objects.filter(service=SERVICE).delete()
+
+
+def paginate(query_cls, base_qs, limit: int = 7, **params):
+    ids = []
+    cursor = ''
+    pages = 0
+    while cursor is not None:
+        query = query_cls(cursor=cursor, rows=limit, **params)
+        page, cursor = query.get_cursor_page(base_qs)
+        assert page == list(query.get_queryset(base_qs).values_list('pk', flat=True))
+        ids.extend(page)
+        pages += 1
+        assert pages < 1000
+    return ids
+
+
+class TestCursorPagination:
+    def test_cursor_codec(self):
+        from utilmeta.core import orm
+        from utilmeta.utils import exceptions
+        token = orm.Cursor.encode(['2024-01-01T00:00:00', None, 3])
+        assert '=' not in token
+        assert orm.Cursor.decode(token) == ['2024-01-01T00:00:00', None, 3]
+        assert orm.Cursor.decode('') == []
+        with pytest.raises(exceptions.BadRequest):
+            orm.Cursor.decode('not-a-cursor')
+
+    def test_cursor_pages(self, service_logs):
+        from utilmeta.ops.api.log import LogAPI
+        base_qs = service_logs(200)
+        all_ids = set(base_qs.values_list('pk', flat=True))
+
+        for order in ['-time', 'time', 'duration', '-duration']:
+            ids = paginate(LogAPI.ServiceLogQuery, base_qs, order=order)
+            # every row is returned exactly once
+            assert len(ids) == len(all_ids)
+            assert set(ids) == all_ids
+            # and in the declared order
+            field = order.lstrip('-')
+            values = base_qs.in_bulk(ids)
+            keys = [getattr(values[pk], field) for pk in ids]
+            non_null = [k for k in keys if k is not None]
+            assert non_null == sorted(non_null, reverse=order.startswith('-'))
+
+        # the page without the cursor param is still offset-based
+        query = LogAPI.ServiceLogQuery(rows=10, page=2, order='-time')
+        assert query.get_next_cursor(base_qs) is None
+        assert len(query.get_queryset(base_qs)) == 10
+
+    def test_cursor_api_response(self, service_logs):
+        from utilmeta.ops.api.log import LogAPI
+        from utilmeta.ops.query import ServiceLogBase
+        base_qs = service_logs(30)
+        query = LogAPI.ServiceLogQuery(cursor='', rows=20, order='-time')
+        logs, kwargs = LogAPI.get_logs(ServiceLogBase, query, base_qs)
+        # the count is skipped in the cursor pagination
+        assert list(kwargs) == ['extra']
+        next_cursor = kwargs['extra']['next_cursor']
+        assert next_cursor
+        assert [log.id for log in logs] == list(query.get_queryset(base_qs).values_list('pk', flat=True))
+        assert query.get_next_cursor(base_qs) == next_cursor
+        assert asyncio.run(query.aget_next_cursor(base_qs)) == next_cursor
+        assert asyncio.run(query.aget_cursor_page(base_qs)) == query.get_cursor_page(base_qs)
+
+        query = LogAPI.ServiceLogQuery(cursor=next_cursor, rows=20, order='-time')
+        logs, kwargs = LogAPI.get_logs(ServiceLogBase, query, base_qs)
+        assert len(logs) == 10
+        assert kwargs == {'extra': {'next_cursor': None}}
+
+        logs, kwargs = LogAPI.get_logs(ServiceLogBase, LogAPI.ServiceLogQuery(rows=20, order='-time'), base_qs)
+        assert len(logs) == 20
+        assert kwargs == {'count': 30}
+
+    @benchmark
+    def test_cursor_benchmark(self, service_logs, record_property):
+        from utilmeta.core import orm
+        from utilmeta.ops.api.log import LogAPI
+        limit = 10
+        deep_page = 10000
+        base_qs = service_logs(limit * deep_page + limit)
+
+        def timeit(query):
+            start = time.perf_counter()
+            result = list(query.get_queryset(base_qs))
+            assert len(result) == limit
+            return time.perf_counter() - start
+
+        deep_offset = limit * (deep_page - 1)
+        ordered = base_qs.order_by('-time', 'pk')
+        # the ordering keys of the last row of page [deep_page - 1]
+        last = ordered[deep_offset - 1]
+        deep_cursor = orm.Cursor.encode([last.time, last.pk])
+
+        record_property('offset_page_1_ms', timeit(LogAPI.ServiceLogQuery(rows=limit, page=1, order='-time')) * 1000)
+        record_property(f'offset_page_{deep_page}_ms', timeit(
+            LogAPI.ServiceLogQuery(rows=limit, page=deep_page, order='-time')) * 1000)
+        record_property('cursor_page_1_ms', timeit(LogAPI.ServiceLogQuery(rows=limit, cursor='', order='-time')) * 1000)
+        record_property(f'cursor_page_{deep_page}_ms', timeit(
+            LogAPI.ServiceLogQuery(rows=limit, cursor=deep_cursor, order='-time')) * 1000)
+
+        # the deep cursor page is the same as the offset page
+        assert list(LogAPI.ServiceLogQuery(
+            rows=limit, cursor=deep_cursor, order='-time'
+        ).get_queryset(base_qs).values_list('pk', flat=True)) == list(
+            ordered.values_list('pk', flat=True)[deep_offset: deep_offset + limit]
+        )
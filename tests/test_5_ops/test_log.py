@@ -1,3 +1,4 @@
+import pytest
 from tests.conftest import setup_service
 
 setup_service(__name__, backend='django', async_param=[False])
@@ -11,3 +12,214 @@ class TestLog:
                 [{'user': {'password': '********', 'token': '********'}}])
         assert (logger.parse_values([{'user': {'UserPassword': '123', 'Access_Token': 'XXX'}}]) ==
                 [{'user': {'UserPassword': '********', 'Access_Token': '********'}}])
+
+    def test_log_buffer(self):
+        from utilmeta.ops.log.pipeline import LogBuffer, ServiceLogRecord
+
+        def record(i, volatile=True):
+            return ServiceLogRecord(path=f'/{i}', method='get', volatile=volatile)
+
+        buffer = LogBuffer(maxsize=3)
+        for i in range(5):
+            buffer.push(record(i))
+        # ring buffer: the oldest are dropped
+        assert [r.path for r in buffer.pop_batch()] == ['/2', '/3', '/4']
+        assert buffer.get_metrics()['dropped'] == 2
+        assert not len(buffer)
+
+        buffer = LogBuffer(maxsize=3, overflow_policy='drop_newest')
+        assert [buffer.push(record(i)) for i in range(5)] == [True, True, True, False, False]
+        assert [r.path for r in buffer.pop_batch(2)] == ['/0', '/1']
+        assert buffer.depth == 1
+
+        buffer = LogBuffer(maxsize=100, overflow_policy='sample', sample_rate=0)
+        for i in range(100):
+            buffer.push(record(i))
+        # only the persisted logs are kept when the buffer is over half full
+        buffer.push(record(100, volatile=False))
+        assert buffer.depth == 51
+        assert buffer.get_metrics()['sampled'] == 50
+
+        with pytest.raises(ValueError):
+            LogBuffer(overflow_policy='invalid')
+
+    def test_log_writer(self):
+        import threading
+        from utilmeta.ops.log.pipeline import LogBuffer, LogWriter, ServiceLogRecord
+
+        saved = []
+        threads = set()
+
+        def save(records):
+            saved.append(len(records))
+            threads.add(threading.get_ident())
+
+        buffer = LogBuffer(maxsize=1000)
+        writer = LogWriter(buffer, save=save, batch_size=10)
+        active = threading.active_count()
+        for i in range(95):
+            buffer.push(ServiceLogRecord(path=f'/{i}'))
+            if len(buffer) >= writer.batch_size:
+                writer.notify()
+        # one long-lived writer thread
+        assert threading.active_count() <= active + 1
+        writer.stop(timeout=5)
+        assert sum(saved) == 95
+        assert max(saved) <= 10
+        assert len(threads) == 1
+        metrics = buffer.get_metrics()
+        assert metrics['flushed'] == 95
+        assert metrics['depth'] == 0
+        assert metrics['flushes'] == len(saved)
+
+    def test_log_record_memory(self, service):
+        import gc
+        import tracemalloc
+        from utilmeta.core import api
+        from utilmeta.core.request import Request
+        from utilmeta.core.response import Response
+        from utilmeta.ops.log.logger import Logger, LogLevel
+        from utilmeta.utils import parse_user_agents
+
+        class ArticleAPI(api.API):
+            @api.get
+            def list(self, page: int = 1):
+                return [{'id': i, 'title': f'article-{i}', 'content': 'x' * 200} for i in range(50)]
+
+        def get():
+            request = Request(
+                method='GET', url='list', query={'page': 1},
+                headers={'user-agent': 'Mozilla/5.0', 'accept': 'application/json'}
+            )
+            return Response(ArticleAPI(request)(), request=request)
+
+        def retained(func, num: int = 200):
+            gc.collect()
+            tracemalloc.start()
+            start = tracemalloc.get_traced_memory()[0]
+            items = [func() for _ in range(num)]
+            gc.collect()
+            size = tracemalloc.get_traced_memory()[0] - start
+            tracemalloc.stop()
+            assert len(items) == num
+            return size / num
+
+        def generate_record():
+            logger = Logger()
+            # production defaults: the result and headers of successful requests are not stored
+            logger._store_result_level = LogLevel.WARN
+            logger._store_headers_level = LogLevel.WARN
+            return logger.generate_record(get())
+
+        response_size = retained(get)
+        record_size = retained(generate_record)
+        print(f'queued response: {response_size:.0f} bytes, log record: {record_size:.0f} bytes')
+        assert record_size * 10 < response_size
+
+        log = generate_record().get_log()
+        assert log.path == 'list'
+        assert log.status == 200
+        assert log.query == {'page': '1'}
+        assert log.request_headers == {}
+        assert log.trace == []
+        assert log.user_agent == parse_user_agents('Mozilla/5.0')
+
+    def test_sql_fingerprint(self):
+        from utilmeta.ops.log.query import get_sql_fingerprint, get_sql_operation, get_sql_tables
+
+        assert get_sql_fingerprint(
+            'SELECT "article"."id" FROM "article" WHERE ("article"."author_id" = 3 AND title = \'it\'\'s\')'
+        ) == 'SELECT "article"."id" FROM "article" WHERE ("article"."author_id" = ? AND title = ?)'
+        assert get_sql_fingerprint(
+            'SELECT * FROM user WHERE id IN (%s, %s, %s)  LIMIT 21'
+        ) == get_sql_fingerprint('SELECT * FROM user WHERE id IN (:param0, :param1) LIMIT 10')
+        assert get_sql_fingerprint('SELECT col::text FROM t1 WHERE a = $1') == 'SELECT col::text FROM t1 WHERE a = ?'
+        assert get_sql_fingerprint(
+            'INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)'
+        ) == 'INSERT INTO t (a, b) VALUES (...)'
+        assert get_sql_operation(' select 1') == 'select'
+        assert get_sql_tables(
+            'SELECT * FROM "article" INNER JOIN "user" ON (a = b) JOIN "article" ON (c = d)'
+        ) == ['article', 'user']
+
+    def test_query_capture(self, service):
+        from django.db import connections
+        from utilmeta.core.request import Request
+        from utilmeta.core.response import Response
+        from utilmeta.ops.log.logger import Logger
+        from utilmeta.ops.log.query import QueryCapture, install_django_execute_wrapper
+        from utilmeta.ops.store import store
+
+        logger = Logger()
+        logger._queries = QueryCapture(max_queries=2)
+        logger._supervised = logger._server_timing = True
+        token = store.logger.set(logger)
+        try:
+            install_django_execute_wrapper()
+            install_django_execute_wrapper()
+            with connections['default'].cursor() as cursor:
+                # N+1 queries share a fingerprint
+                for i in range(5):
+                    cursor.execute('SELECT %s', [i])
+                cursor.execute("SELECT 'a' || %s", ['b'])
+                # exceed the max queries, only counted
+                cursor.execute('SELECT 1 + 1')
+        finally:
+            store.logger.reset(token)
+
+        queries = logger.queries
+        assert queries.num == 7
+        assert queries.exceeded == 1
+        assert queries.duration > 0
+        records = {r.query: r for r in queries.get_records()}
+        assert set(records) == {'SELECT ?', "SELECT ? || ?"}
+        assert records['SELECT ?'].details['count'] == 5
+        assert records['SELECT ?'].alias == 'default'
+        assert records['SELECT ?'].operation == 'select'
+
+        request = Request(method='GET', url='list')
+        response = Response('ok', request=request)
+        logger.duration = 5
+        logger.setup_response(response)
+        timing = response.headers.get('Server-Timing')
+        assert 'db;dur=' in timing
+        assert 'desc="7 queries"' in timing
+
+        # queries outside the captured requests are ignored
+        with connections['default'].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        assert queries.num == 7
+
+    @pytest.mark.asyncio
+    async def test_async_query_capture(self, service, tmp_path):
+        from utilmeta.core.orm import Database
+        from utilmeta.core.orm.databases.base import BaseDatabaseAdaptor
+        from utilmeta.core.orm.databases.encode import EncodeDatabasesAsyncAdaptor
+        from utilmeta.ops.log.logger import Logger
+        from utilmeta.ops.log.query import QueryCapture, record_query
+        from utilmeta.ops.store import store
+
+        db = EncodeDatabasesAsyncAdaptor(
+            Database(name=str(tmp_path / 'query_capture.db'), engine='sqlite3'), alias='async_db'
+        )
+        logger = Logger()
+        logger._queries = QueryCapture()
+        token = store.logger.set(logger)
+        BaseDatabaseAdaptor.add_query_listener(record_query)
+        try:
+            await db.execute('CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)')
+            for i in range(3):
+                await db.execute('INSERT INTO item (name) VALUES (%s)', [f'item-{i}'])
+            assert len(await db.fetchall('SELECT * FROM item WHERE id > %s', [0])) == 3
+            assert await db.fetchone('SELECT * FROM item WHERE id = %s', [1])
+        finally:
+            BaseDatabaseAdaptor.remove_query_listener(record_query)
+            store.logger.reset(token)
+            await db.disconnect()
+
+        records = {r.query: r for r in logger.queries.get_records()}
+        assert records['INSERT INTO item (name) VALUES (...)'].details['count'] == 3
+        assert records['INSERT INTO item (name) VALUES (...)'].tables == ['item']
+        assert records['SELECT * FROM item WHERE id > ?'].details['rows'] == 3
+        assert records['SELECT * FROM item WHERE id = ?'].details['rows'] == 1
+        assert all(r.alias == 'async_db' for r in records.values())
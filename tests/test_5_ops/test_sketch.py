@@ -0,0 +1,89 @@
+import json
+import random
+import time
+import pytest
+from utilmeta.ops.sketch import QuantileSketch
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='django', async_param=[False])
+
+
+def exact_quantile(values: list, q: float):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+class TestQuantileSketch:
+    def test_accuracy(self):
+        rnd = random.Random(0)
+        values = [int(rnd.lognormvariate(3, 1.2)) for _ in range(50000)] + [0] * 100
+        sketch = QuantileSketch()
+        sketch.update(values)
+        assert sketch.count == len(values)
+        assert sketch.min == 0 and sketch.max == max(values)
+        for q in (0.5, 0.95, 0.99, 0.999):
+            exact = exact_quantile(values, q)
+            assert abs(sketch.quantile(q) - exact) <= exact * 0.02 + 1, q
+        assert sketch.quantile(0) == 0
+        assert sketch.quantile(1) == max(values)
+        assert QuantileSketch().quantile(0.5) is None
+        with pytest.raises(ValueError):
+            sketch.quantile(2)
+
+    def test_merge_and_dump(self):
+        rnd = random.Random(1)
+        hours = [[rnd.uniform(1, 500) for _ in range(2000)] for _ in range(24)]
+        hourly = []
+        for values in hours:
+            sketch = QuantileSketch()
+            sketch.update(values)
+            # stored as json in AggregationLog.data / WorkerMonitor.metrics
+            dumped = json.dumps(sketch.dump())
+            hourly.append(QuantileSketch.load(json.loads(dumped)))
+
+        daily = QuantileSketch.merge_all(hourly)
+        all_values = [v for values in hours for v in values]
+        direct = QuantileSketch()
+        direct.update(all_values)
+        assert daily.count == direct.count == len(all_values)
+        assert daily.bins == direct.bins
+        for q in (0.5, 0.95, 0.99):
+            exact = exact_quantile(all_values, q)
+            assert abs(daily.quantile(q) - exact) <= exact * 0.02
+        assert len(json.dumps(daily.dump())) < 4000
+
+        assert QuantileSketch.load({}) is None
+        assert QuantileSketch.merge_all([None, QuantileSketch()]) is None
+        with pytest.raises(ValueError):
+            QuantileSketch().merge(QuantileSketch.load({'a': 0.05, 'n': 1, 'b': [1]}))
+
+    def test_worker_logger(self, service):
+        from utilmeta.ops.log.worker import WorkerMetricsLogger
+        from utilmeta.ops.task.report import get_report_data, SKETCHES_KEY
+
+        logger = WorkerMetricsLogger()
+        for i in range(1, 101):
+            logger.log(duration=i, endpoint_ident='get_article' if i % 2 else None)
+        logger.log(duration=1000, outbound=True)
+        metrics = logger.fetch(60)['metrics']
+        sketch = QuantileSketch.load(metrics['duration_sketch'])
+        assert sketch.count == 100
+        assert abs(sketch.quantile(0.95) - 95) <= 2
+        assert QuantileSketch.load(metrics['endpoint_sketches']['get_article']).count == 50
+        logger.reset()
+        assert logger.get_sketches() == {}
+
+        assert get_report_data({'service': {}, SKETCHES_KEY: {}}) == {'service': {}}
+
+    def test_sketch_benchmark(self):
+        rnd = random.Random(2)
+        values = [rnd.lognormvariate(3, 1) for _ in range(100000)]
+        sketch = QuantileSketch()
+        t0 = time.perf_counter()
+        sketch.update(values)
+        add = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        sorted(values)
+        sort = time.perf_counter() - t0
+        print(f'sketch 100000 values: {add:.4f}s, sort: {sort:.4f}s, '
+              f'dumped: {len(json.dumps(sketch.dump()))} bytes')
@@ -0,0 +1,59 @@
+import asyncio
+from tests.conftest import setup_service
+
+setup_service(__name__, backend='django', async_param=[False])
+import time
+
+
+class TestWorker:
+    def test_probe_timeout(self, service, monkeypatch):
+        from utilmeta.ops.config import Operations
+        from utilmeta.ops.task.worker import OperationWorkerTask, _SKIPPED
+        task = OperationWorkerTask(Operations.config())
+        monkeypatch.setattr(task.config.monitor, 'probe_timeout', 0.2)
+
+        async def hang():
+            await asyncio.sleep(10)
+
+        async def fail():
+            raise ValueError('probe failed')
+
+        async def fast():
+            return {'size': 1}
+
+        async def probe_all():
+            return await asyncio.gather(
+                task.probe(hang(), name='hang'),
+                task.probe(fail(), name='fail'),
+                task.probe(fast(), name='fast'),
+            )
+
+        start = time.perf_counter()
+        hang_result, fail_result, fast_result = asyncio.run(probe_all())
+        # probes run concurrently and a hanging probe does not hold up the others
+        assert time.perf_counter() - start < 2
+        assert hang_result is _SKIPPED
+        assert fail_result is _SKIPPED
+        assert fast_result == {'size': 1}
+        assert task.stage_timings['probe:hang'] >= 0.2
+        assert task.stage_timings['probe:fast'] < 0.2
+
+    def test_db_metrics(self, service):
+        from utilmeta.ops.task.monitor import get_db_metrics, aget_db_metrics
+        metrics = get_db_metrics('default')
+        async_metrics = asyncio.run(aget_db_metrics('default'))
+        assert set(metrics) == set(async_metrics)
+        assert async_metrics['size'] == metrics['size']
+        assert async_metrics['connections'] == []
+
+    def test_async_worker_cycle(self, service):
+        from utilmeta.ops.config import Operations
+        from utilmeta.ops.task.worker import OperationWorkerTask
+        task = OperationWorkerTask(Operations.config())
+        task.asynchronous = True
+        assert task()
+        assert 'save_log' in task.stage_timings
+        assert 'update_worker' in task.stage_timings
+        if task.is_worker_primary:
+            for stage in ['heartbeat', 'server_monitor', 'database_monitor', 'probe:database:default']:
+                assert stage in task.stage_timings
@@ -3,6 +3,7 @@ from typing import Dict, Type, Optional, Any, Literal
 from utilmeta.utils import ERROR_STATUS
 
 DEFAULT_MAX_RETRY_LOOPS = 1000
+DEFAULT_REQUEST_BODY_SPOOL_SIZE = 1024 * 1024
 
 
 class Preference(Config):
@@ -12,6 +13,11 @@ class Preference(Config):
     api_default_strict_response: Optional[bool]
     # client_default_strict_response: Optional[bool]
     client_default_request_backend: Any
+    client_transport_pool: bool
+    client_pool_max_connections: Optional[int]
+    client_pool_max_keepalive_connections: Optional[int]
+    client_pool_keepalive_expiry: Optional[float]
+    client_http2: bool
 
     default_response_status: Optional[int]
     default_response_streaming_chunk_size: Optional[int]
@@ -31,6 +37,9 @@ class Preference(Config):
     # ValueError: The annotation 'xxx' conflicts with a field on the model.
     # orm_schema_redundant_fk_objects: Literal['exclude', 'preserve_pk', 'ignore'] = 'ignore'
     orm_schema_query_max_depth: Optional[int]
+    orm_stream_chunk_size: int
+    orm_default_trusted_source: bool
+    orm_query_plan_cache_size: int
     # orm_recursion: bool
     # orm_default_filter_required: Optional[bool]
     # orm_default_field_fail_silently: bool
@@ -39,6 +48,14 @@ class Preference(Config):
     dependencies_auto_install_disabled: bool
 
     error_variable_max_length: Optional[int]
+    json_codec: Optional[str]
+
+    request_max_body_length: Optional[int]
+    request_body_spool_size: int
+
+    websocket_send_queue_size: int
+    websocket_send_overflow: Literal['block', 'drop', 'close']
+    websocket_close_timeout: Optional[float]
 
     def __init__(
         self,
@@ -59,6 +76,14 @@ class Preference(Config):
         api_default_strict_response: Optional[bool] = None,
         # client_default_strict_response: Optional[bool] = True,
         client_default_request_backend=None,
+        # reuse the connections of the request backends (httpx / aiohttp / requests)
+        # across the Client instances and calls outside the `with client:` context
+        client_transport_pool: bool = True,
+        client_pool_max_connections: Optional[int] = 100,
+        client_pool_max_keepalive_connections: Optional[int] = 20,
+        client_pool_keepalive_expiry: Optional[float] = 5.0,
+        # use HTTP/2 for httpx transports (requires h2 to be installed)
+        client_http2: bool = False,
         default_response_status: Optional[int] = 200,
         default_response_streaming_chunk_size: Optional[int] = None,
         default_aborted_response_status: int = 503,
@@ -73,9 +98,28 @@ class Preference(Config):
         orm_on_conflict_type: Literal['error', 'warn', 'ignore'] = 'warn',
         # orm_schema_redundant_fk_objects: Literal['exclude', 'preserve_pk', 'ignore'] = 'ignore',
         orm_schema_query_max_depth: Optional[int] = 100,
+        # rows fetched (and serialized) per chunk by Schema.stream / astream
+        orm_stream_chunk_size: int = 1000,
+        # convert the queried rows by the precompiled row converters instead of the full parsing
+        orm_default_trusted_source: bool = False,
+        # max entries of the cached field plans and SQL templates of the schema queries, 0 to disable
+        orm_query_plan_cache_size: int = 1024,
         dependencies_auto_install_disabled: bool = False,
         error_variable_max_length: Optional[int] = 100,
         default_dns_resolve_timeout: Optional[float] = None,
+        # json / orjson / msgspec / auto (the fastest installed) or a registered codec name
+        json_codec: Optional[str] = "json",
+        # the max bytes of request body to read, exceeded request will get 413 response
+        request_max_body_length: Optional[int] = None,
+        # file bodies larger than this size will be spilled to a temporary file
+        request_body_spool_size: int = DEFAULT_REQUEST_BODY_SPOOL_SIZE,
+        # messages buffered per websocket connection before the sends are applied the overflow policy,
+        # 0 to send directly (the send waits for the transport)
+        websocket_send_queue_size: int = 64,
+        # block: wait for the queue / drop: discard the message / close: close the slow connection
+        websocket_send_overflow: Literal['block', 'drop', 'close'] = 'block',
+        # seconds to wait for the queued messages to be sent on close
+        websocket_close_timeout: Optional[float] = 5.0,
     ):
         super().__init__(locals())
 
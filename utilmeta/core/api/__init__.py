@@ -6,8 +6,9 @@ from .plugins.base import APIPlugin as Plugin
 from .plugins.retry import RetryPlugin as Retry
 from .plugins.cors import CORSPlugin as CORS
 from .plugins.cache import HttpCache as Cache
-
-# from .plugins.rate import RateLimitPlugin as RateLimit
+from .plugins.cache import ResponseCache
+from .plugins.rate import RateLimitPlugin as RateLimit
+from .plugins.rate import RateLimitRule
 
 route = decorator.APIDecoratorWrapper(None)
 get = decorator.APIDecoratorWrapper("get")
@@ -15,6 +16,8 @@ put = decorator.APIDecoratorWrapper("put")
 post = decorator.APIDecoratorWrapper("post")
 patch = decorator.APIDecoratorWrapper("patch")
 delete = decorator.APIDecoratorWrapper("delete")
+# websocket endpoint, routed with the handshake request
+websocket = decorator.APIDecoratorWrapper("websocket")
 # below is SDK-only method
 head = decorator.APIDecoratorWrapper("head")
 options = decorator.APIDecoratorWrapper("options")
@@ -5,6 +5,8 @@ from utilmeta.utils import (
     Header,
     EndpointAttr,
     COMMON_METHODS,
+    WEBSOCKET,
+    Scheme,
     awaitable,
     classonlymethod,
     distinct_add,
@@ -22,6 +24,7 @@ from utype.utils.datastructures import unprovided
 from ..response import Response
 from ..request import Request, var
 from .route import APIRoute
+from .table import RouteTable
 from .endpoint import Endpoint
 from .hook import Hook, ErrorHook, BeforeHook, AfterHook
 from .chain import APIChainBuilder
@@ -69,6 +72,8 @@ class API(PluginTarget):
     _hook_cls: Type[Hook] = Hook
     _error_cls: Type[Error] = Error
     _route_cls: Type[APIRoute] = APIRoute
+    _route_table_cls: Type[RouteTable] = RouteTable
+    _route_table: Optional[RouteTable] = None
     _endpoint_cls: Type[Endpoint] = Endpoint
     _chain_cls: Type[APIChainBuilder] = APIChainBuilder
     _parser_field_cls: Type[ParserField] = ParserField
@@ -139,6 +144,7 @@ class API(PluginTarget):
         cls._parse_bases()
         cls._generate_routes()
         cls._validate_routes()
+        cls._build_route_table()
         cls._request_cls: Type[Request] = cls._annotations.get("request") or Request
         if not issubclass(cls._request_cls, Request):
             raise TypeError(
@@ -431,6 +437,19 @@ class API(PluginTarget):
                     )
         # TODO: test if any static route is override by a higher priority dynamic route
 
+    @classonlymethod
+    def _build_route_table(cls):
+        cls._route_table = cls._route_table_cls(cls._routes)
+        return cls._route_table
+
+    @classmethod
+    def _get_route_table(cls) -> RouteTable:
+        table = cls.__dict__.get("_route_table")
+        if table is None or table.routes is not cls._routes or table.size != len(cls._routes):
+            # routes changed after class setup
+            table = cls._build_route_table()
+        return table
+
     @classonlymethod
     def __reproduce_with__(cls, generator: decorator.APIGenerator):
         plugins = generator.kwargs.get("plugins")
@@ -475,6 +494,7 @@ class API(PluginTarget):
             handler = import_obj(handler)
         if isinstance(handler, APIRoute):
             cls._routes.append(handler)
+            cls._build_route_table()
             return
         if any([r.handler == handler and r.route == route for r in cls._routes]):
             # same route and handler, return
@@ -491,6 +511,7 @@ class API(PluginTarget):
         api_route.compile_route()
         cls._routes.append(api_route)
         cls._validate_routes()  # validate each time there is a new api mount
+        cls._build_route_table()
 
     def __init__(self, request):
         super().__init__()
@@ -526,31 +547,37 @@ class API(PluginTarget):
 
     def _resolve(self) -> APIRoute:
         method_routes: Dict[str, APIRoute] = {}
-        for route in self._routes:
-            if route.match_route(self.request):
-                # path math
-                if not route.method:
-                    # not endpoint
-                    # further API mount
-                    return route
-                else:
-                    # elif route.method == self.request.method and not self.request.is_options:
-                    #     # options/cross-origin need to collect methods to generate Allow-Methods
-                    #     return route
-                    # first match is 1st priority
-                    method_routes.setdefault(route.method, route)
+        path = var.unmatched_route.getter(self.request)
+        for route, group in self._get_route_table().match(path):
+            # path math
+            route.apply_match(self.request, group)
+            if not route.method:
+                # not endpoint
+                # further API mount
+                return route
+            else:
+                # elif route.method == self.request.method and not self.request.is_options:
+                #     # options/cross-origin need to collect methods to generate Allow-Methods
+                #     return route
+                # first match is 1st priority
+                method_routes.setdefault(route.method, route)
 
         if method_routes:
             allow_methods = var.allow_methods.setup(self.request)
             allow_headers = var.allow_headers.setup(self.request)
             route_var = var.unmatched_route.setup(self.request)
-            allow_methods.set(list(method_routes))
+            # websocket is not a HTTP method to allow
+            allow_methods.set([m for m in method_routes if m != WEBSOCKET])
             headers = list(allow_headers.get() or [])
             for route in method_routes.values():
                 distinct_add(headers, route.header_names)
             allow_headers.set(headers)
             route_var.set("")
             if self.request.method not in method_routes:
+                if list(method_routes) == [WEBSOCKET]:
+                    raise exc.UpgradeRequired(
+                        f"websocket endpoint: {repr(self.request.path)}", scheme=Scheme.WS
+                    )
                 raise exc.MethodNotAllowed(
                     method=self.request.method, allows=allow_methods.get()
                 )
@@ -623,8 +650,8 @@ class API(PluginTarget):
             return await route.aserve(self)
 
     def __call__(self) -> Union[Response, Any]:
-        handler = self._chain_cls(self).build_api_handler(
-            self.__class__.__handler__, asynchronous=False
+        handler = self._chain_cls.get_api_handler(
+            self, self.__class__.__handler__, asynchronous=False
         )
         try:
             resp = handler(self)
@@ -634,8 +661,8 @@ class API(PluginTarget):
 
     @awaitable(__call__)
     async def __call__(self) -> Union[Response, Any]:
-        handler = self._chain_cls(self).build_api_handler(
-            self.__class__.__async_handler__, asynchronous=True
+        handler = self._chain_cls.get_api_handler(
+            self, self.__class__.__async_handler__, asynchronous=True
         )
         try:
             resp = await handler(self)
@@ -655,8 +682,8 @@ class API(PluginTarget):
 
     def __serve__(self, unit):
         if isinstance(unit, Endpoint):
-            handler = self._chain_cls(self, unit).build_api_handler(
-                unit.handler, asynchronous=False
+            handler = self._chain_cls.get_api_handler(
+                self, unit.handler, endpoint=unit, asynchronous=False
             )
             var.endpoint_ref.setter(self.request, unit.ref)
             self._response_types = unit.response_types
@@ -666,8 +693,8 @@ class API(PluginTarget):
 
     async def __aserve__(self, unit):
         if isinstance(unit, Endpoint):
-            handler = self._chain_cls(self, unit).build_api_handler(
-                unit.async_handler, asynchronous=True
+            handler = self._chain_cls.get_api_handler(
+                self, unit.async_handler, endpoint=unit, asynchronous=True
             )
             var.endpoint_ref.setter(self.request, unit.ref)
             self._response_types = unit.response_types
@@ -19,12 +19,14 @@ class BaseChainBuilder:
         required: bool = False,
         reverse: bool = False,
         asynchronous: bool = None,
+        bind_target: bool = True,
     ) -> Tuple[Callable, ...]:
         targets = self.targets
         _classes = set()
         for target in reversed(targets) if reverse else targets:
             if not isinstance(target, PluginTarget):
-                continue
+                if not (inspect.isclass(target) and issubclass(target, PluginTarget)):
+                    continue
 
             plugins: OrderedDict = target._plugins
 
@@ -39,7 +41,11 @@ class BaseChainBuilder:
                     continue
 
                 handlers = [
-                    event.get(plugin, target=target, asynchronous=asynchronous)
+                    event.get(
+                        plugin,
+                        target=target if bind_target else None,
+                        asynchronous=asynchronous,
+                    )
                     for event in events
                 ]
 
@@ -53,10 +59,10 @@ class BaseChainBuilder:
             yield tuple(None for _ in events)
 
     @classmethod
-    def process(cls, obj, handler: Callable):
+    def process(cls, obj, handler: Callable, *args):
         if handler:
             try:
-                res = handler(obj)
+                res = handler(obj, *args)
             except NotImplementedError:
                 return obj
             if res is None:
@@ -65,10 +71,10 @@ class BaseChainBuilder:
         return obj
 
     @classmethod
-    async def async_process(cls, obj, handler: Callable):
+    async def async_process(cls, obj, handler: Callable, *args):
         if handler:
             try:
-                res = handler(obj)
+                res = handler(obj, *args)
                 if inspect.isawaitable(res):
                     res = await res
             except NotImplementedError:
@@ -80,15 +86,61 @@ class BaseChainBuilder:
 
 
 class APIChainBuilder(BaseChainBuilder):
+    # chain cache instrumentation
+    cache_hits = 0
+    cache_rebuilds = 0
+
     def __init__(self, api, endpoint: Endpoint = None):
         from utilmeta.core.api import API
 
-        if not isinstance(api, API):
+        if isinstance(api, API):
+            api_class = api.__class__
+        elif inspect.isclass(api) and issubclass(api, API):
+            api_class = api
+        else:
             raise TypeError(f"Invalid API: {api}")
+        # plugin handlers are bound to the target when the chain is called,
+        # so the built chain does not hold the API instance and can be reused across requests
         super().__init__(endpoint or api)
         self.api = api
+        self.api_class = api_class
         self.endpoint = endpoint
 
+    @classmethod
+    def get_api_handler(
+        cls, api, handler, endpoint: Endpoint = None, asynchronous: bool = None
+    ):
+        """
+        Get the handler chain of the API (or the endpoint if provided) from the plugins cache,
+        the chain is built at the first request and rebuilt only when the plugins of the target changed
+        """
+        if not endpoint and "_plugins" in api.__dict__:
+            # instance plugins
+            return cls(api, endpoint).build_api_handler(handler, asynchronous=asynchronous)
+        target = endpoint or api.__class__
+        cache = target.__dict__.get("_plugins_cache")
+        if cache is None:
+            cache = {}
+            setattr(target, "_plugins_cache", cache)
+        key = (cls, asynchronous)
+        chain = cache.get(key)
+        if chain is not None:
+            cls.cache_hits += 1
+            return chain
+        chain = cls(api.__class__, endpoint).build_api_handler(
+            handler, asynchronous=asynchronous
+        )
+        cache[key] = chain
+        cls.cache_rebuilds += 1
+        return chain
+
+    @classmethod
+    def get_cache_stats(cls) -> dict:
+        return dict(hits=cls.cache_hits, rebuilds=cls.cache_rebuilds)
+
+    def get_target(self, api):
+        return self.endpoint or api
+
     @property
     def idempotent(self):
         if self.endpoint:
@@ -104,6 +156,7 @@ class APIChainBuilder(BaseChainBuilder):
         error_handler=None,
     ):
         retry_index = 0
+        target = self.get_target(api)
         while True:
             try:
                 api.request.adaptor.update_context(
@@ -111,7 +164,7 @@ class APIChainBuilder(BaseChainBuilder):
                 )
                 req = api.request
                 if request_handler:
-                    req = await self.async_process(api.request, request_handler)
+                    req = await self.async_process(api.request, request_handler, target)
                 if isinstance(req, Request):
                     api.request = req
                     response = handler(api)
@@ -121,7 +174,9 @@ class APIChainBuilder(BaseChainBuilder):
                     response = req
                 if response_handler:
                     res = await self.async_process(
-                        api._make_response(response, force=True), response_handler
+                        api._make_response(response, force=True),
+                        response_handler,
+                        target,
                     )
                 else:
                     # successfully get response without response handler
@@ -131,7 +186,7 @@ class APIChainBuilder(BaseChainBuilder):
             except Exception as e:
                 err = Error(e, request=api.request)
                 if error_handler:
-                    err = await self.async_process(err, error_handler)
+                    err = await self.async_process(err, error_handler, target)
                 if isinstance(err, Error):
                     raise err.throw()
                 res = err
@@ -155,6 +210,7 @@ class APIChainBuilder(BaseChainBuilder):
         error_handler=None,
     ):
         retry_index = 0
+        target = self.get_target(api)
         while True:
             try:
                 api.request.adaptor.update_context(
@@ -162,7 +218,7 @@ class APIChainBuilder(BaseChainBuilder):
                 )
                 req = api.request
                 if request_handler:
-                    req = self.process(api.request, request_handler)
+                    req = self.process(api.request, request_handler, target)
                 if isinstance(req, Request):
                     api.request = req
                     response = handler(api)
@@ -170,7 +226,9 @@ class APIChainBuilder(BaseChainBuilder):
                     response = req
                 if response_handler:
                     res = self.process(
-                        api._make_response(response, force=True), response_handler
+                        api._make_response(response, force=True),
+                        response_handler,
+                        target,
                     )
                 else:
                     # successfully get response without response handler
@@ -180,7 +238,7 @@ class APIChainBuilder(BaseChainBuilder):
             except Exception as e:
                 err = Error(e, request=api.request)
                 if error_handler:
-                    err = self.process(err, error_handler)
+                    err = self.process(err, error_handler, target)
                 if isinstance(err, Error):
                     raise err.throw()
                 res = err
@@ -211,7 +269,7 @@ class APIChainBuilder(BaseChainBuilder):
         if asynchronous:
 
             @wraps(handler)
-            async def wrapper(api: API = self.api):
+            async def wrapper(api: API):
                 return await self.async_api_handler(
                     api,
                     handler,
@@ -223,7 +281,7 @@ class APIChainBuilder(BaseChainBuilder):
         else:
 
             @wraps(handler)
-            def wrapper(api: API = self.api):
+            def wrapper(api: API):
                 return self.api_handler(
                     api,
                     handler,
@@ -246,6 +304,7 @@ class APIChainBuilder(BaseChainBuilder):
             handle_error,
             required=False,
             asynchronous=asynchronous,
+            bind_target=False,
         ):
             handler = self.chain_api_handler(
                 handler,
@@ -1,5 +1,10 @@
+import asyncio
+import inspect
+import json
+import math
 from utype.types import *
-from utilmeta.utils import Header, HTTP_METHODS, time_now
+import time
+from utilmeta.utils import Header, HTTP_METHODS, time_now, get_interval, gen_key, is_hop_by_hop, awaitable, Error
 from utilmeta.utils import etag as etag_func
 from utilmeta.utils import exceptions as exc
 from utilmeta.core.request import Request
@@ -135,3 +140,360 @@ class HttpCache(APIPlugin):
 
         response.set_header(Header.CACHE_CONTROL, cache_control)
         return response
+
+
+class ResponseCache(APIPlugin):
+    """
+    Server-side cache of the endpoint responses, a cached response is served in process_request
+    so the endpoint (and its queries) is not executed until the entry expires,
+    entries are keyed by the endpoint, method, path, normalized query, vary headers and (optionally) user id
+    """
+    CONTEXT_KEY = "_response_cache"
+    DEFAULT_PREFIX = "utilmeta:response_cache"
+    EXCLUDED_HEADERS = ("content-length", "set-cookie", "date")
+    ENTRY_SEP = b"\n"
+
+    def __init__(
+        self,
+        timeout: Union[int, float, timedelta] = 60,
+        *,
+        cache_alias: str = "default",
+        scope_prefix: str = None,
+        vary_headers: Union[str, List[str]] = (),
+        vary_user: bool = False,
+        # serve the expired entry for stale_timeout seconds while a request is revalidating it
+        stale_timeout: Union[int, float, timedelta] = 0,
+        lock_timeout: Union[int, float, timedelta] = 10,
+        lock_blocking_timeout: Union[int, float, timedelta] = None,
+        lock_interval: float = 0.05,
+        etag: bool = True,
+        http_statuses: List[int] = (200,),
+        http_methods: List[str] = ("GET", "HEAD"),
+    ):
+        super().__init__(locals())
+        self.timeout = get_interval(timeout)
+        if not self.timeout:
+            raise ValueError(f"ResponseCache: timeout must be > 0, got {timeout}")
+        self.stale_timeout = get_interval(stale_timeout, null=True) or 0
+        self.lock_timeout = get_interval(lock_timeout, null=True) or self.timeout
+        self.lock_blocking_timeout = get_interval(
+            lock_blocking_timeout, null=True
+        ) or self.lock_timeout
+        self.lock_interval = lock_interval
+        self.cache_alias = cache_alias
+        self.scope_prefix = scope_prefix or self.DEFAULT_PREFIX
+        if isinstance(vary_headers, str):
+            vary_headers = [vary_headers]
+        self.vary_headers = [str(h).lower() for h in vary_headers or []]
+        self.vary_user = vary_user
+        self.disable_etag = not etag
+        self.included_statuses = [s for s in http_statuses if isinstance(s, int) and 100 <= s < 600]
+        self.included_methods = [m.upper() for m in http_methods if m.upper() in HTTP_METHODS]
+
+    @property
+    def cache(self):
+        from utilmeta.core.cache import CacheConnections
+
+        return CacheConnections.get(self.cache_alias)
+
+    def cache_get(self, key: str):
+        return self.cache.get_adaptor(False).get(key)
+
+    def cache_set(self, key: str, value, timeout: float, not_exists_only: bool = False):
+        return self.cache.get_adaptor(False).set(
+            key, value, timeout=int(math.ceil(timeout)), not_exists_only=not_exists_only
+        )
+
+    def cache_delete(self, key: str):
+        return self.cache.get_adaptor(False).delete(key)
+
+    async def async_cache_call(self, method: str, *args, **kwargs):
+        cache = self.cache
+        # fallback to the sync adaptor (like locmem) if the cache has no async adaptor
+        res = getattr(cache.get_adaptor(bool(cache.async_adaptor_cls)), method)(*args, **kwargs)
+        if inspect.isawaitable(res):
+            res = await res
+        return res
+
+    async def async_cache_get(self, key: str):
+        return await self.async_cache_call("get", key)
+
+    async def async_cache_set(self, key: str, value, timeout: float, not_exists_only: bool = False):
+        return await self.async_cache_call(
+            "set", key, value, timeout=int(math.ceil(timeout)), not_exists_only=not_exists_only
+        )
+
+    async def async_cache_delete(self, key: str):
+        return await self.async_cache_call("delete", key)
+
+    @property
+    def storage_timeout(self) -> float:
+        return self.timeout + self.stale_timeout
+
+    def get_ident(self, request: Request, target=None) -> str:
+        from ..endpoint import Endpoint
+
+        if isinstance(target, Endpoint):
+            return target.ref
+        return getattr(target, "__ref__", None) or ""
+
+    def get_key(self, request: Request, target=None, user_id=None) -> str:
+        from utilmeta.core.cache.plugins.base import BaseCacheInterface
+
+        digest = BaseCacheInterface.dump_kwargs(
+            method=request.method.upper(),
+            path=request.path,
+            query=dict(request.query or {}),
+            vary={h: request.headers.get(h) for h in self.vary_headers},
+            user=str(user_id) if self.vary_user else None,
+        )
+        return f"{self.scope_prefix}:{self.get_ident(request, target)}:{digest}"
+
+    def get_request_key(self, request: Request, target=None) -> str:
+        user_id = None
+        if self.vary_user:
+            from utilmeta.core.request import var
+
+            user_id = var.user_id.getter(request)
+        return self.get_key(request, target, user_id=user_id)
+
+    @awaitable(get_request_key)
+    async def get_request_key(self, request: Request, target=None) -> str:
+        user_id = None
+        if self.vary_user:
+            from utilmeta.core.request import var
+
+            user_id = await var.user_id.getter(request)
+        return self.get_key(request, target, user_id=user_id)
+
+    # ---- entry
+    def dump_entry(self, response: Response) -> Optional[Tuple[bytes, Optional[str]]]:
+        if response.event_stream or response.file:
+            return None
+        if response.status not in self.included_statuses:
+            return None
+        if response.cookies:
+            # response that set cookies is specific to the client
+            return None
+        body = response.body
+        if not isinstance(body, bytes):
+            return None
+        etag = response.headers.get(Header.ETAG)
+        if not etag and not self.disable_etag:
+            try:
+                etag = etag_func(body)
+            except UnicodeDecodeError:
+                etag = None
+        headers = [
+            [key, val]
+            for key, val in response.prepare_headers(with_content_type=True)
+            if key.lower() not in self.EXCLUDED_HEADERS and not is_hop_by_hop(key)
+        ]
+        if etag and not response.headers.get(Header.ETAG):
+            headers.append([Header.ETAG, etag])
+        meta = json.dumps(
+            dict(status=response.status, headers=headers, etag=etag, time=time.time())
+        )
+        return meta.encode() + self.ENTRY_SEP + body, etag
+
+    def load_entry(self, value) -> Optional[dict]:
+        if not value:
+            return None
+        if isinstance(value, str):
+            value = value.encode()
+        if not isinstance(value, bytes):
+            return None
+        meta, sep, body = value.partition(self.ENTRY_SEP)
+        if not sep:
+            return None
+        try:
+            entry = json.loads(meta)
+        except ValueError:
+            return None
+        if not isinstance(entry, dict):
+            return None
+        entry.update(body=body)
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - (entry.get("time") or 0) < self.timeout
+
+    def not_modified(self, request: Request, etag: Optional[str]) -> bool:
+        if self.disable_etag or not etag:
+            return False
+        return request.headers.get(Header.IF_NONE_MATCH) == etag
+
+    def make_response(self, request: Request, entry: dict) -> Response:
+        etag = entry.get("etag")
+        if self.not_modified(request, etag):
+            return Response(status=304, headers={Header.ETAG: etag}, request=request, cached=True)
+        headers = {}
+        content_type = None
+        for key, val in entry.get("headers") or []:
+            if key.lower() == "content-type":
+                content_type = val
+                continue
+            headers[key] = val
+        return Response(
+            content=entry.get("body"),
+            status=entry.get("status"),
+            content_type=content_type,
+            headers=headers,
+            request=request,
+            cached=True,
+        )
+
+    # ---- single-flight lock
+    @classmethod
+    def _get_lock_key(cls, key: str):
+        return key + "!"
+
+    def acquire_lock(self, key: str, token: str) -> bool:
+        lock_key = self._get_lock_key(key)
+        self.cache_set(lock_key, token, timeout=self.lock_timeout, not_exists_only=True)
+        return self._decode(self.cache_get(lock_key)) == token
+
+    @awaitable(acquire_lock)
+    async def acquire_lock(self, key: str, token: str) -> bool:
+        lock_key = self._get_lock_key(key)
+        await self.async_cache_set(lock_key, token, timeout=self.lock_timeout, not_exists_only=True)
+        return self._decode(await self.async_cache_get(lock_key)) == token
+
+    def release_lock(self, state: dict):
+        token = state.pop("token", None)
+        if not token:
+            return
+        lock_key = self._get_lock_key(state["key"])
+        if self._decode(self.cache_get(lock_key)) == token:
+            self.cache_delete(lock_key)
+
+    @awaitable(release_lock)
+    async def release_lock(self, state: dict):
+        token = state.pop("token", None)
+        if not token:
+            return
+        lock_key = self._get_lock_key(state["key"])
+        if self._decode(await self.async_cache_get(lock_key)) == token:
+            await self.async_cache_delete(lock_key)
+
+    @classmethod
+    def _decode(cls, value):
+        if isinstance(value, bytes):
+            return value.decode(errors="replace")
+        return value
+
+    # ---- plugin events
+    def get_state(self, request: Optional[Request]) -> Optional[dict]:
+        if not request:
+            return None
+        return request.adaptor.get_context(self.CONTEXT_KEY)
+
+    def process_request(self, request: Request, target=None):
+        if request.method.upper() not in self.included_methods:
+            return request
+        state = dict(key=self.get_request_key(request, target))
+        request.adaptor.update_context(**{self.CONTEXT_KEY: state})
+        token = gen_key(32, alnum=True)
+        entry = self.load_entry(self.cache_get(state["key"]))
+        if entry and self.is_fresh(entry):
+            state.update(hit=True)
+            return self.make_response(request, entry)
+        if self.acquire_lock(state["key"], token):
+            # this request executes the endpoint and refresh the entry
+            state.update(token=token)
+            return request
+        if entry:
+            # stale-while-revalidate: another request is refreshing the entry
+            state.update(hit=True)
+            return self.make_response(request, entry)
+        deadline = time.monotonic() + self.lock_blocking_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self.lock_interval)
+            entry = self.load_entry(self.cache_get(state["key"]))
+            if entry:
+                state.update(hit=True)
+                return self.make_response(request, entry)
+            if self.acquire_lock(state["key"], token):
+                state.update(token=token)
+                return request
+        # lock blocking timeout, execute without lock
+        return request
+
+    @awaitable(process_request)
+    async def process_request(self, request: Request, target=None):
+        if request.method.upper() not in self.included_methods:
+            return request
+        state = dict(key=await self.get_request_key(request, target))
+        request.adaptor.update_context(**{self.CONTEXT_KEY: state})
+        token = gen_key(32, alnum=True)
+        entry = self.load_entry(await self.async_cache_get(state["key"]))
+        if entry and self.is_fresh(entry):
+            state.update(hit=True)
+            return self.make_response(request, entry)
+        if await self.acquire_lock(state["key"], token):
+            state.update(token=token)
+            return request
+        if entry:
+            state.update(hit=True)
+            return self.make_response(request, entry)
+        deadline = time.monotonic() + self.lock_blocking_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.lock_interval)
+            entry = self.load_entry(await self.async_cache_get(state["key"]))
+            if entry:
+                state.update(hit=True)
+                return self.make_response(request, entry)
+            if await self.acquire_lock(state["key"], token):
+                state.update(token=token)
+                return request
+        return request
+
+    def process_response(self, response: Response):
+        request = response.request
+        state = self.get_state(request)
+        if not state or state.get("hit"):
+            return response
+        try:
+            dumped = self.dump_entry(response)
+            if not dumped:
+                return response
+            value, etag = dumped
+            self.cache_set(state["key"], value, timeout=self.storage_timeout)
+        finally:
+            self.release_lock(state)
+        if etag:
+            response.set_header(Header.ETAG, etag)
+            if self.not_modified(request, etag):
+                return Response(status=304, headers={Header.ETAG: etag}, request=request)
+        return response
+
+    @awaitable(process_response)
+    async def process_response(self, response: Response):
+        request = response.request
+        state = self.get_state(request)
+        if not state or state.get("hit"):
+            return response
+        try:
+            dumped = self.dump_entry(response)
+            if not dumped:
+                return response
+            value, etag = dumped
+            await self.async_cache_set(state["key"], value, timeout=self.storage_timeout)
+        finally:
+            await self.release_lock(state)
+        if etag:
+            response.set_header(Header.ETAG, etag)
+            if self.not_modified(request, etag):
+                return Response(status=304, headers={Header.ETAG: etag}, request=request)
+        return response
+
+    def handle_error(self, error: Error):
+        state = self.get_state(error.request)
+        if state:
+            self.release_lock(state)
+
+    @awaitable(handle_error)
+    async def handle_error(self, error: Error):
+        state = self.get_state(error.request)
+        if state:
+            await self.release_lock(state)
@@ -1,41 +1,422 @@
-# from utype.types import *
-# from utilmeta.utils.plugin import Plugin
-# from utilmeta.utils import Header
-# from utilmeta.core.request import Request
-#
-#
-# class RateLimitPlugin(Plugin):
-#     @classmethod
-#     def ban_user(cls, request: 'Request'):
-#         return request.user_id
-#
-#     @classmethod
-#     def ban_ip(cls, request: 'Request'):
-#         return request.ip
-#
-#     @classmethod
-#     def ban_session(cls, request: 'Request'):
-#         return request.session.session_key
-#
-#     @classmethod
-#     def ban_origin(cls, request: 'Request'):
-#         return request.origin
-#
-#     @classmethod
-#     def ban_agent(cls, request: 'Request'):
-#         return request.ua_string
-#
-#     @classmethod
-#     def ban_referrer(cls, request: 'Request'):
-#         return request.headers.get(Header.REFERER)
-#
-#     def __init__(self,
-#                  max_rps: Union[int, float] = None,
-#                  max_times: int = None,
-#                  max_errors: int = None,
-#                  cache_alias: str = None,
-#                  reset_after: Union[int, timedelta, float] = None,
-#                  cycle_start: datetime = None,
-#                  cycle_interval: datetime = None,
-#                  ban_function: Callable = None):
-#         super().__init__(locals())
+import inspect
+import math
+import threading
+from utype.types import *
+import time
+from utilmeta.utils import get_interval, gen_key, awaitable
+from utilmeta.utils import exceptions as exc
+from utilmeta.core.request import Request
+from utilmeta.core.response import Response
+from .base import APIPlugin
+
+
+class RateLimitRule:
+    """
+    Allow [limit] requests for a client identified by [key] in every [window] seconds
+    """
+
+    TOKEN_BUCKET = "token_bucket"
+    SLIDING_WINDOW = "sliding_window"
+    ALGORITHMS = {TOKEN_BUCKET: 1, SLIDING_WINDOW: 2}
+
+    IP = "ip"
+    USER = "user"
+    SESSION = "session"
+    ORIGIN = "origin"
+    KEYS = (IP, USER, SESSION, ORIGIN)
+    SESSION_COOKIE_NAME = "sessionid"
+
+    def __init__(
+        self,
+        limit: int,
+        window: Union[int, float, timedelta] = 1,
+        *,
+        key: Union[str, Callable] = IP,
+        algorithm: str = TOKEN_BUCKET,
+        cost: int = 1,
+        name: str = None,
+    ):
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError(f"RateLimitRule: limit must be a positive int, got {limit}")
+        window = get_interval(window)
+        if not window:
+            raise ValueError(f"RateLimitRule: window must be > 0, got {window}")
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(
+                f"RateLimitRule: invalid algorithm: {repr(algorithm)}, options are: {list(self.ALGORITHMS)}"
+            )
+        if isinstance(key, (classmethod, staticmethod)):
+            key = key.__func__
+        if not callable(key) and key not in self.KEYS:
+            raise ValueError(
+                f"RateLimitRule: invalid key: {repr(key)}, must be a callable or one of {self.KEYS}"
+            )
+        if not isinstance(cost, int) or cost <= 0:
+            raise ValueError(f"RateLimitRule: cost must be a positive int, got {cost}")
+        self.limit = limit
+        self.window = window
+        self.key = key
+        self.algorithm = algorithm
+        self.cost = cost
+        self.name = name or (
+            key if isinstance(key, str) else getattr(key, "__name__", "key")
+        )
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.limit}, {self.window}, "
+            f"key={repr(self.name)}, algorithm={repr(self.algorithm)})"
+        )
+
+    @property
+    def window_ms(self) -> int:
+        return int(math.ceil(self.window * 1000))
+
+    def get_ident(self, request: Request) -> Optional[str]:
+        # return None to skip the rule for the request (like user rule for anonymous requests)
+        if callable(self.key):
+            ident = self.key(request)
+        elif self.key == self.IP:
+            ident = request.ip_address
+        elif self.key == self.USER:
+            from utilmeta.core.request import var
+
+            ident = var.user_id.getter(request)
+        elif self.key == self.SESSION:
+            ident = self.get_session_key(request)
+        else:
+            ident = request.origin
+        return None if ident is None else str(ident)
+
+    async def aget_ident(self, request: Request) -> Optional[str]:
+        if callable(self.key):
+            ident = self.key(request)
+            if inspect.isawaitable(ident):
+                ident = await ident
+        elif self.key == self.USER:
+            from utilmeta.core.request import var
+
+            ident = await var.user_id.getter(request)
+        else:
+            return self.get_ident(request)
+        return None if ident is None else str(ident)
+
+    @classmethod
+    def get_session_key(cls, request: Request) -> Optional[str]:
+        cookies = request.cookies or {}
+        return cookies.get(cls.SESSION_COOKIE_NAME)
+
+
+class RateLimitState:
+    __slots__ = ("rule", "allowed", "remaining", "retry_after", "reset")
+
+    def __init__(self, rule: RateLimitRule, allowed: bool, remaining: int, retry_after: float, reset: float):
+        self.rule = rule
+        self.allowed = allowed
+        self.remaining = remaining
+        # seconds until the rejected request can be retried
+        self.retry_after = retry_after
+        # seconds until the quota is fully restored
+        self.reset = reset
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({repr(self.rule)}, allowed={self.allowed}, "
+            f"remaining={self.remaining}, retry_after={self.retry_after}, reset={self.reset})"
+        )
+
+
+class MemoryRateLimitStore:
+    """
+    In-process store for the caches without atomic scripts (like locmem),
+    the limits are counted per process
+    """
+
+    PRUNE_SIZE = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key: (expires at, state), state is [tokens, ts] for token bucket, timestamp list for sliding window
+        self._data: Dict[str, list] = {}
+
+    def prune(self, now: float):
+        for key in [k for k, (expires, _) in self._data.items() if expires <= now]:
+            self._data.pop(key, None)
+
+    def check(self, items: List[Tuple[str, RateLimitRule]], member: str = None) -> List[RateLimitState]:
+        with self._lock:
+            now = time.time()
+            if len(self._data) > self.PRUNE_SIZE:
+                self.prune(now)
+            checks = []
+            for key, rule in items:
+                entry = self._data.get(key)
+                if entry and entry[0] <= now:
+                    entry = None
+                if rule.algorithm == rule.TOKEN_BUCKET:
+                    checks.append(self._check_token_bucket(rule, entry, now))
+                else:
+                    checks.append(self._check_sliding_window(rule, entry, now))
+            allowed = all(state.allowed for state, _ in checks)
+            if allowed:
+                for (key, rule), (state, value) in zip(items, checks):
+                    if rule.algorithm == rule.TOKEN_BUCKET:
+                        value = [value - rule.cost, now]
+                    else:
+                        value = value + [now] * rule.cost
+                    self._data[key] = [now + rule.window, value]
+            return [state for state, _ in checks]
+
+    @classmethod
+    def _check_token_bucket(cls, rule: RateLimitRule, entry, now: float):
+        rate = rule.limit / rule.window
+        if entry:
+            tokens, ts = entry[1]
+            tokens = min(rule.limit, tokens + max(0.0, now - ts) * rate)
+        else:
+            tokens = rule.limit
+        if tokens >= rule.cost:
+            remaining, retry_after = tokens - rule.cost, 0
+        else:
+            remaining, retry_after = tokens, (rule.cost - tokens) / rate
+        state = RateLimitState(
+            rule,
+            allowed=tokens >= rule.cost,
+            remaining=int(remaining),
+            retry_after=retry_after,
+            reset=(rule.limit - remaining) / rate,
+        )
+        return state, tokens
+
+    @classmethod
+    def _check_sliding_window(cls, rule: RateLimitRule, entry, now: float):
+        log = [ts for ts in entry[1] if ts > now - rule.window] if entry else []
+        count = len(log)
+        allowed = count + rule.cost <= rule.limit
+        if allowed:
+            remaining, retry_after = rule.limit - count - rule.cost, 0
+        else:
+            remaining, retry_after = max(0, rule.limit - count), rule.window
+            index = count + rule.cost - rule.limit
+            if rule.cost <= rule.limit and index <= count:
+                # wait until enough requests slide out of the window
+                retry_after = max(0.0, log[index - 1] + rule.window - now)
+        reset = (log[0] + rule.window - now) if log else rule.window
+        state = RateLimitState(
+            rule,
+            allowed=allowed,
+            remaining=int(remaining),
+            retry_after=retry_after,
+            reset=max(0.0, reset),
+        )
+        return state, log
+
+
+class RedisRateLimitStore:
+    """
+    Check all the rules of a request in one round trip by a lua script,
+    the algorithms run atomically in redis so the limits hold across processes and servers
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._con = None
+
+    @property
+    def con(self):
+        if self._con is None:
+            self._con = self.cache.con
+        return self._con
+
+    @classmethod
+    def get_args(cls, items: List[Tuple[str, RateLimitRule]], member: str) -> list:
+        args = [member]
+        for key, rule in items:
+            args.extend([rule.ALGORITHMS[rule.algorithm], rule.limit, rule.window_ms, rule.cost])
+        return args
+
+    @classmethod
+    def get_states(cls, items: List[Tuple[str, RateLimitRule]], result: list) -> List[RateLimitState]:
+        states = []
+        for i, (key, rule) in enumerate(items):
+            ok, remaining, retry_after, reset = [int(v) for v in result[i * 4: i * 4 + 4]]
+            states.append(
+                RateLimitState(
+                    rule,
+                    allowed=bool(ok),
+                    remaining=remaining,
+                    retry_after=retry_after / 1000,
+                    reset=reset / 1000,
+                )
+            )
+        return states
+
+    def check(self, items: List[Tuple[str, RateLimitRule]], member: str = None) -> List[RateLimitState]:
+        from utilmeta.core.cache.backends.redis.scripts import RATE_LIMIT_LUA
+
+        keys = [key for key, _ in items]
+        result = self.con.eval(RATE_LIMIT_LUA, len(keys), *keys, *self.get_args(items, member))
+        return self.get_states(items, result)
+
+    async def acheck(self, items: List[Tuple[str, RateLimitRule]], member: str = None) -> List[RateLimitState]:
+        from utilmeta.core.cache.backends.redis.scripts import RATE_LIMIT_LUA
+
+        keys = [key for key, _ in items]
+        result = await self.cache.async_con.eval(
+            RATE_LIMIT_LUA, len(keys), *keys, *self.get_args(items, member)
+        )
+        return self.get_states(items, result)
+
+
+class RateLimitPlugin(APIPlugin):
+    """
+    Limit the request rate of the API / endpoint by the rules,
+    exceeded requests are rejected by 429 Too Many Requests with Retry-After header
+    """
+
+    rule_cls = RateLimitRule
+    memory_store_cls = MemoryRateLimitStore
+    redis_store_cls = RedisRateLimitStore
+    error_cls = exc.TooManyRequests
+
+    CONTEXT_KEY = "_rate_limit"
+    DEFAULT_PREFIX = "utilmeta:rate_limit"
+    HEADER_LIMIT = "X-RateLimit-Limit"
+    HEADER_REMAINING = "X-RateLimit-Remaining"
+    HEADER_RESET = "X-RateLimit-Reset"
+
+    TOKEN_BUCKET = RateLimitRule.TOKEN_BUCKET
+    SLIDING_WINDOW = RateLimitRule.SLIDING_WINDOW
+
+    def __init__(
+        self,
+        limit: int = None,
+        window: Union[int, float, timedelta] = 1,
+        *,
+        key: Union[str, Callable] = RateLimitRule.IP,
+        algorithm: str = RateLimitRule.TOKEN_BUCKET,
+        cost: int = 1,
+        rules: List[RateLimitRule] = (),
+        # use a redis cache to share the limits across processes, in-process store is used if not specified
+        cache_alias: str = None,
+        scope_prefix: str = None,
+        headers: bool = True,
+    ):
+        super().__init__(locals())
+        rules = list(rules or [])
+        if limit is not None:
+            rules.insert(0, self.rule_cls(limit, window, key=key, algorithm=algorithm, cost=cost))
+        if not rules:
+            raise ValueError(f"RateLimit: limit or rules must be specified")
+        for rule in rules:
+            if not isinstance(rule, RateLimitRule):
+                raise TypeError(f"RateLimit: invalid rule: {rule}, must be a RateLimitRule instance")
+        self.rules: List[RateLimitRule] = rules
+        self.cache_alias = cache_alias
+        self.scope_prefix = scope_prefix
+        self.headers = headers
+        self._store = None
+
+    @property
+    def store(self):
+        if self._store is None:
+            store = None
+            if self.cache_alias:
+                from utilmeta.core.cache import CacheConnections
+
+                cache = CacheConnections.get(self.cache_alias)
+                if cache.type == "redis":
+                    store = self.redis_store_cls(cache)
+            self._store = store or self.memory_store_cls()
+        return self._store
+
+    def get_scope(self, target=None) -> str:
+        if self.scope_prefix:
+            return self.scope_prefix
+        from ..endpoint import Endpoint
+
+        if isinstance(target, Endpoint):
+            ident = target.ref
+        else:
+            ident = getattr(target, "__ref__", None) or ""
+        return f"{self.DEFAULT_PREFIX}:{ident}"
+
+    def get_key(self, index: int, rule: RateLimitRule, ident: str, target=None) -> str:
+        return f"{self.get_scope(target)}:{index}:{rule.name}:{ident}"
+
+    def get_items(self, request: Request, target=None) -> List[Tuple[str, RateLimitRule]]:
+        items = []
+        for i, rule in enumerate(self.rules):
+            ident = rule.get_ident(request)
+            if ident is not None:
+                items.append((self.get_key(i, rule, ident, target), rule))
+        return items
+
+    @awaitable(get_items)
+    async def get_items(self, request: Request, target=None) -> List[Tuple[str, RateLimitRule]]:
+        items = []
+        for i, rule in enumerate(self.rules):
+            ident = await rule.aget_ident(request)
+            if ident is not None:
+                items.append((self.get_key(i, rule, ident, target), rule))
+        return items
+
+    @classmethod
+    def get_headers(cls, states: List[RateLimitState]) -> dict:
+        if not states:
+            return {}
+        # report the most restrictive rule
+        state = min(states, key=lambda s: (s.remaining / s.rule.limit, -s.reset))
+        return {
+            cls.HEADER_LIMIT: state.rule.limit,
+            cls.HEADER_REMAINING: state.remaining,
+            cls.HEADER_RESET: int(math.ceil(state.reset)),
+        }
+
+    def get_error(self, states: List[RateLimitState]) -> Optional[Exception]:
+        rejected = [state for state in states if not state.allowed]
+        if not rejected:
+            return None
+        retry_after = max(state.retry_after for state in rejected)
+        headers = self.get_headers(rejected) if self.headers else {}
+        return self.error_cls(
+            f"Rate limit exceeded: {rejected[0].rule}",
+            retry_after=retry_after,
+            headers=headers,
+        )
+
+    def process_request(self, request: Request, target=None):
+        items = self.get_items(request, target)
+        if not items:
+            return request
+        states = self.store.check(items, member=gen_key(16, alnum=True))
+        request.adaptor.update_context(**{self.CONTEXT_KEY: states})
+        error = self.get_error(states)
+        if error:
+            raise error
+        return request
+
+    @awaitable(process_request)
+    async def process_request(self, request: Request, target=None):
+        items = await self.get_items(request, target)
+        if not items:
+            return request
+        store = self.store
+        member = gen_key(16, alnum=True)
+        if isinstance(store, RedisRateLimitStore):
+            states = await store.acheck(items, member=member)
+        else:
+            states = store.check(items, member=member)
+        request.adaptor.update_context(**{self.CONTEXT_KEY: states})
+        error = self.get_error(states)
+        if error:
+            raise error
+        return request
+
+    def process_response(self, response: Response):
+        if not self.headers or not response.request:
+            return response
+        states = response.request.adaptor.get_context(self.CONTEXT_KEY)
+        for key, val in self.get_headers(states).items():
+            response.headers.setdefault(key, val)
+        return response
@@ -195,6 +195,8 @@ class APIRoute(BaseRoute):
         self.private = private or handler.__name__.startswith("_")
         self.priority = priority
         self.regex_list = []
+        self.template_list = []
+        # (route template, is prefix) of every regex in regex_list
         self.kwargs_regex = {}
         self.header_names = []
         self.init_headers()
@@ -270,6 +272,7 @@ class APIRoute(BaseRoute):
     def compile_route(self):
         if not self.route:
             self.regex_list = [re.compile("")]
+            self.template_list = [("", False)]
             return
 
         regs = []
@@ -278,10 +281,13 @@ class APIRoute(BaseRoute):
 
         if not params:
             regs = [re.compile(self.route)]
+            templates = [(self.route, False)]
             if not self.is_endpoint:
                 # for API
                 regs.append(re.compile(f"{self.route}/(?P<_>.*)"))
+                templates.append((self.route, True))
             self.regex_list = regs
+            self.template_list = templates
             return
 
         d = duplicate(params)
@@ -331,10 +337,13 @@ class APIRoute(BaseRoute):
             suffix = self.route[beg:]
 
         pattern = ""
+        template = ""
+        templates = []
         for div, param in divider:
             path_field = self.get_field(param)
             # use ducked attribute here
             path_regex = getattr(path_field, "regex", self.DEFAULT_PATH_REGEX)
+            template += div
             div = regular(div)
             pattern += div
 
@@ -344,23 +353,30 @@ class APIRoute(BaseRoute):
                 # until omit param, do not add pattern
                 # after omit param, every param should add a pattern
                 regs.append(re.compile(pattern.rstrip("/")))
+                templates.append((template.rstrip("/"), False))
                 # omit does apply for API
 
             kwargs_reg[param] = path_regex
             pattern += f"(?P<{param}>{path_regex})"
+            template += "{%s}" % param
 
         pattern += suffix
+        template += suffix
         regs.append(re.compile(pattern))
+        templates.append((template, False))
 
         if not self.is_endpoint:
             # for API
             regs.append(re.compile(f"{pattern}/(?P<_>.*)"))
+            templates.append((template, True))
 
         regs.reverse()
+        templates.reverse()
         # reverse the reg list so the longest reg match the path first,
         # if success then break, else try out all the regs
 
         self.regex_list = regs
+        self.template_list = templates
         self.kwargs_regex = kwargs_reg
 
     @property
@@ -393,35 +409,39 @@ class APIRoute(BaseRoute):
         # /doc/{page}
         # /user/* -> UserAPI
         # /http/bin/* -> HttpBinAPI
-        route_attr = var.unmatched_route.setup(request)
-        path_params_attr = var.path_params.setup(request)
-        route = route_attr.get()
-        path_params: dict = path_params_attr.get()
+        group = self.match_path(var.unmatched_route.getter(request))
+        if group is None:
+            return False
+        self.apply_match(request, group)
+        return True
+
+    def match_path(self, route: str) -> Optional[dict]:
         for regex in self.regex_list:
             match = regex.fullmatch(route)
             if match:
-                group: dict = match.groupdict()
-                if not self.method:
-                    # only set path params if route is API
-                    # endpoints need to match for multiple methods
-                    route_attr.set(pop(group, "_", ""))
-
-                if not self.method or self.method == request.method:
-                    # set path params for endpoint and API in every match
-                    for key, value in group.items():
-                        # setdefault instead of [setitem]
-                        # because the first match
-                        path_params.setdefault(key, value)
-                    path_params_attr.set(path_params)
-
-                    if self.header_names:
-                        # add allowed headers
-                        allow_headers = var.allow_headers.setup(request)
-                        headers = list(allow_headers.get() or [])
-                        distinct_add(headers, self.header_names)
-                        allow_headers.set(headers)
-                return True
-        return False
+                return match.groupdict()
+        return None
+
+    def apply_match(self, request: Request, group: dict):
+        if not self.method:
+            # only set path params if route is API
+            # endpoints need to match for multiple methods
+            var.unmatched_route.setter(request, pop(group, "_", ""))
+
+        if not self.method or self.method == request.method:
+            # set path params for endpoint and API in every match
+            path_params: dict = var.path_params.getter(request)
+            for key, value in group.items():
+                # setdefault instead of [setitem]
+                # because the first match
+                path_params.setdefault(key, value)
+            var.path_params.setter(request, path_params)
+
+            if self.header_names:
+                # add allowed headers
+                headers = list(var.allow_headers.getter(request) or [])
+                distinct_add(headers, self.header_names)
+                var.allow_headers.setter(request, headers)
 
     def serve(self, api: "API"):
         # ---
@@ -16,7 +16,7 @@ from utilmeta.core.file.base import File
 from utilmeta.core.auth.properties import User
 from utilmeta.core.response.base import Headers, JSON, OCTET_STREAM, PLAIN
 from utilmeta.utils.context import Property, ParserProperty
-from utilmeta.utils.constant import HAS_BODY_METHODS, HTTP_METHODS
+from utilmeta.utils.constant import HAS_BODY_METHODS, HTTP_METHODS, WEBSOCKET
 from utilmeta.utils import (
     valid_url,
     json_dumps,
@@ -1348,7 +1348,8 @@ class OpenAPI(BaseAPISpec):
             self.set_response(api_response, names=list(tags))
 
         for api_route in api._routes:
-            if api_route.private:
+            if api_route.private or api_route.method == WEBSOCKET:
+                # websocket endpoints are not HTTP operations
                 continue
             route_paths = self.from_route(
                 api_route,
@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from utilmeta.utils import regular
+
+if TYPE_CHECKING:
+    from .route import APIRoute
+
+
+class RouteNode:
+    __slots__ = ("children", "param", "exact", "prefix")
+
+    def __init__(self):
+        self.children: Dict[str, "RouteNode"] = {}
+        self.param: Optional["RouteNode"] = None
+        # entries: (index, variant, route, param names)
+        self.exact: List[tuple] = []
+        self.prefix: List[tuple] = []
+
+    def child(self, segment: Optional[str]) -> "RouteNode":
+        if segment is None:
+            if self.param is None:
+                self.param = RouteNode()
+            return self.param
+        node = self.children.get(segment)
+        if node is None:
+            node = self.children[segment] = RouteNode()
+        return node
+
+
+class RouteTable:
+    """
+    A prefix tree of the compiled routes of an API class, built once the routes are settled,
+    the path is resolved in a single walk over its segments instead of trying every regex of every route,
+    routes that cannot be expressed as segments (custom param regex, mixed segments like "{a}-{b}")
+    are still matched by their regex, the result is ordered exactly as the linear scan of API._routes
+    """
+
+    def __init__(self, routes: List["APIRoute"]):
+        self.routes = routes
+        self.size = len(routes)
+        self.root = RouteNode()
+        self.fallbacks: List[Tuple[int, "APIRoute"]] = []
+
+        for index, route in enumerate(routes):
+            variants = self.parse_route(route)
+            if variants is None:
+                self.fallbacks.append((index, route))
+                continue
+            for variant, (segments, names, prefix) in enumerate(variants):
+                node = self.root
+                for seg in segments:
+                    node = node.child(seg)
+                entry = (index, variant, route, names)
+                (node.prefix if prefix else node.exact).append(entry)
+
+    @classmethod
+    def parse_template(cls, route: "APIRoute", template: str):
+        segments = []
+        names = []
+        if not template:
+            return segments, names
+        for seg in template.split("/"):
+            if seg.startswith("{") and seg.endswith("}"):
+                name = seg[1:-1]
+                if route.kwargs_regex.get(name) != route.DEFAULT_PATH_REGEX:
+                    # custom param regex may match across the segments
+                    return None
+                segments.append(None)
+                names.append(name)
+            elif regular(seg) != seg:
+                # mixed segment or regex in route
+                return None
+            else:
+                segments.append(seg)
+        return segments, names
+
+    @classmethod
+    def parse_route(cls, route: "APIRoute"):
+        templates = getattr(route, "template_list", None)
+        if not templates or len(templates) != len(route.regex_list):
+            return None
+        variants = []
+        for template, prefix in templates:
+            parsed = cls.parse_template(route, template)
+            if parsed is None:
+                return None
+            segments, names = parsed
+            variants.append((segments, names, prefix))
+        return variants
+
+    def match(self, path: str) -> List[Tuple["APIRoute", dict]]:
+        """
+        Return the matched (route, groupdict) pairs in the order of routes,
+        groupdict is the same as the one matched by the first matched regex of the route
+        """
+        segments = path.split("/") if path else []
+        total = len(segments)
+        matched: Dict[int, tuple] = {}
+
+        stack = [(self.root, 0, ())]
+        while stack:
+            node, depth, values = stack.pop()
+            if depth == total:
+                for entry in node.exact:
+                    self._add(matched, entry, values, None)
+                continue
+            if node.prefix:
+                remainder = "/".join(segments[depth:])
+                if "\n" not in remainder:
+                    # regex: .* does not match line breaks
+                    for entry in node.prefix:
+                        self._add(matched, entry, values, remainder)
+            seg = segments[depth]
+            child = node.children.get(seg)
+            if child is not None:
+                stack.append((child, depth + 1, values))
+            if node.param is not None and seg:
+                stack.append((node.param, depth + 1, values + (seg,)))
+
+        for index, route in self.fallbacks:
+            for regex in route.regex_list:
+                match = regex.fullmatch(path)
+                if match:
+                    matched[index] = (-1, route, match.groupdict())
+                    break
+
+        if not matched:
+            return []
+        result = []
+        for index in sorted(matched):
+            variant, route, group = matched[index]
+            if not isinstance(group, dict):
+                names, values, remainder = group
+                group = dict(zip(names, values))
+                if remainder is not None:
+                    group["_"] = remainder
+            result.append((route, group))
+        return result
+
+    @classmethod
+    def _add(cls, matched: dict, entry: tuple, values: tuple, remainder: Optional[str]):
+        index, variant, route, names = entry
+        exists = matched.get(index)
+        if exists and exists[0] <= variant:
+            # the preceding regex of the route wins
+            return
+        matched[index] = (variant, route, (names, values, remainder))
@@ -1 +1,3 @@
 from .config import CacheConnections, Cache
+from .pipeline import CachePipeline
+from .near import NearCache
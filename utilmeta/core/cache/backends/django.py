@@ -1,5 +1,5 @@
 from utilmeta.utils import keys_or_args
-from typing import Dict, Optional, Union, Any, ClassVar
+from typing import Dict, Optional, Union, Any, ClassVar, List, Tuple
 from datetime import timedelta, datetime
 from ..base import BaseCacheAdaptor
 from ..config import Cache
@@ -101,6 +101,103 @@ class DjangoCacheAdaptor(BaseCacheAdaptor):
             # django cache backend may raise ValueError if key does not exists
             self.cache.set(key, amount)
 
+    def execute_pipeline(self, commands: List[Tuple[str, tuple, dict]]) -> list:
+        try:
+            from django.core.cache.backends.redis import RedisCache
+        except (ModuleNotFoundError, ImportError):
+            RedisCache = None
+        cache = self.cache
+        if RedisCache and isinstance(cache, RedisCache):
+            return self._execute_redis_pipeline(cache, commands)
+        return super().execute_pipeline(commands)
+
+    @classmethod
+    def _execute_redis_pipeline(cls, cache, commands: List[Tuple[str, tuple, dict]]) -> list:
+        # queue the commands to one redis pipeline, with the keys and serializer of the django cache
+        client = cache._cache.get_client(write=True)
+        serializer = cache._cache._serializer
+        pipe = client.pipeline(transaction=False)
+        # (name, number of the redis commands, extra info to parse the result)
+        parsers = []
+
+        def load(value, default=None):
+            return default if value is None else serializer.loads(value)
+
+        for name, args, kwargs in commands:
+            if name == "get":
+                key, default = args[0], (args[1] if len(args) > 1 else kwargs.get("default"))
+                pipe.get(cache.make_and_validate_key(key))
+                parsers.append((1, lambda r, d=default: load(r[0], d)))
+            elif name == "fetch":
+                keys = keys_or_args(*args)
+                pipe.mget([cache.make_and_validate_key(k) for k in keys])
+                if kwargs.get("named"):
+                    parsers.append((1, lambda r, ks=keys: {
+                        k: load(v) for k, v in zip(ks, r[0]) if v is not None
+                    }))
+                else:
+                    parsers.append((1, lambda r: [load(v) for v in r[0]]))
+            elif name == "set":
+                key, value = args
+                timeout = cache.get_backend_timeout(kwargs.get("timeout"))
+                pipe.set(
+                    cache.make_and_validate_key(key),
+                    serializer.dumps(value),
+                    ex=timeout or None,
+                    xx=kwargs.get("exists_only") or False,
+                    nx=kwargs.get("not_exists_only") or False,
+                )
+                parsers.append((1, lambda r: r[0]))
+            elif name == "update":
+                data = args[0]
+                timeout = cache.get_backend_timeout()
+                pipe.mset({cache.make_and_validate_key(k): serializer.dumps(v) for k, v in data.items()})
+                if timeout is not None:
+                    for key in data:
+                        pipe.expire(cache.make_and_validate_key(key), timeout)
+                    parsers.append((1 + len(data), lambda r: r[0]))
+                else:
+                    parsers.append((1, lambda r: r[0]))
+            elif name == "pop":
+                key = cache.make_and_validate_key(args[0])
+                pipe.get(key)
+                pipe.delete(key)
+                parsers.append((2, lambda r: load(r[0])))
+            elif name in ("delete", "exists"):
+                keys = [cache.make_and_validate_key(k) for k in keys_or_args(*args)]
+                if keys:
+                    getattr(pipe, name)(*keys)
+                    parsers.append((1, lambda r: r[0]))
+                else:
+                    parsers.append((0, lambda r: 0))
+            elif name == "expire":
+                timeout = kwargs.get("timeout")
+                for key in args:
+                    key = cache.make_and_validate_key(key)
+                    if timeout is None:
+                        pipe.persist(key)
+                    else:
+                        pipe.expire(key, int(timeout))
+                parsers.append((len(args), lambda r: None))
+            elif name == "alter":
+                key, amount = args
+                if not isinstance(amount, int):
+                    raise TypeError(
+                        f"{cls.__name__}: pipeline alter requires an int amount, got {repr(amount)}"
+                    )
+                pipe.incrby(cache.make_and_validate_key(key), amount)
+                parsers.append((1, lambda r: r[0]))
+            else:
+                raise NotImplementedError(f"{cls.__name__}: pipeline command: {repr(name)} not supported")
+
+        replies = pipe.execute()
+        results = []
+        index = 0
+        for size, parser in parsers:
+            results.append(parser(replies[index: index + size]))
+            index += size
+        return results
+
 
 class DjangoCache(Cache):
     sync_adaptor_cls = DjangoCacheAdaptor
@@ -1,3 +1,5 @@
 from .config import RedisCache
 from .entity import RedisCacheEntity
 from .lock import RedisLocker
+from .client import round_trips
+from .broadcast import RedisBroadcast
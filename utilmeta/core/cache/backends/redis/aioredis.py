@@ -1,5 +1,5 @@
-from utilmeta.utils import keys_or_args, requires
-from typing import Dict, Optional, Union, Any
+from utilmeta.utils import keys_or_args, requires, get_number
+from typing import Dict, Optional, Union, Any, List, Tuple
 from datetime import timedelta, datetime
 from ...base import BaseCacheAdaptor
 from ...config import Cache
@@ -32,9 +32,19 @@ class AioredisAdaptor(BaseCacheAdaptor):
         if self._cache:
             return self._cache
         aioredis = self.load_aioredis()
-        rd = aioredis.from_url(
-            self.config.get_location(), encoding="utf-8", decode_responses=True
-        )
+        redis_cls = getattr(aioredis, "Redis", None)
+        if redis_cls and redis_cls.__module__.startswith("redis."):
+            # count the round trips of the redis-py asyncio client
+            from .client import get_async_redis_cls
+
+            redis_cls = get_async_redis_cls()
+            rd = redis_cls.from_url(
+                self.config.get_location(), encoding="utf-8", decode_responses=True
+            )
+        else:
+            rd = aioredis.from_url(
+                self.config.get_location(), encoding="utf-8", decode_responses=True
+            )
         self._cache = rd
         return rd
 
@@ -119,3 +129,81 @@ class AioredisAdaptor(BaseCacheAdaptor):
             return await cache.incrby(key, amount)
         else:
             return await cache.decrby(key, abs(amount))
+
+    async def execute_pipeline(self, commands: List[Tuple[str, tuple, dict]]) -> list:
+        # queue the commands in one pipeline (one round trip), without the transaction
+        from .scripts import ALTER_AMOUNT_LUA
+
+        cache = self.get_cache()
+        pipe = cache.pipeline(transaction=False)
+        # (number of the redis commands, function to parse the result)
+        parsers = []
+        for name, args, kwargs in commands:
+            if name == "get":
+                default = args[1] if len(args) > 1 else kwargs.get("default")
+                pipe.get(args[0])
+                parsers.append((1, lambda r, d=default: d if r[0] is None else r[0]))
+            elif name == "fetch":
+                keys = keys_or_args(*args)
+                pipe.mget(keys)
+                if kwargs.get("named"):
+                    parsers.append((1, lambda r, ks=keys: {k: r[0][i] for i, k in enumerate(ks)}))
+                else:
+                    parsers.append((1, lambda r: r[0]))
+            elif name == "set":
+                key, value = args
+                pipe.set(
+                    key,
+                    value,
+                    ex=kwargs.get("timeout"),
+                    nx=kwargs.get("not_exists_only") or False,
+                    xx=kwargs.get("exists_only") or False,
+                )
+                parsers.append((1, lambda r: r[0]))
+            elif name == "update":
+                pipe.mset(args[0])
+                parsers.append((1, lambda r: r[0]))
+            elif name == "pop":
+                pipe.get(args[0])
+                pipe.delete(args[0])
+                parsers.append((2, lambda r: r[0]))
+            elif name in ("delete", "exists"):
+                keys = keys_or_args(*args)
+                if keys:
+                    getattr(pipe, name)(*keys)
+                    parsers.append((1, lambda r: r[0]))
+                else:
+                    parsers.append((0, lambda r: 0))
+            elif name == "expire":
+                for key in args:
+                    pipe.expire(key, kwargs.get("timeout"))
+                parsers.append((len(args), lambda r: None))
+            elif name == "alter":
+                key, amount = args
+                limit = kwargs.get("limit")
+                if not amount:
+                    pipe.get(key)
+                    parsers.append((1, lambda r: r[0]))
+                    continue
+                if limit is not None:
+                    # alter within the limit atomically
+                    pipe.eval(ALTER_AMOUNT_LUA, 1, key, amount, limit)
+                elif isinstance(amount, float):
+                    pipe.incrbyfloat(key, amount)
+                elif amount > 0:
+                    pipe.incrby(key, amount)
+                else:
+                    pipe.decrby(key, abs(amount))
+                parsers.append((1, lambda r: None if r[0] is None else get_number(r[0])))
+            else:
+                raise NotImplementedError(
+                    f"{self.__class__.__name__}: pipeline command: {repr(name)} not supported"
+                )
+
+        replies = await pipe.execute()
+        results = []
+        index = 0
+        for size, parser in parsers:
+            results.append(parser(replies[index: index + size]))
+            index += size
+        return results
@@ -0,0 +1,259 @@
+import os
+import json
+import uuid
+import weakref
+import threading
+from collections import deque
+from typing import Optional, List, Tuple
+from utilmeta.utils import json_dumps
+from utilmeta.core.response.broadcast import Broadcast, BroadcastEvent, BroadcastSubscriber
+from .client import CountedRedis
+from .scripts import BROADCAST_PUBLISH_LUA
+
+__all__ = ["RedisBroadcast"]
+
+
+class RedisBroadcast(Broadcast):
+    """
+    Broadcast the events to the subscribers of all the processes through a redis pub/sub channel
+    - the event ids are assigned by a redis counter, and the recent events are kept in a redis list,
+      so the Last-Event-ID can be replayed by any process (the list is loaded on the first subscribe)
+    - every process subscribes the channel in a daemon thread and fans out the events to its own subscribers,
+      the missed events are caught up from the redis list when the subscription is reconnected
+    - the events published by this process are dispatched locally without waiting for the subscription
+        news = RedisBroadcast('news', cache=RedisCache(port=6379))
+    """
+
+    reconnect_interval = 1.0
+    max_reconnect_interval = 30.0
+
+    def __init__(self, channel: str, cache, **kwargs):
+        super().__init__(channel, **kwargs)
+        self.cache = cache
+        self.ident = uuid.uuid4().hex
+        self.pid = os.getpid()
+        self.seq_key = f"{channel}:seq"
+        self.history_key = f"{channel}:history"
+
+        self._client = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._thread_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        # the ids of the events dispatched (or loaded) in this process, including its own publishes,
+        # the window covers the redis history so the caught up events are never dispatched twice
+        self._seen_size = max(2 * (self.history_size or 0), 1024)
+        self._seen_order = deque()
+        self._seen = set()
+        self._seen_lock = threading.Lock()
+        self.subscribed = threading.Event()
+        _broadcasts.add(self)
+
+    @property
+    def client(self) -> CountedRedis:
+        if self._client is None:
+            self._client = CountedRedis.from_url(self.cache.get_location())
+        return self._client
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.alive:
+            return
+        with self._thread_lock:
+            if self.alive:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self.run, name=f"Broadcast({self.channel})", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        self.subscribed.clear()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def reset(self):
+        # in the forked child process, the subscriber thread is not inherited
+        self._client = None
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._seen_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.subscribed = threading.Event()
+        self.ident = uuid.uuid4().hex
+        self.pid = os.getpid()
+
+    def dumps(self, event: Optional[str], data, retry: Optional[int], key: str) -> str:
+        return json.dumps(
+            {"source": self.ident, "event": event, "data": data, "retry": retry, "key": key},
+            default=lambda o: json.loads(json_dumps(o)),
+        )
+
+    @classmethod
+    def loads(cls, message) -> Tuple[Optional[int], Optional[dict]]:
+        if isinstance(message, bytes):
+            message = message.decode()
+        if not isinstance(message, str) or ":" not in message:
+            return None, None
+        seq, payload = message.split(":", 1)
+        try:
+            seq = int(seq)
+            payload = json.loads(payload)
+        except (TypeError, ValueError):
+            return None, None
+        if not isinstance(payload, dict):
+            return None, None
+        return seq, payload
+
+    def to_event(self, seq: int, payload: dict) -> BroadcastEvent:
+        event = payload.get("event")
+        return BroadcastEvent(
+            seq,
+            payload.get("key") or event or "message",
+            self.encode(seq, event, payload.get("data"), payload.get("retry")),
+        )
+
+    def _mark_seen(self, seq: int) -> bool:
+        # return False if the event is already dispatched
+        with self._seen_lock:
+            if seq in self._seen:
+                return False
+            self._seen.add(seq)
+            self._seen_order.append(seq)
+            while len(self._seen_order) > self._seen_size:
+                self._seen.discard(self._seen_order.popleft())
+            return True
+
+    def _dispatch_message(self, seq: int, payload: dict):
+        if not self._mark_seen(seq):
+            return
+        self.dispatch(self.to_event(seq, payload))
+
+    def publish(self, data=None, event: str = None, *, retry: int = None, key: str = None) -> int:
+        event, data, retry = self.get_event_fields(data, event=event, retry=retry)
+        message = self.dumps(event, data, retry, key)
+        seq = int(
+            self.client.eval(
+                BROADCAST_PUBLISH_LUA, 2, self.seq_key, self.history_key,
+                self.channel, self.history_size or 0, message
+            )
+        )
+        # dispatched with the payload decoded from the message, the same as the other processes
+        self._dispatch_message(seq, json.loads(message))
+        return seq
+
+    async def apublish(self, data=None, event: str = None, *, retry: int = None, key: str = None) -> int:
+        event, data, retry = self.get_event_fields(data, event=event, retry=retry)
+        message = self.dumps(event, data, retry, key)
+        con = self.cache.get_adaptor(True).get_cache()
+        seq = int(
+            await con.eval(
+                BROADCAST_PUBLISH_LUA, 2, self.seq_key, self.history_key,
+                self.channel, self.history_size or 0, message
+            )
+        )
+        self._dispatch_message(seq, json.loads(message))
+        return seq
+
+    def fetch_history(self) -> List[Tuple[int, dict]]:
+        if not self.history_size:
+            return []
+        messages = []
+        for message in self.client.lrange(self.history_key, 0, -1):
+            seq, payload = self.loads(message)
+            if seq is not None:
+                messages.append((seq, payload))
+        return messages
+
+    def load_history(self):
+        # the ring buffer of a fresh process is loaded from redis to replay the Last-Event-ID
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                messages = self.fetch_history()
+            except Exception as e:
+                print(f"utilmeta.core.response: load broadcast history of {repr(self.channel)} failed with error: {e}")
+                return
+            # the loaded events are only kept for the replay, not dispatched to the subscribers
+            messages = [(seq, payload) for seq, payload in messages if self._mark_seen(seq)]
+            with self._lock:
+                events = [self.to_event(seq, payload) for seq, payload in messages]
+                merged = sorted(list(self._history) + events, key=lambda e: e.id)
+                self._history.clear()
+                self._history.extend(merged)
+            self._loaded = True
+
+    def subscribe(self, last_event_id=None, *, buffer_size: int = None, policy: str = None) -> BroadcastSubscriber:
+        self.start()
+        if last_event_id is not None:
+            self.load_history()
+        return super().subscribe(last_event_id, buffer_size=buffer_size, policy=policy)
+
+    def catch_up(self):
+        # dispatch the events published while the subscription is disconnected,
+        # the events already dispatched (like the own publishes) are skipped by id
+        for seq, payload in self.fetch_history():
+            self._dispatch_message(seq, payload)
+
+    def handle(self, data):
+        seq, payload = self.loads(data)
+        if seq is None:
+            return
+        # skip the own publishes and the events already caught up from the history
+        self._dispatch_message(seq, payload)
+
+    def run(self):
+        interval = self.reconnect_interval
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if self._loaded:
+                    self.catch_up()
+                else:
+                    self.load_history()
+                self.subscribed.set()
+                interval = self.reconnect_interval
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle(message.get("data"))
+            except Exception as e:
+                self.subscribed.clear()
+                print(f"utilmeta.core.response: subscribe broadcast {repr(self.channel)} failed with error: {e}")
+                self._stopped.wait(interval)
+                interval = min(interval * 2, self.max_reconnect_interval)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:  # noqa
+                        pass
+
+    def close(self):
+        super().close()
+        self.stop()
+
+
+_broadcasts = weakref.WeakSet()
+
+
+def _reset_broadcasts():
+    for broadcast in list(_broadcasts):
+        broadcast.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_broadcasts)
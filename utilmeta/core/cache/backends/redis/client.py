@@ -0,0 +1,83 @@
+import threading
+from redis.client import Redis, Pipeline
+
+__all__ = ["RoundTripCounter", "round_trips", "CountedRedis", "CountedPipeline", "get_async_redis_cls"]
+
+
+class RoundTripCounter:
+    """
+    Process-wide counter of the network round trips to redis,
+    a command counts one, and an executed pipeline (with any number of commands) counts one
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+        self.commands = 0
+
+    def __int__(self):
+        return self.value
+
+    def __repr__(self):
+        return f"RoundTripCounter(value={self.value}, commands={self.commands})"
+
+    def incr(self, commands: int = 1):
+        with self._lock:
+            self.value += 1
+            self.commands += commands
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+            self.commands = 0
+
+
+round_trips = RoundTripCounter()
+
+
+class CountedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        if self.command_stack:
+            round_trips.incr(len(self.command_stack))
+        return super().execute(raise_on_error=raise_on_error)
+
+
+class CountedRedis(Redis):
+    def execute_command(self, *args, **options):
+        round_trips.incr()
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None) -> CountedPipeline:
+        return CountedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+_async_redis_cls = None
+
+
+def get_async_redis_cls():
+    global _async_redis_cls
+    if _async_redis_cls is not None:
+        return _async_redis_cls
+
+    from redis.asyncio.client import Redis as AsyncRedis, Pipeline as AsyncPipeline
+
+    class CountedAsyncPipeline(AsyncPipeline):
+        async def execute(self, raise_on_error: bool = True):
+            if self.command_stack:
+                round_trips.incr(len(self.command_stack))
+            return await super().execute(raise_on_error=raise_on_error)
+
+    class CountedAsyncRedis(AsyncRedis):
+        async def execute_command(self, *args, **options):
+            round_trips.incr()
+            return await super().execute_command(*args, **options)
+
+        def pipeline(self, transaction: bool = True, shard_hint=None) -> CountedAsyncPipeline:
+            return CountedAsyncPipeline(
+                self.connection_pool, self.response_callbacks, transaction, shard_hint
+            )
+
+    _async_redis_cls = CountedAsyncRedis
+    return CountedAsyncRedis
@@ -2,11 +2,13 @@ from ...config import Cache
 from typing import Optional
 from .aioredis import AioredisAdaptor
 from ..django import DjangoCacheAdaptor
+from .near import RedisNearCacheInvalidator
 
 
 class RedisCache(Cache):
     async_adaptor_cls = AioredisAdaptor
     sync_adaptor_cls = DjangoCacheAdaptor
+    near_invalidator_cls = RedisNearCacheInvalidator
 
     username: Optional[str] = None
     password: Optional[str] = None
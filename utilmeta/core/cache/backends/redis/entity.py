@@ -1,11 +1,12 @@
 from utype.types import *
 from utype import type_transform
 from ...plugins.entity import CacheEntity
-from utilmeta.utils import dumps, loads, normalize, get_number, COMMON_ERRORS, utc_ms_ts
+from utilmeta.utils import dumps, loads, normalize, get_number, utc_ms_ts
 from redis.exceptions import ResponseError
-from redis.client import Redis
+from redis.client import Redis, Pipeline
 from .scripts import *
 from .lock import RedisLocker
+from .client import CountedRedis
 import random
 
 NUM_TYPES = (int, float)
@@ -13,10 +14,32 @@ NUM_TYPES = (int, float)
 
 class RedisCacheEntity(CacheEntity):
     backend_name = "redis"
+    # entities are created for each operation, reuse the client (and its connection pool) of a location
+    _connections: Dict[str, Redis] = {}
 
     @property
     def con(self) -> Redis:
-        return Redis.from_url(self.cache.get_location())
+        location = self.cache.get_location()
+        con = self._connections.get(location)
+        if con is None:
+            con = self._connections.setdefault(location, CountedRedis.from_url(location))
+        return con
+
+    def pipeline(self) -> Pipeline:
+        # batch the commands of a logical operation in one round trip
+        return self.con.pipeline(transaction=False)
+
+    def _trace_hits(self, requests: int, hits: List[str], pipe: Pipeline = None):
+        (pipe or self.con).eval(
+            TRACE_HITS_LUA,
+            3,
+            self.requests_key,
+            self.hits_key,
+            self.vary_hits_key,
+            requests,
+            self.variant or "",
+            *hits,
+        )
 
     def get_requests(self):
         req = self.con.get(self.requests_key)
@@ -25,8 +48,10 @@ class RedisCacheEntity(CacheEntity):
         return int(req.decode())
 
     def reset_stats(self):
-        self.con.set(self.requests_key, 0)
-        self.con.delete(self.hits_key)
+        pipe = self.pipeline()
+        pipe.set(self.requests_key, 0)
+        pipe.delete(self.hits_key)
+        pipe.execute()
 
     def keys(self):
         if not self.src.trace_keys:
@@ -39,8 +64,10 @@ class RedisCacheEntity(CacheEntity):
             return []
         misses = self.con.eval(BATCH_EXISTS_LUA, len(tot_keys), *tot_keys, 0)
         if misses:
-            self.con.zrem(self.hits_key, *misses)
-            self.con.zrem(self.update_key, *misses)
+            pipe = self.pipeline()
+            pipe.zrem(self.hits_key, *misses)
+            pipe.zrem(self.update_key, *misses)
+            pipe.execute()
             tot_keys = list(set(tot_keys).difference(misses))
         return [v.decode() for v in tot_keys]
 
@@ -54,10 +81,12 @@ class RedisCacheEntity(CacheEntity):
         return scores
 
     def get_key_hits(self, *keys):
-        scores = 0
+        if not keys:
+            return 0
+        pipe = self.pipeline()
         for key in keys:
-            scores += self.con.zscore(self.hits_key, key) or 0
-        return scores
+            pipe.zscore(self.hits_key, key)
+        return sum(score or 0 for score in pipe.execute())
 
     def get_latest_update(self):
         max_pair = self.con.zrange(self.update_key, 0, 1, desc=True, withscores=True)
@@ -71,11 +100,12 @@ class RedisCacheEntity(CacheEntity):
                 f"Cache.last_modified not implemented, "
                 f"please set trace_keys=True to enable this method"
             )
-        times = []
+        if not keys:
+            return None
+        pipe = self.pipeline()
         for key in keys:
-            sc = self.con.zscore(self.update_key, key)
-            if sc:
-                times.append(sc)
+            pipe.zscore(self.update_key, key)
+        times = [sc for sc in pipe.execute() if sc]
         if times:
             return type_transform(max(times), datetime)
         return None
@@ -88,11 +118,14 @@ class RedisCacheEntity(CacheEntity):
             )
         keys = [v.decode() for v in self.con.zrange(self.update_key, 0, -1)]
         # do not need to validate exists now
-        self.con.delete(*keys, self.requests_key, self.update_key, self.hits_key)
+        pipe = self.pipeline()
+        pipe.delete(*keys, self.requests_key, self.update_key, self.hits_key)
         if self.variant:
             # clear for this vary
-            self.con.zrem(self.vary_hits_key, self.variant)
-            self.con.zrem(self.vary_update_key, self.variant)
+            pipe.zrem(self.vary_hits_key, self.variant)
+            pipe.zrem(self.vary_update_key, self.variant)
+        pipe.execute()
+        self.cache.invalidate_near(*keys)
 
     def delete(self, *keys: str):
         if not keys:
@@ -101,15 +134,15 @@ class RedisCacheEntity(CacheEntity):
             raise RuntimeError(f"Attempt to delete key ({keys}) at a readonly cache")
 
         # upd_keys = self.last_update_key(keys)
-        self.con.delete(*keys)
-
-        if self.src.trace_keys:
-            self.con.zrem(
-                self.hits_key, *keys
-            )  # remove deleted keys from hit statistics
-            self.con.zrem(
-                self.update_key, *keys
-            )  # remove deleted keys from last update
+        if not self.src.trace_keys:
+            self.con.delete(*keys)
+        else:
+            pipe = self.pipeline()
+            pipe.delete(*keys)
+            pipe.zrem(self.hits_key, *keys)  # remove deleted keys from hit statistics
+            pipe.zrem(self.update_key, *keys)  # remove deleted keys from last update
+            pipe.execute()
+        self.cache.invalidate_near(*keys)
 
     def count(self) -> int:
         if not self.src.trace_keys:
@@ -130,16 +163,18 @@ class RedisCacheEntity(CacheEntity):
     ):
         if self.readonly:
             return None
-        self.prepare(key)
         argv = [amount, limit] if isinstance(limit, NUM_TYPES) else [amount]
-        result: Optional[bytes] = self.con.eval(ALTER_AMOUNT_LUA, 1, key, *argv)
+        if self.src.trace_keys:
+            pipe = self.pipeline()
+            self.prepare(key, pipe=pipe)
+            pipe.eval(ALTER_AMOUNT_LUA, 1, key, *argv)
+            result: Optional[bytes] = pipe.execute()[-1]
+        else:
+            result: Optional[bytes] = self.con.eval(ALTER_AMOUNT_LUA, 1, key, *argv)
+        self.cache.invalidate_near(key)
 
         if self.src.trace_keys:
-            self.con.incr(self.requests_key, 1)
-            if result is not None:
-                self.z_incr_by(self.hits_key, key)
-                if self.variant:
-                    self.z_incr_by(self.vary_hits_key, self.variant)
+            self._trace_hits(1, [key] if result is not None else [])
 
         if result is None:
             return None
@@ -165,10 +200,12 @@ class RedisCacheEntity(CacheEntity):
             raise PermissionError(
                 f"Attempt to lpush ({key} -> {values}) to a readonly cache"
             )
-        res = self.con.lpush(key, *values)
-        if self.src.trace_keys:
-            self.con.zadd(self.update_key, {key: utc_ms_ts()})
-        return res
+        if not self.src.trace_keys:
+            return self.con.lpush(key, *values)
+        pipe = self.pipeline()
+        pipe.lpush(key, *values)
+        pipe.zadd(self.update_key, {key: utc_ms_ts()})
+        return pipe.execute()[0]
 
     def rpush(self, key: str, *values):
         if not values:
@@ -177,26 +214,32 @@ class RedisCacheEntity(CacheEntity):
             raise PermissionError(
                 f"Attempt to rpush ({key} -> {values}) to a readonly cache"
             )
-        res = self.con.rpush(key, *values)
-        if self.src.trace_keys:
-            self.con.zadd(self.update_key, {key: utc_ms_ts()})
-        return res
+        if not self.src.trace_keys:
+            return self.con.rpush(key, *values)
+        pipe = self.pipeline()
+        pipe.rpush(key, *values)
+        pipe.zadd(self.update_key, {key: utc_ms_ts()})
+        return pipe.execute()[0]
 
     def lpop(self, key: str):
         if self.readonly:
             raise PermissionError(f"Attempt to lpop ({key}) to a readonly cache")
-        res = self.con.lpop(key)
-        if self.src.trace_keys:
-            self.con.zadd(self.update_key, {key: utc_ms_ts()})
-        return res
+        if not self.src.trace_keys:
+            return self.con.lpop(key)
+        pipe = self.pipeline()
+        pipe.lpop(key)
+        pipe.zadd(self.update_key, {key: utc_ms_ts()})
+        return pipe.execute()[0]
 
     def rpop(self, key: str):
         if self.readonly:
             raise PermissionError(f"Attempt to rpop ({key}) to a readonly cache")
-        res = self.con.rpop(key)
-        if self.src.trace_keys:
-            self.con.zadd(self.update_key, {key: utc_ms_ts()})
-        return res
+        if not self.src.trace_keys:
+            return self.con.rpop(key)
+        pipe = self.pipeline()
+        pipe.rpop(key)
+        pipe.zadd(self.update_key, {key: utc_ms_ts()})
+        return pipe.execute()[0]
 
     def z_incr_by(self, name, key, value=1.0):
         """
@@ -214,29 +257,63 @@ class RedisCacheEntity(CacheEntity):
                 return None
             return []
 
-        hits = []
-        if single:
+        if self.src.trace_keys:
+            # get and trace the hits in one round trip
+            result = self.con.eval(
+                TRACED_GET_LUA,
+                len(keys) + 3,
+                self.requests_key,
+                self.hits_key,
+                self.vary_hits_key,
+                *keys,
+                self.variant or "",
+            )
+            if single:
+                result = result[0]
+        elif single:
             result = self.con.get(keys[0])
-            if result is not None:
-                hits = keys
         else:
             result = self.con.mget(*keys)
-            hits = [k for k in keys if k in result]
-
-        if self.src.trace_keys:
-            self.con.incr(self.requests_key, len(keys))
-
-            for hit in hits:
-                self.z_incr_by(self.hits_key, hit)
-            if self.variant:
-                self.z_incr_by(self.vary_hits_key, self.variant)
 
         result = loads(result, exclude_types=NUM_TYPES, bulk_data=not single)
         if not result:
             return result
         return result
 
-    def prepare(self, *keys: str):
+    def _pop_min(self, name: str, count: int, exclude: List[str] = ()) -> list:
+        if count <= 0:
+            return []
+        exclude = {k.encode() if isinstance(k, str) else k for k in exclude}
+        # fetch a few more members in case of the excluded ones
+        members = [
+            m for m in self.con.zrange(name, 0, count + len(exclude) - 1) if m not in exclude
+        ][:count]
+        if members:
+            self.con.zrem(name, *members)
+        return members
+
+    def _evict(self, stats, excess: int, policy: str, candidates: list, exclude: list = ()) -> list:
+        hits_key, update_key = stats
+        if policy == self.src.OBSOLETE_LFU:
+            del_keys = self._pop_min(hits_key, excess, exclude=exclude)
+        elif policy == self.src.OBSOLETE_LRU:
+            del_keys = self._pop_min(update_key, excess, exclude=exclude)
+        elif policy == self.src.OBSOLETE_RANDOM:
+            del_keys = random.sample(candidates, k=min(excess, len(candidates)))
+        else:
+            return []
+        if del_keys:
+            pipe = self.pipeline()
+            pipe.zrem(hits_key, *del_keys)
+            pipe.zrem(update_key, *del_keys)
+            pipe.execute()
+        return [k.decode() if isinstance(k, bytes) else k for k in del_keys]
+
+    def prepare(self, *keys: str, pipe: Pipeline = None):
+        """
+        Trace the updates of keys (and evict the entries / variants if the bounds exceeded),
+        if pipe is provided, the trace command is queued to the pipeline of the following write command
+        """
         if not keys:
             return
 
@@ -244,80 +321,84 @@ class RedisCacheEntity(CacheEntity):
             return
 
         last_modified = utc_ms_ts()
+        check_variants = bool(self.variant and self.src.max_variants)
+
+        if self.src.max_entries or check_variants:
+            # read the bounds in one round trip
+            checks = self.pipeline()
+            if self.src.max_entries:
+                checks.zcard(self.update_key)
+            if check_variants:
+                checks.zcard(self.vary_update_key)
+                checks.zscore(self.vary_update_key, self.variant)
+            replies = checks.execute()
+        else:
+            replies = []
 
         if self.src.max_entries:
-            # key have not been set
-            current_keys = self.con.zrange(self.update_key, 0, -1)
-            excess: int = self.exists(*current_keys, *keys) - self.src.max_entries
-
+            # the traced keys may be expired, only check the exists keys if the bound exceeded
             if (
-                excess > self.src.max_entries_tolerance
-            ):  # default to 0, but can set a throttle value
-                # total_key >= max_entries
-                # delete the least frequently hit key
-                target_key = None
-                del_keys = []
-                if self.src.max_entries_policy == self.src.OBSOLETE_LFU:
-                    target_key = self.hits_key
-                elif self.src.max_entries_policy == self.src.OBSOLETE_LRU:
-                    target_key = self.update_key
-                elif self.src.max_entries_policy == self.src.OBSOLETE_RANDOM:
-                    exists_keys = self.keys()
-                    del_keys = random.choices(exists_keys, k=excess)
-
-                if target_key:
-                    try:
-                        del_keys = [
-                            items[0] for items in self.con.zpopmin(target_key, excess)
-                        ]
-                    except (ResponseError, *COMMON_ERRORS):
-                        # old version of redis or windows not support this command, downgrade
-                        for k in self.con.zrange(target_key, 0, -1):
-                            if self.con.zrank(target_key, k) < excess:
-                                del_keys.append(k)
-
-                if del_keys:
-                    self.delete(*del_keys)
-
-        if self.variant:
-            self.con.zadd(self.vary_hits_key, {self.variant: 0}, nx=True)
-            self.con.zadd(self.vary_update_key, {self.variant: last_modified})
-
-            if self.src.max_variants:
-                excess = self.con.zcard(self.vary_hits_key) - self.src.max_variants
-
+                replies.pop(0) + len(keys) - self.src.max_entries
+                > self.src.max_entries_tolerance
+            ):
+                others = [
+                    k for k in self.con.zrange(self.update_key, 0, -1)
+                    if k.decode() not in keys
+                ]
+                excess: int = (
+                    (self.exists(*others) if others else 0)
+                    + len(set(keys))
+                    - self.src.max_entries
+                )
                 if (
-                    excess > self.src.max_variants_tolerance
+                    excess > self.src.max_entries_tolerance
                 ):  # default to 0, but can set a throttle value
                     # total_key >= max_entries
-                    # delete the least frequently hit key
-                    target_key = None
-                    del_keys = []
-                    if self.src.max_variants_tolerance == self.src.OBSOLETE_LFU:
-                        target_key = self.vary_hits_key
-                    elif self.src.max_variants_policy == self.src.OBSOLETE_LRU:
-                        target_key = self.vary_update_key
-                    elif self.src.max_variants_policy == self.src.OBSOLETE_RANDOM:
-                        exists_variants = self.con.zrange(self.vary_hits_key, 0, -1)
-                        del_keys = random.choices(exists_variants, k=excess)
-
-                    if target_key:
-                        try:
-                            del_keys = [
-                                items[0]
-                                for items in self.con.zpopmin(target_key, excess)
-                            ]
-                        except (ResponseError, *COMMON_ERRORS):
-                            # old version of redis or windows not support this command, downgrade
-                            for k in self.con.zrange(target_key, 0, -1):
-                                if self.con.zrank(target_key, k) < excess:
-                                    del_keys.append(k)
-
+                    # delete the least frequently hit key (from the sorted sets directly)
+                    del_keys = self._evict(
+                        (self.hits_key, self.update_key),
+                        excess,
+                        policy=self.src.max_entries_policy,
+                        candidates=others,
+                        exclude=keys,
+                    )
                     if del_keys:
-                        self.src.clear_variants(*del_keys)
+                        self.con.delete(*del_keys)
+
+        if check_variants:
+            variants, score = replies
+            if score is None:
+                variants += 1
+            excess = variants - self.src.max_variants
 
-        self.con.zadd(self.hits_key, {k: 0 for k in keys}, nx=True)
-        self.con.zadd(self.update_key, {k: last_modified for k in keys})
+            if (
+                excess > self.src.max_variants_tolerance
+            ):  # default to 0, but can set a throttle value
+                others = [
+                    v for v in self.con.zrange(self.vary_update_key, 0, -1)
+                    if v.decode() != self.variant
+                ]
+                del_keys = self._evict(
+                    (self.vary_hits_key, self.vary_update_key),
+                    excess,
+                    policy=self.src.max_variants_policy,
+                    candidates=others,
+                    exclude=[self.variant],
+                )
+                if del_keys:
+                    self.src.clear_variants(*del_keys)
+
+        (pipe or self.con).eval(
+            TRACE_UPDATES_LUA,
+            4,
+            self.hits_key,
+            self.update_key,
+            self.vary_hits_key,
+            self.vary_update_key,
+            last_modified,
+            self.variant or "",
+            *keys,
+        )
 
     def update(self, data: dict, timeout: float = None):
         if self.readonly:
@@ -327,10 +408,16 @@ class RedisCacheEntity(CacheEntity):
             return
         if not data:
             return
-        self.prepare(*data)
+        pipe = self.pipeline()
+        self.prepare(*data, pipe=pipe)
         dumped = dumps(normalize(data), exclude_types=(int, float), bulk_data=True)
         # for incrby / decrby / incrbyfloat work fine at lua script number typed data will not be dump
-        self.con.mset(dumped)
+        pipe.mset(dumped)
+        if isinstance(timeout, NUM_TYPES):
+            for key in dumped:
+                pipe.expire(key, int(timeout))
+        pipe.execute()
+        self.cache.invalidate_near(*dumped)
 
     def set(
         self,
@@ -347,8 +434,15 @@ class RedisCacheEntity(CacheEntity):
         if timeout == 0:
             # will expire ASAP
             return
-        self.prepare(key)
         val = normalize(val)
         dumped = dumps(val, exclude_types=(int, float))
         # for incrby / decrby / incrbyfloat work fine at lua script number typed data will not be dump
-        self.con.set(key, dumped, ex=timeout, nx=not_exists_only, xx=exists_only)
+        if not self.src.trace_keys:
+            self.con.set(key, dumped, ex=timeout, nx=not_exists_only, xx=exists_only)
+        else:
+            # trace the update and set the value in one round trip
+            pipe = self.pipeline()
+            self.prepare(key, pipe=pipe)
+            pipe.set(key, dumped, ex=timeout, nx=not_exists_only, xx=exists_only)
+            pipe.execute()
+        self.cache.invalidate_near(key)
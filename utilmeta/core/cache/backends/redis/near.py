@@ -0,0 +1,120 @@
+import json
+import threading
+from typing import List, Optional
+from ...near import NearCacheInvalidator, NearCache
+from .client import CountedRedis
+
+
+class RedisNearCacheInvalidator(NearCacheInvalidator):
+    """
+    Broadcast the invalidated keys through a redis pub/sub channel,
+    every process subscribes the channel in a daemon thread and invalidates its near cache,
+    the near cache is cleared when the subscription is (re)connected since the messages may be missed
+    """
+
+    reconnect_interval = 1.0
+    max_reconnect_interval = 30.0
+
+    def __init__(self, cache, near: NearCache, channel: str = None):
+        super().__init__(cache, near, channel=channel)
+        self._client = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+        self.subscribed = threading.Event()
+
+    @property
+    def client(self) -> CountedRedis:
+        if self._client is None:
+            self._client = CountedRedis.from_url(self.cache.get_location())
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        # the near cache is bypassed until the channel is subscribed
+        return self.subscribed.is_set()
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.alive:
+            return
+        with self._lock:
+            if self.alive:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self.run, name=f"NearCacheInvalidator({self.channel})", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        self.subscribed.clear()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def reset(self):
+        self._client = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.subscribed = threading.Event()
+        super().reset()
+
+    def dumps(self, keys: List[str]) -> str:
+        return json.dumps({"source": self.ident, "keys": list(keys)})
+
+    def publish(self, keys: List[str]):
+        try:
+            self.client.publish(self.channel, self.dumps(keys))
+        except Exception as e:
+            print(f"utilmeta.core.cache: publish invalidation to {repr(self.channel)} failed with error: {e}")
+
+    async def apublish(self, keys: List[str]):
+        try:
+            con = self.cache.get_adaptor(True).get_cache()
+            await con.publish(self.channel, self.dumps(keys))
+        except Exception as e:
+            print(f"utilmeta.core.cache: publish invalidation to {repr(self.channel)} failed with error: {e}")
+
+    def handle(self, data):
+        if isinstance(data, bytes):
+            data = data.decode()
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(message, dict):
+            return
+        self.on_message(message.get("source"), message.get("keys") or [])
+
+    def run(self):
+        interval = self.reconnect_interval
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # the invalidations before the subscription are missed
+                self.near.clear()
+                self.subscribed.set()
+                interval = self.reconnect_interval
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle(message.get("data"))
+            except Exception as e:
+                self.subscribed.clear()
+                print(f"utilmeta.core.cache: subscribe {repr(self.channel)} failed with error: {e}")
+                self._stopped.wait(interval)
+                interval = min(interval * 2, self.max_reconnect_interval)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:  # noqa
+                        pass
@@ -7,3 +7,8 @@ BATCH_EXISTS_LUA = open(os.path.join(script_path, "batch_exists.lua")).read()
 BATCH_RELATES_LUA = open(os.path.join(script_path, "batch_relates.lua")).read()
 BATCH_COUNT_LUA = open(os.path.join(script_path, "batch_count.lua")).read()
 ALTER_AMOUNT_LUA = open(os.path.join(script_path, "alter_amount.lua")).read()
+RATE_LIMIT_LUA = open(os.path.join(script_path, "rate_limit.lua")).read()
+TRACE_HITS_LUA = open(os.path.join(script_path, "trace_hits.lua")).read()
+TRACE_UPDATES_LUA = open(os.path.join(script_path, "trace_updates.lua")).read()
+TRACED_GET_LUA = open(os.path.join(script_path, "traced_get.lua")).read()
+BROADCAST_PUBLISH_LUA = open(os.path.join(script_path, "broadcast_publish.lua")).read()
@@ -0,0 +1,12 @@
+-- KEYS[1]: the sequence key of the channel, KEYS[2]: the history list of the channel
+-- ARGV[1]: channel, ARGV[2]: history size, ARGV[3]: the event message (JSON)
+-- the message is published as "<id>:<message>", the ids are increasing in the publish order
+local seq = redis.call('INCR', KEYS[1])
+local message = seq .. ':' .. ARGV[3]
+local size = tonumber(ARGV[2])
+if size > 0 then
+    redis.call('RPUSH', KEYS[2], message)
+    redis.call('LTRIM', KEYS[2], -size, -1)
+end
+redis.call('PUBLISH', ARGV[1], message)
+return seq
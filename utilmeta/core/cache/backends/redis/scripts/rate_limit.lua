@@ -0,0 +1,89 @@
+--- check the rate limit rules in one round trip, the cost is consumed only if every rule is satisfied
+--- KEYS: the key of each rule
+--- ARGV: member, then (algorithm, limit, window_ms, cost) for each rule, algorithm: 1 token bucket, 2 sliding window log
+--- return (allowed, remaining, retry_after_ms, reset_ms) for each rule
+local t = redis.call('time')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local member = ARGV[1]
+local states = {}
+local allowed = true
+for i, key in ipairs(KEYS) do
+    local base = (i - 1) * 4 + 1
+    local algorithm = tonumber(ARGV[base + 1])
+    local limit = tonumber(ARGV[base + 2])
+    local window = tonumber(ARGV[base + 3])
+    local cost = tonumber(ARGV[base + 4])
+    local s = {algorithm = algorithm, limit = limit, window = window, cost = cost}
+    if algorithm == 1 then
+        local rate = limit / window
+        local state = redis.call('hmget', key, 'tokens', 'ts')
+        local tokens = tonumber(state[1])
+        local ts = tonumber(state[2])
+        if tokens == nil or ts == nil then
+            tokens = limit
+        else
+            tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+        end
+        s.tokens = tokens
+        s.ok = tokens >= cost
+        if s.ok then
+            s.remaining = tokens - cost
+            s.retry_after = 0
+        else
+            s.remaining = tokens
+            s.retry_after = math.ceil((cost - tokens) / rate)
+        end
+        s.reset = math.ceil((limit - s.remaining) / rate)
+    else
+        redis.call('zremrangebyscore', key, '-inf', now - window)
+        local count = redis.call('zcard', key)
+        s.ok = count + cost <= limit
+        if s.ok then
+            s.remaining = limit - count - cost
+            s.retry_after = 0
+        else
+            s.remaining = math.max(0, limit - count)
+            s.retry_after = window
+            local index = count + cost - limit
+            if cost <= limit and index <= count then
+                local entry = redis.call('zrange', key, index - 1, index - 1, 'WITHSCORES')
+                if entry[2] then
+                    s.retry_after = math.max(0, tonumber(entry[2]) + window - now)
+                end
+            end
+        end
+        s.reset = window
+        local oldest = redis.call('zrange', key, 0, 0, 'WITHSCORES')
+        if oldest[2] then
+            s.reset = math.max(0, tonumber(oldest[2]) + window - now)
+        end
+    end
+    if not s.ok then
+        allowed = false
+    end
+    states[i] = s
+end
+local result = {}
+for i, key in ipairs(KEYS) do
+    local s = states[i]
+    if allowed then
+        if s.algorithm == 1 then
+            redis.call('hset', key, 'tokens', tostring(s.tokens - s.cost), 'ts', tostring(now))
+        else
+            for c = 1, s.cost do
+                redis.call('zadd', key, now, member .. ':' .. c)
+            end
+        end
+        redis.call('pexpire', key, math.ceil(s.window))
+    end
+    local ok = 0
+    if s.ok then
+        ok = 1
+    end
+    local base = (i - 1) * 4
+    result[base + 1] = ok
+    result[base + 2] = math.floor(s.remaining)
+    result[base + 3] = math.ceil(s.retry_after)
+    result[base + 4] = math.ceil(s.reset)
+end
+return result
@@ -0,0 +1,15 @@
+--- record the requests and hits of the traced keys in one round trip
+--- KEYS: requests key, hits key, variant hits key
+--- ARGV: requests amount, variant (empty if not varied), then the hit keys
+local requests = tonumber(ARGV[1])
+if requests > 0 then
+    redis.call('incrby', KEYS[1], requests)
+end
+local hits = #ARGV - 2
+for i = 3, #ARGV do
+    redis.call('zincrby', KEYS[2], 1, ARGV[i])
+end
+if hits > 0 and ARGV[2] ~= '' then
+    redis.call('zincrby', KEYS[3], 1, ARGV[2])
+end
+return hits
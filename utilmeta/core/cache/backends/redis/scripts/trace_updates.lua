@@ -0,0 +1,13 @@
+--- record the update time of the traced keys in one round trip, keys without hits start with 0 hit
+--- KEYS: hits key, update key, variant hits key, variant update key
+--- ARGV: timestamp, variant (empty if not varied), then the updated keys
+local ts = ARGV[1]
+for i = 3, #ARGV do
+    redis.call('zadd', KEYS[1], 'NX', 0, ARGV[i])
+    redis.call('zadd', KEYS[2], ts, ARGV[i])
+end
+if ARGV[2] ~= '' then
+    redis.call('zadd', KEYS[3], 'NX', 0, ARGV[2])
+    redis.call('zadd', KEYS[4], ts, ARGV[2])
+end
+return redis.call('zcard', KEYS[2])
@@ -0,0 +1,21 @@
+--- get the traced keys and record the requests and hits in one round trip
+--- KEYS: requests key, hits key, variant hits key, then the keys to get
+--- ARGV: variant (empty if not varied)
+local unpack = unpack or table.unpack
+local keys = {}
+for i = 4, #KEYS do
+    keys[#keys + 1] = KEYS[i]
+end
+local values = redis.call('mget', unpack(keys))
+redis.call('incrby', KEYS[1], #keys)
+local hits = 0
+for i = 1, #keys do
+    if values[i] then
+        hits = hits + 1
+        redis.call('zincrby', KEYS[2], 1, keys[i])
+    end
+end
+if hits > 0 and ARGV[1] ~= '' then
+    redis.call('zincrby', KEYS[3], 1, ARGV[1])
+end
+return values
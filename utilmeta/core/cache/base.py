@@ -1,4 +1,5 @@
-from typing import Dict, Optional, Union, Any, ClassVar
+import inspect
+from typing import Dict, Optional, Union, Any, ClassVar, List, Tuple
 from datetime import timedelta, datetime
 
 
@@ -67,3 +68,19 @@ class BaseCacheAdaptor:
         self, key: str, amount: Union[int, float], limit: int = None
     ) -> Optional[Union[int, float]]:
         raise NotImplementedError
+
+    def execute_pipeline(self, commands: List[Tuple[str, tuple, dict]]) -> list:
+        # execute the queued commands of a CachePipeline one by one,
+        # the adaptors of the backends that support pipelining should override this method
+        if self.asynchronous:
+            return self._async_execute_pipeline(commands)
+        return [getattr(self, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+    async def _async_execute_pipeline(self, commands: List[Tuple[str, tuple, dict]]) -> list:
+        results = []
+        for name, args, kwargs in commands:
+            result = getattr(self, name)(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            results.append(result)
+        return results
@@ -2,11 +2,13 @@ import warnings
 
 from utilmeta.conf.base import Config
 from utilmeta import UtilMeta
-from utilmeta.utils import awaitable, exceptions, localhost
+from utilmeta.utils import awaitable, exceptions, localhost, keys_or_args
 from typing import Dict, List, Optional, Union, Callable, Any, ClassVar
 from datetime import timedelta, datetime
 from utype.utils.datastructures import unprovided
 from .base import BaseCacheAdaptor
+from .pipeline import CachePipeline
+from .near import NearCache, NearCacheInvalidator, MISSING
 
 
 class Cache(Config):
@@ -20,6 +22,7 @@ class Cache(Config):
 
     sync_adaptor_cls = None
     async_adaptor_cls = None
+    near_invalidator_cls = NearCacheInvalidator
     # ---
 
     engine: str  # 'redis' / 'memcached' / 'locmem'
@@ -31,6 +34,12 @@ class Cache(Config):
     max_entries: Optional[int] = None
     key_function: Optional[Callable] = None
     options: Optional[dict] = None
+    # in-process L1 tier (near cache) in front of the backend
+    near_cache: bool = False
+    near_cache_max_entries: int = 1024
+    near_cache_timeout: float = 30
+    near_cache_negative_timeout: float = 5
+    near_cache_channel: Optional[str] = None
 
     def __init__(
         self,
@@ -44,6 +53,11 @@ class Cache(Config):
         max_entries: Optional[int] = None,
         key_function: Optional[Callable] = None,
         options: Optional[dict] = None,
+        near_cache: bool = False,
+        near_cache_max_entries: int = 1024,
+        near_cache_timeout: float = 30,
+        near_cache_negative_timeout: float = 5,
+        near_cache_channel: Optional[str] = None,
         **kwargs,
     ):
         kwargs.update(locals())
@@ -57,6 +71,8 @@ class Cache(Config):
         self.adaptor: Optional[BaseCacheAdaptor] = None
         self.asynchronous = False
         self._applied = False
+        self._near: Optional[NearCache] = None
+        self._near_invalidator: Optional[NearCacheInvalidator] = None
 
     @property
     def type(self) -> str:
@@ -127,23 +143,135 @@ class Cache(Config):
             return self.location
         return f"{self.host}:{self.port}"
 
+    def get_near_invalidator(self) -> Optional[NearCacheInvalidator]:
+        if not self.near_cache:
+            return None
+        if self._near_invalidator is None:
+            near = NearCache(
+                max_entries=self.near_cache_max_entries,
+                timeout=self.near_cache_timeout,
+                negative_timeout=self.near_cache_negative_timeout,
+            )
+            alias = self.adaptor.alias if self.adaptor else None
+            channel = self.near_cache_channel or f"utilmeta:cache:{alias or 'default'}:invalidate"
+            self._near = near
+            self._near_invalidator = self.near_invalidator_cls(self, near, channel=channel)
+        return self._near_invalidator
+
+    def get_near_cache(self) -> Optional[NearCache]:
+        """
+        The near cache (L1 tier) to read, None if the near cache is not enabled or not available
+        (like the invalidation channel is not subscribed yet)
+        """
+        invalidator = self.get_near_invalidator()
+        if invalidator is None:
+            return None
+        invalidator.start()
+        if not invalidator.available:
+            return None
+        return self._near
+
+    def get_near_stats(self) -> Optional[dict]:
+        if not self._near:
+            return None
+        return self._near.get_stats()
+
+    def invalidate_near(self, *keys: str):
+        # invalidate the keys in the near caches of the current and the other processes
+        invalidator = self.get_near_invalidator()
+        if invalidator is None or not keys:
+            return
+        invalidator.near.invalidate(*keys)
+        invalidator.publish(list(keys))
+
+    async def ainvalidate_near(self, *keys: str):
+        invalidator = self.get_near_invalidator()
+        if invalidator is None or not keys:
+            return
+        invalidator.near.invalidate(*keys)
+        await invalidator.apublish(list(keys))
+
+    def pipeline(self) -> CachePipeline:
+        """
+        Batch the cache operations, use `with cache.pipeline() as pipe:` or `async with cache.pipeline() as pipe:`
+        """
+        return CachePipeline(self)
+
     def get(self, key: str, default=None):
-        return self.get_adaptor(False).get(key, default)
+        adaptor = self.get_adaptor(False)
+        near = self.get_near_cache()
+        if near is None:
+            return adaptor.get(key, default)
+        found, value = near.get(key)
+        if not found:
+            version = near.version
+            value = adaptor.get(key)
+            near.set(key, value, version=version)
+        return default if value is None or value is MISSING else value
 
     async def aget(self, key: str, default=None):
-        return await self.get_adaptor(True).get(key, default)
+        adaptor = self.get_adaptor(True)
+        near = self.get_near_cache()
+        if near is None:
+            return await adaptor.get(key, default)
+        found, value = near.get(key)
+        if not found:
+            version = near.version
+            value = await adaptor.get(key)
+            near.set(key, value, version=version)
+        return default if value is None or value is MISSING else value
+
+    @classmethod
+    def _fetch_near(cls, near: NearCache, keys: list):
+        values = {}
+        missing = []
+        for key in keys:
+            found, value = near.get(key)
+            if found:
+                values[key] = None if value is MISSING else value
+            else:
+                missing.append(key)
+        return values, missing
+
+    @classmethod
+    def _merge_near(cls, near: NearCache, keys: list, values: dict, missing: list,
+                    data, version: int, named: bool = False):
+        if isinstance(data, dict):
+            data = [data.get(key) for key in missing]
+        for key, value in zip(missing, data or [None] * len(missing)):
+            near.set(key, value, version=version)
+            values[key] = value
+        if named:
+            return {key: values[key] for key in keys if values.get(key) is not None}
+        return [values.get(key) for key in keys]
 
     def fetch(
         self, args=None, *keys: str, named: bool = False
     ) -> Union[list, Dict[str, Any]]:
         # get many
-        return self.get_adaptor(False).fetch(args, *keys, named=named)
+        adaptor = self.get_adaptor(False)
+        near = self.get_near_cache()
+        if near is None:
+            return adaptor.fetch(args, *keys, named=named)
+        keys = keys_or_args(args, *keys)
+        version = near.version
+        values, missing = self._fetch_near(near, keys)
+        data = adaptor.fetch(missing) if missing else []
+        return self._merge_near(near, keys, values, missing, data, version=version, named=named)
 
     async def afetch(
         self, args=None, *keys: str, named: bool = False
     ) -> Union[list, Dict[str, Any]]:
         # get many
-        return await self.get_adaptor(True).fetch(args, *keys, named=named)
+        adaptor = self.get_adaptor(True)
+        near = self.get_near_cache()
+        if near is None:
+            return await adaptor.fetch(args, *keys, named=named)
+        keys = keys_or_args(args, *keys)
+        version = near.version
+        values, missing = self._fetch_near(near, keys)
+        data = (await adaptor.fetch(missing)) if missing else []
+        return self._merge_near(near, keys, values, missing, data, version=version, named=named)
 
     def set(
         self,
@@ -154,13 +282,15 @@ class Cache(Config):
         exists_only: bool = False,
         not_exists_only: bool = False,
     ):
-        return self.get_adaptor(False).set(
+        result = self.get_adaptor(False).set(
             key,
             value,
             timeout=timeout,
             exists_only=exists_only,
             not_exists_only=not_exists_only,
         )
+        self.invalidate_near(key)
+        return result
 
     async def aset(
         self,
@@ -171,34 +301,48 @@ class Cache(Config):
         exists_only: bool = False,
         not_exists_only: bool = False,
     ):
-        return await self.get_adaptor(True).set(
+        result = await self.get_adaptor(True).set(
             key,
             value,
             timeout=timeout,
             exists_only=exists_only,
             not_exists_only=not_exists_only,
         )
+        await self.ainvalidate_near(key)
+        return result
 
     def update(self, data: Dict[str, Any]):
         # set many
-        return self.get_adaptor(False).update(data)
+        result = self.get_adaptor(False).update(data)
+        self.invalidate_near(*data)
+        return result
 
     async def aupdate(self, data: Dict[str, Any]):
         # set many
-        return await self.get_adaptor(True).update(data)
+        result = await self.get_adaptor(True).update(data)
+        await self.ainvalidate_near(*data)
+        return result
 
     def pop(self, key: str):
-        return self.get_adaptor(False).pop(key)
+        result = self.get_adaptor(False).pop(key)
+        self.invalidate_near(key)
+        return result
 
     async def apop(self, key: str):
         # set many
-        return await self.get_adaptor(True).pop(key)
+        result = await self.get_adaptor(True).pop(key)
+        await self.ainvalidate_near(key)
+        return result
 
     def delete(self, args=None, *keys):
-        return self.get_adaptor(False).delete(args, *keys)
+        result = self.get_adaptor(False).delete(args, *keys)
+        self.invalidate_near(*keys_or_args(args, *keys))
+        return result
 
     async def adelete(self, args=None, *keys):
-        return await self.get_adaptor(True).delete(args, *keys)
+        result = await self.get_adaptor(True).delete(args, *keys)
+        await self.ainvalidate_near(*keys_or_args(args, *keys))
+        return result
 
     def exists(self, args=None, *keys) -> int:
         return self.get_adaptor(False).exists(args, *keys)
@@ -207,20 +351,28 @@ class Cache(Config):
         return await self.get_adaptor(True).exists(args, *keys)
 
     def expire(self, *keys: str, timeout: float):
-        return self.get_adaptor(False).expire(*keys, timeout=timeout)
+        result = self.get_adaptor(False).expire(*keys, timeout=timeout)
+        self.invalidate_near(*keys)
+        return result
 
     async def aexpire(self, *keys: str, timeout: float):
-        return await self.get_adaptor(True).expire(*keys, timeout=timeout)
+        result = await self.get_adaptor(True).expire(*keys, timeout=timeout)
+        await self.ainvalidate_near(*keys)
+        return result
 
     def alter(
         self, key: str, amount: Union[int, float], limit: int = None
     ) -> Optional[Union[int, float]]:
-        return self.get_adaptor(False).alter(key, amount, limit=limit)
+        result = self.get_adaptor(False).alter(key, amount, limit=limit)
+        self.invalidate_near(key)
+        return result
 
     async def aalter(
         self, key: str, amount: Union[int, float], limit: int = None
     ) -> Optional[Union[int, float]]:
-        return await self.get_adaptor(True).alter(key, amount, limit=limit)
+        result = await self.get_adaptor(True).alter(key, amount, limit=limit)
+        await self.ainvalidate_near(key)
+        return result
 
     # deprecate in the future
     @awaitable(get)
@@ -270,7 +422,7 @@ class Cache(Config):
     @awaitable(delete)
     async def delete(self, args=None, *keys):
         warnings.warn(f"Deprecated in future, please use adelete()", DeprecationWarning)
-        return await self.get_adaptor(True).delete(args, *keys)
+        return await self.adelete(args, *keys)
 
     @awaitable(exists)
     async def exists(self, args=None, *keys) -> int:
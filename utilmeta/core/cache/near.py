@@ -0,0 +1,189 @@
+import os
+import time
+import uuid
+import weakref
+import threading
+from collections import OrderedDict
+from typing import Any, Tuple, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .config import Cache
+
+__all__ = ["NearCache", "NearCacheInvalidator", "MISSING"]
+
+
+class _Missing:
+    def __repr__(self):
+        return "MISSING"
+
+    def __bool__(self):
+        return False
+
+
+# the stored value of the negative cached keys (keys that not exists in the backend)
+MISSING = _Missing()
+
+
+class NearCache:
+    """
+    A bounded in-process LRU store with TTL in front of the cache backend (the L1 tier),
+    it is populated on read (including the negative results), and invalidated when the keys
+    are written through utilmeta, the invalidation is broadcast to the other processes by the invalidator
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        timeout: float = 30,
+        negative_timeout: float = 5,
+    ):
+        if not max_entries or max_entries <= 0:
+            raise ValueError(f"NearCache: max_entries must be positive, got {max_entries}")
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+        self._lock = threading.Lock()
+        # key -> (value, expires)
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+
+        # incremented on every invalidation, the values read from the backend
+        # before an invalidation are not populated
+        self.version = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        found, _ = self.get(key, count=False)
+        return found
+
+    def get(self, key: str, count: bool = True) -> Tuple[bool, Any]:
+        """
+        return (found, value), value is MISSING if the key is negative cached
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, expires = item
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    if count:
+                        if value is MISSING:
+                            self.negative_hits += 1
+                        else:
+                            self.hits += 1
+                    return True, value
+                self._data.pop(key, None)
+            if count:
+                self.misses += 1
+            return False, None
+
+    def set(self, key: str, value: Any, version: int = None):
+        # None is treated as a miss of the backend
+        if version is not None and version != self.version:
+            return
+        if value is None:
+            value = MISSING
+        timeout = self.negative_timeout if value is MISSING else self.timeout
+        if not timeout or timeout <= 0:
+            return
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            self._data[key] = (value, time.monotonic() + timeout)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: str):
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                if self._data.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    def get_stats(self) -> dict:
+        hits = self.hits + self.negative_hits
+        requests = hits + self.misses
+        return dict(
+            size=len(self._data),
+            max_entries=self.max_entries,
+            requests=requests,
+            hits=self.hits,
+            negative_hits=self.negative_hits,
+            misses=self.misses,
+            hit_rate=round(hits / requests, 4) if requests else 0,
+            evictions=self.evictions,
+            invalidations=self.invalidations,
+        )
+
+
+_invalidators = weakref.WeakSet()
+
+
+class NearCacheInvalidator:
+    """
+    Broadcast the invalidated keys to the near caches in the other processes,
+    this base invalidator only invalidates the current process
+    (for the caches that only live in the current process, like locmem)
+    """
+
+    def __init__(self, cache: "Cache", near: NearCache, channel: str = None):
+        self.cache = cache
+        self.near = near
+        self.channel = channel
+        self.ident = uuid.uuid4().hex
+        self.pid = os.getpid()
+        _invalidators.add(self)
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def publish(self, keys: List[str]):
+        pass
+
+    async def apublish(self, keys: List[str]):
+        pass
+
+    def reset(self):
+        # in the forked child process, the subscriber thread is not inherited
+        self.ident = uuid.uuid4().hex
+        self.pid = os.getpid()
+        self.near.clear()
+
+    def on_message(self, source: Optional[str], keys: List[str]):
+        if source == self.ident:
+            # published by this process, already invalidated
+            return
+        if keys:
+            self.near.invalidate(*keys)
+        else:
+            self.near.clear()
+
+
+def _reset_invalidators():
+    for invalidator in list(_invalidators):
+        invalidator.reset()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_invalidators)
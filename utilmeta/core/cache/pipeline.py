@@ -0,0 +1,152 @@
+import inspect
+from typing import List, Tuple, Dict, Any, Optional, Union, TYPE_CHECKING
+from datetime import timedelta, datetime
+from utilmeta.utils import keys_or_args
+
+if TYPE_CHECKING:
+    from .config import Cache
+
+__all__ = ["CachePipeline", "PipelineCommand"]
+
+# (method name of the cache adaptor, args, kwargs)
+PipelineCommand = Tuple[str, tuple, dict]
+
+WRITE_COMMANDS = ("set", "update", "pop", "delete", "expire", "alter")
+
+
+class CachePipeline:
+    """
+    Queue the cache operations and execute them in a batch (one round trip for the backends support pipelining)
+
+        with cache.pipeline() as pipe:
+            pipe.get('a')
+            pipe.set('b', 1)
+        pipe.results    # [<value of a>, True]
+
+        async with cache.pipeline() as pipe:
+            pipe.fetch('a', 'b')
+            pipe.incr('c')
+
+    the queued commands are executed when exiting the context (without exception),
+    or by calling execute() / aexecute() explicitly, which return the results in the queued order
+    """
+
+    def __init__(self, cache: "Cache"):
+        self.cache = cache
+        self.commands: List[PipelineCommand] = []
+        self.results: Optional[list] = None
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __enter__(self) -> "CachePipeline":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.execute()
+        else:
+            self.reset()
+
+    async def __aenter__(self) -> "CachePipeline":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            await self.aexecute()
+        else:
+            self.reset()
+
+    def reset(self):
+        self.commands = []
+
+    def _queue(self, name: str, *args, **kwargs) -> "CachePipeline":
+        self.commands.append((name, args, kwargs))
+        return self
+
+    @classmethod
+    def get_written_keys(cls, commands: List[PipelineCommand]) -> List[str]:
+        keys = []
+        for name, args, kwargs in commands:
+            if name not in WRITE_COMMANDS:
+                continue
+            if name == "update":
+                keys.extend(args[0])
+            elif name == "delete":
+                keys.extend(args[0])
+            elif name == "expire":
+                keys.extend(args)
+            else:
+                keys.append(args[0])
+        return keys
+
+    def execute(self) -> list:
+        commands, self.commands = self.commands, []
+        if not commands:
+            self.results = []
+            return []
+        adaptor = self.cache.get_adaptor(False)
+        self.results = adaptor.execute_pipeline(commands)
+        self.cache.invalidate_near(*self.get_written_keys(commands))
+        return self.results
+
+    async def aexecute(self) -> list:
+        commands, self.commands = self.commands, []
+        if not commands:
+            self.results = []
+            return []
+        adaptor = self.cache.get_adaptor(True)
+        results = adaptor.execute_pipeline(commands)
+        if inspect.isawaitable(results):
+            results = await results
+        self.results = results
+        await self.cache.ainvalidate_near(*self.get_written_keys(commands))
+        return results
+
+    def get(self, key: str, default=None):
+        return self._queue("get", key, default)
+
+    def fetch(self, args=None, *keys: str, named: bool = False):
+        return self._queue("fetch", keys_or_args(args, *keys), named=named)
+
+    def set(
+        self,
+        key: str,
+        value,
+        *,
+        timeout: Union[int, timedelta, datetime] = None,
+        exists_only: bool = False,
+        not_exists_only: bool = False,
+    ):
+        return self._queue(
+            "set",
+            key,
+            value,
+            timeout=timeout,
+            exists_only=exists_only,
+            not_exists_only=not_exists_only,
+        )
+
+    def update(self, data: Dict[str, Any]):
+        return self._queue("update", data)
+
+    def pop(self, key: str):
+        return self._queue("pop", key)
+
+    def delete(self, args=None, *keys):
+        return self._queue("delete", keys_or_args(args, *keys))
+
+    def exists(self, args=None, *keys):
+        return self._queue("exists", keys_or_args(args, *keys))
+
+    def expire(self, *keys: str, timeout: float):
+        return self._queue("expire", *keys, timeout=timeout)
+
+    def alter(self, key: str, amount: Union[int, float], limit: int = None):
+        return self._queue("alter", key, amount, limit=limit)
+
+    def incr(self, key: str, amount: Union[int, float] = 1):
+        return self.alter(key, amount)
+
+    def decr(self, key: str, amount: Union[int, float] = 1):
+        return self.alter(key, -amount)
@@ -401,6 +401,7 @@ class BaseCacheInterface(PluginBase):
             "size": total_keys,
             "last_modified": last_modified,
             "variants": variant_data,
+            "near_cache": self.cache_instance.get_near_stats(),
         }
 
     @classmethod
@@ -1,10 +1,11 @@
-from utilmeta.utils import pop, time_now
+from utilmeta.utils import time_now
 from typing import Union, Optional, Dict, Any, Tuple
 from datetime import datetime
 from utype import unprovided
 import warnings
 import random
 from .base import BaseCacheInterface
+from .stats import KeyStats, CacheKeyStats, LocalKeyStats, pop_min
 
 NUM_TYPES = (int, float)
 NUM = Union[int, float]
@@ -47,12 +48,7 @@ class CacheEntity:
         self._assigned_variant = variant
 
     def reset_stats(self):
-        self.cache.fetch(
-            {
-                self.requests_key: 0,
-                self.hits_key: {},
-            }
-        )
+        self.stats.reset()
 
     @property
     def variant(self):
@@ -68,66 +64,54 @@ class CacheEntity:
     # def config(self):
     #     return self.src.config
 
+    def get_key_stats(self, vary: bool = False) -> KeyStats:
+        if vary:
+            keys = (None, self.vary_hits_key, self.vary_update_key)
+        else:
+            keys = (self.requests_key, self.hits_key, self.update_key)
+        cache = self.cache
+        if cache.is_memory:
+            # the memory cache only lives in the current process, so does the statistics
+            return LocalKeyStats.get(self.src.cache_alias, *keys)
+        return CacheKeyStats(cache, *keys)
+
+    @property
+    def stats(self) -> KeyStats:
+        return self.get_key_stats()
+
+    @property
+    def vary_stats(self) -> KeyStats:
+        return self.get_key_stats(vary=True)
+
     def get_requests(self):
-        return self.cache.get(self.requests_key) or 0
+        return self.stats.get_requests()
 
     def get_total_hits(self):
-        hits = self.cache.get(self.hits_key) or {}
+        hits = self.stats.get_hits()
         return sum(hits.values()) if hits else 0
 
     def get_key_hits(self, *keys):
-        hits = self.cache.get(self.hits_key) or {}
-        values = [v for k, v in hits.items() if k in keys]
-        return sum(values) if values else 0
+        hits = self.stats.get_hits(list(keys))
+        return sum(hits.values()) if hits else 0
 
     def get_latest_update(self):
-        updates = self.cache.get(self.update_key) or {}
+        updates = self.stats.get_updates()
         return max(updates.values()) if updates else None
 
-    def _get_key_data(self, vary: bool = False) -> Tuple[dict, dict]:
-        tk, uk = (
-            (self.vary_hits_key, self.vary_update_key)
-            if vary
-            else (self.hits_key, self.update_key)
-        )
-        _data = self.cache.fetch(tk, uk)
-        _counts = _data.get(tk)
-        _updates = _data.get(uk)
-        if not isinstance(_counts, dict):
-            _counts = {}
-        if not isinstance(_updates, dict):
-            _updates = {}
-        return _counts, _updates
-
-    def _set_key_data(self, counts: dict, updates: dict, vary: bool = False):
-        if not isinstance(counts, dict):
-            counts = {}
-        if not isinstance(updates, dict):
-            updates = {}
-        tk, uk = (
-            (self.vary_hits_key, self.vary_update_key)
-            if vary
-            else (self.hits_key, self.update_key)
-        )
-        self.cache.update({tk: counts, uk: updates})
-
     @classmethod
     def pop_min(cls, data: dict, count: int):
-        reverse_map = {}
-        for key, val in data.items():
-            if val in reverse_map:
-                reverse_map[val].append(key)
-            else:
-                reverse_map[val] = [key]
-        pop_keys = []
-        for v in sorted(reverse_map.keys()):
-            keys = reverse_map.get(v)
-            if not keys:
-                continue
-            pop_keys.extend(keys)
-            if len(pop_keys) > count:
-                break
-        return pop_keys[:count]
+        return pop_min(data, count)
+
+    def _evict(self, stats: KeyStats, excess: int, policy: str, candidates: list, exclude: list = ()) -> list:
+        if policy == self.src.OBSOLETE_LFU:
+            return stats.pop_min(excess, exclude=exclude)
+        elif policy == self.src.OBSOLETE_LRU:
+            return stats.pop_min(excess, lru=True, exclude=exclude)
+        elif policy == self.src.OBSOLETE_RANDOM:
+            del_keys = random.sample(candidates, k=min(excess, len(candidates)))
+            stats.remove(del_keys)
+            return del_keys
+        return []
 
     def prepare(self, *keys: str):
         if not keys:
@@ -137,67 +121,65 @@ class CacheEntity:
             return
 
         last_modified = time_now()
-        counts, updates = self._get_key_data()
-        # we don't lively trace hit data in set
-        # no hit in hits_count means 0 hit
-        for k in keys:
-            counts.setdefault(k, 0)
-        updates.update({k: last_modified for k in keys})
+        stats = self.stats
 
         if self.src.max_entries:
-            # counts already set keys
-            excess: int = self.exists(*updates) - self.src.max_entries
-
+            tracked = list(stats.get_updates())
+            # tracked keys may be expired, only check the exists keys if the bound exceeded
             if (
-                excess > self.src.max_entries_tolerance
-            ):  # default to 0, but can set a throttle value
-                # total_key >= max_entries
-                # delete the least frequently hit key
-                del_keys = []
-                if self.src.max_entries_policy == self.src.OBSOLETE_LFU:
-                    del_keys = self.pop_min(counts, count=excess)
-                elif self.src.max_entries_policy == self.src.OBSOLETE_LRU:
-                    del_keys = self.pop_min(updates, count=excess)
-                elif self.src.max_entries_policy == self.src.OBSOLETE_RANDOM:
-                    exists_keys = self.keys()
-                    del_keys = random.choices(exists_keys, k=excess)
-
-                if del_keys:
-                    self.cache.delete(*keys)
-                    # update key metrics
-                    for key in del_keys:
-                        pop(counts, key)
-                        pop(updates, key)
-
-        self._set_key_data(counts, updates)
+                len(tracked) + len(keys) - self.src.max_entries
+                > self.src.max_entries_tolerance
+            ):
+                # the keys to set are counted as exists
+                others = [k for k in tracked if k not in keys]
+                excess: int = (
+                    self.exists(*others) + len(set(keys)) - self.src.max_entries
+                )
+                if (
+                    excess > self.src.max_entries_tolerance
+                ):  # default to 0, but can set a throttle value
+                    # total_key >= max_entries
+                    # delete the least frequently hit key (before the keys to set are traced)
+                    del_keys = self._evict(
+                        stats,
+                        excess,
+                        policy=self.src.max_entries_policy,
+                        candidates=others,
+                        exclude=keys,
+                    )
+                    if del_keys:
+                        self.cache.delete(*del_keys)
+
+        # we don't lively trace hit data in set
+        # no hit in hits_count means 0 hit
+        stats.touch(list(keys), last_modified)
 
         if self.variant:
-            vary_counts, vary_updates = self._get_key_data(vary=True)
-            vary_keys = list(vary_counts)
-            vary_counts.setdefault(self.variant, 0)
-            vary_updates[self.variant] = last_modified
-            self._set_key_data(vary_counts, vary_updates, vary=True)
-            # set it here, if it is clearing, the corresponding variant will be deleted
-            # in that operation, we do not care about that now
+            vary_stats = self.vary_stats
+            vary_keys = [v for v in vary_stats.get_updates() if v != self.variant]
 
             if self.src.max_variants:
-                excess = len(vary_updates) - self.src.max_variants
+                excess = len(vary_keys) + 1 - self.src.max_variants
 
                 if (
                     excess > self.src.max_variants_tolerance
                 ):  # default to 0, but can set a throttle value
                     # total_key >= max_entries
                     # delete the least frequently hit key
-                    del_keys = []
-                    if self.src.max_variants_tolerance == self.src.OBSOLETE_LFU:
-                        del_keys = self.pop_min(vary_counts, count=excess)
-                    elif self.src.max_variants_policy == self.src.OBSOLETE_LRU:
-                        del_keys = self.pop_min(vary_updates, count=excess)
-                    elif self.src.max_variants_policy == self.src.OBSOLETE_RANDOM:
-                        del_keys = random.choices(vary_keys, k=excess)
+                    del_keys = self._evict(
+                        vary_stats,
+                        excess,
+                        policy=self.src.max_variants_policy,
+                        candidates=vary_keys,
+                        exclude=[self.variant],
+                    )
                     if del_keys:
                         self.src.clear_variants(*del_keys)
 
+            # set it here, if it is clearing, the corresponding variant will be deleted
+            # in that operation, we do not care about that now
+            vary_stats.touch([self.variant], last_modified)
+
     def update(self, data: Dict[str, Any], timeout: float = unprovided):
         if not data:
             return
@@ -208,9 +190,10 @@ class CacheEntity:
             # will expire ASAP
             return
         self.prepare(*data)
-        self.cache.update(data)
-        if not unprovided(timeout):
-            self.cache.expire(*data, timeout=timeout)
+        with self.cache.pipeline() as pipe:
+            pipe.update(data)
+            if not unprovided(timeout):
+                pipe.expire(*data, timeout=timeout)
 
     def set(
         self,
@@ -239,9 +222,6 @@ class CacheEntity:
         self.prepare(key)
         self.cache.set(key, val, timeout=timeout)
 
-    def _incr_requests(self, amount=1):
-        self.cache.alter(self.requests_key, amount)
-
     def get(self, *keys: str, single: bool = False):
         if not keys:
             if single:
@@ -259,29 +239,16 @@ class CacheEntity:
             if not result:
                 # no hits
                 hits = []
-            else:
+            elif isinstance(result, dict):
                 hits = [k for k in keys if k in result]
+            else:
+                hits = [k for k, v in zip(keys, result) if v is not None]
 
         # set key metrics
         if self.src.trace_keys:
-            self._incr_requests(len(keys))
-
-            if hits:
-                hit_counts = self.cache.get(self.hits_key) or {}
-                for key in hits:
-                    if key in hit_counts:
-                        hit_counts[key] += 1
-                    else:
-                        hit_counts[key] = 1
-                self.cache.set(self.hits_key, hit_counts)
-
-                if self.variant:
-                    vary_counts = self.cache.get(self.vary_hits_key) or {}
-                    if self.variant in vary_counts:
-                        vary_counts[self.variant] += 1
-                    else:
-                        vary_counts[self.variant] = 1
-                    self.cache.set(self.vary_hits_key, vary_counts)
+            self.stats.incr(requests=len(keys), hits=hits)
+            if hits and self.variant:
+                self.vary_stats.incr(hits=[self.variant])
 
         return result
 
@@ -291,17 +258,11 @@ class CacheEntity:
                 f"Cache.last_modified not implemented, "
                 f"please set trace_keys=True to enable this method"
             )
-        updates = self.cache.get(self.update_key)
-        if isinstance(updates, dict):
-            times = []
-            for key in keys:
-                dt = updates.get(key)
-                if isinstance(dt, datetime):
-                    times.append(dt)
-            if not times:
-                return None
-            return max(times)
-        return None
+        updates = self.stats.get_updates(list(keys))
+        times = [dt for dt in updates.values() if isinstance(dt, datetime)]
+        if not times:
+            return None
+        return max(times)
 
     def keys(self):
         if not self.src.trace_keys:
@@ -309,24 +270,17 @@ class CacheEntity:
                 f"Cache.keys not implemented, "
                 f"please set trace_keys=True to enable this method"
             )
-        keys = self.cache.get(self.update_key)
-        if isinstance(keys, dict):
-            misses = []
-            exists = []
-            for key in keys:
-                if key in self.cache:
-                    exists.append(key)
-                else:
-                    misses.append(key)
-            if misses:
-                # clear the missing data
-                counts, updates = self._get_key_data()
-                for key in misses:
-                    pop(counts, key)
-                    pop(updates, key)
-                self._set_key_data(counts, updates)
-            return exists
-        return []
+        misses = []
+        exists = []
+        for key in self.stats.get_updates():
+            if self.cache.exists(key):
+                exists.append(key)
+            else:
+                misses.append(key)
+        if misses:
+            # clear the missing data
+            self.stats.remove(misses)
+        return exists
 
     def clear(self):
         if not self.src.trace_keys:
@@ -334,14 +288,13 @@ class CacheEntity:
                 f"Cache.clear not implemented, "
                 f"please set trace_keys=True to enable this method"
             )
-        keys = self.cache.get(self.update_key) or {}
-        self.delete(*keys, self.requests_key, self.hits_key, self.update_key)
+        keys = list(self.stats.get_updates())
+        if keys:
+            self.cache.delete(*keys)
+        self.stats.clear()
         if self.variant:
             # clear for this vary
-            vary_counts, vary_updates = self._get_key_data(vary=True)
-            pop(vary_counts, self.variant)
-            pop(vary_updates, self.variant)
-            self._set_key_data(vary_counts, vary_updates, vary=True)
+            self.vary_stats.remove([self.variant])
 
     def delete(self, *keys: str):
         if not keys:
@@ -351,11 +304,7 @@ class CacheEntity:
         self.cache.delete(*keys)
         # update key metrics
         if self.src.trace_keys:
-            counts, updates = self._get_key_data()
-            for key in keys:
-                pop(counts, key)
-                pop(updates, key)
-            self._set_key_data(counts, updates)
+            self.stats.remove(list(keys))
 
     def expire(self, *keys: str, timeout: float):
         for key in keys:
@@ -367,24 +316,17 @@ class CacheEntity:
                 f"Cache.count not implemented, "
                 f"please set trace_keys=True to enable this method"
             )
-        keys = self.cache.get(self.update_key)
-        if isinstance(keys, dict):
-            # consider timeout
-            return self.exists(*keys)
-        return 0
+        keys = self.stats.get_updates()
+        # consider timeout
+        return self.exists(*keys) if keys else 0
 
     def exists(self, *keys: str) -> int:
-        exists = 0
-        for key in keys:
-            if key in self.cache:
-                exists += 1
-        return exists
+        if not keys:
+            return 0
+        return self.cache.exists(*keys)
 
     def variants(self):
-        counts = self.cache.get(self.vary_update_key)
-        if not counts:
-            return []
-        return list(counts)  # noqa
+        return list(self.vary_stats.get_updates())
 
     def alter(self, key: str, amount: Union[int, float], limit: int = None):
         # cannot perform atomic limitation, only lua script in redis can do that
@@ -408,31 +350,18 @@ class CacheEntity:
             res = value + amount
             self.cache.set(key, res)
         else:
-            self._incr_requests()
-            exists = key in self.cache
+            exists = bool(self.cache.exists(key))
             if exists:
-                res = self.cache.alter(key, delta=amount)
+                res = self.cache.alter(key, amount)
             else:
                 res = amount
                 self.cache.set(key, amount)
 
-        if limit is None and res is not None:
-            # add hits metrics
-            if self.src.trace_keys:
-                # add hits
-                hits = self.cache.get(self.hits_key) or {}
-                if key in hits:
-                    hits[key] += 1
-                else:
-                    hits[key] = 1
-                self.cache.set(self.hits_key, hits)
-                if self.variant:
-                    vary_counts = self.cache.get(self.vary_hits_key) or {}
-                    if self.variant in vary_counts:
-                        vary_counts[self.variant] += 1
-                    else:
-                        vary_counts[self.variant] = 1
-                    self.cache.set(self.vary_hits_key, vary_counts)
+        if limit is None and self.src.trace_keys:
+            # add requests and hits metrics
+            self.stats.incr(requests=1, hits=[key] if res is not None else [])
+            if res is not None and self.variant:
+                self.vary_stats.incr(hits=[self.variant])
 
         return res
 
@@ -0,0 +1,214 @@
+import heapq
+import threading
+from operator import itemgetter
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from utilmeta.core.cache import Cache
+
+__all__ = ["KeyStats", "CacheKeyStats", "LocalKeyStats", "pop_min"]
+
+
+def pop_min(data: dict, count: int, exclude: List[str] = ()) -> List[str]:
+    # keys of the [count] smallest values, without sorting the whole dict
+    if not data or count <= 0:
+        return []
+    items = data.items()
+    if exclude:
+        items = [(k, v) for k, v in items if k not in exclude]
+    return [key for key, _ in heapq.nsmallest(count, items, key=itemgetter(1))]
+
+
+def _subset(data: dict, keys: List[str] = None) -> dict:
+    if keys is None:
+        return dict(data)
+    return {key: data[key] for key in keys if key in data}
+
+
+class KeyStats:
+    """
+    The requests / hits / last update statistics of the traced keys in a cache scope (or the variants of a scope)
+    """
+
+    def get_requests(self) -> int:
+        raise NotImplementedError
+
+    def get_hits(self, keys: List[str] = None) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def get_updates(self, keys: List[str] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def incr(self, requests: int = 0, hits: List[str] = ()):
+        raise NotImplementedError
+
+    def touch(self, keys: List[str], last_modified):
+        # set the update time of keys, keys without hits record start with 0 hit
+        raise NotImplementedError
+
+    def remove(self, keys: List[str]):
+        raise NotImplementedError
+
+    def pop_min(self, count: int, lru: bool = False, exclude: List[str] = ()) -> List[str]:
+        # pop the least frequently hit (or least recently updated) keys from statistics
+        raise NotImplementedError
+
+    def reset(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class CacheKeyStats(KeyStats):
+    """
+    Store the statistics as dict values in the cache, used for the shared backends (like memcached / file / db)
+    that do not provide atomic hash or sorted set operations, so concurrent updates may overwrite each other
+    """
+
+    def __init__(self, cache: "Cache", requests_key: Optional[str], hits_key: str, update_key: str):
+        self.cache = cache
+        self.requests_key = requests_key
+        self.hits_key = hits_key
+        self.update_key = update_key
+
+    def _fetch(self):
+        data = self.cache.fetch(self.hits_key, self.update_key, named=True) or {}
+        counts = data.get(self.hits_key)
+        updates = data.get(self.update_key)
+        return (
+            counts if isinstance(counts, dict) else {},
+            updates if isinstance(updates, dict) else {},
+        )
+
+    def get_requests(self) -> int:
+        if not self.requests_key:
+            return 0
+        return self.cache.get(self.requests_key) or 0
+
+    def get_hits(self, keys: List[str] = None) -> Dict[str, int]:
+        hits = self.cache.get(self.hits_key)
+        return _subset(hits, keys) if isinstance(hits, dict) else {}
+
+    def get_updates(self, keys: List[str] = None) -> Dict[str, Any]:
+        updates = self.cache.get(self.update_key)
+        return _subset(updates, keys) if isinstance(updates, dict) else {}
+
+    def incr(self, requests: int = 0, hits: List[str] = ()):
+        if not hits:
+            if requests and self.requests_key:
+                self.cache.alter(self.requests_key, requests)
+            return
+        with self.cache.pipeline() as pipe:
+            if requests and self.requests_key:
+                pipe.alter(self.requests_key, requests)
+            pipe.get(self.hits_key)
+        counts = pipe.results[-1]
+        counts = counts if isinstance(counts, dict) else {}
+        for key in hits:
+            counts[key] = counts.get(key, 0) + 1
+        self.cache.set(self.hits_key, counts)
+
+    def touch(self, keys: List[str], last_modified):
+        counts, updates = self._fetch()
+        for key in keys:
+            counts.setdefault(key, 0)
+            updates[key] = last_modified
+        self.cache.update({self.hits_key: counts, self.update_key: updates})
+
+    def remove(self, keys: List[str]):
+        counts, updates = self._fetch()
+        for key in keys:
+            counts.pop(key, None)
+            updates.pop(key, None)
+        self.cache.update({self.hits_key: counts, self.update_key: updates})
+
+    def pop_min(self, count: int, lru: bool = False, exclude: List[str] = ()) -> List[str]:
+        counts, updates = self._fetch()
+        keys = pop_min(updates if lru else counts, count, exclude=exclude)
+        for key in keys:
+            counts.pop(key, None)
+            updates.pop(key, None)
+        self.cache.update({self.hits_key: counts, self.update_key: updates})
+        return keys
+
+    def reset(self):
+        data = {self.hits_key: {}}
+        if self.requests_key:
+            data[self.requests_key] = 0
+        self.cache.update(data)
+
+    def clear(self):
+        self.cache.delete(*[k for k in (self.requests_key, self.hits_key, self.update_key) if k])
+
+
+class LocalKeyStats(KeyStats):
+    """
+    In-process statistics for the caches that only live in the current process (like locmem),
+    updates are atomic under a lock and take no cache round trip
+    """
+
+    _instances: Dict[tuple, "LocalKeyStats"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.hits: Dict[str, int] = {}
+        self.updates: Dict[str, Any] = {}
+
+    @classmethod
+    def get(cls, *ident) -> "LocalKeyStats":
+        stats = cls._instances.get(ident)
+        if stats is None:
+            with cls._instances_lock:
+                stats = cls._instances.setdefault(ident, cls())
+        return stats
+
+    def get_requests(self) -> int:
+        return self.requests
+
+    def get_hits(self, keys: List[str] = None) -> Dict[str, int]:
+        with self.lock:
+            return _subset(self.hits, keys)
+
+    def get_updates(self, keys: List[str] = None) -> Dict[str, Any]:
+        with self.lock:
+            return _subset(self.updates, keys)
+
+    def incr(self, requests: int = 0, hits: List[str] = ()):
+        with self.lock:
+            self.requests += requests
+            for key in hits:
+                self.hits[key] = self.hits.get(key, 0) + 1
+
+    def touch(self, keys: List[str], last_modified):
+        with self.lock:
+            for key in keys:
+                self.hits.setdefault(key, 0)
+                self.updates[key] = last_modified
+
+    def remove(self, keys: List[str]):
+        with self.lock:
+            for key in keys:
+                self.hits.pop(key, None)
+                self.updates.pop(key, None)
+
+    def pop_min(self, count: int, lru: bool = False, exclude: List[str] = ()) -> List[str]:
+        with self.lock:
+            keys = pop_min(self.updates if lru else self.hits, count, exclude=exclude)
+            for key in keys:
+                self.hits.pop(key, None)
+                self.updates.pop(key, None)
+            return keys
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.hits = {}
+
+    def clear(self):
+        with self.lock:
+            self.requests = 0
+            self.hits = {}
+            self.updates = {}
@@ -7,30 +7,40 @@ class AiohttpClientRequestAdaptor(ClientRequestAdaptor):
     # request: ClientRequest
     backend = aiohttp
 
+    @classmethod
+    def make_session(cls) -> aiohttp.ClientSession:
+        from utilmeta.conf import Preference
+
+        pref = Preference.get()
+        connector = aiohttp.TCPConnector(
+            limit=pref.client_pool_max_connections or 0,
+            keepalive_timeout=pref.client_pool_keepalive_expiry,
+        )
+        # cookies are managed by the Client, not stored in the (shared) session
+        return aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+
     async def __call__(
         self,
         timeout: float = None,
         allow_redirects: bool = None,
         clients: dict = None,
         stream: bool = False,
+        pooled: bool = None,
+        proxies: dict = None,
         **kwargs
     ):
         from utilmeta.core.response.backends.aiohttp import AiohttpClientResponseAdaptor
 
-        session: aiohttp.ClientSession = (clients or {}).get('aiohttp_session')
-
-        if not isinstance(session, aiohttp.ClientSession) or session.closed:
-            session = aiohttp.ClientSession(
-                timeout=ClientTimeout(total=float(timeout) if timeout is not None else None)
-            )
-
-            if isinstance(clients, dict):
-                # set for cache
-                clients['aiohttp_session'] = session
+        session, managed = self.get_transport(
+            'aiohttp_session',
+            self.make_session,
+            clients=clients,
+            pooled=pooled,
+            proxies=proxies,
+            asynchronous=True,
+        )
+        session: aiohttp.ClientSession
 
-        # async with aiohttp.ClientSession(
-        #     timeout=ClientTimeout(total=float(timeout) if timeout is not None else None)
-        # ) as session:
         try:
             resp = await session.request(
                 method=self.request.method,
@@ -38,6 +48,7 @@ class AiohttpClientRequestAdaptor(ClientRequestAdaptor):
                 data=self.request.body,
                 headers=self.request.headers,
                 allow_redirects=allow_redirects,
+                timeout=ClientTimeout(total=float(timeout) if timeout is not None else None),
             )
             if not stream:
                 await resp.read()
@@ -45,9 +56,9 @@ class AiohttpClientRequestAdaptor(ClientRequestAdaptor):
             return AiohttpClientResponseAdaptor(resp)
         except Exception:
             if stream:
-                if clients is None:
+                if not managed:
                     await session.close()
             raise
         finally:
-            if not stream and clients is None:
+            if not stream and not managed:
                 await session.close()
@@ -1,4 +1,5 @@
 from utilmeta.utils.adaptor import BaseAdaptor
+from typing import Callable, Any, Tuple
 from utilmeta.core.request.base import Request
 
 
@@ -11,6 +12,11 @@ class ClientRequestAdaptor(BaseAdaptor):
             return super().get_module_name(obj.backend)
         return super().get_module_name(obj)
 
+    @classmethod
+    def get_dispatch_key(cls, obj):
+        # qualified by the backend of the object, not the type
+        return type(obj), cls.get_module_name(obj)
+
     @classmethod
     def qualify(cls, obj: Request):
         if not cls.backend or not obj.backend:
@@ -23,6 +29,40 @@ class ClientRequestAdaptor(BaseAdaptor):
     def __init__(self, request: Request):
         self.request = request
 
+    def get_transport(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        clients: dict = None,
+        pooled: bool = None,
+        proxies: dict = None,
+        asynchronous: bool = False,
+    ) -> Tuple[Any, bool]:
+        """
+        Get the transport (client / session) of the backend to make request, return (transport, managed)
+        managed transport is cached in the client context (`with client:`) or the process-wide pool,
+        and should not be closed after the request
+        """
+        from ..pool import pool
+
+        transport = (clients or {}).get(name)
+        if transport is not None and not pool.is_closed(transport):
+            return transport, True
+        if clients is None and pool.enabled(pooled):
+            key = pool.get_key(
+                self.backend_name or self.get_module_name(self.backend),
+                self.request.url,
+                proxies=proxies,
+                asynchronous=asynchronous,
+            )
+            return pool.get(key, factory), True
+        transport = factory()
+        if isinstance(clients, dict):
+            # set for cache
+            clients[name] = transport
+            return transport, True
+        return transport, False
+
     def __call__(self, **kwargs):
         raise NotImplementedError(
             "This request backend does not support calling outbound requests"
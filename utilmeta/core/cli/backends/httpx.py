@@ -1,6 +1,7 @@
 import httpx
 from .base import ClientRequestAdaptor
 from utilmeta.utils import awaitable, pop
+import warnings
 
 
 class HttpxClientRequestAdaptor(ClientRequestAdaptor):
@@ -22,40 +23,65 @@ class HttpxClientRequestAdaptor(ClientRequestAdaptor):
                 kwargs.update(data=self.request.body)
         return kwargs
 
+    @classmethod
+    def get_client_kwargs(cls) -> dict:
+        from utilmeta.conf import Preference
+        from ..pool import make_cookie_jar
+
+        pref = Preference.get()
+        kwargs = dict(
+            cookies=httpx.Cookies(make_cookie_jar()),
+            limits=httpx.Limits(
+                max_connections=pref.client_pool_max_connections,
+                max_keepalive_connections=pref.client_pool_max_keepalive_connections,
+                keepalive_expiry=pref.client_pool_keepalive_expiry,
+            )
+        )
+        if pref.client_http2:
+            try:
+                import h2  # noqa
+            except ImportError:
+                warnings.warn('utilmeta.core.cli: client_http2 requires "h2" to be installed, '
+                              'fallback to HTTP/1.1')
+            else:
+                kwargs.update(http2=True)
+        return kwargs
+
     def __call__(
         self,
         timeout: float = None,
         allow_redirects: bool = None,
         stream: bool = False,
         clients: dict = None,
+        pooled: bool = None,
+        proxies: dict = None,
         **kwargs
     ):
         from utilmeta.core.response.backends.httpx import HttpxClientResponseAdaptor
 
-        client: httpx.Client = (clients or {}).get('httpx_client')
-
-        if not isinstance(client, httpx.Client) or client.is_closed:
-            client = httpx.Client(
-                timeout=float(timeout) if timeout is not None else None,
-                follow_redirects=allow_redirects,
-            )
-            if isinstance(clients, dict):
-                # set for cache
-                clients['httpx_client'] = client
+        client, managed = self.get_transport(
+            'httpx_client',
+            lambda: httpx.Client(**self.get_client_kwargs()),
+            clients=clients,
+            pooled=pooled,
+            proxies=proxies,
+        )
+        client: httpx.Client
 
         try:
             request = client.build_request(
                 **self.request_kwargs,
+                timeout=float(timeout) if timeout is not None else None,
             )
-            resp = client.send(request, stream=stream)
+            resp = client.send(request, stream=stream, follow_redirects=allow_redirects)
             return HttpxClientResponseAdaptor(resp)
         except Exception:
             if stream:
-                if clients is None:
+                if not managed:
                     client.close()
             raise
         finally:
-            if not stream and clients is None:
+            if not stream and not managed:
                 # not cacheable
                 client.close()
 
@@ -66,34 +92,36 @@ class HttpxClientRequestAdaptor(ClientRequestAdaptor):
         allow_redirects: bool = None,
         stream: bool = False,
         clients: dict = None,
+        pooled: bool = None,
+        proxies: dict = None,
         **kwargs
     ):
         from utilmeta.core.response.backends.httpx import HttpxClientResponseAdaptor
 
-        client: httpx.AsyncClient = (clients or {}).get('httpx_async_client')
-
-        if not isinstance(client, httpx.AsyncClient) or client.is_closed:
-            client = httpx.AsyncClient(
-                timeout=float(timeout) if timeout is not None else None,
-                follow_redirects=allow_redirects,
-            )
-            if isinstance(clients, dict):
-                # set for cache
-                clients['httpx_async_client'] = client
+        client, managed = self.get_transport(
+            'httpx_async_client',
+            lambda: httpx.AsyncClient(**self.get_client_kwargs()),
+            clients=clients,
+            pooled=pooled,
+            proxies=proxies,
+            asynchronous=True,
+        )
+        client: httpx.AsyncClient
 
         try:
             request = client.build_request(
                 **self.request_kwargs,
+                timeout=float(timeout) if timeout is not None else None,
             )
-            resp = await client.send(request, stream=stream)
+            resp = await client.send(request, stream=stream, follow_redirects=allow_redirects)
             return HttpxClientResponseAdaptor(resp)
         except Exception:
             if stream:
-                if clients is None:
+                if not managed:
                     await client.aclose()
             raise
         finally:
-            if not stream and clients is None:
+            if not stream and not managed:
                 # not cacheable
                 await client.aclose()
 
@@ -5,6 +5,21 @@ import requests
 class RequestsRequestAdaptor(ClientRequestAdaptor):
     backend = requests
 
+    @classmethod
+    def make_session(cls) -> requests.Session:
+        from utilmeta.conf import Preference
+        from requests.adapters import HTTPAdapter
+        from ..pool import make_cookie_policy
+
+        pref = Preference.get()
+        session = requests.Session()
+        session.cookies.set_policy(make_cookie_policy())
+        if pref.client_pool_max_keepalive_connections:
+            adapter = HTTPAdapter(pool_maxsize=pref.client_pool_max_keepalive_connections)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        return session
+
     def __call__(
         self,
         timeout: float = None,
@@ -12,18 +27,19 @@ class RequestsRequestAdaptor(ClientRequestAdaptor):
         proxies: dict = None,
         stream: bool = False,
         clients: dict = None,
+        pooled: bool = None,
         **kwargs
     ):
         from utilmeta.core.response.backends.requests import RequestsResponseAdaptor
 
-        session: requests.Session = (clients or {}).get('requests_session')
-
-        if not isinstance(session, requests.Session):
-            session = requests.Session()
-
-            if isinstance(clients, dict):
-                # set for cache
-                clients['requests_session'] = session
+        session, managed = self.get_transport(
+            'requests_session',
+            self.make_session,
+            clients=clients,
+            pooled=pooled,
+            proxies=proxies,
+        )
+        session: requests.Session
 
         try:
             resp = session.request(
@@ -39,9 +55,9 @@ class RequestsRequestAdaptor(ClientRequestAdaptor):
             return RequestsResponseAdaptor(resp)
         except Exception:
             if stream:
-                if clients is None:
+                if not managed:
                     session.close()
             raise
         finally:
-            if not stream and clients is None:
+            if not stream and not managed:
                 session.close()
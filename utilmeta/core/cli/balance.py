@@ -0,0 +1,196 @@
+import time
+import random
+import threading
+from collections import deque
+from typing import List, Optional, Iterable
+
+__all__ = [
+    "Node",
+    "LoadBalancer",
+    "ROUND_ROBIN",
+    "LEAST_OUTSTANDING",
+    "EWMA",
+    "STRATEGIES",
+]
+
+ROUND_ROBIN = "round_robin"
+LEAST_OUTSTANDING = "least_outstanding"
+EWMA = "ewma"
+STRATEGIES = (ROUND_ROBIN, LEAST_OUTSTANDING, EWMA)
+
+
+class Node:
+    """
+    A target (base url index) of the load balancer, with the passive health state:
+    a node is ejected after [max_failures] consecutive failures (timeouts / errors / 5xx),
+    and is recovered (for a probe) after the ejection time
+    """
+    __slots__ = (
+        "index",
+        "outstanding",
+        "latency",
+        "requests",
+        "failures",
+        "consecutive_failures",
+        "ejected_until",
+        "ejections",
+    )
+
+    def __init__(self, index: int):
+        self.index = index
+        self.outstanding = 0
+        # EWMA of the response latency (seconds)
+        self.latency: Optional[float] = None
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+
+    def __repr__(self):
+        return f"Node({self.index}, outstanding={self.outstanding}, latency={self.latency})"
+
+    def is_healthy(self, now: float = None) -> bool:
+        return self.ejected_until <= (now or time.monotonic())
+
+    def get_stats(self) -> dict:
+        return dict(
+            index=self.index,
+            healthy=self.is_healthy(),
+            outstanding=self.outstanding,
+            latency=round(self.latency * 1000, 3) if self.latency is not None else None,
+            requests=self.requests,
+            failures=self.failures,
+            ejections=self.ejections,
+        )
+
+
+class LoadBalancer:
+    """
+    Client-side load balancer across the base urls of a Client, the balancer only
+    hold the node indexes, so the same balancer can be shared by the sub clients
+    (which have their own base urls joined with the route)
+    - round_robin: rotate the healthy nodes
+    - least_outstanding: choose the node with the least in-flight requests
+    - ewma: choose the node with the least (EWMA latency * (outstanding + 1))
+    """
+
+    def __init__(
+        self,
+        size: int,
+        strategy: str = ROUND_ROBIN,
+        max_failures: int = 3,
+        ejection_time: float = 10.0,
+        max_ejection_time: float = 300.0,
+        decay: float = 0.3,
+        latency_samples: int = 200,
+        min_hedge_samples: int = 20,
+        hedge_percentile: float = 0.95,
+    ):
+        if size <= 0:
+            raise ValueError(f"LoadBalancer: size must be positive, got {size}")
+        if strategy not in STRATEGIES:
+            raise ValueError(
+                f"LoadBalancer: invalid strategy: {repr(strategy)}, must be one of {STRATEGIES}"
+            )
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.decay = decay
+        self.min_hedge_samples = min_hedge_samples
+        self.hedge_percentile = hedge_percentile
+        self.nodes: List[Node] = [Node(i) for i in range(size)]
+        self.latencies = deque(maxlen=latency_samples)
+        self.hedged = 0
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get_healthy_nodes(self, exclude: Iterable[int] = ()) -> List[Node]:
+        now = time.monotonic()
+        return [
+            node for node in self.nodes if node.index not in exclude and node.is_healthy(now)
+        ]
+
+    def choose(self, exclude: Iterable[int] = ()) -> Optional[Node]:
+        """
+        Choose a node for the request, the nodes in [exclude] (already tried) are skipped,
+        if no healthy node is left, fallback to the non-excluded nodes (panic mode)
+        return None only if all the nodes are excluded
+        """
+        exclude = set(exclude or ())
+        with self._lock:
+            candidates = self.get_healthy_nodes(exclude)
+            if not candidates:
+                candidates = [node for node in self.nodes if node.index not in exclude]
+                if not candidates:
+                    return None
+            if len(candidates) == 1:
+                return candidates[0]
+            if self.strategy == LEAST_OUTSTANDING:
+                least = min(node.outstanding for node in candidates)
+                return random.choice([node for node in candidates if node.outstanding == least])
+            if self.strategy == EWMA:
+                unmeasured = [node for node in candidates if node.latency is None]
+                if unmeasured:
+                    return unmeasured[0]
+                return min(candidates, key=lambda n: n.latency * (n.outstanding + 1))
+            for _ in range(len(self.nodes)):
+                node = self.nodes[self._cursor % len(self.nodes)]
+                self._cursor += 1
+                if node in candidates:
+                    return node
+            return candidates[0]
+
+    def start(self, node: Node):
+        with self._lock:
+            node.outstanding += 1
+            node.requests += 1
+
+    def finish(self, node: Node, latency: float = None, failed: bool = False):
+        with self._lock:
+            node.outstanding = max(0, node.outstanding - 1)
+            if failed:
+                node.failures += 1
+                node.consecutive_failures += 1
+                if node.consecutive_failures >= self.max_failures:
+                    # exponential backoff of the ejection time
+                    node.ejections += 1
+                    ejection = min(
+                        self.ejection_time * (2 ** (node.ejections - 1)),
+                        self.max_ejection_time,
+                    )
+                    node.ejected_until = time.monotonic() + ejection
+                    # the recovered node is ejected again if the probe request is failed
+                    node.consecutive_failures = self.max_failures - 1
+                return
+            node.consecutive_failures = 0
+            node.ejections = 0
+            node.ejected_until = 0.0
+            if latency is None:
+                return
+            self.latencies.append(latency)
+            if node.latency is None:
+                node.latency = latency
+            else:
+                node.latency = self.decay * latency + (1 - self.decay) * node.latency
+
+    def get_hedge_delay(self) -> Optional[float]:
+        # the percentile latency of the recent requests,
+        # None if the samples are not enough
+        samples = list(self.latencies)
+        if len(samples) < self.min_hedge_samples:
+            return None
+        samples.sort()
+        return samples[min(len(samples) - 1, int(len(samples) * self.hedge_percentile))]
+
+    def get_stats(self) -> dict:
+        return dict(
+            strategy=self.strategy,
+            hedged=self.hedged,
+            hedge_delay=self.get_hedge_delay(),
+            nodes=[node.get_stats() for node in self.nodes],
+        )
@@ -9,6 +9,7 @@ from utilmeta.utils import (
     classonlymethod,
     json_dumps,
     COMMON_METHODS,
+    DEFAULT_IDEMPOTENT_METHODS,
     EndpointAttr,
     parse_query_string,
     parse_query_dict,
@@ -23,12 +24,17 @@ from utilmeta.core.response.base import Headers
 from utilmeta.conf import Preference
 from .endpoint import ClientEndpoint, ClientRoute
 from .chain import ClientChainBuilder
+from .balance import LoadBalancer, Node
 from utilmeta.core.request import Request
 from utilmeta.core.api import decorator
 from utype.utils.compat import is_annotated
 from utype import Schema
 from .hook import Hook
 import urllib
+import copy
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed
 from urllib.parse import urlsplit, urlunsplit, urlencode
 from utilmeta import UtilMeta
 from functools import partial
@@ -97,6 +103,33 @@ def is_timeout_error(e: Exception) -> bool:
     return "timeout" in str(e).lower() or "timed out" in str(e).lower()
 
 
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_hedge_executor() -> ThreadPoolExecutor:
+    # the executor to make the hedged (concurrent) requests of the sync clients
+    global _hedge_executor
+    if _hedge_executor is None:
+        _hedge_executor = ThreadPoolExecutor(thread_name_prefix="utilmeta-hedge")
+    return _hedge_executor
+
+
+def get_response_status(resp) -> Optional[int]:
+    try:
+        return int(getattr(resp, "status", None) or 0) or None
+    except (TypeError, ValueError):
+        return None
+
+
+def discard_response(resp):
+    close = getattr(resp, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:   # noqa
+            pass
+
+
 class ClientParameters(Schema):
     base_url: Union[str, List[str], None]
     backend: Any
@@ -116,6 +149,9 @@ class ClientParameters(Schema):
     fail_silently: Optional[bool]
     default_timeout: Union[float, int, timedelta, None]
     proxies: Optional[dict]
+    pooled: Optional[bool]
+    load_balance: Any
+    hedged: Optional[bool]
 
 
 class Client(PluginTarget):
@@ -235,7 +271,15 @@ class Client(PluginTarget):
         allow_redirects: bool = None,
         charset: str = "utf-8",
         fail_silently: bool = False,
-        stream: bool = None
+        stream: bool = None,
+        # reuse the transports (connections) from the process-wide pool outside the `with client:` context,
+        # default to Preference.client_transport_pool
+        pooled: bool = None,
+        # strategy to balance the requests across multiple base urls:
+        # round_robin / least_outstanding / ewma, or a LoadBalancer instance
+        load_balance: Union[str, LoadBalancer] = None,
+        # hedge the idempotent requests to another node after the p95 latency
+        hedged: bool = False,
     ):
 
         super().__init__(plugins=plugins)
@@ -264,23 +308,31 @@ class Client(PluginTarget):
         self._default_timeout = default_timeout
         self._base_headers = base_headers or {}
         self._stream = stream
-
-        if base_url:
-            # check base url
-            res = urlsplit(base_url)
-            if not res.scheme:
-                # allow ws / wss in the future
-                raise ValueError(
-                    f"utilmeta.core.cli.Client: Invalid base_url: {repr(base_url)}, "
-                    f"must be a valid url"
-                )
-            if res.query:
-                self._base_query.update(parse_query_string(res.query))
-            base_url = urlunsplit(
-                (res.scheme, res.netloc, res.path, "", "")  # query  # fragment
-            )
+        self._pooled = pooled
+
+        base_urls = None
+        if isinstance(base_url, (list, tuple)):
+            base_urls = [self._parse_base_url(url) for url in base_url if url]
+            base_url = base_urls[0] if base_urls else None
+        elif base_url:
+            base_url = self._parse_base_url(base_url)
+
+        balancer = None
+        if base_urls and len(base_urls) > 1:
+            if isinstance(load_balance, LoadBalancer):
+                if len(load_balance) != len(base_urls):
+                    raise ValueError(
+                        f"utilmeta.core.cli.Client: LoadBalancer size: {len(load_balance)} "
+                        f"mismatch with the base_url: {base_urls}"
+                    )
+                balancer = load_balance
+            else:
+                balancer = LoadBalancer(len(base_urls), strategy=load_balance or "round_robin")
 
         self._base_url = base_url
+        self._base_urls = base_urls if balancer else None
+        self._balancer = balancer
+        self._hedged = hedged
         self._proxies = proxies
         self._allow_redirects = allow_redirects
         self._charset = charset
@@ -324,7 +376,10 @@ class Client(PluginTarget):
         if self._clients:
             params = self.get_client_params()
             for name, client_route in self._clients.items():
-                client_base_url = url_join(self._base_url, client_route.route)
+                if self._base_urls:
+                    client_base_url = [url_join(url, client_route.route) for url in self._base_urls]
+                else:
+                    client_base_url = url_join(self._base_url, client_route.route)
                 client_cls = client_route.handler
                 params = dict(params)
                 params.update(
@@ -374,10 +429,28 @@ class Client(PluginTarget):
 
         self._request_clients = None
 
+    def _parse_base_url(self, base_url: str) -> str:
+        res = urlsplit(base_url)
+        if not res.scheme:
+            # allow ws / wss in the future
+            raise ValueError(
+                f"utilmeta.core.cli.Client: Invalid base_url: {repr(base_url)}, "
+                f"must be a valid url"
+            )
+        if res.query:
+            self._base_query.update(parse_query_string(res.query))
+        return urlunsplit(
+            (res.scheme, res.netloc, res.path, "", "")  # query  # fragment
+        )
+
     @property
     def fail_silently(self):
         return self._fail_silently
 
+    @property
+    def balancer(self) -> Optional[LoadBalancer]:
+        return self._balancer
+
     @property
     def cookies(self):
         return self._cookies
@@ -412,6 +485,9 @@ class Client(PluginTarget):
             charset=self._charset,
             default_timeout=self._default_timeout,
             fail_silently=self._fail_silently,
+            pooled=self._pooled,
+            load_balance=self._balancer,
+            hedged=self._hedged,
             mock=self._mock,
             internal=self._internal,
             plugins=self._plugins,
@@ -573,24 +649,24 @@ class Client(PluginTarget):
                 )
 
         else:
-            adaptor: ClientRequestAdaptor = ClientRequestAdaptor.dispatch(request)
             if timeout is None:
                 timeout = request.adaptor.get_context("timeout")  # slot
                 if timeout is None:
                     timeout = self._default_timeout
             if timeout is not None:
                 timeout = float(timeout)
+            stream = stream or self._stream
             try:
-                resp = adaptor(
+                resp = self._balanced_request(
+                    request,
+                    hedge=self._should_hedge(request, stream=stream),
                     timeout=timeout,
                     allow_redirects=self._allow_redirects,
                     proxies=self._proxies,
-                    stream=stream or self._stream,
-                    clients=self._request_clients
+                    stream=stream,
+                    clients=self._request_clients,
+                    pooled=self._pooled,
                 )
-                if inspect.isawaitable(resp):
-                    raise RuntimeError(f'{self}: request backend: {self._backend} '
-                                       f'support only async request function')
             except Exception as e:
                 if not self._fail_silently:
                     raise e from e
@@ -631,19 +707,20 @@ class Client(PluginTarget):
                 )
 
         else:
-            adaptor: ClientRequestAdaptor = ClientRequestAdaptor.dispatch(request)
             if timeout is None:
                 timeout = request.adaptor.get_context("timeout")  # slot
+            stream = stream or self._stream
             try:
-                resp = adaptor(
+                resp = await self._async_balanced_request(
+                    request,
+                    hedge=self._should_hedge(request, stream=stream),
                     timeout=timeout or self._default_timeout,
                     allow_redirects=self._allow_redirects,
                     proxies=self._proxies,
-                    stream=stream or self._stream,
-                    clients=self._request_clients
+                    stream=stream,
+                    clients=self._request_clients,
+                    pooled=self._pooled,
                 )
-                if inspect.isawaitable(resp):
-                    resp = await resp
             except Exception as e:
                 if not self._fail_silently:
                     raise e from e
@@ -654,6 +731,177 @@ class Client(PluginTarget):
                 response = Response(response=resp, request=request)
         return response
 
+    def _should_hedge(self, request: Request, stream: bool = False) -> bool:
+        if not self._hedged or not self._balancer or stream:
+            return False
+        idempotent = request.adaptor.get_context("idempotent")
+        if idempotent is None:
+            idempotent = str(request.method).upper() in DEFAULT_IDEMPOTENT_METHODS
+        return bool(idempotent)
+
+    def _get_balanced_path(self, url: str) -> Optional[str]:
+        # the url after the base url, None if the url is not targeting the base urls
+        if not self._balancer or self._internal:
+            return None
+        for base_url in sorted(self._base_urls, key=len, reverse=True):
+            if url.startswith(base_url):
+                return url[len(base_url):]
+        return None
+
+    def _choose_node(self, request: Request, exclude=()) -> Optional[Node]:
+        # the nodes tried for this request (like the retries of the RetryPlugin) are skipped
+        tried = list(request.adaptor.get_context("balance_nodes") or [])
+        excluded = set(tried).union(exclude)
+        if len(excluded) >= len(self._balancer):
+            excluded = set(exclude)
+        node = self._balancer.choose(exclude=excluded)
+        if node is not None:
+            tried.append(node.index)
+            request.adaptor.update_context(balance_nodes=tried)
+        return node
+
+    def _get_node_request(self, request: Request, node: Node, path: str, copied: bool = False) -> Request:
+        client_request = request.adaptor.request
+        if copied:
+            # concurrent requests (hedging) should not share the url
+            client_request = copy.copy(client_request)
+            request = self._request_cls(client_request, backend=request.backend)
+        client_request.url = self._base_urls[node.index] + path
+        return request
+
+    def _send_request(self, request: Request, **kwargs):
+        adaptor: ClientRequestAdaptor = ClientRequestAdaptor.dispatch(request)
+        resp = adaptor(**kwargs)
+        if inspect.isawaitable(resp):
+            raise RuntimeError(f'{self}: request backend: {self._backend} '
+                               f'support only async request function')
+        return resp
+
+    async def _async_send_request(self, request: Request, **kwargs):
+        adaptor: ClientRequestAdaptor = ClientRequestAdaptor.dispatch(request)
+        resp = adaptor(**kwargs)
+        if inspect.isawaitable(resp):
+            resp = await resp
+        return resp
+
+    def _send_to_node(self, request: Request, node: Node, **kwargs):
+        self._balancer.start(node)
+        start = time.perf_counter()
+        try:
+            resp = self._send_request(request, **kwargs)
+        except Exception:
+            self._balancer.finish(node, failed=True)
+            raise
+        status = get_response_status(resp)
+        self._balancer.finish(
+            node, latency=time.perf_counter() - start, failed=bool(status and status >= 500)
+        )
+        return resp
+
+    async def _async_send_to_node(self, request: Request, node: Node, **kwargs):
+        self._balancer.start(node)
+        start = time.perf_counter()
+        try:
+            resp = await self._async_send_request(request, **kwargs)
+        except asyncio.CancelledError:
+            # the hedged request is cancelled, not a failure of the node
+            self._balancer.finish(node)
+            raise
+        except Exception:
+            self._balancer.finish(node, failed=True)
+            raise
+        status = get_response_status(resp)
+        self._balancer.finish(
+            node, latency=time.perf_counter() - start, failed=bool(status and status >= 500)
+        )
+        return resp
+
+    @classmethod
+    def _is_accepted(cls, future) -> bool:
+        if future.exception() is not None:
+            return False
+        status = get_response_status(future.result())
+        return not status or status < 500
+
+    def _balanced_request(self, request: Request, hedge: bool = False, **kwargs):
+        path = self._get_balanced_path(request.url)
+        if path is None:
+            return self._send_request(request, **kwargs)
+        node = self._choose_node(request)
+        delay = self._balancer.get_hedge_delay() if hedge else None
+        if delay is None:
+            return self._send_to_node(self._get_node_request(request, node, path), node, **kwargs)
+
+        executor = get_hedge_executor()
+        primary = executor.submit(
+            self._send_to_node, self._get_node_request(request, node, path, copied=True), node, **kwargs
+        )
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        second = self._choose_node(request, exclude=[node.index])
+        if second is None or second.index == node.index or not second.is_healthy():
+            return primary.result()
+        self._balancer.hedged += 1
+        secondary = executor.submit(
+            self._send_to_node, self._get_node_request(request, second, path, copied=True), second, **kwargs
+        )
+        futures = [primary, secondary]
+        winner = None
+        for future in as_completed(futures):
+            if self._is_accepted(future):
+                winner = future
+                break
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(
+                    lambda f: discard_response(f.result()) if f.exception() is None else None
+                )
+        if winner is None:
+            # both failed, raise / return the result of the primary request
+            return primary.result()
+        return winner.result()
+
+    async def _async_balanced_request(self, request: Request, hedge: bool = False, **kwargs):
+        path = self._get_balanced_path(request.url)
+        if path is None:
+            return await self._async_send_request(request, **kwargs)
+        node = self._choose_node(request)
+        delay = self._balancer.get_hedge_delay() if hedge else None
+        if delay is None:
+            return await self._async_send_to_node(
+                self._get_node_request(request, node, path), node, **kwargs
+            )
+
+        primary = asyncio.ensure_future(
+            self._async_send_to_node(self._get_node_request(request, node, path, copied=True), node, **kwargs)
+        )
+        done, _ = await asyncio.wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        second = self._choose_node(request, exclude=[node.index])
+        if second is None or second.index == node.index or not second.is_healthy():
+            return await primary
+        self._balancer.hedged += 1
+        secondary = asyncio.ensure_future(
+            self._async_send_to_node(self._get_node_request(request, second, path, copied=True), second, **kwargs)
+        )
+        pending = {primary, secondary}
+        winner = None
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if self._is_accepted(task):
+                    winner = task
+                    break
+        for task in pending:
+            task.cancel()
+        if winner is None:
+            return primary.result()
+        if winner is not primary and primary.done() and primary.exception() is None:
+            discard_response(primary.result())
+        return winner.result()
+
     def request(
         self,
         method: str,
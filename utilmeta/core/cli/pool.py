@@ -0,0 +1,152 @@
+import os
+import asyncio
+import inspect
+import threading
+from urllib.parse import urlsplit
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import Dict, Callable, Any, Optional
+
+__all__ = ["TransportPool", "pool", "make_cookie_policy", "make_cookie_jar"]
+
+
+def make_cookie_policy() -> DefaultCookiePolicy:
+    # the shared transports should not store the response cookies,
+    # cookies are managed by the Client instances
+    return DefaultCookiePolicy(allowed_domains=[])
+
+
+def make_cookie_jar() -> CookieJar:
+    return CookieJar(policy=make_cookie_policy())
+
+
+class TransportPool:
+    """
+    Process-wide pool of the request transports (httpx.Client / httpx.AsyncClient /
+    aiohttp.ClientSession / requests.Session), keyed by (backend, origin, proxies),
+    so that the long-lived clients reuse the connections outside the `with client:` context
+    async transports are bound to the event loop that created them
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (transport, loop)
+        self._transports: Dict[tuple, tuple] = {}
+        self._pid = os.getpid()
+        self.created = 0
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._transports)
+
+    @classmethod
+    def enabled(cls, pooled: Optional[bool] = None) -> bool:
+        if pooled is not None:
+            return pooled
+        from utilmeta.conf import Preference
+
+        return Preference.get().client_transport_pool
+
+    @classmethod
+    def get_key(cls, backend: str, url: str, proxies: dict = None, asynchronous: bool = False) -> tuple:
+        parsed = urlsplit(str(url))
+        origin = f"{parsed.scheme}://{parsed.netloc}".lower()
+        proxies_key = tuple(sorted((proxies or {}).items()))
+        loop_id = id(asyncio.get_running_loop()) if asynchronous else None
+        return backend, origin, proxies_key, loop_id
+
+    @classmethod
+    def is_closed(cls, transport) -> bool:
+        closed = getattr(transport, "is_closed", None)
+        if closed is None:
+            closed = getattr(transport, "closed", False)
+        return bool(closed)
+
+    def get(self, key: tuple, factory: Callable[[], Any]):
+        if os.getpid() != self._pid:
+            # forked: the connections belongs to the parent process
+            self.reset()
+        loop = asyncio.get_running_loop() if key[-1] is not None else None
+        with self._lock:
+            item = self._transports.get(key)
+            if item:
+                transport, transport_loop = item
+                if transport_loop is loop and not self.is_closed(transport):
+                    self.hits += 1
+                    return transport
+            transport = factory()
+            self.created += 1
+            self._transports[key] = (transport, loop)
+            if loop is not None:
+                self._purge_closed_loops()
+            return transport
+
+    def _purge_closed_loops(self):
+        for key, (transport, loop) in list(self._transports.items()):
+            if loop is not None and loop.is_closed():
+                self._transports.pop(key)
+
+    def reset(self):
+        # drop the transports without closing, used in the forked child process
+        self._lock = threading.Lock()
+        self._transports = {}
+        self._pid = os.getpid()
+
+    def get_stats(self) -> dict:
+        return dict(size=len(self._transports), created=self.created, hits=self.hits)
+
+    def _pop_all(self) -> list:
+        with self._lock:
+            items = list(self._transports.values())
+            self._transports.clear()
+        return items
+
+    @classmethod
+    def _close_async(cls, transport, loop):
+        if loop.is_closed():
+            return
+        close = getattr(transport, "aclose", None) or transport.close
+        if loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                loop.create_task(close())
+            else:
+                asyncio.run_coroutine_threadsafe(close(), loop)
+            return
+        loop.run_until_complete(close())
+
+    def close(self):
+        for transport, loop in self._pop_all():
+            try:
+                if loop is None:
+                    transport.close()
+                else:
+                    self._close_async(transport, loop)
+            except Exception as e:
+                print(f"utilmeta.core.cli.pool: close transport: {transport} failed with error: {e}")
+
+    async def aclose(self):
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for transport, loop in self._pop_all():
+            try:
+                if loop is None:
+                    transport.close()
+                elif loop is current:
+                    r = transport.aclose() if hasattr(transport, "aclose") else transport.close()
+                    if inspect.isawaitable(r):
+                        await r
+                else:
+                    self._close_async(transport, loop)
+            except Exception as e:
+                print(f"utilmeta.core.cli.pool: close transport: {transport} failed with error: {e}")
+
+
+pool = TransportPool()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=pool.reset)
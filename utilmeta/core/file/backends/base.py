@@ -13,9 +13,10 @@ class FileAdaptor(BaseAdaptor):
     @classmethod
     def get_module_name(cls, obj):
         from io import BytesIO, TextIOWrapper, BufferedRandom, BufferedReader
+        from tempfile import SpooledTemporaryFile
         from utilmeta.core.response.base import Response, ResponseAdaptor
 
-        if isinstance(obj, BytesIO):
+        if isinstance(obj, (BytesIO, SpooledTemporaryFile)):
             return "bytesio"
         elif isinstance(obj, (BufferedReader, BufferedRandom, TextIOWrapper)):
             return "fileio"
@@ -1,13 +1,16 @@
 from .base import FileAdaptor
 from io import BytesIO
+from tempfile import SpooledTemporaryFile
+from typing import Union
 
 
 class BytesIOFileAdaptor(FileAdaptor):
-    file: BytesIO
+    # in-memory file, or spooled file that rolled over to disk when it's too large
+    file: Union[BytesIO, SpooledTemporaryFile]
 
     @classmethod
     def qualify(cls, obj):
-        return isinstance(obj, BytesIO)
+        return isinstance(obj, (BytesIO, SpooledTemporaryFile))
 
     @property
     def content_type(self):
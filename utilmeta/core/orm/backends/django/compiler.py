@@ -8,7 +8,7 @@ from . import expressions as exp
 from .constant import PK, ID, SEG
 from django.db import models
 from utilmeta.utils import awaitable, Error, multi, pop, order_list
-from typing import List, Tuple, Type, Union, TYPE_CHECKING
+from typing import List, Tuple, Type, Union, Optional, Iterator, AsyncIterator, TYPE_CHECKING
 from .queryset import AwaitableQuerySet
 import asyncio
 import warnings
@@ -137,7 +137,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             pk = val[PK]
             if pk is None:
                 continue
-            if pk in pk_list:
+            if pk in pk_map:
                 # distinct here
                 continue
             pk_list.append(pk)
@@ -149,6 +149,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             result.append(val)
         self.pk_list = pk_list
         self.pk_map = pk_map
+        self.pk_types = {type(pk) for pk in pk_map}
         if self.pk_orders and result:
             result = order_list(result, orders=self.pk_orders, by=PK, join_rest=True)
         self.values: List[dict] = result
@@ -176,17 +177,19 @@ class DjangoQueryCompiler(BaseQueryCompiler):
         if not self.values:
             return []
         self._resolve_recursion()
-
-        if self.pk_list:
-            for field in self.isolated_fields.values():
-                try:
-                    self.query_isolated_field(field)
-                except Exception as e:
-                    self.handle_isolated_field(field, e)
-
+        self.query_isolated_fields()
         self.clear_pks()
         return self.values
 
+    def query_isolated_fields(self):
+        if not self.pk_list:
+            return
+        for field in self.isolated_fields.values():
+            try:
+                self.query_isolated_field(field)
+            except Exception as e:
+                self.handle_isolated_field(field, e)
+
     @awaitable(get_values, bind_service=True, close_conn=True)
     async def get_values(self):
         if self.queryset.query.is_empty():
@@ -205,7 +208,11 @@ class DjangoQueryCompiler(BaseQueryCompiler):
         if not self.values:
             return []
         self._resolve_recursion()
+        await self.async_query_isolated_fields()
+        self.clear_pks()
+        return self.values
 
+    async def async_query_isolated_fields(self):
         async def query_isolated(f):
             try:
                 await self.async_query_isolated_field(f)
@@ -233,9 +240,184 @@ class DjangoQueryCompiler(BaseQueryCompiler):
                 # either of which we will directly cancel the unfinished tasks and raise the error
                 raise
 
-        self.clear_pks()
+    def _reset_chunk(self):
+        self.pk_list = []
+        self.pk_map = {}
+        self.pk_types = set()
+        self.values = []
+        # recursion map is isolated among chunks, the resolved pks will not accumulate
+        self.recursion_map = self.context.recursion_map or {}
+
+    def _dedup_chunk(self, values: List[dict], seen: set = None) -> List[dict]:
+        # rows of the same pk in different chunks (queries join multi-valued relations)
+        if seen is None or not self.with_pk:
+            return values
+        result = []
+        for val in values:
+            pk = val[PK]
+            if pk in seen:
+                continue
+            seen.add(pk)
+            result.append(val)
+        return result
+
+    def _get_chunk_values(self, values: List[dict], seen: set = None) -> List[dict]:
+        self._reset_chunk()
+        self.set_values(self._dedup_chunk(values, seen))
+        if not self.values:
+            return []
+        self._resolve_recursion()
         return self.values
 
+    def _get_stream_params(self, chunk_size: int = None):
+        chunk_size = chunk_size or self.pref.orm_stream_chunk_size or 1000
+        fields = [PK, *self.fields] if self.with_pk else self.fields
+        values_qs = self.queryset.values(*fields, **self.expressions)
+        # only the pks (not the rows) are kept across chunks,
+        # and only for the queries with joins that may duplicate the rows
+        seen = set() if len(self.queryset.query.alias_map) > 1 else None
+        return chunk_size, values_qs, seen
+
+    def iter_values(self, chunk_size: int = None) -> Iterator[List[dict]]:
+        """
+        Iterate the values in chunks, the rows are fetched by the chunked cursor
+        (server-side cursor if the database support) and the related fields are queried per chunk,
+        so the memory is bounded by the chunk size instead of the result size
+        """
+        if self.queryset.query.is_empty():
+            return
+        if self.pk_orders:
+            # queryset of the given pk list, which is already in memory
+            values = self.get_values()
+            if values:
+                yield values
+            return
+        self.process_fields()
+        chunk_size, values_qs, seen = self._get_stream_params(chunk_size)
+        chunk = []
+        for val in values_qs.iterator(chunk_size=chunk_size):
+            chunk.append(val)
+            if len(chunk) < chunk_size:
+                continue
+            values = self._get_chunk_values(chunk, seen)
+            chunk = []
+            if values:
+                self.query_isolated_fields()
+                self.clear_pks()
+                yield values
+        if chunk:
+            values = self._get_chunk_values(chunk, seen)
+            if values:
+                self.query_isolated_fields()
+                self.clear_pks()
+                yield values
+
+    @classmethod
+    def _get_keyset_lookup(cls, qs) -> Optional[str]:
+        # the pk lookup to page the queryset ordered by pk after the last row, None for the other orderings
+        query = qs.query
+        if query.is_sliced:
+            return None
+        meta = query.get_meta()
+        ordering = list(query.order_by)
+        if not ordering and query.default_ordering:
+            ordering = list(meta.ordering or [])
+        if len(ordering) != 1 or not isinstance(ordering[0], str):
+            return None
+        name = ordering[0]
+        if name.lstrip("-") not in (PK, meta.pk.name, meta.pk.attname):
+            return None
+        return "pk__lt" if name.startswith("-") else "pk__gt"
+
+    async def _aiter_chunks(self, values_qs, chunk_size: int):
+        if isinstance(values_qs, AwaitableQuerySet) and values_qs.support_pure_async:
+            # async database drivers fetch all the result of a statement, use paged queries
+            if not values_qs.ordered and not values_qs.query.is_sliced:
+                values_qs = values_qs.order_by(PK)
+            lookup = self._get_keyset_lookup(values_qs) if self.with_pk else None
+            if lookup:
+                # keyset pages of the unique pk ordering: each query reads only its chunk,
+                # and the rows are not skipped or duplicated by the writes during the stream
+                qs = values_qs
+                while True:
+                    chunk = await qs[:chunk_size].result()
+                    if not chunk:
+                        break
+                    # the pk may be removed from the values after the chunk is consumed
+                    last = chunk[-1][PK]
+                    yield chunk
+                    if len(chunk) < chunk_size:
+                        break
+                    qs = values_qs.filter(**{lookup: last})
+                return
+            # the orderings that are not unique fall back to the offset pages
+            offset = 0
+            while True:
+                chunk = await values_qs[offset: offset + chunk_size].result()
+                if chunk:
+                    yield chunk
+                if len(chunk) < chunk_size:
+                    break
+                offset += chunk_size
+            return
+        if not hasattr(values_qs, "aiterator"):
+            # compat django < 4.1
+            yield [val async for val in values_qs]
+            return
+        chunk = []
+        async for val in values_qs.aiterator(chunk_size=chunk_size):
+            chunk.append(val)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def aiter_values(self, chunk_size: int = None) -> AsyncIterator[List[dict]]:
+        if self.queryset.query.is_empty():
+            return
+        if self.pk_orders:
+            values = await self.get_values()
+            if values:
+                yield values
+            return
+        self.process_fields()
+        chunk_size, values_qs, seen = self._get_stream_params(chunk_size)
+        async for chunk in self._aiter_chunks(values_qs, chunk_size):
+            values = self._get_chunk_values(chunk, seen)
+            if values:
+                await self.async_query_isolated_fields()
+                self.clear_pks()
+                yield values
+
+    @property
+    def plan_key(self):
+        key = super().plan_key
+        if key is None:
+            return None
+        # the sum expressions are processed differently for the sliced queryset
+        return (*key, self.queryset.query.is_sliced)
+
+    def get_plan(self) -> dict:
+        forced = self.context.force_expressions or {}
+        return dict(
+            super().get_plan(),
+            pk_fields=frozenset(self.pk_fields),
+            fields=tuple(self.fields),
+            expressions={k: v for k, v in self.expressions.items() if k not in forced},
+            annotation_aliases=dict(self.annotation_aliases),
+            isolated_fields=dict(self.isolated_fields),
+        )
+
+    def apply_plan(self, plan: dict):
+        super().apply_plan(plan)
+        self.pk_fields = set(plan["pk_fields"])
+        self.fields = list(plan["fields"])
+        for name, expr in plan["expressions"].items():
+            self.expressions.setdefault(name, expr)
+        self.annotation_aliases = dict(plan["annotation_aliases"])
+        self.isolated_fields = dict(plan["isolated_fields"])
+
     def handle_isolated_field(self, field: ParserQueryField, e: Exception):
         prepend = (
             f"{self.parser.name}[{self.parser.model.model}] "
@@ -423,7 +605,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             # we need to serialize its value first
 
             if field.is_sub_relation:
-                pk_map = {str(pk): pk for pk in pk_list}
+                pk_map = {pk: pk for pk in pk_list}
 
             elif field.model_field.is_2o:
                 f, c = field.model_field.reverse_lookup
@@ -451,8 +633,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
                     if rel is not None:
                         pk_map.setdefault(val[PK], []).append(rel)
 
-        # convert pk_map to str key
-        pk_map = {str(k): v for k, v in pk_map.items()}
+        pk_map, str_keys = self.normalize_pk_keys(pk_map)
 
         if field.related_schema:
             related_pks = set()
@@ -491,7 +672,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
 
             # insert values
             for val in self.values:
-                rel = pk_map.get(str(val[PK]))
+                rel = pk_map.get(str(val[PK]) if str_keys else val[PK])
                 if rel is None:
                     val[key] = [] if field.related_single is False else None
                     # set to a deterministic value instead of its original query value
@@ -520,7 +701,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
         else:
             # common value / expression value is all user need
             for val in self.values:
-                rel = pk_map.get(str(val[PK]))
+                rel = pk_map.get(str(val[PK]) if str_keys else val[PK])
                 if rel is None and field.related_single is False:
                     rel = []
                 val.setdefault(key, rel)  # even for None value
@@ -553,6 +734,18 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             lst.append(pk)
         return lst
 
+    def normalize_pk_keys(self, pk_map: dict) -> Tuple[dict, bool]:
+        """
+        The keys from query results are the pk values already, so the map is used as-is,
+        only a map with keys of other types (like str keys returned by a field function) is
+        converted to str keys, return the map and whether the lookup pk should be converted to str
+        """
+        pk_types = self.pk_types
+        for k in pk_map:
+            if type(k) not in pk_types:
+                return {str(k): v for k, v in pk_map.items()}, True
+        return pk_map, False
+
     def normalize_pk_map(self, pk_map: dict, pk_only: bool = True):
         if not isinstance(pk_map, dict):
             raise TypeError(f"Invalid pk map: {pk_map}, must be a dict")
@@ -561,9 +754,9 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             if pk_only:
                 lst = self.normalize_pk_list(value)
                 if lst:
-                    result[str(k)] = lst
+                    result[k] = lst
             else:
-                result[str(k)] = value
+                result[k] = value
         return result
 
     async def async_normalize_pk_map(self, pk_map: dict, pk_only: bool = True):
@@ -574,9 +767,9 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             if pk_only:
                 lst = await self.async_normalize_pk_list(value)
                 if lst:
-                    result[str(k)] = lst
+                    result[k] = lst
             else:
-                result[str(k)] = value
+                result[k] = value
         return result
 
     # @awaitable(query_isolated_field)
@@ -686,7 +879,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
             if field.is_sub_relation:
                 # fixme: async backend may not fetch pk along with one-to-rel
 
-                pk_map = {str(pk): pk for pk in pk_list}
+                pk_map = {pk: pk for pk in pk_list}
 
             elif field.model_field.is_2o:
                 f, c = field.model_field.reverse_lookup
@@ -713,7 +906,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
                     if rel is not None:
                         pk_map.setdefault(val[PK], []).append(rel)
 
-        pk_map = {str(k): v for k, v in pk_map.items()}
+        pk_map, str_keys = self.normalize_pk_keys(pk_map)
 
         if field.related_schema:
             related_pks = set()
@@ -751,7 +944,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
 
             # insert values
             for val in self.values:
-                rel = pk_map.get(str(val[PK]))
+                rel = pk_map.get(str(val[PK]) if str_keys else val[PK])
                 if rel is None:
                     val[key] = [] if field.related_single is False else None
                     # set to a deterministic value instead of its original query value
@@ -779,7 +972,7 @@ class DjangoQueryCompiler(BaseQueryCompiler):
         else:
             # common value / expression value is all user need
             for val in self.values:
-                rel = pk_map.get(str(val[PK]))
+                rel = pk_map.get(str(val[PK]) if str_keys else val[PK])
                 if rel is None and field.related_single is False:
                     rel = []
                 val.setdefault(key, rel)  # even for None value
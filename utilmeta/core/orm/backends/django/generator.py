@@ -4,9 +4,10 @@ from . import expressions as exp
 from ..base import ModelFieldAdaptor
 from utilmeta.core.orm.fields.filter import ParserFilter
 from utilmeta.core.orm.fields.order import Order
-from django.db import models
+from django.db import models, connections
 from django.db.models import Q
-from utilmeta.utils import multi
+from utilmeta.utils import multi, exceptions
+from functools import reduce
 from utilmeta.utils.error import Error
 import warnings
 from utilmeta.core.orm.generator import BaseQuerysetGenerator
@@ -47,12 +48,62 @@ class DjangoQuerysetGenerator(BaseQuerysetGenerator):
 
     def get_queryset(self, base=None) -> models.QuerySet:
         qs = self._get_unsliced_qs(base)
+        if self.cursor is not None:
+            if not any(key[0] == "pk" for key in self.cursor_keys):
+                # make the ordering deterministic for the keyset pagination
+                self.cursor_keys.append(("pk", False, None, False))
+                self.orders.append("pk")
+            if self.cursor:
+                qs = qs.filter(self.get_cursor_q(db=qs.db))
         if self.orders:
             qs = qs.order_by(*self.orders)
         if self.slice and not qs.query.is_sliced:
             qs = qs[self.slice]
         return qs
 
+    def get_cursor_q(self, db: str = None) -> Q:
+        # lexicographic "after" predicate of the cursor values:
+        # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... (> is replaced by < for descending keys)
+        keys = self.cursor_keys
+        if len(self.cursor) != len(keys):
+            raise exceptions.BadRequest(f"Invalid cursor: ordering keys mismatch")
+        nulls_largest = connections[db or "default"].features.nulls_order_largest
+        terms = []
+        equals = Q()
+        for (name, desc, nulls_first, nullable), value in zip(keys, self.cursor):
+            if nullable and nulls_first is None:
+                # the default nulls ordering of the database
+                nulls_first = nulls_largest == desc
+            if value is None:
+                after = Q(**{f"{name}__isnull": False}) if nulls_first else None
+                equal = Q(**{f"{name}__isnull": True})
+            else:
+                after = Q(**{f"{name}__lt" if desc else f"{name}__gt": value})
+                if nullable and not nulls_first:
+                    after |= Q(**{f"{name}__isnull": True})
+                equal = Q(**{name: value})
+            if after is not None:
+                terms.append(equals & after)
+            equals &= equal
+        if not terms:
+            # the cursor is at the end
+            return Q(pk__in=[])
+        q = reduce(lambda x, y: x | y, terms)
+        name, desc, nulls_first, nullable = keys[0]
+        value = self.cursor[0]
+        if value is not None and not nullable:
+            # a range on the leading key, so the index of the key can be used
+            q = Q(**{f"{name}__lte" if desc else f"{name}__gte": value}) & q
+        return q
+
+    def get_cursor_rows(self, base=None) -> list:
+        qs = self.get_queryset(base)
+        return list(qs.values_list(*[key[0] for key in self.cursor_keys]))
+
+    async def aget_cursor_rows(self, base=None) -> list:
+        qs = self.get_queryset(base)
+        return [row async for row in qs.values_list(*[key[0] for key in self.cursor_keys])]
+
     def count(self, base=None) -> int:
         qs = self._get_unsliced_qs(base)
         return qs.count()
@@ -108,6 +159,15 @@ class DjangoQuerysetGenerator(BaseQuerysetGenerator):
             self._add_annotate(name, field.field)
         name = field.query_name or name
         desc = flag < 0
+        nulls_first = None
+        if order.nulls_first or order.nulls_last:
+            nulls_first = bool(order.nulls_first)
+        self.cursor_keys.append((
+            "pk" if field.is_pk else name,
+            desc,
+            nulls_first,
+            field.is_nullable and not order.notnull
+        ))
         if order.nulls_first or order.nulls_last:
             f = exp.F(name)
             if desc:
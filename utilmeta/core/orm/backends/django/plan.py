@@ -0,0 +1,140 @@
+from django.db.models import sql
+from django.db.models.expressions import Col, Subquery
+from django.db.models.sql.where import WhereNode, AND, OR
+from django.core.exceptions import EmptyResultSet
+from typing import List, Tuple, Optional
+
+try:
+    from django.core.exceptions import FullResultSet
+except ImportError:
+    # django < 4.2
+    class FullResultSet(Exception):
+        pass
+
+
+__all__ = ["SQLTemplate", "get_query_shape"]
+
+# derived from the other attributes of the query
+DERIVED_ATTRS = ("where", "_annotation_select_cache", "_extra_select_cache")
+
+
+class UnsupportedShape(Exception):
+    pass
+
+
+def _freeze(value):
+    if value is None or isinstance(value, (str, int, float, bool, bytes, type)):
+        return value
+    if isinstance(value, dict):
+        return tuple((key, _freeze(val)) for key, val in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(val) for val in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(val) for val in value)
+    if type(value) is Col:
+        # the most common expression, skip the costly identity
+        return Col, value.alias, value.target, value.output_field
+    if isinstance(value, (sql.Query, Subquery)):
+        # the values of the subqueries are part of the shape
+        # (Subquery is not comparable by the content like the other expressions)
+        return type(value), _freeze(value.__dict__)
+    if type(value).__hash__ is None or type(value).__hash__ is object.__hash__:
+        # not comparable by the content
+        raise UnsupportedShape(value)
+    hash(value)
+    return value
+
+
+def _where_shape(node: WhereNode, leaves: list):
+    if node.connector not in (AND, OR):
+        # like XOR, which may be rewritten by the compiler with the leaves duplicated
+        raise UnsupportedShape(node.connector)
+    children = []
+    for child in node.children:
+        if isinstance(child, WhereNode):
+            children.append(_where_shape(child, leaves))
+        else:
+            leaves.append(child)
+            rhs = getattr(child, "rhs", None)
+            # the IN lookups of different sizes are compiled to different placeholders
+            size = len(rhs) if isinstance(rhs, (list, tuple, set, frozenset)) else None
+            children.append((type(child), size))
+    return node.connector, node.negated, tuple(children)
+
+
+def get_query_shape(query: sql.Query) -> Tuple[Optional[tuple], list]:
+    """
+    Get the shape of the query and the leaves (lookups) of the where clause,
+    the shape is everything of the query except the values of the filters,
+    return (None, []) if the query shape cannot be reused
+    """
+    where = query.where
+    if query.combinator or where.contains_aggregate or where.contains_over_clause:
+        # the filters of the aggregates are compiled into HAVING / QUALIFY
+        return None, []
+    leaves = []
+    try:
+        where_shape = _where_shape(where, leaves)
+        rest = _freeze({key: val for key, val in query.__dict__.items() if key not in DERIVED_ATTRS})
+    except (UnsupportedShape, TypeError):
+        return None, []
+    return (type(query), where_shape, rest), leaves
+
+
+class SQLTemplate:
+    """
+    The compiled SQL of a query shape, params = prefix + <params of the where leaves> + suffix
+    """
+
+    def __init__(self, sql_str: str, prefix: tuple, suffix: tuple, leaves: Tuple[str, ...]):
+        self.sql = sql_str
+        self.prefix = prefix
+        self.suffix = suffix
+        self.leaves = leaves
+
+    @classmethod
+    def compile_leaves(cls, compiler, leaves: list) -> Tuple[List[str], list]:
+        # raise EmptyResultSet / FullResultSet if the leaf is eliminated by the compiler
+        sqls = []
+        params = []
+        for leaf in leaves:
+            leaf_sql, leaf_params = compiler.compile(leaf)
+            sqls.append(leaf_sql)
+            params.extend(leaf_params)
+        return sqls, params
+
+    @classmethod
+    def build(cls, compiler, leaves: list, sql_str: str, params) -> Optional["SQLTemplate"]:
+        """
+        Build the template from the compiled query, return None if the params of the filters
+        cannot be located in the params of the query
+        """
+        try:
+            leaf_sqls, where_params = cls.compile_leaves(compiler, leaves)
+        except (EmptyResultSet, FullResultSet):
+            return None
+        params = tuple(params)
+        size = len(where_params)
+        if not size:
+            return cls(sql_str, params, (), tuple(leaf_sqls))
+        positions = [
+            i for i in range(len(params) - size + 1) if list(params[i: i + size]) == where_params
+        ]
+        if len(positions) != 1:
+            # not contiguous, or ambiguous with the other params
+            return None
+        pos = positions[0]
+        return cls(sql_str, params[:pos], params[pos + size:], tuple(leaf_sqls))
+
+    def bind(self, compiler, leaves: list) -> Optional[Tuple[str, tuple]]:
+        """
+        Compile the leaves of the where clause only, return None if the compiled leaves
+        differ from the template (like the IN lookups with a different number of values)
+        """
+        try:
+            leaf_sqls, where_params = self.compile_leaves(compiler, leaves)
+        except (EmptyResultSet, FullResultSet):
+            return None
+        if tuple(leaf_sqls) != self.leaves:
+            return None
+        return self.sql, (*self.prefix, *where_params, *self.suffix)
@@ -18,6 +18,9 @@ from django.db.models import sql
 from django.core.exceptions import EmptyResultSet
 from django.db.models.sql.compiler import SQLUpdateCompiler, SQLCompiler
 from ...databases import DatabaseConnections
+from ...plan import query_plans
+from .plan import SQLTemplate, get_query_shape
+from utilmeta.conf import Preference
 from .expressions import Ref, Value
 import django
 from datetime import date, time, timedelta, datetime
@@ -579,6 +582,34 @@ class AwaitableQuerySet(QuerySet):
     def compiler(self):
         return self.query.get_compiler(self.db)
 
+    def get_sql(self) -> Tuple[str, tuple]:
+        """
+        Compile the query to (sql, params), the SQL templates are cached by the query shape,
+        so the repeated queries of the same shape only compile the filters to bind the params
+        """
+        compiler = self.compiler
+        if not Preference.get().orm_query_plan_cache_size:
+            return compiler.as_sql()
+        shape, leaves = get_query_shape(self.query)
+        if shape is None:
+            query_plans.template_bypasses += 1
+            return compiler.as_sql()
+        key = (self.db, self.model, shape)
+        template: Optional[SQLTemplate] = query_plans.get_template(key)
+        if template is not None:
+            bound = template.bind(compiler, leaves)
+            if bound is not None:
+                query_plans.template_hits += 1
+                return bound
+        query_plans.template_misses += 1
+        q, params = compiler.as_sql()
+        template = SQLTemplate.build(self.query.get_compiler(self.db), leaves, q, params)
+        if template is None:
+            query_plans.template_bypasses += 1
+        else:
+            query_plans.set_template(key, template)
+        return q, params
+
     def _convert_raw_values(self, values, query):
         names = [
             *query.extra_select,
@@ -700,9 +731,8 @@ class AwaitableQuerySet(QuerySet):
     async def result(self, one: bool = False):
         # usage:
         # result = await model.objects.values(*fields, *exps).result()
-        compiler = self.compiler
         try:
-            q, params = compiler.as_sql()
+            q, params = self.get_sql()
         except EmptyResultSet:
             return None if one else []
         db = self.database
@@ -1,7 +1,8 @@
 from .parser import SchemaClassParser
 from .fields.field import ParserQueryField
 from .context import QueryContext
-from typing import List, Any, Dict, Tuple, Type, Union, TYPE_CHECKING
+from .plan import query_plans
+from typing import List, Any, Dict, Tuple, Type, Union, Iterator, AsyncIterator, TYPE_CHECKING
 from utilmeta.utils import awaitable
 from utilmeta.conf import Preference
 from utype import unprovided, Options, Schema
@@ -128,6 +129,7 @@ class BaseQueryCompiler:
         self.pk_map = {}
         self.pk_orders = []
         self.pk_list = []
+        self.pk_types = set()
         # self.recursively = False
         self.values: List[dict] = []
         self.pref = Preference.get()
@@ -274,7 +276,39 @@ class BaseQueryCompiler:
         if field.related_schema:
             self.recursively = True
 
+    @property
+    def plan_key(self):
+        """
+        Key of the field plan, the fields in scope are determined by the keys of includes / excludes,
+        return None if the plan cannot be cached
+        """
+        if not self.pref.orm_query_plan_cache_size:
+            return None
+        try:
+            includes = frozenset(self.context.includes) if self.context.includes else None
+            excludes = frozenset(self.context.excludes) if self.context.excludes else None
+            forced = frozenset(self.context.force_expressions or ())
+        except TypeError:
+            return None
+        return self.parser.obj, self.__class__, includes, excludes, forced
+
+    def get_plan(self) -> dict:
+        # the state resolved by process_fields
+        return dict(recursively=self.recursively)
+
+    def apply_plan(self, plan: dict):
+        self.recursively = plan["recursively"]
+
     def process_fields(self):
+        key = self.plan_key
+        plan = query_plans.get_plan(key)
+        if plan is not None:
+            self.apply_plan(plan)
+            return
+        self.process_scoped_fields()
+        query_plans.set_plan(key, self.get_plan())
+
+    def process_scoped_fields(self):
         for name, field in self.parser.fields.items():
             if not isinstance(field, ParserQueryField):
                 continue
@@ -296,6 +330,12 @@ class BaseQueryCompiler:
     async def get_values(self) -> List[dict]:
         raise NotImplementedError
 
+    def iter_values(self, chunk_size: int = None) -> Iterator[List[dict]]:
+        raise NotImplementedError
+
+    def aiter_values(self, chunk_size: int = None) -> AsyncIterator[List[dict]]:
+        raise NotImplementedError
+
     def process_data(
         self, data: dict, with_relations: bool = None
     ) -> Tuple[dict, dict, dict]:
@@ -0,0 +1,170 @@
+from utype import Options, unprovided
+from utype.parser.rule import LogicalType, Rule
+from utype.parser.cls import ClassParser
+from utype.parser.field import ParserField
+from typing import Callable, Optional, List, Tuple, Any, Type, TYPE_CHECKING
+from typing import ForwardRef
+
+if TYPE_CHECKING:
+    from .schema import Schema
+
+__all__ = ["RowConverter", "get_type_checker"]
+
+TypeChecker = Callable[[Any], bool]
+
+
+def _exact(t: type) -> TypeChecker:
+    return lambda v: type(v) is t
+
+
+def get_type_checker(t) -> Optional[TypeChecker]:
+    """
+    Compile a checker of the values that already satisfy the type [t] (under ignore_constraints),
+    return None if the type cannot be checked without parsing (like the custom rules and forward refs)
+    """
+    if t is None:
+        # Any
+        return lambda v: True
+    if t is type(None):
+        return lambda v: v is None
+    if isinstance(t, (ForwardRef, str)):
+        return None
+    if isinstance(t, LogicalType):
+        combinator = getattr(t, "__combinator__", None)
+        if combinator:
+            if combinator != "|" or not t.__args__:
+                return None
+            checkers = [get_type_checker(arg) for arg in t.__args__]
+            if any(c is None for c in checkers):
+                return None
+            return lambda v: any(c(v) for c in checkers)
+        if not isinstance(t, type) or not issubclass(t, Rule):
+            return None
+        origin = getattr(t, "__origin__", None)
+        args = getattr(t, "__args__", None)
+        if origin is None:
+            return None
+        if not args:
+            return get_type_checker(origin)
+        if origin is list and len(args) == 1:
+            item = get_type_checker(args[0])
+            if item is None:
+                return None
+            return lambda v: type(v) is list and all(item(i) for i in v)
+        if origin is dict and len(args) == 2:
+            key = get_type_checker(args[0])
+            val = get_type_checker(args[1])
+            if key is None or val is None:
+                return None
+            return lambda v: type(v) is dict and all(key(k) and val(i) for k, i in v.items())
+        return None
+    if isinstance(t, type):
+        if isinstance(getattr(t, "__parser__", None), ClassParser):
+            # (related) schema instances serialized by their own schema
+            return lambda v: isinstance(v, t)
+        return _exact(t)
+    return None
+
+
+class RowConverter:
+    """
+    Precompiled converter of the trusted rows to the Schema instances,
+    the rows are the values of the typed database columns (converted by the database converters),
+    so the values already of the field type are taken as is, and only the others are parsed,
+    the field aliases, defaults, no-input fields and the additions are handled as the utype parser does
+    """
+
+    def __init__(self, schema_cls: Type["Schema"], options: Options):
+        self.schema_cls = schema_cls
+        self.parser: ClassParser = schema_cls.__parser__
+        self.options = options
+        # (output name, parser field, aliases, type checker, static no input)
+        self.fields: List[Tuple[str, ParserField, tuple, Optional[TypeChecker], Optional[bool]]] = []
+        self.used_aliases = set()
+
+        for key, field in self.parser.fields.items():
+            checker = None
+            if not field.discriminator_map and not field.field.deprecated:
+                checker = get_type_checker(field.type)
+            no_input = None if callable(field.no_input) else field.is_no_input(None, options)
+            aliases = tuple(field.all_aliases)
+            self.fields.append((field.name, field, aliases, checker, no_input))
+            self.used_aliases.update(aliases)
+
+        # keep the additions as is if no type or exclusion applies
+        self.raw_addition = bool(
+            options.addition is True and not self.parser.addition_type and not self.parser.exclude_vars
+        )
+
+    @classmethod
+    def supported(cls, schema_cls: Type["Schema"], options: Options) -> bool:
+        parser: ClassParser = getattr(schema_cls, "__parser__", None)
+        if not isinstance(parser, ClassParser):
+            return False
+        if getattr(parser, "init_parser", None):
+            # custom __init__
+            return False
+        return bool(
+            options.ignore_constraints
+            and not options.max_params
+            and not options.min_params
+            and not parser.case_insensitive_names
+        )
+
+    def _default(self, field: ParserField, result: dict, name: str):
+        default = field.get_default(self.options, defer=False)
+        if not unprovided(default):
+            result[name] = default
+
+    def convert(self, data: dict, context) -> Optional[dict]:
+        # return None to fallback to the full parsing
+        result = {}
+        options = self.options
+        ignore_conflicts = options.ignore_alias_conflicts
+        for name, field, aliases, checker, no_input in self.fields:
+            value = unprovided
+            for alias in aliases:
+                if alias in data:
+                    if unprovided(value):
+                        value = data[alias]
+                        if ignore_conflicts:
+                            break
+                    elif data[alias] != value:
+                        return None
+            if unprovided(value):
+                self._default(field, result, name)
+                continue
+            if no_input is None:
+                no_input = field.is_no_input(value, options)
+            if no_input:
+                self._default(field, result, name)
+                continue
+            if checker is None or not checker(value):
+                value = field.parse_value(value, context=context)
+                if unprovided(value):
+                    continue
+            result[name] = value
+
+        if options.addition is not None:
+            for key, value in data.items():
+                if key in self.used_aliases:
+                    continue
+                if not self.raw_addition:
+                    value = self.parser.parse_addition(key, value, context=context)
+                    if unprovided(value):
+                        continue
+                result[key] = value
+        return result
+
+    def __call__(self, data: dict) -> "Schema":
+        cls = self.schema_cls
+        context = self.options.make_context(cls)
+        values = self.convert(data, context)
+        if values is None:
+            return cls.__from__(data, self.options)
+        context.raise_error()
+        inst = cls.__new__(cls)
+        inst.__context__ = context
+        self.parser.set_attributes(values, inst, options=context.options)
+        cls.__post_init__(inst, values, context)
+        return inst
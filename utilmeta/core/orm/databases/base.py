@@ -1,7 +1,8 @@
-from typing import Type, TYPE_CHECKING, List, Tuple
+from typing import Type, TYPE_CHECKING, List, Tuple, Callable
 
 from utilmeta.utils import cached_property, detect_package_manager, requires, exceptions
 import os
+import warnings
 
 if TYPE_CHECKING:
     from .config import Database
@@ -10,11 +11,31 @@ if TYPE_CHECKING:
 class BaseDatabaseAdaptor:
     asynchronous = False
     DEFAULT_ENGINES = {}
+    # listeners of the executed queries: (alias, sql, duration_ms, rows, error)
+    # used by query instrumentation like the operations query logs
+    query_listeners: List[Callable] = []
 
     def __init__(self, config: "Database", alias: str = None):
         self.config = config
         self.alias = alias
 
+    @classmethod
+    def add_query_listener(cls, listener: Callable):
+        if listener not in BaseDatabaseAdaptor.query_listeners:
+            BaseDatabaseAdaptor.query_listeners.append(listener)
+
+    @classmethod
+    def remove_query_listener(cls, listener: Callable):
+        if listener in BaseDatabaseAdaptor.query_listeners:
+            BaseDatabaseAdaptor.query_listeners.remove(listener)
+
+    def report_query(self, sql: str, duration: float, rows: int = None, error: Exception = None):
+        for listener in self.query_listeners:
+            try:
+                listener(self.alias, sql, duration, rows, error)
+            except Exception as e:  # noqa
+                warnings.warn(f"{self.__class__.__name__}: query listener {listener} failed: {e}")
+
     def get_engine(self):
         if "." in self.config.engine:
             return self.config.engine
@@ -3,6 +3,7 @@ import inspect
 from .base import BaseDatabaseAdaptor
 from typing import Mapping, TYPE_CHECKING
 import re
+import time
 from utilmeta.utils import requires, json_dumps
 
 if TYPE_CHECKING:
@@ -267,26 +268,46 @@ class EncodeDatabasesAsyncAdaptor(BaseDatabaseAdaptor):
         else:
             raise ValueError(f"Invalid params: {params}")
 
+    async def _query(self, func, sql, params=None, count_rows=None):
+        if not self.query_listeners:
+            return await func(sql, params)
+        start = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = await func(sql, params)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.report_query(
+                sql,
+                duration=(time.perf_counter() - start) * 1000,
+                rows=count_rows(result) if count_rows and error is None else None,
+                error=error
+            )
+
     async def execute(self, sql, params=None):
         db = await self.connect()  # lazy connect
         sql, params = self._parse_sql_params(sql, params)
-        return await db.execute(sql, params)
+        return await self._query(db.execute, sql, params)
 
     async def execute_many(self, sql, params: list):
         db = await self.connect()  # lazy connect
-        return await db.execute_many(sql, params)
+        return await self._query(db.execute_many, sql, params, count_rows=lambda _: len(params))
 
     async def fetchone(self, sql, params=None):
         db = await self.connect()  # lazy connect
         sql, params = self._parse_sql_params(sql, params)
-        r = await db.fetch_one(sql, params)
+        r = await self._query(db.fetch_one, sql, params, count_rows=lambda res: 1 if res else 0)
         return dict(r._mapping) if r else None
 
     async def fetchall(self, sql, params=None):
         db = await self.connect()  # lazy connect
         # db = self.get_db()
         sql, params = self._parse_sql_params(sql, params)
-        values = await db.fetch_all(sql, params)
+        values = await self._query(db.fetch_all, sql, params, count_rows=lambda res: len(res or []))
         return [dict(val._mapping) for val in values] if values else []
 
     def transaction(self, savepoint=None, isolation=None, force_rollback: bool = False):
@@ -2,5 +2,5 @@ from .field import QueryField as Field
 from .order import OrderBy, Order
 from .filter import Filter
 from .search import Search
-from .pagination import Page, Offset, Limit
+from .pagination import Page, Offset, Limit, Cursor
 from .scope import Scope
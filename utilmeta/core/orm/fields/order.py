@@ -1,4 +1,5 @@
 import warnings
+from copy import copy
 from utype import Field
 from utype.parser.field import ParserField
 from utype.types import *
@@ -103,38 +104,47 @@ class ParserOrderBy(ParserField):
         self.desc_prefix: str = "-"
 
         if isinstance(model, ModelAdaptor) and isinstance(self.field, OrderBy):
-            self.model = model
-            self.desc_prefix = self.field.desc_prefix
-
-            orders = {}
-            for key, order in self.field.orders.items():
-                field_name = order.field or key
-                field = model.get_field(field_name)
-                name = key if isinstance(key, str) else field.query_name
-                if not name:
-                    raise ValueError(f"Order field: {key} must have a valid name")
-                if field.is_exp:
-                    model.check_expressions(field.field)
-                else:
-                    model.check_order(field.query_name)
-                    if model.include_many_relates(field_name):
-                        warnings.warn(
-                            f"Order for {model} field <{field_name}> contains multiple value, "
-                            f"make sure that is what your expected"
-                        )
-
-                if order.asc:
-                    orders.setdefault(name, (order, field, 1))
-                if order.desc:
-                    orders.setdefault(self.desc_prefix + name, (order, field, -1))
-
-            self.orders = orders
-            self.type = enum_array(
-                list(orders),
-                item_type=str,
-                # name=f'{self.model.ident}.{self.name}.enum',
-                unique=True,
-            )
+            self.setup_model(model)
+
+    def reconstruct(self, model: "ModelAdaptor"):
+        # for the OrderBy inherited from a base query class that not specifying model
+        field = copy(self)
+        field.setup_model(model)
+        return field
+
+    def setup_model(self, model: "ModelAdaptor"):
+        self.model = model
+        self.desc_prefix = self.field.desc_prefix
+
+        orders = {}
+        for key, order in self.field.orders.items():
+            field_name = order.field or key
+            field = model.get_field(field_name)
+            name = key if isinstance(key, str) else field.query_name
+            if not name:
+                raise ValueError(f"Order field: {key} must have a valid name")
+            if field.is_exp:
+                model.check_expressions(field.field)
+            else:
+                model.check_order(field.query_name)
+                if model.include_many_relates(field_name):
+                    warnings.warn(
+                        f"Order for {model} field <{field_name}> contains multiple value, "
+                        f"make sure that is what your expected"
+                    )
+
+            if order.asc:
+                orders.setdefault(name, (order, field, 1))
+            if order.desc:
+                orders.setdefault(self.desc_prefix + name, (order, field, -1))
+
+        self.orders = orders
+        self.type = enum_array(
+            list(orders),
+            item_type=str,
+            # name=f'{self.model.ident}.{self.name}.enum',
+            unique=True,
+        )
 
     @property
     def schema_annotations(self):
@@ -1,4 +1,9 @@
+import base64
+import json
+from datetime import datetime, date, time
+from typing import Union
 from utype import Field, types
+from utilmeta.utils import exceptions
 
 
 class Page(Field):
@@ -35,3 +40,43 @@ class Limit(Field):
     @property
     def schema_annotations(self):
         return {"class": "limit"}
+
+
+class Cursor(Field):
+    """
+    Keyset (cursor) pagination: the token encodes the ordering keys of the last row of the previous page,
+    the next page is queried by (k1, k2, ...) > (v1, v2, ...) instead of an OFFSET
+    an empty token starts the cursor pagination from the first page
+    """
+    type = str
+
+    def __init__(self, required: bool = False, default=None, **kwargs):
+        super().__init__(**kwargs, required=required, default=default)
+
+    @classmethod
+    def _encode_value(cls, value):
+        # keep the full precision of the keys (like the microseconds and timezone of datetime)
+        if isinstance(value, (datetime, date, time)):
+            return value.isoformat()
+        return str(value)
+
+    @classmethod
+    def encode(cls, values: Union[list, tuple]) -> str:
+        data = json.dumps(list(values), default=cls._encode_value, separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> list:
+        if not token:
+            return []
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        except (ValueError, TypeError) as e:
+            raise exceptions.BadRequest(f"Invalid cursor: {repr(token)}") from e
+        if not isinstance(values, list):
+            raise exceptions.BadRequest(f"Invalid cursor: {repr(token)}")
+        return values
+
+    @property
+    def schema_annotations(self):
+        return {"class": "cursor"}
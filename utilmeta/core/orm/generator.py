@@ -1,9 +1,9 @@
 from .parser import QueryClassParser
 from .fields.filter import ParserFilter
 from .fields.order import Order, ParserOrderBy
-from .fields.pagination import Page, Limit, Offset
+from .fields.pagination import Page, Limit, Offset, Cursor
 from .fields.scope import Scope
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, Tuple
 from .context import QueryContext
 from utilmeta.utils import multi
 from utilmeta.conf import Preference
@@ -38,6 +38,10 @@ class BaseQuerysetGenerator:
         self.page = None
         self.limit = None
         self.offset = None
+        # decoded cursor values, [] for the first page of the cursor pagination
+        self.cursor = None
+        # (name, desc, nulls_first, nullable) of the ordering keys
+        self.cursor_keys = []
         self.includes = None
         self.excludes = None
 
@@ -64,8 +68,54 @@ class BaseQuerysetGenerator:
         kwargs.update(includes=self.includes, excludes=self.excludes, using=self.using)
         return QueryContext(**kwargs)
 
+    def get_cursor_rows(self, base=None) -> list:
+        # the ordering keys of the rows in the current page, pk is included
+        raise NotImplementedError
+
+    async def aget_cursor_rows(self, base=None) -> list:
+        raise NotImplementedError
+
+    @property
+    def cursor_pk_index(self) -> int:
+        for i, key in enumerate(self.cursor_keys):
+            if key[0] == "pk":
+                return i
+        return -1
+
+    def _get_cursor_page(self, rows: list) -> Tuple[list, Optional[str]]:
+        if self.cursor is None:
+            raise ValueError(f"{self.parser.obj}: cursor pagination is not used")
+        index = self.cursor_pk_index
+        return [row[index] for row in rows], self.encode_cursor(rows)
+
+    def get_cursor_page(self, base=None) -> Tuple[list, Optional[str]]:
+        # the pks of the page and the cursor of the next page, derived from the same fetched rows
+        return self._get_cursor_page(self.get_cursor_rows(base))
+
+    async def aget_cursor_page(self, base=None) -> Tuple[list, Optional[str]]:
+        return self._get_cursor_page(await self.aget_cursor_rows(base))
+
+    def get_next_cursor(self, base=None) -> Optional[str]:
+        # the values are processed with the queryset
+        return self.encode_cursor(self.get_cursor_rows(base))
+
+    async def aget_next_cursor(self, base=None) -> Optional[str]:
+        return self.encode_cursor(await self.aget_cursor_rows(base))
+
+    def encode_cursor(self, rows: list) -> Optional[str]:
+        # rows: the ordering keys of the current page
+        if self.cursor is None or not rows:
+            return None
+        if not self.limit or len(rows) < self.limit:
+            # last page
+            return None
+        return Cursor.encode(rows[-1])
+
     @property
     def slice(self) -> slice:
+        if self.cursor is not None:
+            # the offset is replaced by the cursor predicate
+            return slice(0, self.limit) if self.limit else slice(0, None)
         offset = self.offset
         if offset is None:
             if self.page and self.limit:
@@ -107,6 +157,9 @@ class BaseQuerysetGenerator:
             self.offset = value
         elif isinstance(field.field, Limit):
             self.limit = value
+        elif isinstance(field.field, Cursor):
+            if value is not None:
+                self.cursor = field.field.decode(value)
         elif isinstance(field.field, Scope):
             if field.field.excluded:
                 self.excludes = field.field.parse_scope(value)
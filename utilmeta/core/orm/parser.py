@@ -1,12 +1,14 @@
 from utype.parser.cls import ClassParser
 from .fields.field import ParserQueryField
 from .fields.filter import ParserFilter
+from .fields.order import ParserOrderBy
 from utilmeta.core.orm import exceptions
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .compiler import BaseQueryCompiler
     from .generator import BaseQuerysetGenerator
+    from .converter import RowConverter
 
 
 class QueryClassParser(ClassParser):
@@ -19,6 +21,15 @@ class QueryClassParser(ClassParser):
         self.model = ModelAdaptor.dispatch(model) if model else None
         super().__init__(obj, *args, **kwargs)
 
+        if self.model:
+            for name in list(self.fields):
+                field = self.fields[name]
+                if isinstance(field, ParserOrderBy) and not field.model:
+                    # the order fields inherited from a base query class that not specifying model
+                    field = field.reconstruct(self.model)
+                    field.setup(self.options)
+                    self.fields[name] = field
+
     @property
     def kwargs(self):
         return dict(model=self.model)
@@ -82,11 +93,31 @@ class SchemaClassParser(ClassParser):
             #                                        f'requires to declare a primary key field (such as id)')
 
         self.pk_names = pk_names
+        self.row_converters = {}
 
     @property
     def kwargs(self):
         return dict(model=self.model)
 
+    def resolve_forward_refs(self, local_vars=None, ignore_errors: bool = True):
+        resolved = super().resolve_forward_refs(local_vars, ignore_errors=ignore_errors)
+        if resolved:
+            # the resolved fields may change the query plans and row converters
+            from .plan import query_plans
+            query_plans.invalidate(self.obj)
+            self.row_converters = {}
+        return resolved
+
+    def get_row_converter(self, options) -> "RowConverter":
+        # converters are compiled once per serialize options
+        key = str(options)
+        converter = self.row_converters.get(key)
+        if converter is None:
+            from .converter import RowConverter
+            self.resolve_forward_refs()
+            converter = self.row_converters.setdefault(key, RowConverter(self.obj, options))
+        return converter
+
     def get_compiler(self, queryset, context=None) -> "BaseQueryCompiler":
         if not self.model:
             raise exceptions.ModelRequired(
@@ -0,0 +1,137 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Hashable
+from utilmeta.conf import Preference
+
+__all__ = ["QueryPlanCache", "query_plans"]
+
+
+class QueryPlanCache:
+    """
+    Bounded LRU store of the compiled query plans (Preference.orm_query_plan_cache_size, 0 to disable)
+    - plans: the resolved field plan of the query compiler,
+      keyed by (schema class, compiler class, field scope, ...)
+    - templates: the SQL templates of the queries, keyed by (db alias, model, query shape),
+      the queries of the same shape only need to bind the filter parameters
+    the callers check the preference before using the cache,
+    the plans of a schema are invalidated when its forward refs are resolved,
+    call invalidate(schema_or_model) after altering the schema or model at runtime
+    """
+
+    def __init__(self, max_entries: int = None):
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.plans: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.templates: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+        self.plan_hits = 0
+        self.plan_misses = 0
+        self.template_hits = 0
+        self.template_misses = 0
+        # queries that the shape cannot be reused (like the filters with aggregates)
+        self.template_bypasses = 0
+        self.invalidations = 0
+
+    @property
+    def max_entries(self) -> int:
+        if self._max_entries is not None:
+            return self._max_entries
+        return Preference.get().orm_query_plan_cache_size or 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _get(self, store: OrderedDict, key):
+        with self._lock:
+            value = store.get(key)
+            if value is not None:
+                store.move_to_end(key)
+            return value
+
+    def _set(self, store: OrderedDict, key, value):
+        max_entries = self.max_entries
+        if max_entries <= 0:
+            return
+        with self._lock:
+            store[key] = value
+            store.move_to_end(key)
+            while len(store) > max_entries:
+                store.popitem(last=False)
+
+    def get_plan(self, key) -> Optional[Any]:
+        if key is None:
+            return None
+        plan = self._get(self.plans, key)
+        if plan is None:
+            self.plan_misses += 1
+        else:
+            self.plan_hits += 1
+        return plan
+
+    def set_plan(self, key, plan):
+        if key is None:
+            return
+        self._set(self.plans, key, plan)
+
+    def get_template(self, key) -> Optional[Any]:
+        if key is None:
+            return None
+        # the hits are counted by the caller after the template is bound
+        return self._get(self.templates, key)
+
+    def set_template(self, key, template):
+        if key is None:
+            return
+        self._set(self.templates, key, template)
+
+    def invalidate(self, target=None):
+        """
+        Invalidate the plans of a schema class, or the plans and templates of a model class,
+        invalidate all if target is None
+        """
+        if target is None:
+            return self.clear()
+        with self._lock:
+            plan_keys = []
+            for key in self.plans:
+                schema = key[0]
+                if schema is target:
+                    plan_keys.append(key)
+                    continue
+                parser = getattr(schema, "__parser__", None)
+                model = getattr(parser, "model", None)
+                if model is not None and model.model is target:
+                    plan_keys.append(key)
+            template_keys = [key for key in self.templates if key[1] is target]
+            for key in plan_keys:
+                self.plans.pop(key, None)
+            for key in template_keys:
+                self.templates.pop(key, None)
+            self.invalidations += len(plan_keys) + len(template_keys)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self.plans) + len(self.templates)
+            self.plans.clear()
+            self.templates.clear()
+
+    def get_stats(self) -> dict:
+        plan_requests = self.plan_hits + self.plan_misses
+        template_requests = self.template_hits + self.template_misses
+        return dict(
+            max_entries=self.max_entries,
+            plans=len(self.plans),
+            plan_hits=self.plan_hits,
+            plan_misses=self.plan_misses,
+            plan_hit_rate=round(self.plan_hits / plan_requests, 4) if plan_requests else 0,
+            templates=len(self.templates),
+            template_hits=self.template_hits,
+            template_misses=self.template_misses,
+            template_bypasses=self.template_bypasses,
+            template_hit_rate=round(self.template_hits / template_requests, 4) if template_requests else 0,
+            invalidations=self.invalidations,
+        )
+
+
+query_plans = QueryPlanCache()
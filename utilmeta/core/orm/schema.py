@@ -8,8 +8,11 @@ from .parser import SchemaClassParser, QueryClassParser
 from utilmeta.core.orm import exceptions
 from utilmeta.utils.exceptions import BadRequest
 from .context import QueryContext
+from .converter import RowConverter
+from functools import partial
 from .fields.field import ParserQueryField
-from utype.types import ForwardRef, Type, List, Union, Callable
+from utype.types import ForwardRef, Type, List, Union, Callable, Optional, Tuple
+from typing import Iterator, AsyncIterator
 
 
 T = TypeVar("T")
@@ -32,6 +35,9 @@ class Schema(utype.Schema):
     __parser__: SchemaClassParser
     __field__ = req.Body
     __model__ = None
+    # trust the queried rows (values of the typed database columns) and convert them
+    # by the precompiled row converter instead of the full parsing, None to use the preference
+    __trusted_source__: Optional[bool] = None
 
     def __class_getitem__(cls: T, item) -> T:
         k = (cls, item)
@@ -127,6 +133,16 @@ class Schema(utype.Schema):
             context.integrity_error_cls = cls.__integrity_error_cls__
         return cls.__parser__.get_compiler(qs, context=context)
 
+    @classmethod
+    def _get_converter(cls, compiler) -> Callable[[dict], "Schema"]:
+        options = compiler.serialize_options
+        trusted = cls.__trusted_source__
+        if trusted is None:
+            trusted = compiler.pref.orm_default_trusted_source
+        if trusted and RowConverter.supported(cls, options):
+            return cls.__parser__.get_row_converter(options)
+        return partial(cls.__from__, options=options)
+
     @classmethod
     def _get_relational_update_cls(cls, field: str, mode: Union[str, utype.Options]):
         # class RoleSchema(orm.Schema[Member]):
@@ -242,20 +258,40 @@ class Schema(utype.Schema):
     def serialize(cls: Type[T], queryset, context=None) -> List[T]:
         # todo: add auto_distinct
         cls: Type[Schema]
-        values = []
         compiler = cls._get_compiler(queryset, context=context)
-        for val in compiler.get_values():
-            values.append(cls.__from__(val, compiler.serialize_options))
-        return values
+        values = compiler.get_values()
+        converter = cls._get_converter(compiler)
+        return [converter(val) for val in values]
 
     @classmethod
     async def aserialize(cls: Type[T], queryset, context=None) -> List[T]:
         cls: Type[Schema]
-        values = []
         compiler = cls._get_compiler(queryset, context=context)
-        for val in await compiler.get_values():
-            values.append(cls.__from__(val, compiler.serialize_options))
-        return values
+        values = await compiler.get_values()
+        converter = cls._get_converter(compiler)
+        return [converter(val) for val in values]
+
+    @classmethod
+    def stream(cls: Type[T], queryset, context=None, chunk_size: int = None) -> Iterator[T]:
+        # serialize lazily in chunks (Preference.orm_stream_chunk_size by default)
+        # memory is bounded by the chunk size, can be used as the stream of JSONStreamResponse
+        cls: Type[Schema]
+        compiler = cls._get_compiler(queryset, context=context)
+        converter = None
+        for values in compiler.iter_values(chunk_size):
+            converter = converter or cls._get_converter(compiler)
+            for val in values:
+                yield converter(val)
+
+    @classmethod
+    async def astream(cls: Type[T], queryset, context=None, chunk_size: int = None) -> AsyncIterator[T]:
+        cls: Type[Schema]
+        compiler = cls._get_compiler(queryset, context=context)
+        converter = None
+        async for values in compiler.aiter_values(chunk_size):
+            converter = converter or cls._get_converter(compiler)
+            for val in values:
+                yield converter(val)
 
     @classmethod
     def init(cls: Type[T], queryset, context=None) -> T:
@@ -487,6 +523,29 @@ class Query(utype.Schema):
             raise NotImplementedError
         return await self.get_generator(using=using).acount(base)
 
+    def get_next_cursor(self, base=None, using: str = None) -> Optional[str]:
+        # the cursor of the next page, None if the cursor pagination is not used or this is the last page
+        if not self.__parser__.model:
+            raise NotImplementedError
+        return self.get_generator(using=using).get_next_cursor(base)
+
+    async def aget_next_cursor(self, base=None, using: str = None) -> Optional[str]:
+        if not self.__parser__.model:
+            raise NotImplementedError
+        return await self.get_generator(using=using).aget_next_cursor(base)
+
+    def get_cursor_page(self, base=None, using: str = None) -> Tuple[list, Optional[str]]:
+        # the pks of the page (in order) and the cursor of the next page, queried once,
+        # the pks can be serialized by the Schema: Schema.serialize(pks)
+        if not self.__parser__.model:
+            raise NotImplementedError
+        return self.get_generator(using=using).get_cursor_page(base)
+
+    async def aget_cursor_page(self, base=None, using: str = None) -> Tuple[list, Optional[str]]:
+        if not self.__parser__.model:
+            raise NotImplementedError
+        return await self.get_generator(using=using).aget_cursor_page(base)
+
     def get_context(self, using: str = None, request: req.Request = None):
         return self.get_generator(using=using).get_context(request=request)
 
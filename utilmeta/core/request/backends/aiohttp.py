@@ -6,6 +6,8 @@ import aiohttp
 from utype import unprovided
 from multidict import MultiDictProxy
 from aiohttp.web_request import FileField
+from aiohttp.web_exceptions import HTTPRequestEntityTooLarge
+from utilmeta.utils import exceptions as exc
 from typing import Union
 from utilmeta.core.file import File
 
@@ -66,13 +68,49 @@ class AiohttpRequestAdaptor(RequestAdaptor):
                 result[key] = val
         return result
 
+    @property
+    def max_length(self):
+        # fallback to the client_max_size of aiohttp application
+        return super().max_length or getattr(self.request, "_client_max_size", None)
+
+    @max_length.setter
+    def max_length(self, max_length):
+        self._max_length = max_length
+
+    @property
+    def body_loaded(self) -> bool:
+        return (
+            not unprovided(self._body)
+            or getattr(self.request, "_read_bytes", None) is not None
+        )
+
+    @property
+    def streaming_content(self) -> bool:
+        return self.file_type or self.content_type == RequestType.FORM_DATA
+
     async def async_get_content(self):
         if self.content_type == RequestType.FORM_DATA:
-            return self.process_form(await self.request.post())
+            self.check_length()
+            # aiohttp write the file parts to temporary files, and check the size while reading
+            self.request._client_max_size = self.max_length or 0
+            try:
+                form = await self.request.post()
+            except HTTPRequestEntityTooLarge as e:
+                raise exc.RequestEntityTooLarge(str(e.text)) from e
+            return self.process_form(form)
+        if self.file_type:
+            return await self.async_get_file()
         return self.get_content()
 
+    def async_iter_body(self):
+        return self.request.content.iter_chunked(self.body_chunk_size)
+
     async def async_read(self):
-        return await self.request.read()
+        body = getattr(self.request, "_read_bytes", None)
+        if body is None:
+            body = await self.async_read_chunks(self.async_iter_body())
+            self.request._read_bytes = body
+        return body
 
     def __init__(self, request: Request):
         super().__init__(request)
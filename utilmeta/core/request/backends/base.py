@@ -1,5 +1,5 @@
 from urllib.parse import urlsplit, urlunsplit
-from typing import Optional
+from typing import Optional, Iterable, AsyncIterable
 from utilmeta.utils import (
     MetaMethod,
     CommonMethod,
@@ -15,15 +15,57 @@ from utilmeta.utils import LOCAL_IP
 from utilmeta.core.file import File
 from ipaddress import ip_address
 from utilmeta.utils.adaptor import BaseAdaptor
+from utilmeta.utils.codec import get_json_codec
 from utype import unprovided
+import tempfile
 import json
 import io
 
 
+class LimitedStream:
+    """
+    A file-like wrapper of the request body stream,
+    raise RequestEntityTooLarge as soon as more than [max_length] bytes are read
+    """
+
+    def __init__(self, stream, max_length: int):
+        self.stream = stream
+        self.max_length = max_length
+        self.read_length = 0
+
+    def _count(self, data):
+        if data:
+            self.read_length += len(data)
+            if self.read_length > self.max_length:
+                raise exc.RequestEntityTooLarge(
+                    f"request body exceeded the max length: {self.max_length}"
+                )
+        return data
+
+    def read(self, size: int = -1):
+        return self._count(self.stream.read(size))
+
+    def readline(self, size: int = -1):
+        return self._count(self.stream.readline(size))
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                break
+            yield line
+
+    def close(self):
+        close = getattr(self.stream, "close", None)
+        if close:
+            close()
+
+
 class RequestAdaptor(BaseAdaptor):
     __backends_package__ = 'utilmeta.core.request.backends'
     file_adaptor_cls = None
     json_decoder_cls = json.JSONDecoder
+    body_chunk_size = 64 * 1024
 
     def __init__(self, request, route: str = None, *args, **kwargs):
         self.request = request
@@ -35,6 +77,8 @@ class RequestAdaptor(BaseAdaptor):
 
         self._body = unprovided
         self._data = unprovided
+        self._max_length = None
+        self._read_length = 0
         self._context = {}
         self._override_method = None
         self._override_route = None
@@ -179,6 +223,114 @@ class RequestAdaptor(BaseAdaptor):
     def content_length(self) -> int:
         return int(self.headers.get(Header.LENGTH) or 0)
 
+    @property
+    def max_length(self) -> Optional[int]:
+        if self._max_length:
+            return self._max_length
+        from utilmeta.conf import Preference
+
+        return Preference.get().request_max_body_length
+
+    @max_length.setter
+    def max_length(self, max_length: Optional[int]):
+        self._max_length = max_length
+
+    def limit_length(self, max_length: Optional[int]):
+        # the limit can only be narrowed (by the body params of the endpoint)
+        if not max_length:
+            return
+        current = self.max_length
+        if not current or max_length < current:
+            self._max_length = max_length
+
+    @property
+    def read_length(self) -> int:
+        # the bytes of the body that actually received
+        if self._read_length:
+            return self._read_length
+        if isinstance(self._body, (bytes, bytearray)):
+            return len(self._body)
+        return 0
+
+    def check_length(self, length: int = None):
+        max_length = self.max_length
+        if not max_length:
+            return
+        if length is None:
+            # reject by the Content-Length before reading
+            length = self.content_length
+        if length > max_length:
+            raise exc.RequestEntityTooLarge(
+                f"request body exceeded the max length: {max_length}"
+            )
+
+    def iter_body(self) -> Iterable[bytes]:
+        # iterate the body stream in chunks if the backend support
+        raise NotImplementedError
+
+    def async_iter_body(self) -> AsyncIterable[bytes]:
+        raise NotImplementedError
+
+    def limit_chunks(self, chunks: Iterable[bytes]):
+        self.check_length()
+        for chunk in chunks:
+            self._read_length += len(chunk)
+            self.check_length(self._read_length)
+            yield chunk
+
+    async def async_limit_chunks(self, chunks: AsyncIterable[bytes]):
+        self.check_length()
+        async for chunk in chunks:
+            self._read_length += len(chunk)
+            self.check_length(self._read_length)
+            yield chunk
+
+    def read_chunks(self, chunks: Iterable[bytes]) -> bytes:
+        return b"".join(self.limit_chunks(chunks))
+
+    async def async_read_chunks(self, chunks: AsyncIterable[bytes]) -> bytes:
+        return b"".join([chunk async for chunk in self.async_limit_chunks(chunks)])
+
+    @classmethod
+    def make_spooled_file(cls):
+        from utilmeta.conf import Preference
+
+        return tempfile.SpooledTemporaryFile(
+            max_size=Preference.get().request_body_spool_size
+        )
+
+    def spool_chunks(self, chunks: Iterable[bytes]):
+        file = self.make_spooled_file()
+        try:
+            for chunk in self.limit_chunks(chunks):
+                file.write(chunk)
+        except BaseException:
+            file.close()
+            raise
+        file.seek(0)
+        return file
+
+    async def async_spool_chunks(self, chunks: AsyncIterable[bytes]):
+        file = self.make_spooled_file()
+        try:
+            async for chunk in self.async_limit_chunks(chunks):
+                file.write(chunk)
+        except BaseException:
+            file.close()
+            raise
+        file.seek(0)
+        return file
+
+    @property
+    def body_loaded(self) -> bool:
+        return not unprovided(self._body)
+
+    @property
+    def streaming_content(self) -> bool:
+        # whether the content can be loaded from the body stream
+        # without buffering the entire body in memory
+        return False
+
     @property
     def json_type(self):
         content_type = self.content_type
@@ -214,12 +366,20 @@ class RequestAdaptor(BaseAdaptor):
         content_type = self.content_type
         return content_type.startswith("text")
 
+    @property
+    def file_type(self):
+        if not self.content_type:
+            return False
+        return not (
+            self.json_type or self.form_type or self.xml_type or self.text_type
+        )
+
     def get_json(self):
         if not self.content_length:
             # Empty content
             return None
-        import json
-
+        if self.json_decoder_cls is json.JSONDecoder:
+            return get_json_codec().loads(self.body)
         return json.loads(self.body, cls=self.json_decoder_cls)
 
     def get_xml(self):
@@ -230,8 +390,25 @@ class RequestAdaptor(BaseAdaptor):
         return parser.close()
 
     def get_file(self):
+        if not self.body_loaded:
+            try:
+                chunks = self.iter_body()
+            except NotImplementedError:
+                pass
+            else:
+                return File(self.spool_chunks(chunks))
         return File(io.BytesIO(self.body))
 
+    async def async_get_file(self):
+        if not self.body_loaded:
+            try:
+                chunks = self.async_iter_body()
+            except NotImplementedError:
+                pass
+            else:
+                return File(await self.async_spool_chunks(chunks))
+        return self.get_file()
+
     def get_form(self):
         if self.content_type == RequestType.FORM_URLENCODED:
             return parse_query_string(self.body.decode())
@@ -268,7 +445,7 @@ class RequestAdaptor(BaseAdaptor):
             return self._data
         try:
             return self.get_content()
-        except NotImplementedError:
+        except (NotImplementedError, exc.RequestEntityTooLarge):
             raise
         except Exception as e:
             raise exc.UnprocessableEntity(
@@ -290,11 +467,11 @@ class RequestAdaptor(BaseAdaptor):
         if not unprovided(self._data):
             return self._data
         try:
-            if unprovided(self._body):
+            if unprovided(self._body) and not self.streaming_content:
                 self._body = await self.async_read()
             self._data = await self.async_get_content()
             return self._data
-        except NotImplementedError:
+        except (NotImplementedError, exc.RequestEntityTooLarge):
             raise
         except Exception as e:
             raise exc.UnprocessableEntity(
@@ -1,4 +1,4 @@
-from .base import RequestAdaptor
+from .base import RequestAdaptor, LimitedStream
 from django.http.request import HttpRequest
 from django.middleware.csrf import CsrfViewMiddleware, get_token
 from utilmeta.utils import (
@@ -87,7 +87,36 @@ class DjangoRequestAdaptor(RequestAdaptor):
                 load_call()
                 request.META["REQUEST_METHOD"] = m
 
+    def limit_stream(self):
+        # the multipart parser of django read from the request stream,
+        # and upload handlers already spool the large files to disk
+        max_length = self.max_length
+        if not max_length or self.body_loaded:
+            return
+        self.check_length()
+        stream = getattr(self.request, "_stream", None)
+        if stream is None or isinstance(stream, LimitedStream):
+            return
+        self.request._stream = LimitedStream(stream, max_length)
+
+    @property
+    def body_loaded(self) -> bool:
+        return hasattr(self.request, "_body")
+
+    @property
+    def read_length(self) -> int:
+        if hasattr(self.request, "_body"):
+            return len(self.request._body or b"")
+        stream = getattr(self.request, "_stream", None)
+        if isinstance(stream, LimitedStream):
+            return stream.read_length
+        return super().read_length
+
+    def iter_body(self):
+        return iter(lambda: self.request.read(self.body_chunk_size), b"")
+
     def get_form(self):
+        self.limit_stream()
         self.load_form_data(self.request)
         data = parse_query_dict(self.request.POST)
         parsed_files = {}
@@ -133,6 +162,7 @@ class DjangoRequestAdaptor(RequestAdaptor):
 
     @property
     def body(self):
+        self.limit_stream()
         return self.request.body
 
     @property
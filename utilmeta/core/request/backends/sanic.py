@@ -57,6 +57,11 @@ class SanicRequestAdaptor(RequestAdaptor):
     def headers(self):
         return self.request.headers
 
+    @property
+    def read_length(self) -> int:
+        # the body is buffered by the server before handling
+        return len(self.request.body or b"")
+
     @property
     def query_string(self):
         return self.request.query_string
@@ -38,6 +38,9 @@ class StarletteRequestAdaptor(RequestAdaptor):
 
     @property
     def request_method(self) -> str:
+        if self.request.scope["type"] == "websocket":
+            # the handshake request of starlette WebSocket
+            return "GET"
         return self.request.method
 
     @property
@@ -92,7 +95,22 @@ class StarletteRequestAdaptor(RequestAdaptor):
         self.request._body = data
 
     async def async_read(self):
-        return await self.request.body()
+        if hasattr(self.request, "_body"):
+            return self.request._body
+        body = await self.async_read_chunks(self.request.stream())
+        self.request._body = body
+        return body
+
+    def async_iter_body(self):
+        return self.request.stream()
+
+    @property
+    def body_loaded(self) -> bool:
+        return not unprovided(self._body) or hasattr(self.request, "_body")
+
+    @property
+    def streaming_content(self) -> bool:
+        return self.file_type or self.content_type == RequestType.FORM_DATA
 
     def get_form(self):
         return self.process_form(async_to_sync(self.request.form)())
@@ -129,7 +147,16 @@ class StarletteRequestAdaptor(RequestAdaptor):
 
                     form = await MultiPartParser(self.headers, steam()).parse()
                 else:
-                    form = await self.request.form()
+                    from starlette.formparsers import MultiPartParser
+
+                    # file parts are spooled to the temporary files by the parser
+                    form = await MultiPartParser(
+                        self.headers, self.async_limit_chunks(self.request.stream())
+                    ).parse()
+                    # closed with the request
+                    self.request._form = form
                 return self.process_form(form)
             return {}
+        if self.file_type:
+            return await self.async_get_file()
         return self.get_content()
@@ -39,6 +39,11 @@ class TornadoServerRequestAdaptor(RequestAdaptor):
     def headers(self):
         return self.request.headers
 
+    @property
+    def read_length(self) -> int:
+        # the body is buffered by the server before handling
+        return len(self.request.body or b"")
+
     # note: tornado use bytes to process query, which is not a standard way, fallback instead
     # @property
     # def query_params(self):
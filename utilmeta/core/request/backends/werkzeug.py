@@ -1,8 +1,10 @@
 from .base import RequestAdaptor
 from werkzeug.wrappers import Request
+from werkzeug.exceptions import RequestEntityTooLarge as WerkzeugEntityTooLarge
 from utilmeta.core.file.backends.werkzeug import WerkzeugFileAdaptor
 from utilmeta.core.file.base import File
 from utilmeta.utils import Headers, HAS_BODY_METHODS
+from utilmeta.utils import exceptions as exc
 import werkzeug
 
 
@@ -23,10 +25,48 @@ class WerkzeugRequestAdaptor(RequestAdaptor):
         self._cookies = self.request.cookies
         self._body = None
         self._form = None
-        if self._method in HAS_BODY_METHODS:
-            self._body = self.request.data
-            if self.form_type:
-                self._form = self.get_form()
+        self._body_error = None
+
+    def limit_stream(self):
+        # the body is read lazily after the body params set the max length,
+        # werkzeug check the length while reading the stream and parsing the form,
+        # and the large file parts are spooled to disk
+        max_length = self.max_length
+        if not max_length:
+            return
+        self.check_length()
+        if "stream" not in self.request.__dict__:
+            # the input stream of werkzeug is limited when it is created
+            self.request.max_content_length = max_length
+
+    def _too_large(self, e: Exception):
+        self._body_error = exc.RequestEntityTooLarge(
+            f"request body exceeded the max length: {self.max_length}"
+        )
+        self._body_error.__cause__ = e
+        return self._body_error
+
+    @property
+    def body_loaded(self) -> bool:
+        return self._body is not None
+
+    def iter_body(self):
+        if self._method not in HAS_BODY_METHODS:
+            return iter(())
+        self.limit_stream()
+        stream = self.request.stream
+
+        def chunks():
+            try:
+                while True:
+                    chunk = stream.read(self.body_chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            except WerkzeugEntityTooLarge as e:
+                raise self._too_large(e) from e
+
+        return chunks()
 
     @property
     def request_method(self):
@@ -50,7 +90,17 @@ class WerkzeugRequestAdaptor(RequestAdaptor):
 
     @property
     def body(self):
-        return self._body or b""
+        if self._body_error:
+            raise self._body_error
+        if self._body is None:
+            if self._method not in HAS_BODY_METHODS:
+                return b""
+            self.limit_stream()
+            try:
+                self._body = self.request.get_data(cache=True)
+            except WerkzeugEntityTooLarge as e:
+                raise self._too_large(e) from e
+        return self._body
 
     @property
     def headers(self):
@@ -61,11 +111,20 @@ class WerkzeugRequestAdaptor(RequestAdaptor):
         return self._cookies
 
     def get_form(self):
+        if self._body_error:
+            raise self._body_error
         if self._form is not None:
             return self._form
-        form = dict(self.request.form)
-        parsed_files = {}
-        for key, files in self.request.files.lists():
-            parsed_files[key] = [File(self.file_adaptor_cls(file)) for file in files]
+        if self._method not in HAS_BODY_METHODS:
+            return {}
+        self.limit_stream()
+        try:
+            form = dict(self.request.form)
+            parsed_files = {}
+            for key, files in self.request.files.lists():
+                parsed_files[key] = [File(self.file_adaptor_cls(file)) for file in files]
+        except WerkzeugEntityTooLarge as e:
+            raise self._too_large(e) from e
         form.update(parsed_files)
+        self._form = form
         return form
@@ -11,13 +11,13 @@ from utilmeta.utils import (
     guess_mime_type,
     RequestType,
     encode_multipart_form,
-    json_dumps,
     multi,
     parse_query_string,
     parse_query_dict,
 )
 from collections.abc import Mapping
 from utilmeta.core.file import File
+from utilmeta.utils.codec import get_json_codec
 
 
 class ClientRequest:
@@ -170,7 +170,7 @@ class ClientRequest:
             if self.content_type:
                 if self.content_type.startswith(RequestType.JSON):
                     self._json = (
-                        json.loads(self.data)
+                        get_json_codec().loads(self.data)
                         if isinstance(self.data, bytes)
                         else json.load(self.data)
                     )
@@ -196,7 +196,7 @@ class ClientRequest:
 
                 elif self.content_type.startswith(RequestType.JSON):
                     if isinstance(self.data, (dict, Mapping)) or multi(self.data):
-                        self.body = json_dumps(self.data).encode()
+                        self.body = get_json_codec().dumpb(self.data)
                         self._json = self.data
                     else:
                         # should raise?
@@ -231,12 +231,12 @@ class ClientRequest:
                         self.reset_files()
                     else:
                         self.content_type = RequestType.JSON
-                        self.body = json_dumps(self.data).encode()
+                        self.body = get_json_codec().dumpb(self.data)
                         self._json = dict(self.data)
 
                 elif multi(self.data):
                     self.content_type = RequestType.JSON
-                    self.body = json_dumps(self.data).encode()
+                    self.body = get_json_codec().dumpb(self.data)
                     self._json = list(self.data)
 
                 elif file_like(self.data):
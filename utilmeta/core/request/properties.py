@@ -93,6 +93,7 @@ class Body(Property):
 
     def getter(self, request: Request, field: ParserField = None):
         self.validate_content_type(request)
+        self.limit_max_length(request)
         data = request.data
         var_data = var.data.setup(request)
         if not var_data.contains():
@@ -106,6 +107,7 @@ class Body(Property):
         var_data = var.data.setup(request)
         if var_data.contains():
             return await var_data.get()
+        self.limit_max_length(request)
         data = await request.aload()
         var_data.set(data)
         self.validate_max_length(request)
@@ -117,13 +119,21 @@ class Body(Property):
                 f"invalid content type: {request.content_type}"
             )
 
+    def limit_max_length(self, request: Request):
+        # enforce the max length while the body is read,
+        # and reject early by the Content-Length header
+        if self.max_length:
+            request.adaptor.limit_length(self.max_length)
+        request.adaptor.check_length()
+
     def validate_max_length(self, request: Request):
-        if (
-            self.max_length
-            and request.content_length
-            and request.content_length > self.max_length
-        ):
-            raise exc.RequestEntityTooLarge
+        # the body may be already buffered by the backend (or loaded by other params)
+        if self.max_length:
+            length = max(request.adaptor.read_length, request.content_length or 0)
+            if length > self.max_length:
+                raise exc.RequestEntityTooLarge(
+                    f"request body exceeded the max length: {self.max_length}"
+                )
 
     def __init__(
         self,
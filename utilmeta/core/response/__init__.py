@@ -1,2 +1,4 @@
 from .base import Response
 from .sse import SSEResponse, ServerSentEvent
+from .stream import JSONStreamResponse
+from .broadcast import Broadcast
@@ -3,6 +3,7 @@ from typing import AsyncIterator
 from utilmeta import utils
 from utype.types import *
 from utilmeta.utils.adaptor import BaseAdaptor
+from utilmeta.utils.codec import get_json_codec
 import json
 from http.cookies import SimpleCookie
 
@@ -191,9 +192,9 @@ class ResponseAdaptor(BaseAdaptor):
 
     def get_json(self) -> Union[dict, list, None]:
         text = self.get_text()
-        import json
-
         try:
+            if self.json_decoder_cls is json.JSONDecoder:
+                return get_json_codec().loads(text)
             return json.loads(text, cls=self.json_decoder_cls)
         except json.decoder.JSONDecodeError:
             return None
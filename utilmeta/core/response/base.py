@@ -1,5 +1,4 @@
 import inspect
-import json
 import os.path
 import warnings
 from http.cookies import SimpleCookie
@@ -25,6 +24,7 @@ from utilmeta.utils import Headers
 from utilmeta.conf import Preference
 from .backends.base import ResponseAdaptor
 from utilmeta.utils.error import Error
+from utilmeta.utils.codec import JSONCodec, get_json_codec, json_normalize
 from utype.parser.cls import ClassParser
 from utype.utils.functional import get_obj_name
 from utype.utils.compat import get_args, is_union
@@ -64,6 +64,7 @@ class Response(Generic[_T]):
     __parser_cls__ = ResponseClassParser
     __parser__: ResponseClassParser
     __json_encoder_cls__ = utype.JSONEncoder
+    __json_codec__: Optional[str] = None  # None: use Preference.json_codec
     __file_block_size__ = 4096
     __file_attachment__ = False
 
@@ -520,8 +521,9 @@ class Response(Generic[_T]):
             self.state = error.state
         if self.result is None:
             self.result = error.result
-        if self.headers is None:
-            self.headers = error.headers
+        if error.headers:
+            for key, val in error.headers.items():
+                self.headers.setdefault(key, val)
         if not self.message:  # empty string ''
             self.message = str(error.exception)
         if not self.is_aborted:
@@ -640,7 +642,8 @@ class Response(Generic[_T]):
                 self.content_type = OCTET_STREAM
             return
         elif self._event_stream:
-            self.content_type = EVENT_STREAM
+            # the streaming responses may declare their own content type (like ndjson)
+            self.content_type = self.content_type or EVENT_STREAM
             return
         if self.content_type is not None:
             return
@@ -683,10 +686,19 @@ class Response(Generic[_T]):
     def data(self):
         if not self._content:
             return None
+        if self._event_stream is not None and self._content is self._event_stream:
+            # the stream can only be consumed once (by the server)
+            return None
         if self.is_json:
-            if self._data:
-                return self._data
-            self._data = json.loads(self.dump_json(self._content))
+            if self._data is None:
+                if self._cached and isinstance(self._content, (bytes, str)):
+                    # the encoded body of the cached response, other str content is kept as is
+                    try:
+                        self._data = self.get_json_codec().loads(self._content)
+                    except ValueError:
+                        self._data = json_normalize(self._content)
+                else:
+                    self._data = json_normalize(self._content)
             return self._data
         if isinstance(self._content, File) or file_like(self._content):
             self._content.seek(0)
@@ -738,11 +750,19 @@ class Response(Generic[_T]):
         self._print(pprint)
 
     @classmethod
-    def dump_json(cls, content, encoder=None, ensure_ascii: bool = False, **kwargs):
-        import json
+    def get_json_codec(cls) -> JSONCodec:
+        return get_json_codec(cls.__json_codec__)
 
+    @classmethod
+    def dump_json(cls, content, encoder=None, ensure_ascii: bool = False, **kwargs) -> str:
+        kwargs.update(ensure_ascii=ensure_ascii)
+        return cls.get_json_codec().dumps(content, cls=encoder or cls.__json_encoder_cls__, **kwargs)
+
+    @classmethod
+    def dump_json_bytes(cls, content, encoder=None, ensure_ascii: bool = False, **kwargs) -> bytes:
+        # encode to the body bytes directly, the fast codecs (orjson / msgspec) will skip the str
         kwargs.update(ensure_ascii=ensure_ascii)
-        return json.dumps(content, cls=encoder or cls.__json_encoder_cls__, **kwargs)
+        return cls.get_json_codec().dumpb(content, cls=encoder or cls.__json_encoder_cls__, **kwargs)
 
     def parse_headers(self):
         if self.message_header:
@@ -1008,7 +1028,9 @@ class Response(Generic[_T]):
             return b""
         if self.is_json and not isinstance(body, (str, bytes)):
             try:
-                return self.dump_json(body)
+                if self.charset and self.charset.lower().replace("-", "") != "utf8":
+                    return self.dump_json(body)
+                return self.dump_json_bytes(body)
             except TypeError as e:
                 self.init_error(e)
                 return str(e).encode()
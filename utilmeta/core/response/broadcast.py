@@ -0,0 +1,423 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Optional, List, Tuple, Union, Iterator, AsyncIterator, TYPE_CHECKING
+from utilmeta.utils.protocol.sse import ServerSentEvent
+
+if TYPE_CHECKING:
+    from utilmeta.core.request import Request
+    from .sse import SSEResponse
+
+__all__ = ["Broadcast", "BroadcastEvent", "BroadcastSubscriber"]
+
+DROP = "drop"
+DISCONNECT = "disconnect"
+COALESCE = "coalesce"
+POLICIES = (DROP, DISCONNECT, COALESCE)
+
+KEEPALIVE = b": keepalive\n\n"
+
+
+class BroadcastEvent:
+    """
+    A published event, encoded once and shared by all the subscribers
+    """
+
+    __slots__ = ("id", "key", "data")
+
+    def __init__(self, id: int, key: str, data: bytes):
+        self.id = id
+        # events of the same key are coalesced for the slow consumers
+        self.key = key
+        self.data = data
+
+    def __repr__(self):
+        return f"BroadcastEvent(id={self.id}, key={repr(self.key)})"
+
+
+class BroadcastSubscriber:
+    """
+    A client of the broadcast channel with a bounded buffer, when the buffer is full:
+    - drop: the oldest buffered event is dropped
+    - disconnect: the subscriber is closed, the client can reconnect with Last-Event-ID to replay
+    - coalesce: the buffered event of the same key (event name) is replaced, or the oldest is dropped
+    the events can be put from any thread, the waiters (thread or event loop) are notified
+    """
+
+    def __init__(self, broadcast: "Broadcast", buffer_size: int, policy: str):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid broadcast slow consumer policy: {repr(policy)}, must in {POLICIES}")
+        if not buffer_size or buffer_size <= 0:
+            raise ValueError(f"Broadcast: buffer_size must be positive, got {buffer_size}")
+        self.broadcast = broadcast
+        self.buffer_size = buffer_size
+        self.policy = policy
+        self.closed = False
+        # closed by the disconnect policy
+        self.overflowed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._buffer: "deque[BroadcastEvent]" = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Event] = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(channel={repr(self.broadcast.channel)}, "
+            f"buffered={len(self._buffer)}, closed={self.closed})"
+        )
+
+    def __len__(self):
+        return len(self._buffer)
+
+    def put(self, event: BroadcastEvent):
+        with self._cond:
+            if self.closed:
+                return
+            buffer = self._buffer
+            if len(buffer) >= self.buffer_size:
+                if self.policy == DISCONNECT:
+                    self.overflowed = True
+                    self.closed = True
+                    self._drop(len(buffer) + 1)
+                    self.broadcast.overflowed += 1
+                    buffer.clear()
+                elif self.policy == COALESCE:
+                    for i in range(len(buffer) - 1, -1, -1):
+                        if buffer[i].key == event.key:
+                            del buffer[i]
+                            self.coalesced += 1
+                            self.broadcast.coalesced += 1
+                            break
+                    else:
+                        buffer.popleft()
+                        self._drop()
+                else:
+                    buffer.popleft()
+                    self._drop()
+            if not self.closed:
+                buffer.append(event)
+            self._cond.notify()
+        self._wakeup()
+
+    def _drop(self, count: int = 1):
+        # the counters of the broadcast are not locked, they may be slightly off
+        self.dropped += count
+        self.broadcast.dropped += count
+
+    def _wakeup(self):
+        waiter = self._waiter
+        loop = self._loop
+        if waiter is None or loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            waiter.set()
+            return
+        try:
+            loop.call_soon_threadsafe(waiter.set)
+        except RuntimeError:
+            # the loop is closed
+            pass
+
+    def _pop(self) -> Optional[BroadcastEvent]:
+        # called with the lock acquired
+        if self._buffer:
+            self.delivered += 1
+            return self._buffer.popleft()
+        return None
+
+    def get(self, timeout: float = None) -> Optional[BroadcastEvent]:
+        """
+        Wait for the next event, return None if timed out or closed
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self.closed, timeout)
+            return self._pop()
+
+    async def aget(self, timeout: float = None) -> Optional[BroadcastEvent]:
+        if self._waiter is None:
+            self._loop = asyncio.get_running_loop()
+            self._waiter = asyncio.Event()
+        waiter = self._waiter
+        with self._cond:
+            event = self._pop()
+            if event is not None or self.closed:
+                return event
+            waiter.clear()
+        try:
+            await asyncio.wait_for(waiter.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._cond:
+            return self._pop()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+        self._wakeup()
+        self.broadcast.unsubscribe(self)
+
+    def stream(self, keepalive: float = None) -> Iterator[bytes]:
+        """
+        The encoded events until the subscriber is closed,
+        a keepalive comment is sent if there is no event in [keepalive] seconds
+        """
+        try:
+            while True:
+                # the buffered events are drained after the subscriber is closed
+                event = self.get(timeout=keepalive)
+                if event is None:
+                    if self.closed:
+                        break
+                    yield KEEPALIVE
+                    continue
+                yield event.data
+        finally:
+            self.close()
+
+    async def astream(self, keepalive: float = None) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                event = await self.aget(timeout=keepalive)
+                if event is None:
+                    if self.closed:
+                        break
+                    yield KEEPALIVE
+                    continue
+                yield event.data
+        finally:
+            self.close()
+
+
+class Broadcast:
+    """
+    An in-process broadcast channel for the SSE (and other streaming) clients,
+    the event is published (and encoded) once and fanned out to the buffers of all the subscribers,
+    the recent events are kept in a bounded ring buffer to replay from the Last-Event-ID
+        news = Broadcast('news')
+
+        @api.get
+        def subscribe(self):
+            return news.response(self.request)
+
+        news.publish({'title': 'hello'}, event='news')
+
+    use RedisBroadcast (utilmeta.core.cache.backends.redis) to broadcast across processes
+    """
+
+    subscriber_cls = BroadcastSubscriber
+    keepalive_interval: float = 15.0
+
+    def __init__(
+        self,
+        channel: str,
+        *,
+        history_size: int = 1024,
+        buffer_size: int = 256,
+        policy: str = DROP,
+        retry: Optional[int] = None,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid broadcast slow consumer policy: {repr(policy)}, must in {POLICIES}")
+        self.channel = channel
+        self.history_size = history_size
+        self.buffer_size = buffer_size
+        self.policy = policy
+        # the reconnection time (ms) sent to the clients
+        self.retry = retry
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._history: "deque[BroadcastEvent]" = deque(maxlen=history_size or 0)
+        self._subscribers = set()
+        # snapshot to fan out without holding the lock
+        self._targets: Tuple[BroadcastSubscriber, ...] = ()
+
+        self.published = 0
+        self.replayed = 0
+        self.total_subscribers = 0
+        self.dropped = 0
+        self.coalesced = 0
+        # subscribers closed by the disconnect policy
+        self.overflowed = 0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(channel={repr(self.channel)}, subscribers={len(self._targets)})"
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._targets)
+
+    @property
+    def last_id(self) -> Optional[int]:
+        return self._history[-1].id if self._history else None
+
+    @classmethod
+    def parse_id(cls, event_id) -> Optional[int]:
+        if event_id is None:
+            return None
+        try:
+            return int(event_id)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def get_event_fields(cls, data=None, event: str = None, retry: int = None) -> Tuple[Optional[str], object, Optional[int]]:
+        if isinstance(data, ServerSentEvent):
+            return event or data.event, data.data, retry or data.retry
+        return event, data, retry
+
+    def encode(self, id: int, event: Optional[str], data, retry: Optional[int]) -> bytes:
+        retry = retry or self.retry
+        if data is not None and not isinstance(data, (dict, list, str)):
+            data = str(data)
+        return ServerSentEvent(event=event, data=data, id=str(id), retry=retry).encode()
+
+    def _next_id(self) -> int:
+        # called with the lock acquired
+        self._seq += 1
+        return self._seq
+
+    def subscribe(
+        self,
+        last_event_id: Union[str, int] = None,
+        *,
+        buffer_size: int = None,
+        policy: str = None,
+    ) -> BroadcastSubscriber:
+        """
+        Subscribe the channel, the events after [last_event_id] in the ring buffer are replayed,
+        the replay is best effort if the event is already evicted from the ring buffer
+        """
+        subscriber = self.subscriber_cls(
+            self,
+            buffer_size=buffer_size or self.buffer_size,
+            policy=policy or self.policy,
+        )
+        last = self.parse_id(last_event_id)
+        with self._lock:
+            if last is not None:
+                # registered under the lock, no event is missed between the replay and the subscription
+                replay = [event for event in self._history if event.id > last]
+                subscriber._buffer.extend(replay)
+                self.replayed += len(replay)
+            self._subscribers.add(subscriber)
+            self._targets = tuple(self._subscribers)
+            self.total_subscribers += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber: BroadcastSubscriber):
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.discard(subscriber)
+                self._targets = tuple(self._subscribers)
+
+    def dispatch(self, event: BroadcastEvent):
+        """
+        Keep the event in the ring buffer and fan out to the subscribers of this process
+        """
+        with self._lock:
+            if self._history.maxlen:
+                self._add_history(event)
+            self.published += 1
+            targets = self._targets
+        for subscriber in targets:
+            subscriber.put(event)
+
+    def _add_history(self, event: BroadcastEvent):
+        # called with the lock acquired, the history is kept in id order
+        # (the events missed by a cross-process subscription are caught up after the later ones)
+        history = self._history
+        if not history or event.id > history[-1].id:
+            history.append(event)
+            return
+        if len(history) >= history.maxlen:
+            if event.id < history[0].id:
+                # older than the ring buffer
+                return
+            history.popleft()
+        index = len(history)
+        while index and history[index - 1].id > event.id:
+            index -= 1
+        history.insert(index, event)
+
+    def publish(self, data=None, event: str = None, *, retry: int = None, key: str = None) -> int:
+        """
+        Publish an event to all the subscribers, data can also be a ServerSentEvent,
+        the events of the same [key] (default to the event name) are coalesced for the slow consumers,
+        return the id of the event
+        """
+        event, data, retry = self.get_event_fields(data, event=event, retry=retry)
+        with self._lock:
+            event_id = self._next_id()
+        self.dispatch(
+            BroadcastEvent(event_id, key or event or "message", self.encode(event_id, event, data, retry))
+        )
+        return event_id
+
+    async def apublish(self, data=None, event: str = None, *, retry: int = None, key: str = None) -> int:
+        return self.publish(data, event, retry=retry, key=key)
+
+    def response(
+        self,
+        request: "Request" = None,
+        *,
+        last_event_id: Union[str, int] = None,
+        asynchronous: bool = None,
+        buffer_size: int = None,
+        policy: str = None,
+        keepalive: float = None,
+        **kwargs,
+    ) -> "SSEResponse":
+        """
+        A SSEResponse streaming the channel events to a client,
+        the Last-Event-ID is taken from the request headers if not provided,
+        asynchronous is default to whether there is a running event loop
+        """
+        from .sse import SSEResponse
+
+        if last_event_id is None and request is not None:
+            last_event_id = request.headers.get("last-event-id")
+        if asynchronous is None:
+            try:
+                asyncio.get_running_loop()
+                asynchronous = True
+            except RuntimeError:
+                asynchronous = False
+        keepalive = (self.keepalive_interval if keepalive is None else keepalive) or None
+        subscriber = self.subscribe(last_event_id, buffer_size=buffer_size, policy=policy)
+        stream = subscriber.astream(keepalive) if asynchronous else subscriber.stream(keepalive)
+        return SSEResponse(stream, request=request, **kwargs)
+
+    def get_history(self, last_event_id: Union[str, int] = None) -> List[BroadcastEvent]:
+        last = self.parse_id(last_event_id)
+        with self._lock:
+            return [event for event in self._history if last is None or event.id > last]
+
+    def close(self):
+        # close all the subscribers, the streams are ended
+        for subscriber in self._targets:
+            subscriber.close()
+
+    def get_stats(self) -> dict:
+        targets = self._targets
+        return dict(
+            channel=self.channel,
+            subscribers=len(targets),
+            total_subscribers=self.total_subscribers,
+            published=self.published,
+            replayed=self.replayed,
+            history=len(self._history),
+            buffered=sum(len(s) for s in targets),
+            dropped=self.dropped,
+            coalesced=self.coalesced,
+            overflowed=self.overflowed,
+        )
@@ -6,9 +6,14 @@ from utilmeta.utils import omit
 from utype.parser.rule import LogicalType
 from utype.utils.compat import get_args, get_origin, is_union
 from datetime import timedelta
+import asyncio
+import queue
+import threading
+import time
 
 
 _T = TypeVar("_T")
+_STOP = object()
 
 __all__ = [
     'SSEResponse',
@@ -21,6 +26,9 @@ class SSEResponse(Response[_T]):
     content_type = "text/event-stream"
     stream = True
     decoder_cls = SSEDecoder
+    # buffered events of the timed iteration (iter / aiter with timeouts)
+    reader_queue_size = 1024
+    reader_poll_interval = 0.1
 
     _event_type: Type[ServerSentEvent] = ServerSentEvent
 
@@ -100,19 +108,18 @@ class SSEResponse(Response[_T]):
         if self.event_stream:
             if inspect.isasyncgen(self.event_stream):
                 raise RuntimeError(f'Event stream is async generator, please use aiter')
-            for event in self.event_stream:
-                yield self._decoder.decode(event)
+            yield from self._decoder.iter_bytes(self.event_stream)
         elif self.is_event_stream:
             yield from self._decoder.iter_bytes(self.adaptor.iter_bytes(self.chunk_size))
 
     async def _aiter_events(self) -> AsyncIterator[ServerSentEvent]:
         if self.event_stream:
             if inspect.isasyncgen(self.event_stream):
-                async for event in self.event_stream:
-                    yield self._decoder.decode(event)
+                async for event in self._decoder.aiter_bytes(self.event_stream):
+                    yield event
             else:
-                for event in self.event_stream:
-                    yield self._decoder.decode(event)
+                for event in self._decoder.iter_bytes(self.event_stream):
+                    yield event
         elif self.is_event_stream:
             try:
                 async for event in self._decoder.aiter_bytes(self.adaptor.aiter_bytes(self.chunk_size)):
@@ -216,6 +223,52 @@ class SSEResponse(Response[_T]):
             self._async_iterator = self._init_async_iterator()
         return await self._async_iterator.__anext__()
 
+    def _timeout_event(self, read_timeout, total_timeout, elapsed: float, raise_timeout: bool = False):
+        if total_timeout and (not read_timeout or elapsed + read_timeout >= total_timeout):
+            msg = f"{self} read events timed out after {total_timeout} seconds"
+        else:
+            msg = f"{self} read event timed out after {read_timeout} seconds"
+        if raise_timeout:
+            raise TimeoutError(msg)
+        return ServerSentEvent(
+            event='error',
+            data={
+                'timeout': True,
+                'read_timeout': read_timeout,
+                'total_timeout': total_timeout,
+                'total_time': elapsed,
+                'message': msg
+            }
+        )
+
+    @classmethod
+    def _get_wait_timeout(cls, read_timeout, total_timeout, elapsed: float):
+        # the time to wait for the next event: the read timeout bounded by the rest of the total timeout
+        if not total_timeout:
+            return read_timeout
+        remaining = max(0.0, total_timeout - elapsed)
+        return min(read_timeout, remaining) if read_timeout else remaining
+
+    def _read_events(self, events: queue.Queue, stopped: threading.Event):
+        # runs in the reader thread of the response, the consumer waits on the bounded queue with timeouts
+        def put(item) -> bool:
+            while not stopped.is_set():
+                try:
+                    events.put(item, timeout=self.reader_poll_interval)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            for event in self:
+                if not put((event, None)):
+                    return
+        except BaseException as e:
+            put((_STOP, e))
+        else:
+            put((_STOP, None))
+
     def iter(
         self,
         read_timeout=None,
@@ -229,64 +282,56 @@ class SSEResponse(Response[_T]):
             total_timeout = total_timeout.total_seconds()
 
         if read_timeout or total_timeout:
-            gen = self.__iter__()
-            import multiprocessing.pool
-            import time
-
+            # one reader thread for the whole stream, feeding a bounded queue
+            events = queue.Queue(maxsize=self.reader_queue_size)
+            stopped = threading.Event()
+            reader = threading.Thread(
+                target=self._read_events,
+                args=(events, stopped),
+                name=f'{self.__class__.__name__}Reader',
+                daemon=True
+            )
+            reader.start()
             start = time.monotonic()
-            closed = False
-
-            def next_with_timeout():
-                pool = multiprocessing.pool.ThreadPool(processes=1)
-                async_result = pool.apply_async(gen.__next__)
-                elapsed = time.monotonic() - start
-                remaining = max(0.0, total_timeout - elapsed) if total_timeout else None
-                curr_read_timeout = min(read_timeout, remaining) if read_timeout else remaining
-
-                try:
-                    if remaining == 0:
-                        raise multiprocessing.context.TimeoutError
-                    r = async_result.get(curr_read_timeout)
-                except multiprocessing.context.TimeoutError:
-                    # pool.terminate()
-                    if total_timeout:
-                        msg = f"{self} read events timed out after {total_timeout} seconds"
-                    else:
-                        msg = f"{self} read event timed out after {read_timeout} seconds"
-
-                    if raise_timeout:
-                        raise TimeoutError(msg)
-
-                    nonlocal closed
-                    closed = True
-                    return ServerSentEvent(
-                        event='error',
-                        data={
-                            'timeout': True,
-                            'read_timeout': read_timeout,
-                            'total_timeout': total_timeout,
-                            'total_time': elapsed,
-                            'message': msg
-                        }
-                    )
-
-                finally:
-                    pool.close()
-                return r
 
             try:
                 while True:
-                    if closed:
+                    elapsed = time.monotonic() - start
+                    wait_timeout = self._get_wait_timeout(read_timeout, total_timeout, elapsed)
+                    try:
+                        if wait_timeout == 0:
+                            raise queue.Empty
+                        event, error = events.get(timeout=wait_timeout)
+                    except queue.Empty:
+                        yield self._timeout_event(
+                            read_timeout, total_timeout,
+                            elapsed=time.monotonic() - start,
+                            raise_timeout=raise_timeout
+                        )
+                        break
+                    if event is _STOP:
+                        if error is not None:
+                            raise error
                         break
-                    yield next_with_timeout()
-            except StopIteration:
-                return
+                    yield event
             finally:
+                stopped.set()
                 # requests .close() will wait until response is read done
                 omit(self.close)()
         else:
             yield from self
 
+    async def _aread_events(self, events: asyncio.Queue):
+        try:
+            async for event in self:
+                await events.put((event, None))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            await events.put((_STOP, e))
+        else:
+            await events.put((_STOP, None))
+
     async def aiter(
         self,
         read_timeout=None,
@@ -299,52 +344,42 @@ class SSEResponse(Response[_T]):
             total_timeout = total_timeout.total_seconds()
 
         if read_timeout or total_timeout:
-            agen = self.__aiter__()
-
-            import asyncio
-            import time
-
+            # one reader task for the whole stream, instead of wrapping every __anext__ in a new task
+            events = asyncio.Queue(maxsize=self.reader_queue_size)
+            reader = asyncio.ensure_future(self._aread_events(events))
             start = time.monotonic()
-            closed = False
-
-            async def next_with_timeout():
-                elapsed = time.monotonic() - start
-                remaining = max(0.0, total_timeout - elapsed) if total_timeout else None
-                curr_read_timeout = min(read_timeout, remaining) if read_timeout else remaining
-
-                try:
-                    if remaining == 0:
-                        raise asyncio.TimeoutError
-
-                    return await asyncio.wait_for(agen.__anext__(), curr_read_timeout)
-                except asyncio.TimeoutError:
-                    if total_timeout:
-                        msg = f"{self} read events timed out after {total_timeout} seconds"
-                    else:
-                        msg = f"{self} read event timed out after {read_timeout} seconds"
-                    if raise_timeout:
-                        raise TimeoutError(msg)
-                    nonlocal closed
-                    closed = True
-                    return ServerSentEvent(
-                        event='error',
-                        data={
-                            'timeout': True,
-                            'read_timeout': read_timeout,
-                            'total_timeout': total_timeout,
-                            'total_time': elapsed,
-                            'message': msg
-                        }
-                    )
 
             try:
                 while True:
-                    if closed:
+                    elapsed = time.monotonic() - start
+                    wait_timeout = self._get_wait_timeout(read_timeout, total_timeout, elapsed)
+                    try:
+                        if events.qsize():
+                            # already buffered, skip the wait
+                            event, error = events.get_nowait()
+                        elif wait_timeout == 0:
+                            raise asyncio.TimeoutError
+                        else:
+                            event, error = await asyncio.wait_for(events.get(), wait_timeout)
+                    except asyncio.TimeoutError:
+                        yield self._timeout_event(
+                            read_timeout, total_timeout,
+                            elapsed=time.monotonic() - start,
+                            raise_timeout=raise_timeout
+                        )
+                        break
+                    if event is _STOP:
+                        if error is not None:
+                            raise error
                         break
-                    yield await next_with_timeout()
-            except StopAsyncIteration:
-                return
+                    yield event
             finally:
+                if not reader.done():
+                    reader.cancel()
+                    try:
+                        await reader
+                    except (asyncio.CancelledError, Exception):
+                        pass
                 await self.aclose()
 
         else:
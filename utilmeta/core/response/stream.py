@@ -0,0 +1,141 @@
+from .base import Response, JSON
+from utilmeta.utils import Headers
+import inspect
+from typing import TypeVar, Iterable, AsyncIterable, Union, Optional
+
+_T = TypeVar("_T")
+
+NDJSON = "application/x-ndjson"
+
+__all__ = ["JSONStreamResponse", "NDJSON"]
+
+
+class JSONStreamResponse(Response[_T]):
+    """
+    Streaming JSON response, as newline-delimited JSON or a chunked JSON array
+    """
+    # the items of the (sync or async) iterable are encoded once they are yielded,
+    # so the memory is bounded by the buffer size instead of the result size
+    #     @api.get
+    #     def export(self) -> JSONStreamResponse:
+    #         return JSONStreamResponse(UserSchema.stream(User.objects.all()))
+
+    content_type = NDJSON
+    stream = True
+    array = False
+    # encoded bytes buffered before flushing a chunk to the server
+    buffer_size = 64 * 1024
+
+    def __init__(
+        self,
+        stream: Union[Iterable, AsyncIterable] = None,
+        *,
+        array: bool = None,
+        buffer_size: Optional[int] = None,
+        **kwargs
+    ):
+        if array is not None:
+            self.array = array
+        if buffer_size is not None:
+            self.buffer_size = buffer_size
+        if self.array:
+            kwargs.setdefault("content_type", JSON)
+        super().__init__(event_stream=stream, **kwargs)
+
+    def init_result(self, result):
+        if result is not None and not isinstance(result, (dict, str, bytes)) and (
+            hasattr(result, "__iter__") or hasattr(result, "__aiter__")
+        ):
+            # the generator returned by API function
+            self.init_event_stream(result)
+            return
+        super().init_result(result)
+
+    def _encode_item(self, item) -> bytes:
+        return self.dump_json_bytes(item)
+
+    def _iter_encoded(self, items: Iterable):
+        buffer = bytearray(b"[" if self.array else b"")
+        first = True
+        try:
+            for item in items:
+                if self.array:
+                    if not first:
+                        buffer += b","
+                buffer += self._encode_item(item)
+                if not self.array:
+                    buffer += b"\n"
+                first = False
+                if len(buffer) >= self.buffer_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+        except Exception:
+            # flush the encoded items before the error
+            if buffer:
+                yield bytes(buffer)
+            raise
+        if self.array:
+            buffer += b"]"
+        if buffer:
+            yield bytes(buffer)
+
+    async def _aiter_encoded(self, items: AsyncIterable):
+        buffer = bytearray(b"[" if self.array else b"")
+        first = True
+        try:
+            async for item in items:
+                if self.array:
+                    if not first:
+                        buffer += b","
+                buffer += self._encode_item(item)
+                if not self.array:
+                    buffer += b"\n"
+                first = False
+                if len(buffer) >= self.buffer_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+        except Exception:
+            # flush the encoded items before the error
+            if buffer:
+                yield bytes(buffer)
+            raise
+        if self.array:
+            buffer += b"]"
+        if buffer:
+            yield bytes(buffer)
+
+    def _handle_stream_error(self, e: Exception):
+        # the status and headers are already sent, the truncated body (unterminated array or line)
+        # tells the client that the stream is failed
+        from utilmeta.utils.error import Error
+        Error(e, request=self.request).log(console=True)
+
+    def init_event_stream(self, es):
+        if es is None:
+            return
+        if inspect.isasyncgen(es) or hasattr(es, "__aiter__"):
+            async def _async_stream(_es):
+                try:
+                    async for chunk in self._aiter_encoded(_es):
+                        yield chunk
+                except Exception as e:
+                    self._handle_stream_error(e)
+            es = _async_stream(es)
+        elif hasattr(es, "__iter__") and not isinstance(es, (dict, str, bytes)):
+            def _stream(_es):
+                try:
+                    yield from self._iter_encoded(_es)
+                except Exception as e:
+                    self._handle_stream_error(e)
+            es = _stream(es)
+        else:
+            return
+        self._event_stream = es
+        if not self.content_type:
+            self.content_type = JSON if self.array else NDJSON
+        if isinstance(self.headers, Headers):
+            self.headers.setdefault("x-accel-buffering", "no")
+
+    @property
+    def is_event_stream(self):
+        return False
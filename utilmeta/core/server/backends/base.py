@@ -45,6 +45,11 @@ class ServerAdaptor(BaseAdaptor):
             return obj.__name__
         return super().get_module_name(obj.backend)
 
+    @classmethod
+    def get_dispatch_key(cls, obj):
+        # qualified by the backend of the object, not the type
+        return type(obj), cls.get_module_name(obj)
+
     @classmethod
     def qualify(cls, obj: "UtilMeta"):
         if not cls.backend or not obj.backend:
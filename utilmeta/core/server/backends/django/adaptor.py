@@ -17,9 +17,11 @@ from utilmeta.core.orm.backends.django.database import DjangoDatabaseAdaptor
 from utilmeta.core.cache.backends.django import DjangoCacheAdaptor
 from utilmeta.core.request.backends.django import DjangoRequestAdaptor
 from utilmeta.core.response.backends.django import DjangoResponseAdaptor
+from utilmeta.core.websocket.backends.asgi import ASGIWebsocketAdaptor
+from utilmeta.core.websocket import serve_websocket
 from utilmeta.core.request import Request
 from utilmeta.core.api import API
-from utilmeta.utils import Header, localhost, pop
+from utilmeta.utils import Header, localhost, pop, WebSocketCloseCode
 from utilmeta.core.response import Response
 from utilmeta.core.server.backends.base import ServerAdaptor
 from .settings import DjangoSettings
@@ -58,10 +60,27 @@ class DebugCookieMiddleware(MiddlewareMixin):
         return response
 
 
+class WebsocketASGIHandler(ASGIHandler):
+    """
+    Dispatch the "websocket" scopes to the websocket application (like the ProtocolTypeRouter of Channels),
+    other scopes are handled by django
+    """
+
+    def __init__(self, websocket_application=None):
+        super().__init__()
+        self.websocket_application = websocket_application
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "websocket" and self.websocket_application:
+            return await self.websocket_application(scope, receive, send)
+        return await super().__call__(scope, receive, send)
+
+
 class DjangoServerAdaptor(ServerAdaptor):
     backend = django
     request_adaptor_cls = DjangoRequestAdaptor
     response_adaptor_cls = DjangoResponseAdaptor
+    websocket_adaptor_cls = ASGIWebsocketAdaptor
     sync_db_adaptor_cls = DjangoDatabaseAdaptor
     sync_cache_adaptor_cls = DjangoCacheAdaptor
     default_asynchronous = False
@@ -412,12 +431,37 @@ class DjangoServerAdaptor(ServerAdaptor):
         # csrf_exempt must set to True or every result without token will be blocked
         return f
 
+    async def websocket_application(self, scope, receive, send):
+        """
+        The ASGI application of the "websocket" protocol, serve the connections by the root API,
+        can be routed in a Channels-style application if the django application is customized
+            application = ProtocolTypeRouter({
+                "http": get_asgi_application(),
+                "websocket": service.adaptor.websocket_application,
+            })
+        """
+        from django.core.handlers.asgi import ASGIRequest
+        import io
+
+        adaptor = self.websocket_adaptor_cls(scope, receive, send)
+        route = str(scope.get("path") or "").strip("/")
+        root_url = str(self.config.root_url or "").strip("/")
+        if root_url:
+            if route != root_url and not route.startswith(root_url + "/"):
+                await adaptor.close(WebSocketCloseCode.APPLICATION + 404)
+                return
+            route = route[len(root_url):]
+        # the handshake request as a GET request for the request adaptor
+        django_request = ASGIRequest(dict(scope, method="GET"), io.BytesIO())
+        request = Request(self.request_adaptor_cls(django_request, self.load_route(route)))
+        await serve_websocket(self.config.resolve(), request, adaptor)
+
     def application(self):
         self.setup()
         if self.app:
             return self.app
         if self.asynchronous:
-            self.app = ASGIHandler()
+            self.app = WebsocketASGIHandler(self.websocket_application)
         else:
             self.app = WSGIHandler()
         # return self.app
@@ -2,11 +2,14 @@ import sanic
 from sanic import Sanic
 from utilmeta.core.request.backends.sanic import SanicRequestAdaptor
 from utilmeta.core.response.backends.sanic import SanicResponseAdaptor
+from utilmeta.core.websocket.backends.sanic import SanicWebsocketAdaptor
+from utilmeta.core.websocket import serve_websocket, has_websocket_routes
 from utilmeta.core.response import Response
 from utilmeta.core.request import Request
 from .base import ServerAdaptor
 from utilmeta.core.api import API
 import contextvars
+import asyncio
 from typing import Type
 
 _current_request = contextvars.ContextVar("_sanic.request")
@@ -17,6 +20,7 @@ class SanicServerAdaptor(ServerAdaptor):
     backend = sanic
     request_adaptor_cls = SanicRequestAdaptor
     response_adaptor_cls = SanicResponseAdaptor
+    websocket_adaptor_cls = SanicWebsocketAdaptor
     application_cls = Sanic
     DEFAULT_NAME = "sanic_application"
     default_asynchronous = True
@@ -95,6 +99,33 @@ class SanicServerAdaptor(ServerAdaptor):
         _current_response.set(None)
         return sanic_response
 
+    @classmethod
+    def is_websocket(cls, sanic_request) -> bool:
+        # the "websocket" scope of the sanic ASGI app may not carry the upgrade header
+        scope = getattr(sanic_request.transport, "scope", None)
+        if isinstance(scope, dict) and scope.get("type") == "websocket":
+            return True
+        return str(sanic_request.headers.get("upgrade", "")).lower() == "websocket"
+
+    async def serve_websocket(self, utilmeta_api_class, sanic_request, req: Request):
+        """
+        Complete the handshake of the upgrade request routed to the API like sanic websocket routes,
+        (the websocket route cannot share the path with the GET route of the API)
+        """
+        if self.app.asgi:
+            ws = sanic_request.transport.get_websocket_connection()
+            await ws.accept()
+        else:
+            protocol = sanic_request.transport.get_protocol()
+            ws = await protocol.websocket_handshake(sanic_request)
+        task = asyncio.current_task()
+        # cancelled when the server is stopped
+        self.app.websocket_tasks.add(task)
+        try:
+            await serve_websocket(utilmeta_api_class, req, self.websocket_adaptor_cls(ws, sanic_request))
+        finally:
+            self.app.websocket_tasks.discard(task)
+
     def setup_middlewares(self):
         if self.middlewares:
             self.app.on_request(self.on_request)
@@ -163,6 +194,11 @@ class SanicServerAdaptor(ServerAdaptor):
         else:
             prepend = "/"
 
+        websocket = asynchronous and has_websocket_routes(utilmeta_api_class)
+        if websocket:
+            # use the websocket protocol of sanic for the upgrade requests
+            app.enable_websocket()
+
         if asynchronous:
             # @app.route('%s<path:path>' % prepend, methods=self.HANDLED_METHODS, static=True)
             async def f(request, path: str = ""):
@@ -177,6 +213,12 @@ class SanicServerAdaptor(ServerAdaptor):
                         req.adaptor.route = path
                         req.adaptor.request = request
 
+                    if websocket and self.is_websocket(request):
+                        await self.serve_websocket(
+                            utilmeta_api_class, request, Request.apply_for(req)
+                        )
+                        return None
+
                     resp = await utilmeta_api_class(req)()
                 except Exception as e:
                     resp = getattr(utilmeta_api_class, "response", Response)(
@@ -210,6 +252,9 @@ class SanicServerAdaptor(ServerAdaptor):
         # app.route('%s<path:path>' % prepend, methods=self.HANDLED_METHODS, name='extend_path')(f)
         # app.route(route, methods=self.HANDLED_METHODS, name='core_methods')(f)
         f.__wrapped__ = utilmeta_api_class
+        if websocket:
+            # sanic will not require a response from the handler of the upgrade requests
+            f.is_websocket = True
         return app.route(
             "%s<path:path>" % prepend,
             methods=self.HANDLED_METHODS,
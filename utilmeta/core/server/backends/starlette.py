@@ -2,6 +2,7 @@ import inspect
 
 import starlette
 from starlette.requests import Request as StarletteRequest
+from starlette.websockets import WebSocket as StarletteWebSocket
 from starlette.applications import Starlette
 from starlette.concurrency import iterate_in_threadpool
 from starlette.responses import Response as StarletteResponse
@@ -10,11 +11,14 @@ from .base import ServerAdaptor
 from utilmeta.core.response import Response
 from utilmeta.core.request.backends.starlette import StarletteRequestAdaptor
 from utilmeta.core.response.backends.starlette import StarletteResponseAdaptor
+from utilmeta.core.websocket.backends.starlette import StarletteWebsocketAdaptor
+from utilmeta.core.websocket import serve_websocket
 from utilmeta.core.api import API
 from utilmeta.core.request import Request
 from utilmeta.utils import HAS_BODY_METHODS, RequestType, exceptions, pop, Error
+from utype import unprovided
 import contextvars
-from typing import Optional, Type
+from typing import Optional, Type, Union
 
 _current_request = contextvars.ContextVar("_starlette.request")
 # _current_response = contextvars.ContextVar('_starlette.response')
@@ -26,6 +30,7 @@ class StarletteServerAdaptor(ServerAdaptor):
     application_cls = Starlette  # can be inherit and replace with FastAPI
     request_adaptor_cls = StarletteRequestAdaptor
     response_adaptor_cls = StarletteResponseAdaptor
+    websocket_adaptor_cls = StarletteWebsocketAdaptor
     default_asynchronous = True
     DEFAULT_PORT = 8000
     RECORD_RESPONSE_BODY_STATUS_GTE = 400
@@ -44,6 +49,10 @@ class StarletteServerAdaptor(ServerAdaptor):
     DEFAULT_HOST = "127.0.0.1"
     HANDLED_METHODS = ["DELETE", "HEAD", "GET", "OPTIONS", "PATCH", "POST", "PUT"]
 
+    asgi_middleware: bool = False
+    # opt-in: install the service middlewares as a raw ASGI middleware
+    # instead of the call_next http middleware
+
     def __init__(self, config):
         super().__init__(config=config)
         self.app = (
@@ -68,7 +77,7 @@ class StarletteServerAdaptor(ServerAdaptor):
         self.app.mount(route, app)
         self._mounts[route] = app
 
-    def load_route(self, request: StarletteRequest):
+    def load_route(self, request: Union[StarletteRequest, StarletteWebSocket]):
         path = request.path_params.get("path") or request.url.path
         return super().load_route(path)
 
@@ -95,6 +104,10 @@ class StarletteServerAdaptor(ServerAdaptor):
 
     def setup_middlewares(self):
         if self.middlewares:
+            if self.asgi_middleware:
+                self.app.add_middleware(ASGIServiceMiddleware, adaptor=self)  # noqa
+                return
+
             from starlette.middleware.base import BaseHTTPMiddleware
 
             self.app.add_middleware(
@@ -381,12 +394,24 @@ class StarletteServerAdaptor(ServerAdaptor):
 
         f.__wrapped__ = utilmeta_api_class
 
+        # websocket is always served asynchronously
+        async def ws(websocket: StarletteWebSocket):
+            req = Request(self.request_adaptor_cls(websocket, self.load_route(websocket)))
+            await serve_websocket(
+                utilmeta_api_class, req, self.websocket_adaptor_cls(websocket)
+            )
+
+        ws.__wrapped__ = utilmeta_api_class
+
         if default:
             original_default = app.router.default
 
             async def default_route(scope, receive, send):
                 from starlette.requests import Request
 
+                if scope["type"] == "websocket":
+                    return await ws(StarletteWebSocket(scope, receive=receive, send=send))
+
                 request = Request(scope, receive=receive, send=send)
                 try:
                     response = f(request, True)
@@ -402,6 +427,7 @@ class StarletteServerAdaptor(ServerAdaptor):
             app.add_route(
                 path="%s{path:path}" % route, route=f, methods=self.HANDLED_METHODS
             )
+            app.router.add_websocket_route("%s{path:path}" % route, ws)
 
     def application(self):
         self.setup()
@@ -427,3 +453,152 @@ class StarletteServerAdaptor(ServerAdaptor):
                 self.app,
                 **run_kwargs,
             )
+
+
+class ASGIServiceMiddleware:
+    """
+    Run the service middlewares directly on the ASGI scope / receive / send,
+    the request body is only teed when it is going to be recorded,
+    and the downstream response messages are passed through as they are
+    unless a middleware returns a new response
+    (streaming responses are passed through immediately, changes to them are ignored)
+    """
+
+    def __init__(self, app, adaptor: StarletteServerAdaptor):
+        self.app = app
+        self.adaptor = adaptor
+
+    def record_request_body(self, request: Request) -> bool:
+        adaptor = self.adaptor
+        if request.adaptor.request_method.lower() not in HAS_BODY_METHODS:
+            return False
+        return (
+            request.content_type in adaptor.RECORD_REQUEST_BODY_TYPES
+            and (request.content_length or 0) <= adaptor.RECORD_REQUEST_BODY_LENGTH_LTE
+        )
+
+    async def process_request(self, request: Request):
+        for middleware in self.adaptor.middlewares:
+            res = middleware.process_request(request) or request
+            if inspect.isawaitable(res):
+                res = await res
+            if isinstance(res, Response):
+                return request, res
+            elif isinstance(res, Request):
+                request = res
+        return request, None
+
+    async def process_response(self, response: Response):
+        response_updated = False
+        for middleware in self.adaptor.middlewares:
+            _response = middleware.process_response(response)
+            if inspect.isawaitable(_response):
+                _response = await _response
+            if isinstance(_response, Response):
+                response = _response
+                response_updated = True
+        return response, response_updated
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        adaptor = self.adaptor
+        request = Request(adaptor.request_adaptor_cls(StarletteRequest(scope, receive=receive)))
+        request, response = await self.process_request(request)
+
+        if response is not None:
+            response, _ = await self.process_response(response)
+            starlette_response = adaptor.response_adaptor_cls.reconstruct(response)
+            return await starlette_response(scope, receive, send)
+
+        body_chunks = []
+        body_complete = not self.record_request_body(request)
+        response_start = None
+        response_chunks = []
+        response_length = 0
+        pending = []
+        streaming = False
+
+        async def receive_wrapper():
+            nonlocal body_complete
+            message = await receive()
+            if not body_complete and message["type"] == "http.request":
+                body_chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body_complete = True
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_start, response_length, streaming
+            if message["type"] == "http.response.start":
+                response_start = message
+                return
+            if message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                if (
+                    response_start["status"] >= adaptor.RECORD_RESPONSE_BODY_STATUS_GTE
+                    and response_length + len(body) <= adaptor.RECORD_RESPONSE_BODY_LENGTH_LTE
+                ):
+                    response_chunks.append(body)
+                response_length += len(body)
+                if not streaming and not message.get("more_body", False):
+                    # the whole response is generated, hold it for the middlewares
+                    pending.append(message)
+                    return
+            if not streaming:
+                streaming = True
+                await send(response_start)
+            await send(message)
+
+        exc = None
+        _current_request.set(request)
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except Exception as e:
+            exc = e
+        finally:
+            _current_request.set(None)
+
+        if not body_complete and unprovided(request.adaptor._body):
+            # the body is not (fully) consumed by the application
+            while not body_complete:
+                message = await receive()
+                if message["type"] != "http.request":
+                    break
+                body_chunks.append(message.get("body", b""))
+                body_complete = not message.get("more_body", False)
+        if body_chunks and body_complete:
+            request.adaptor.body = b"".join(body_chunks)
+
+        if exc is not None:
+            response = Response(error=Error(exc, request=request), request=request)
+        else:
+            response = request.adaptor.get_context("response")
+            if response_start is not None:
+                starlette_response = StarletteResponse(status_code=response_start["status"])
+                starlette_response.raw_headers = list(response_start.get("headers") or [])
+                starlette_response.body = b"".join(response_chunks)
+                if not isinstance(response, Response):
+                    # from native starlette api
+                    response = Response(
+                        response=adaptor.response_adaptor_cls(starlette_response),
+                        request=request,
+                    )
+                elif not response.adaptor:
+                    response.adaptor = adaptor.response_adaptor_cls(starlette_response)
+
+        response_updated = False
+        if isinstance(response, Response):
+            response, response_updated = await self.process_response(response)
+
+        if exc is not None:
+            raise exc from exc
+        if streaming or response_start is None:
+            return
+        if response_updated:
+            starlette_response = adaptor.response_adaptor_cls.reconstruct(response)
+            return await starlette_response(scope, receive, send)
+        await send(response_start)
+        for message in pending:
+            await send(message)
@@ -5,6 +5,8 @@ from tornado.web import RequestHandler, Application
 from utilmeta.core.response import Response
 from utilmeta.core.request import Request
 from utilmeta.core.request.backends.tornado import TornadoServerRequestAdaptor
+from utilmeta.core.websocket.backends.tornado import TornadoWebsocketAdaptor, TornadoWebsocketHandler
+from utilmeta.core.websocket import serve_websocket, has_websocket_routes
 from .base import ServerAdaptor
 import asyncio
 from utilmeta.core.api import API
@@ -14,6 +16,7 @@ from typing import Optional, Type
 class TornadoServerAdaptor(ServerAdaptor):
     backend = tornado
     request_adaptor_cls = TornadoServerRequestAdaptor
+    websocket_adaptor_cls = TornadoWebsocketAdaptor
     application_cls = Application
     DEFAULT_PORT = 8000
     default_asynchronous = True
@@ -38,7 +41,7 @@ class TornadoServerAdaptor(ServerAdaptor):
             api, asynchronous=asynchronous, append_slash=True
         )
         path = rf'/{route.strip("/")}(\/.*)?' if route.strip("/") else "(.*)"
-        self.app.add_handlers(".*", [(path, func)])
+        self.app.add_handlers(".*", [*self.get_websocket_rules(api, path), (path, func)])
 
     def load_route(self, path: str):
         return (path or "").strip("/")
@@ -211,6 +214,35 @@ class TornadoServerAdaptor(ServerAdaptor):
 
         return Handler
 
+    def get_websocket_handler(self, utilmeta_api_class):
+        request_adaptor_cls = self.request_adaptor_cls
+        websocket_adaptor_cls = self.websocket_adaptor_cls
+        service = self
+
+        class Handler(TornadoWebsocketHandler):
+            async def serve(self, path: str = None, *args, **kwargs):
+                request = Request(request_adaptor_cls(self.request, service.load_route(path)))
+                await serve_websocket(utilmeta_api_class, request, websocket_adaptor_cls(self))
+
+        return Handler
+
+    def get_websocket_rules(self, utilmeta_api_class, path: str) -> list:
+        """
+        The websocket handler is matched before the request handler of the same path
+        only for the upgrade requests
+        """
+        if not has_websocket_routes(utilmeta_api_class):
+            return []
+        from tornado.routing import Rule, PathMatches
+
+        class WebsocketMatches(PathMatches):
+            def match(self, request):
+                if str(request.headers.get("Upgrade", "")).lower() != "websocket":
+                    return None
+                return super().match(request)
+
+        return [Rule(WebsocketMatches(path), self.get_websocket_handler(utilmeta_api_class))]
+
     @property
     def request_handler(self):
         return self.get_request_handler(self.resolve(), asynchronous=self.asynchronous)
@@ -241,10 +273,14 @@ class TornadoServerAdaptor(ServerAdaptor):
         else:
             url_pattern = "/" + root_api._get_route_pattern().lstrip("^")
 
+        rules = [
+            *self.get_websocket_rules(root_api, url_pattern),
+            (url_pattern, self.request_handler),
+        ]
         if self.app:
-            self.app.add_handlers(".*", [(url_pattern, self.request_handler)])
+            self.app.add_handlers(".*", rules)
             return self.app
-        self.app = self.application_cls([(url_pattern, self.request_handler)])
+        self.app = self.application_cls(rules)
         self._ready = True
         return self.app
 
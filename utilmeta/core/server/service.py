@@ -445,14 +445,19 @@ class UtilMeta:
                 await r
 
     def shutdown(self):
+        from utilmeta.core.cli.pool import pool
+
         for cls, config in self.configs.items():
             if isinstance(config, Config):
                 config.on_shutdown(self)
         for func in self.events.get("shutdown", []):
             func()
+        pool.close()
 
     @awaitable(shutdown)
     async def shutdown(self):
+        from utilmeta.core.cli.pool import pool
+
         for cls, config in self.configs.items():
             if isinstance(config, Config):
                 r = config.on_shutdown(self)
@@ -462,6 +467,7 @@ class UtilMeta:
             r = func()
             if inspect.isawaitable(r):
                 await r
+        await pool.aclose()
 
     def on_startup(self, f):
         if callable(f):
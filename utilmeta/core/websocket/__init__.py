@@ -1,3 +1,4 @@
-from .base import Websocket
-from .request import WebsocketRequest
-from .properties import ClientEvent, ServerEvent
+from .base import Websocket, serve_websocket, has_websocket_routes
+from .backends.base import WebsocketAdaptor
+from .properties import Connection
+from .stats import websocket_stats
@@ -0,0 +1,65 @@
+from typing import Union, Optional, List, Tuple
+from utilmeta.utils.exceptions import WebsocketDisconnect
+from .base import WebsocketAdaptor
+
+
+class ASGIWebsocketAdaptor(WebsocketAdaptor):
+    """
+    Websocket over the raw ASGI (scope, receive, send) of the "websocket" protocol,
+    like the Django Channels-style ASGI applications
+    """
+
+    def __init__(self, scope: dict, receive, send):
+        super().__init__(scope)
+        self.scope = scope
+        self._receive = receive
+        self._send = send
+        self._connected = False
+
+    @property
+    def subprotocols(self) -> List[str]:
+        return list(self.scope.get("subprotocols") or [])
+
+    async def _connect(self):
+        if self._connected:
+            return
+        message = await self._receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebsocketDisconnect(message.get("code", 1000))
+        if message["type"] != "websocket.connect":
+            raise RuntimeError(f"Unexpected ASGI message before connect: {message['type']}")
+        self._connected = True
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: List[Tuple[str, str]] = None,
+    ):
+        await self._connect()
+        message = {"type": "websocket.accept", "subprotocol": subprotocol}
+        if headers:
+            message["headers"] = [
+                (str(k).lower().encode("latin-1"), str(v).encode("latin-1"))
+                for k, v in headers
+            ]
+        await self._send(message)
+
+    async def receive(self) -> Union[str, bytes]:
+        message = await self._receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebsocketDisconnect(message.get("code", 1000), message.get("reason"))
+        text = message.get("text")
+        if text is not None:
+            return text
+        return message.get("bytes") or b""
+
+    async def send(self, data: Union[str, bytes]):
+        if isinstance(data, bytes):
+            await self._send({"type": "websocket.send", "bytes": data})
+        else:
+            await self._send({"type": "websocket.send", "text": data})
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        # close before accept will reject the handshake (403 response)
+        await self._connect()
+        await self._send({"type": "websocket.close", "code": code, "reason": reason or ""})
@@ -0,0 +1,52 @@
+from typing import Union, Optional, List, Tuple
+from utilmeta.utils.adaptor import BaseAdaptor
+
+
+class WebsocketAdaptor(BaseAdaptor):
+    """
+    The transport of a server-side websocket connection,
+    the messages are str (text frames) or bytes (binary frames),
+    receive() raise WebsocketDisconnect when the connection is closed
+    """
+
+    __backends_package__ = "utilmeta.core.websocket.backends"
+    # the handshake is completed by the server before the endpoint is called,
+    # so the connection cannot be rejected with a HTTP response,
+    # and the subprotocol passed to accept() is not negotiated (see selected_subprotocol)
+    auto_accept = False
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+
+    @classmethod
+    def parse_subprotocols(cls, value) -> List[str]:
+        # the Sec-WebSocket-Protocol header
+        if not value:
+            return []
+        return [v.strip() for v in str(value).split(",") if v.strip()]
+
+    @property
+    def subprotocols(self) -> List[str]:
+        # the subprotocols requested by the client
+        return []
+
+    @property
+    def selected_subprotocol(self) -> Optional[str]:
+        # the subprotocol selected by the server in the handshake completed before the endpoint
+        return None
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: List[Tuple[str, str]] = None,
+    ):
+        raise NotImplementedError
+
+    async def receive(self) -> Union[str, bytes]:
+        raise NotImplementedError
+
+    async def send(self, data: Union[str, bytes]):
+        raise NotImplementedError
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        raise NotImplementedError
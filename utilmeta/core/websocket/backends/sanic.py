@@ -0,0 +1,73 @@
+from sanic.server.websockets.impl import WebsocketImplProtocol
+from sanic.server.websockets.connection import WebSocketConnection
+from typing import Union, Optional, List, Tuple
+from utilmeta.utils.exceptions import WebsocketDisconnect
+from .base import WebsocketAdaptor
+import sanic
+
+
+class SanicWebsocketAdaptor(WebsocketAdaptor):
+    """
+    Adapt the websocket of sanic server (WebsocketImplProtocol) and sanic ASGI app (WebSocketConnection)
+    """
+
+    websocket: Union[WebsocketImplProtocol, WebSocketConnection]
+    backend = sanic
+    # sanic complete the handshake before the websocket handler
+    auto_accept = True
+
+    def __init__(self, websocket, request=None):
+        super().__init__(websocket)
+        # the sanic request of the handshake
+        self.request = request
+
+    @classmethod
+    def qualify(cls, obj):
+        return isinstance(obj, (WebsocketImplProtocol, WebSocketConnection))
+
+    @property
+    def subprotocols(self) -> List[str]:
+        if isinstance(self.websocket, WebSocketConnection):
+            return list(self.websocket.subprotocols)
+        if self.request is None:
+            return []
+        return self.parse_subprotocols(self.request.headers.get("sec-websocket-protocol"))
+
+    @property
+    def selected_subprotocol(self) -> Optional[str]:
+        if isinstance(self.websocket, WebSocketConnection):
+            return None
+        return self.websocket.subprotocol
+
+    def _close_code(self) -> int:
+        close = getattr(getattr(self.websocket, "ws_proto", None), "close_rcvd", None)
+        return getattr(close, "code", None) or 1005
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: List[Tuple[str, str]] = None,
+    ):
+        # the handshake is completed before the endpoint is called,
+        # the subprotocol and headers are not applied
+        pass
+
+    async def receive(self) -> Union[str, bytes]:
+        from websockets.exceptions import ConnectionClosed
+
+        try:
+            data = await self.websocket.recv()
+        except ConnectionClosed as e:
+            rcvd = getattr(e, "rcvd", None)
+            raise WebsocketDisconnect(
+                getattr(rcvd, "code", None) or 1005, getattr(rcvd, "reason", None)
+            ) from e
+        if data is None:
+            raise WebsocketDisconnect(self._close_code())
+        return data
+
+    async def send(self, data: Union[str, bytes]):
+        await self.websocket.send(data)
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        await self.websocket.close(code=code, reason=reason or "")
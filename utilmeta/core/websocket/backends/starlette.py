@@ -0,0 +1,55 @@
+from starlette.websockets import WebSocket, WebSocketState
+from typing import Union, Optional, List, Tuple
+from utilmeta.utils.exceptions import WebsocketDisconnect
+from .base import WebsocketAdaptor
+import starlette
+
+
+class StarletteWebsocketAdaptor(WebsocketAdaptor):
+    """
+    This adaptor can adapt starlette project and all frameworks based on it
+    such as [FastAPI]
+    """
+
+    websocket: WebSocket
+    backend = starlette
+
+    @classmethod
+    def qualify(cls, obj):
+        return isinstance(obj, WebSocket)
+
+    @property
+    def subprotocols(self) -> List[str]:
+        return list(self.websocket.scope.get("subprotocols") or [])
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: List[Tuple[str, str]] = None,
+    ):
+        if headers:
+            headers = [
+                (str(k).lower().encode("latin-1"), str(v).encode("latin-1"))
+                for k, v in headers
+            ]
+        await self.websocket.accept(subprotocol=subprotocol, headers=headers)
+
+    async def receive(self) -> Union[str, bytes]:
+        message = await self.websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            raise WebsocketDisconnect(message.get("code", 1000), message.get("reason"))
+        text = message.get("text")
+        if text is not None:
+            return text
+        return message.get("bytes") or b""
+
+    async def send(self, data: Union[str, bytes]):
+        if isinstance(data, bytes):
+            await self.websocket.send_bytes(data)
+        else:
+            await self.websocket.send_text(data)
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        if self.websocket.application_state == WebSocketState.DISCONNECTED:
+            return
+        await self.websocket.close(code=code, reason=reason)
@@ -0,0 +1,83 @@
+import asyncio
+from tornado.websocket import WebSocketHandler
+from typing import Union, Optional, List, Tuple
+from utilmeta.utils.exceptions import WebsocketDisconnect
+from .base import WebsocketAdaptor
+import tornado
+
+
+class TornadoWebsocketHandler(WebSocketHandler):
+    """
+    Bridge the tornado websocket callbacks to a message queue that consumed by the adaptor,
+    the handler of the connection is scheduled in open() as tornado
+    will not deliver the messages until open() returns
+    """
+
+    def initialize(self, **kwargs):
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.handler_task: Optional[asyncio.Task] = None
+
+    def check_origin(self, origin: str) -> bool:
+        # the origin is checked by the API plugins (like CORS) with the handshake request
+        return True
+
+    async def serve(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def open(self, *args, **kwargs):
+        self.handler_task = asyncio.ensure_future(self.serve(*args, **kwargs))
+
+    def on_message(self, message: Union[str, bytes]):
+        self.messages.put_nowait(message)
+
+    def on_close(self):
+        self.messages.put_nowait(None)
+
+
+class TornadoWebsocketAdaptor(WebsocketAdaptor):
+    websocket: TornadoWebsocketHandler
+    backend = tornado
+    # the handshake is completed before open()
+    auto_accept = True
+
+    @classmethod
+    def qualify(cls, obj):
+        return isinstance(obj, TornadoWebsocketHandler)
+
+    @property
+    def subprotocols(self) -> List[str]:
+        return self.parse_subprotocols(self.websocket.request.headers.get("Sec-WebSocket-Protocol"))
+
+    @property
+    def selected_subprotocol(self) -> Optional[str]:
+        # selected by TornadoWebsocketHandler.select_subprotocol (none by default)
+        return self.websocket.selected_subprotocol
+
+    async def accept(
+        self,
+        subprotocol: Optional[str] = None,
+        headers: List[Tuple[str, str]] = None,
+    ):
+        # the handshake is completed before open(), the subprotocol and headers are not applied
+        pass
+
+    async def receive(self) -> Union[str, bytes]:
+        message = await self.websocket.messages.get()
+        if message is None:
+            # put it back for the concurrent receivers
+            self.websocket.messages.put_nowait(None)
+            raise WebsocketDisconnect(
+                self.websocket.close_code or 1005, self.websocket.close_reason
+            )
+        return message
+
+    async def send(self, data: Union[str, bytes]):
+        from tornado.websocket import WebSocketClosedError
+
+        try:
+            await self.websocket.write_message(data, binary=isinstance(data, bytes))
+        except WebSocketClosedError as e:
+            raise WebsocketDisconnect(self.websocket.close_code or 1006) from e
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None):
+        self.websocket.close(code, reason)
@@ -1,24 +1,341 @@
-# from utilmeta.core.api import API
-#
-#
-# class Websocket(API):
-#     def send(self):
-#         pass
-#
-#     async def asend(self):
-#         pass
-#
-#     def accept(self):
-#         pass
-#
-#     async def aaccept(self):
-#         pass
-#
-#     def receive(self):
-#         pass
-#
-#     def connect(self):
-#         pass
-#
-#     def disconnect(self):
-#         pass
+import asyncio
+import warnings
+from typing import Union, Optional, Any, List, Tuple, Dict, Type, AsyncIterator, TYPE_CHECKING
+from utype.parser.field import ParserField
+from utype import Options, unprovided
+from utype.utils.exceptions import ParseError
+from utilmeta.conf import Preference
+from utilmeta.utils import exceptions as exc
+from utilmeta.utils import Error, WebSocketCloseCode, WEBSOCKET
+from utilmeta.utils.codec import get_json_codec
+from utilmeta.core.request import Request
+from utilmeta.core.response import Response
+from .backends.base import WebsocketAdaptor
+from .properties import Connection, WEBSOCKET_CONTEXT_KEY
+from .stats import websocket_stats
+
+if TYPE_CHECKING:
+    from utilmeta.core.api import API
+
+__all__ = ["Websocket", "serve_websocket", "has_websocket_routes"]
+
+_message_options = Options()
+_message_fields: Dict[Any, ParserField] = {}
+
+
+def _get_message_field(t) -> ParserField:
+    field = _message_fields.get(t)
+    if field is None:
+        field = _message_fields[t] = ParserField.generate(
+            attname="message", annotation=t, default=unprovided, options=_message_options
+        )
+    return field
+
+
+class Websocket:
+    """
+    A server-side websocket connection, declare an endpoint param with this type to get it
+        @api.websocket('chat/{room}')
+        async def chat(self, ws: Websocket, room: str):
+            async for message in ws.iter(ChatMessage):
+                await ws.send({'room': room, 'text': message.text})
+
+    - the endpoint is routed and processed (plugins, before hooks, auth params) with the handshake request,
+      and the connection is accepted on the first receive / send if not accepted explicitly
+    - the sent messages are queued and written by a writer task, when the queue is full,
+      send() is applied the overflow policy (block / drop / close) to backpressure the slow clients
+    - state is a dict for the per-connection state
+    - on the servers completing the handshake before the endpoint (sanic, tornado),
+      the subprotocol of accept() is not negotiated, ws.subprotocol is the one selected by the server
+    """
+
+    __field__ = Connection
+
+    def __init__(
+        self,
+        adaptor: WebsocketAdaptor,
+        request: Request = None,
+        *,
+        send_queue_size: int = None,
+        overflow: str = None,
+        close_timeout: float = None,
+    ):
+        pref = Preference.get()
+        self.adaptor = adaptor
+        self.request = request
+        self.state: Dict[str, Any] = {}
+        self.send_queue_size = (
+            pref.websocket_send_queue_size if send_queue_size is None else send_queue_size
+        ) or 0
+        self.overflow = overflow or pref.websocket_send_overflow
+        if self.overflow not in ("block", "drop", "close"):
+            raise ValueError(f"Invalid websocket send overflow: {repr(self.overflow)}")
+        self.close_timeout = (
+            pref.websocket_close_timeout if close_timeout is None else close_timeout
+        )
+
+        self.accepted = adaptor.auto_accept
+        self.subprotocol: Optional[str] = adaptor.selected_subprotocol if adaptor.auto_accept else None
+        self.closed = False
+        self.close_code: Optional[int] = None
+        self.close_reason: Optional[str] = None
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+
+    def __repr__(self):
+        path = self.request.path if self.request else None
+        return f"{self.__class__.__name__}(path={repr(path)}, closed={self.closed})"
+
+    @property
+    def subprotocols(self) -> List[str]:
+        # the subprotocols requested by the client
+        return self.adaptor.subprotocols
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def accept(self, subprotocol: str = None, headers: List[Tuple[str, str]] = None):
+        if self.closed:
+            raise exc.WebsocketDisconnect(self.close_code or WebSocketCloseCode.ABNORMAL)
+        if not self.accepted:
+            await self.adaptor.accept(subprotocol=subprotocol, headers=headers)
+            self.accepted = True
+            self.subprotocol = subprotocol
+        elif subprotocol and subprotocol != self.subprotocol:
+            warnings.warn(
+                f"utilmeta.core.websocket: subprotocol: {repr(subprotocol)} is not applied, "
+                f"the handshake is already completed by the server"
+            )
+        if self.send_queue_size and self._writer is None:
+            self._queue = asyncio.Queue(maxsize=self.send_queue_size)
+            self._writer = asyncio.ensure_future(self._write())
+
+    async def _ensure_accepted(self):
+        if not self.accepted or (self.send_queue_size and self._writer is None):
+            await self.accept()
+
+    def _set_closed(self, code: int = None, reason: str = None):
+        if self.closed:
+            return
+        self.closed = True
+        self.close_code = code
+        self.close_reason = reason
+
+    # receive ------------------------------------------------
+
+    async def receive_raw(self) -> Union[str, bytes]:
+        await self._ensure_accepted()
+        if self.closed:
+            raise exc.WebsocketDisconnect(self.close_code or WebSocketCloseCode.ABNORMAL)
+        try:
+            data = await self.adaptor.receive()
+        except exc.WebsocketDisconnect as e:
+            self._set_closed(e.code, e.reason)
+            raise
+        self.messages_received += 1
+        websocket_stats.receive(len(data))
+        return data
+
+    def parse(self, data: Union[str, bytes], t=None):
+        """
+        Parse the received message to type [t], the message is decoded as JSON
+        unless t is str / bytes, raise BadRequest if the message is invalid
+        """
+        if t is None or t is Any:
+            return data
+        if t is bytes:
+            return data.encode() if isinstance(data, str) else data
+        if t is str:
+            return data.decode() if isinstance(data, bytes) else data
+        try:
+            value = get_json_codec().loads(data)
+        except ValueError as e:
+            raise exc.BadRequest(f"invalid websocket message: {e}") from e
+        field = _get_message_field(t)
+        try:
+            return field.parse_value(value, context=_message_options.make_context())
+        except ParseError as e:
+            raise exc.BadRequest(str(e), detail=e.get_detail()) from e
+
+    async def receive(self, t=None):
+        """
+        Receive a message, parsed to type [t] if specified,
+        raise WebsocketDisconnect if the connection is closed
+        """
+        return self.parse(await self.receive_raw(), t)
+
+    async def iter(self, t=None) -> AsyncIterator:
+        """
+        Iterate the (parsed) messages until the connection is closed
+        """
+        while True:
+            try:
+                data = await self.receive_raw()
+            except exc.WebsocketDisconnect:
+                return
+            yield self.parse(data, t)
+
+    def __aiter__(self):
+        return self.iter()
+
+    # send ------------------------------------------------
+
+    def encode(self, data) -> Union[str, bytes]:
+        if isinstance(data, (str, bytes)):
+            return data
+        if isinstance(data, (bytearray, memoryview)):
+            return bytes(data)
+        return get_json_codec().dumps(data)
+
+    async def _write(self):
+        queue = self._queue
+        while True:
+            message = await queue.get()
+            try:
+                await self.adaptor.send(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # the transport is broken, the pending messages are discarded
+                code = e.code if isinstance(e, exc.WebsocketDisconnect) else WebSocketCloseCode.ABNORMAL
+                self._set_closed(code)
+                queue.task_done()
+                while not queue.empty():
+                    queue.get_nowait()
+                    queue.task_done()
+                return
+            self.messages_sent += 1
+            websocket_stats.send(len(message))
+            queue.task_done()
+
+    async def send(self, data) -> bool:
+        """
+        Send a message (str / bytes as is, others are encoded as JSON),
+        return False if the message is dropped by the overflow policy
+        """
+        await self._ensure_accepted()
+        if self.closed:
+            raise exc.WebsocketDisconnect(self.close_code or WebSocketCloseCode.ABNORMAL)
+        message = self.encode(data)
+        queue = self._queue
+        if queue is None:
+            try:
+                await self.adaptor.send(message)
+            except exc.WebsocketDisconnect as e:
+                self._set_closed(e.code, e.reason)
+                raise
+            self.messages_sent += 1
+            websocket_stats.send(len(message))
+            return True
+        if queue.full():
+            if self.overflow == "drop":
+                self.messages_dropped += 1
+                websocket_stats.drop()
+                return False
+            if self.overflow == "close":
+                self.messages_dropped += 1
+                websocket_stats.drop()
+                # the client cannot keep up with the messages
+                await self.close(WebSocketCloseCode.TRY_AGAIN_LATER, "send queue overflow", flush=False)
+                return False
+        await queue.put(message)
+        websocket_stats.queued(queue.qsize())
+        return True
+
+    async def flush(self):
+        """
+        Wait until the queued messages are sent
+        """
+        if self._queue is not None and self._writer is not None and not self._writer.done():
+            await self._queue.join()
+
+    async def close(self, code: int = WebSocketCloseCode.NORMAL, reason: str = None, flush: bool = True):
+        if self.closed:
+            await self._stop_writer()
+            return
+        if flush and self.accepted:
+            try:
+                await asyncio.wait_for(self.flush(), timeout=self.close_timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._set_closed(code, reason)
+        await self._stop_writer()
+        try:
+            await self.adaptor.close(code=code, reason=reason)
+        except Exception:  # noqa
+            # the transport is already closed
+            pass
+
+    async def _stop_writer(self):
+        writer = self._writer
+        if writer is None or writer.done():
+            return
+        writer.cancel()
+        try:
+            await writer
+        except (asyncio.CancelledError, Exception):  # noqa
+            pass
+
+
+def get_close_code(error: Optional[Error]) -> Tuple[int, Optional[str]]:
+    if error is None or isinstance(error.exc, exc.WebsocketDisconnect):
+        return WebSocketCloseCode.NORMAL, None
+    status = error.status
+    if status < 500:
+        # request errors (like 401 / 403 / 404) are closed with the application codes
+        # the close reason is limited to 123 bytes
+        reason = str(error.exc).encode()[:123].decode(errors="ignore")
+        return WebSocketCloseCode.APPLICATION + status, reason
+    return WebSocketCloseCode.INTERNAL_ERROR, None
+
+
+async def serve_websocket(api: Type["API"], request: Request, adaptor: WebsocketAdaptor) -> Websocket:
+    """
+    Serve a websocket connection by the API class, the handshake request is routed to the
+    @api.websocket endpoint and the connection is closed when the endpoint returns
+    """
+    ws = Websocket(adaptor, request=request)
+    request.adaptor.method = WEBSOCKET
+    request.adaptor.update_context(**{WEBSOCKET_CONTEXT_KEY: ws})
+    websocket_stats.connect(ws)
+    error = None
+    try:
+        resp = await api(request)()
+        if isinstance(resp, Response) and resp.error:
+            error = resp.error
+    except Exception as e:
+        error = Error(e, request=request)
+
+    code, reason = get_close_code(error)
+    if code == WebSocketCloseCode.INTERNAL_ERROR:
+        error.log(console=True)
+    accepted = ws.accepted
+    await ws.close(code, reason)
+    websocket_stats.disconnect(ws, accepted=accepted, error=code == WebSocketCloseCode.INTERNAL_ERROR)
+    return ws
+
+
+def has_websocket_routes(api: Type["API"], _visited: set = None) -> bool:
+    """
+    Whether there are @api.websocket endpoints in the API tree,
+    for the backends that need to enable the websocket protocol explicitly
+    """
+    from utilmeta.core.api import API
+
+    visited = _visited if _visited is not None else set()
+    if api in visited:
+        return False
+    visited.add(api)
+    for route in api._routes:
+        if route.method == WEBSOCKET:
+            return True
+        handler = route.handler
+        if isinstance(handler, type) and issubclass(handler, API):
+            if has_websocket_routes(handler, visited):
+                return True
+    return False
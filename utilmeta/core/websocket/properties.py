@@ -1,26 +1,25 @@
-# from utilmeta.types import *
-# from utilmeta.core.context import Property
-#
-#
-# class ClientEvent:
-#     def __init__(self,
-#                  key='action',
-#                  path_param=None,
-#                  data_getter=None):
-#         super().__init__()
-#
-#     def __call__(self, name: str,
-#                  aliases: List[str] = None,
-#                  deprecated: bool = None
-#                  ):
-#         def decorator(f):
-#             pass
-#         return decorator
-#
-#
-# class ServerEvent:
-#     pass
-#
-#
-# class Data(Property):
-#     pass
+from utilmeta.utils.context import Property
+from utilmeta.utils import exceptions as exc
+from utilmeta.core.request import Request
+from utype.parser.field import ParserField
+
+__all__ = ["Connection", "WEBSOCKET_CONTEXT_KEY"]
+
+WEBSOCKET_CONTEXT_KEY = "websocket"
+
+
+class Connection(Property):
+    """
+    The websocket connection of the handshake request,
+    injected to the endpoint params annotated as Websocket
+    """
+
+    __ident__ = "websocket"
+    __exclusive__ = True
+
+    @classmethod
+    def getter(cls, request: Request, field: ParserField = None):
+        ws = request.adaptor.get_context(WEBSOCKET_CONTEXT_KEY)
+        if ws is None:
+            raise exc.UpgradeRequired("websocket connection required", scheme="ws")
+        return ws
@@ -1,5 +0,0 @@
-# from utilmeta.core.request import Request
-#
-#
-# class WebsocketRequest(Request):
-#     pass
@@ -0,0 +1,98 @@
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .base import Websocket
+
+__all__ = ["WebsocketStats", "websocket_stats"]
+
+
+class WebsocketStats:
+    """
+    Process-level counters of the websocket connections, reported to the ops layer,
+    the message rates are calculated over the interval since the last get_metrics()
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections: "weakref.WeakSet[Websocket]" = weakref.WeakSet()
+        self.total_connections = 0
+        self.rejected = 0
+        self.errors = 0
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.messages_dropped = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.max_queue_depth = 0
+
+        self._last_time = time.monotonic()
+        self._last_received = 0
+        self._last_sent = 0
+
+    def connect(self, ws: "Websocket"):
+        with self.lock:
+            self.connections.add(ws)
+            self.total_connections += 1
+
+    def disconnect(self, ws: "Websocket", accepted: bool = True, error: bool = False):
+        with self.lock:
+            self.connections.discard(ws)
+            if not accepted:
+                self.rejected += 1
+            if error:
+                self.errors += 1
+
+    def receive(self, size: int):
+        # counters are not locked like the dispatch counters, they may be slightly off
+        self.messages_received += 1
+        self.bytes_received += size
+
+    def send(self, size: int):
+        self.messages_sent += 1
+        self.bytes_sent += size
+
+    def drop(self):
+        self.messages_dropped += 1
+
+    def queued(self, depth: int):
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    @property
+    def active_connections(self) -> int:
+        return len(self.connections)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(ws.queue_depth for ws in list(self.connections))
+
+    def get_metrics(self) -> dict:
+        now = time.monotonic()
+        with self.lock:
+            interval = now - self._last_time
+            received = self.messages_received - self._last_received
+            sent = self.messages_sent - self._last_sent
+            self._last_time = now
+            self._last_received = self.messages_received
+            self._last_sent = self.messages_sent
+        return dict(
+            active_connections=self.active_connections,
+            total_connections=self.total_connections,
+            rejected=self.rejected,
+            errors=self.errors,
+            messages_received=self.messages_received,
+            messages_sent=self.messages_sent,
+            messages_dropped=self.messages_dropped,
+            bytes_received=self.bytes_received,
+            bytes_sent=self.bytes_sent,
+            receive_rate=round(received / interval, 3) if interval > 0 else 0,
+            send_rate=round(sent / interval, 3) if interval > 0 else 0,
+            queue_depth=self.queue_depth,
+            max_queue_depth=self.max_queue_depth,
+        )
+
+
+websocket_stats = WebsocketStats()
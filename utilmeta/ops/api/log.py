@@ -48,6 +48,7 @@ class LogAPI(api.API):
         __distinct__ = False
         offset: int = orm.Offset(default=None)
         page: int = orm.Page()
+        cursor: str = orm.Cursor()
         rows: int = orm.Limit(default=20, le=100, alias_from=["limit"])
         method: str = orm.Filter(query=lambda v: models.Q(method__iexact=v))
         path: str
@@ -109,6 +110,7 @@ class LogAPI(api.API):
         __distinct__ = False
         offset: int = orm.Offset(default=None)
         page: int = orm.Page()
+        cursor: str = orm.Cursor()
         rows: int = orm.Limit(default=20, le=100, alias_from=["limit"])
         start: int = orm.Filter(query=lambda v: models.Q(time__gte=v))
         end: int = orm.Filter(query=lambda v: models.Q(time__lte=v))
@@ -147,35 +149,44 @@ class LogAPI(api.API):
             q = models.Q(service=self.supervisor.service)
         return q
 
+    @classmethod
+    def get_logs(cls, schema: Type[orm.Schema], query: orm.Query, base_qs) -> Tuple[list, dict]:
+        # the cursor pagination is used when the cursor param is provided (empty for the first page),
+        # the next cursor is derived from the fetched page and the count is skipped
+        if query.cursor is None:
+            return schema.serialize(query.get_queryset(base_qs)), dict(count=query.count(base_qs))
+        pks, next_cursor = query.get_cursor_page(base_qs)
+        return schema.serialize(pks), dict(extra=dict(next_cursor=next_cursor))
+
     @opsRequire("log.view")
     @api.get('/service')
     @adapt_async(close_conn=config.db_alias)
     def get_service_logs(self, query: ServiceLogQuery) -> WrappedResponse[List[ServiceLogBase]]:
         base_qs = ServiceLog.objects.filter(self.log_q)
-        logs = ServiceLogBase.serialize(query.get_queryset(base_qs))
+        logs, kwargs = self.get_logs(ServiceLogBase, query, base_qs)
         if config.log.hide_ip_address or config.log.hide_user_id:
             for log in logs:
                 if config.log.hide_ip_address:
                     log.ip = "*.*.*.*" if log.ip else ""
                 if config.log.hide_user_id:
                     log.user_id = "***" if log.user_id else None
-        return self.response(result=logs, count=query.count(base_qs))
+        return self.response(result=logs, **kwargs)
 
     @opsRequire("log.view")
     @api.get('/request')
     @adapt_async(close_conn=config.db_alias)
     def get_request_logs(self, query: RequestLogQuery) -> WrappedResponse[List[RequestLogBase]]:
         base_qs = RequestLog.objects.filter(self.log_q)
-        logs = RequestLogBase.serialize(query.get_queryset(base_qs))
-        return self.response(result=logs, count=query.count(base_qs))
+        logs, kwargs = self.get_logs(RequestLogBase, query, base_qs)
+        return self.response(result=logs, **kwargs)
 
     @opsRequire("log.view")
     @api.get('/alert')
     @adapt_async(close_conn=config.db_alias)
     def get_alert_logs(self, query: AlertLogQuery) -> WrappedResponse[List[AlertLogBase]]:
         base_qs = AlertLog.objects.filter(self.log_q)
-        logs = AlertLogBase.serialize(query.get_queryset(base_qs))
-        return self.response(result=logs, count=query.count(base_qs))
+        logs, kwargs = self.get_logs(AlertLogBase, query, base_qs)
+        return self.response(result=logs, **kwargs)
 
     @opsRequire("log.view")
     @api.get("service/values")
@@ -63,6 +63,8 @@ class Operations(Config):
         # SERVER_MONITOR_RETENTION = timedelta(days=7)
         # INSTANCE_MONITOR_RETENTION = timedelta(days=7)
         default_cpu_interval: int
+        # timeout (in seconds) of each resource probe in the async worker cycle
+        probe_timeout: float
 
         def __init__(
             self,
@@ -78,6 +80,7 @@ class Operations(Config):
             database_retention: timedelta = timedelta(days=7),
             cache_retention: timedelta = timedelta(days=7),
             default_cpu_interval: int = 1,
+            probe_timeout: float = 5,
         ):
             super().__init__(locals())
 
@@ -90,6 +93,12 @@ class Operations(Config):
         logger_cls: Any
         middleware_cls: Any
         max_backlog: int
+        max_queue_size: int
+        overflow_policy: str
+        sample_rate: float
+        capture_queries: bool
+        capture_queries_sample_rate: float
+        max_captured_queries: int
 
         store_data_level: Optional[int]
         store_result_level: Optional[int]
@@ -112,6 +121,15 @@ class Operations(Config):
             logger_cls=None,
             middleware_cls=None,
             max_backlog: int = 100,
+            # the backlog will trigger a batch save, the queued logs over max_queue_size are
+            # dropped (drop_oldest / drop_newest) or sampled (sample) by the overflow_policy
+            max_queue_size: int = 10000,
+            overflow_policy: Literal['drop_oldest', 'drop_newest', 'sample'] = 'drop_oldest',
+            sample_rate: float = 0.1,
+            # capture the sql queries of (the sampled) requests into QueryLog, aggregated by the sql fingerprint
+            capture_queries: bool = False,
+            capture_queries_sample_rate: float = 1.0,
+            max_captured_queries: int = 50,
             # logger_cls=None,
             store_data_level: Optional[int] = None,
             store_result_level: Optional[int] = None,
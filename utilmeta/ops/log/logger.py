@@ -3,7 +3,7 @@ import warnings
 from utilmeta.core.response import Response
 from utilmeta.core.request import var, Request
 from utilmeta.utils.context import ContextProperty, Property
-from typing import Optional, Union
+from typing import Optional, Union, List
 from utilmeta.utils import (
     HAS_BODY_METHODS,
     hide_secret_values,
@@ -13,9 +13,12 @@ from utilmeta.utils import (
 )
 from utilmeta.ops.config import Operations
 import threading
+import random
 import time
 from functools import wraps
 from utilmeta.ops.store import store
+from .pipeline import ServiceLogRecord, RequestLogRecord
+from .query import QueryCapture
 
 
 class LogLevel:
@@ -72,6 +75,7 @@ class Logger(Property):
         self._events_only = False
         self._server_timing = False
         self._exited = False
+        self._queries: Optional[QueryCapture] = None
         self._volatile = self.config.log.default_volatile
         self._store_data_level = self.config.log.store_data_level
         self._store_result_level = self.config.log.store_result_level
@@ -115,6 +119,10 @@ class Logger(Property):
             and not self._span_logger
         )
 
+    @property
+    def queries(self) -> Optional[QueryCapture]:
+        return self._queries
+
     @property
     def level(self):
         return self._level
@@ -163,6 +171,7 @@ class Logger(Property):
         logger._request = self._request
         logger._supervised = self._supervised
         logger._server_timing = self._server_timing
+        logger._queries = self._queries
         store.logger.set(logger)
         self._span_logger = logger
         return logger
@@ -219,6 +228,13 @@ class Logger(Property):
                     self._omitted = True
                 if "timing" in options or "server-timing" in options:
                     self._server_timing = True
+        if self.config.log.capture_queries and not self._omitted:
+            sample_rate = self.config.log.capture_queries_sample_rate
+            if sample_rate >= 1 or random.random() < sample_rate:
+                self._queries = QueryCapture(
+                    max_queries=self.config.log.max_captured_queries,
+                    exclude=[self.config.db_alias]
+                )
 
     def omit(self, val: bool = True):
         self._omitted = val
@@ -236,39 +252,29 @@ class Logger(Property):
                     else self.init_time
                 )
                 if duration:
-                    response.set_header(
-                        "Server-Timing", f"total;dur={duration};ts={ts}"
-                    )
+                    timing = f"total;dur={duration};ts={ts}"
+                    if self._queries:
+                        timing += f', db;dur={round(self._queries.duration, 3)};desc="{self._queries.num} queries"'
+                    response.set_header("Server-Timing", timing)
 
-    def generate_request_logs(self, context_type="service_log", context_id=None):
+    def generate_request_records(self) -> List[RequestLogRecord]:
         if not self._client_responses:
             return []
+        return [self.generate_request_record(resp) for resp in self._client_responses]
 
-        objects = []
-
-        for resp in self._client_responses:
-            log = self.generate_request_log(
-                resp, context_type=context_type, context_id=context_id
-            )
-            if log:
-                objects.append(log)
-        return objects
-
-    def generate_request_log(
-        self, response: Response, context_type="service_log", context_id=None
-    ):
-        from utilmeta.ops.models import RequestLog
-        from utilmeta.ops.alert.event import event
+    def generate_request_logs(self, context_type="service_log", context_id=None):
+        return [
+            record.get_log(self.service.name, context_type=context_type, context_id=context_id)
+            for record in self.generate_request_records()
+        ]
 
+    def generate_request_record(self, response: Response) -> RequestLogRecord:
         request = response.request
-        status = response.status
         request_headers = {}
         response_headers = {}
-        level = None
         data = None
         result = None
-        if level is None:
-            level = self.status_level(response.status)
+        level = self.status_level(response.status)
         if level >= self._store_headers_level:
             request_headers = self.parse_values(dict(request.headers))
             response_headers = self.parse_values(
@@ -289,40 +295,15 @@ class Logger(Property):
             except Exception as e:  # noqa: ignore
                 warnings.warn(f"load response data failed: {e}")
 
-        # ALERT -----
-        alert_event = None
-        alert_log = None
-
-        if not status or response.is_timeout:
-            alert_event = event.api_timeout_outbound_request
-        elif status >= 400:
-            alert_event = event.api_error_outbound_request
-        if alert_event:
-            alert_log = alert_event(
-                None, response.time,
-                method=request.method,
-                url=request.url,
-                status=status,
-            )
-        # ----------
-
-        return RequestLog(
-            service=self.service.name,
+        return RequestLogRecord(
             time=request.time,
             duration=response.duration_ms,
-            node_id=store.node_id,
-            context_type=context_type,
-            context_id=context_id,
-            instance=store.instance,
-            worker=store.worker,
             host=request.host,
             asynchronous=request.adaptor.get_context("asynchronous"),
             timeout=request.adaptor.get_context("timeout"),
             timeout_error=response.is_timeout,
             server_error=response.is_server_error,
             client_error=response.is_client_error,
-            alert=alert_log,
-            # --
             scheme=request.scheme,
             in_traffic=response.traffic,
             out_traffic=request.traffic,
@@ -331,8 +312,8 @@ class Logger(Property):
             query=request.query,
             data=data,
             result=result,
-            user_agent=parse_user_agents(request.headers.get("user-agent")),
-            status=status,
+            user_agent=request.headers.get("user-agent"),
+            status=response.status,
             request_type=str(request.content_type)[:200] if request.content_type else None,
             response_type=str(response.content_type)[:200] if response.content_type else None,
             request_headers=request_headers,
@@ -341,6 +322,13 @@ class Logger(Property):
             method=request.method,
         )
 
+    def generate_request_log(
+        self, response: Response, context_type="service_log", context_id=None
+    ):
+        return self.generate_request_record(response).get_log(
+            self.service.name, context_type=context_type, context_id=context_id
+        )
+
     @classmethod
     def get_file_repr(cls, file):
         return "<file>"
@@ -351,17 +339,16 @@ class Logger(Property):
         )
 
     def generate_log(self, response: Response):
-        from utilmeta.ops.models import ServiceLog
+        return self.generate_record(response).get_log()
+
+    def generate_record(self, response: Response) -> ServiceLogRecord:
+        # convert the response to a compact record, the request / response can be released after
         from utilmeta.ops.api import access_token_var
-        from utilmeta.ops.alert.event import event
 
         request = response.request
         duration = response.duration_ms
 
         status = response.status
-        path = request.path
-        in_traffic = request.traffic
-        out_traffic = response.traffic
         level = self.level
         if level is None:
             level = self.status_level(status)
@@ -417,59 +404,33 @@ class Logger(Property):
             endpoint_ident = store.get_endpoint_ident(request)
 
         endpoint_ref = var.endpoint_ref.getter(request) or None
-        endpoint = store.endpoints_map.get(endpoint_ident) if endpoint_ident else None
         access_token = access_token_var.getter(request)
+        user_config = var.user_config.getter(request) if user_id else None
 
         try:
             level_str = LOG_LEVELS[level]
         except IndexError:
             level_str = LogLevel.DEBUG
 
-        # ALERT -----
-        alert_event = None
-        alert_log = None
-        if status >= 500:
-            alert_event = event.api_5xx_response
-        elif status >= 400:
-            alert_event = event.api_4xx_response
-
-        if alert_event:
-            alert_log = alert_event(
-                endpoint_ident, request.time,
-                method=method,
-                url=request.url,
-                status=status,
-                result=result,
-                user_id=user_id,
-                brief_message=self.brief_message,
-            )
-        # -----------
-
-        return ServiceLog(
+        return ServiceLogRecord(
             service=self.service.name,
-            instance=store.instance,
-            version=store.version,
-            node_id=store.node_id,
-            supervisor=store.supervisor,
             access_token_id=getattr(access_token, "id", None),
             level=level_str,
             volatile=volatile,
             time=request.time,
             duration=duration,
-            worker=store.worker,
             thread_id=self.current_thread,
-            alert=alert_log,
             # --- Web mixin
             scheme=request.scheme,
-            in_traffic=in_traffic,
-            out_traffic=out_traffic,
+            in_traffic=request.traffic,
+            out_traffic=response.traffic,
             public=public,
-            path=path,
+            path=request.path,
             full_url=request.url,
             query=query,
             data=data,
             result=result,
-            user_agent=parse_user_agents(request.headers.get("user-agent")),
+            user_agent=request.headers.get("user-agent"),
             status=status,
             request_type=str(request.content_type)[:200] if request.content_type else None,
             response_type=str(response.content_type)[:200] if response.content_type else None,
@@ -480,11 +441,14 @@ class Logger(Property):
             # --
             user_id=str(user_id) if user_id else None,
             ip=str(request.ip_address),
-            endpoint=endpoint,
             endpoint_ident=str(endpoint_ident)[:500] if endpoint_ident else None,
             endpoint_ref=str(endpoint_ref)[:500] if endpoint_ref else None,
             messages=self.messages,
             trace=self.get_trace(),
+            brief_message=self.brief_message,
+            user_config=user_config,
+            request_logs=self.generate_request_records(),
+            query_logs=self._queries.get_records() if self._queries else None,
         )
 
     def get_trace(self):
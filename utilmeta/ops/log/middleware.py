@@ -1,9 +1,12 @@
 import threading
+import warnings
 from utilmeta.core.response import Response
 from utilmeta.core.request import var, Request
 from utilmeta.core.server import ServiceMiddleware
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional, List
 from utilmeta.ops.store import store
+from .pipeline import LogWriter, ServiceLogRecord
+from .query import record_query, install_django_execute_wrapper
 
 if TYPE_CHECKING:
     from utilmeta.ops import Operations
@@ -13,6 +16,15 @@ class LogMiddleware(ServiceMiddleware):
     def __init__(self, config: "Operations"):
         super().__init__(config=config)
         self.config = config
+        store.log_buffer.configure(
+            maxsize=config.log.max_queue_size,
+            overflow_policy=config.log.overflow_policy,
+            sample_rate=config.log.sample_rate,
+        )
+        log_writer.batch_size = config.max_backlog
+        if config.log.capture_queries:
+            from utilmeta.core.orm.databases.base import BaseDatabaseAdaptor
+            BaseDatabaseAdaptor.add_query_listener(record_query)
 
     def process_request(self, request: Request):
         # log = request_logger.setup(request)
@@ -21,6 +33,8 @@ class LogMiddleware(ServiceMiddleware):
         store.logger.set(logger)
         logger.setup_request(request)
         store.request_logger.setter(request, logger)
+        if logger.queries is not None:
+            install_django_execute_wrapper(exclude=[self.config.db_alias])
 
     def is_excluded(self, response: Response):
         request = response.request
@@ -49,6 +63,16 @@ class LogMiddleware(ServiceMiddleware):
                 return True
         return False
 
+    @classmethod
+    def get_endpoint_ident(cls, request: Request) -> Optional[str]:
+        if not store.endpoints_map:
+            # endpoints are not synced to supervisor, no endpoint reports
+            return None
+        operation_names = var.operation_names.getter(request)
+        if operation_names:
+            return "_".join(operation_names)
+        return store.get_endpoint_ident(request)
+
     def process_response(self, response: Response):
         logger = store.logger.get(None)
         if not logger:
@@ -66,6 +90,7 @@ class LogMiddleware(ServiceMiddleware):
             error=response.status >= 500,
             in_traffic=response.request.traffic,
             out_traffic=response.traffic,
+            endpoint_ident=self.get_endpoint_ident(response.request),
         )
 
         if logger.omitted:
@@ -75,10 +100,20 @@ class LogMiddleware(ServiceMiddleware):
             if response.success and logger.vacuum:
                 return response.close()
 
-        store.responses_queue.append(response)
-
-        if len(store.responses_queue) >= self.config.max_backlog:
-            threading.Thread(target=batch_save_logs, kwargs=dict(close=True)).start()
+        try:
+            try:
+                record = logger.generate_record(response)
+            except Exception as e:  # noqa
+                warnings.warn(f"utilmeta.ops.log: generate log for {response} failed: {e}")
+                return
+
+            store.log_buffer.push(record)
+            if len(store.log_buffer) >= self.config.max_backlog:
+                log_writer.notify()
+        finally:
+            if response.event_stream is None and response.file is None:
+                # the streamed responses are closed by the server after they are sent
+                response.close()
 
     # def handle_error(self, error: Error, response=None):
     #     logger: Logger = _logger.get(None)
@@ -87,21 +122,15 @@ class LogMiddleware(ServiceMiddleware):
     #     logger.commit_error(error)
 
 
-def batch_save_logs(close: bool = False):
-    from utilmeta.ops.models import ServiceLog, QueryLog, RequestLog
+def save_log_records(records: List[ServiceLogRecord]):
+    from utilmeta.ops.models import ServiceLog, RequestLog, QueryLog
     from utilmeta.core.auth import User
-    from utilmeta.ops.store import store
-    from .logger import Logger
 
-    with threading.Lock():
-        queue = store.responses_queue
-        _responses_queue = []
-        # ----------------
+    with _save_lock:
         logs_creates = []
         logs_bulk_creates = []
-        logs_updates = []
-        query_logs = []
         request_logs = []
+        query_logs = []
         context_map = {}
         user_last_logs = {}
 
@@ -112,48 +141,23 @@ def batch_save_logs(close: bool = False):
             store.load_supervisor()
             # reload supervisor
 
-        for response in queue:
-            response: Response
-            try:
-                logger: Logger = store.request_logger.getter(response.request)
-                if not logger:
-                    continue
-
-                service_log = logger.generate_log(response)
-
-                if not service_log:
-                    continue
-
-                context_request_logs = logger.generate_request_logs(
-                    context_type='service_log',
-                    context_id=service_log.id
-                )
-
-                if service_log.id:
-                    logs_updates.append(service_log)
-                else:
-                    if context_request_logs:
-                        context_map[service_log] = context_request_logs
-                        request_logs.extend(context_request_logs)
-                        logs_creates.append(service_log)
-                    else:
-                        logs_bulk_creates.append(service_log)
-
-                if service_log.user_id:
-                    user_config = var.user_config.getter(response.request)
-
-                    if isinstance(user_config, User) and user_config.last_activity_field:
-                        user_last_logs.setdefault(user_config, {}).update({service_log.user_id: service_log.time})
-
-            finally:
-                response.close()
+        for record in records:
+            service_log = record.get_log()
+            context_request_logs = record.get_request_logs(context_type='service_log')
+            context_query_logs = record.get_query_logs(context_type='service_log')
 
-        if not logs_creates and not logs_bulk_creates and not logs_updates:
-            return
+            if context_request_logs or context_query_logs:
+                context_map[service_log] = context_request_logs + context_query_logs
+                request_logs.extend(context_request_logs)
+                query_logs.extend(context_query_logs)
+                logs_creates.append(service_log)
+            else:
+                logs_bulk_creates.append(service_log)
 
-        if logs_updates:
-            for log in logs_updates:
-                log.save()
+            if service_log.user_id:
+                user_config = record.user_config
+                if isinstance(user_config, User) and user_config.last_activity_field:
+                    user_last_logs.setdefault(user_config, {}).update({service_log.user_id: service_log.time})
 
         if logs_bulk_creates:
             ServiceLog.objects.bulk_create(logs_bulk_creates, ignore_conflicts=True)
@@ -167,12 +171,12 @@ def batch_save_logs(close: bool = False):
                     for ctx_log in context_logs:
                         ctx_log.context_id = log.pk
 
-        if query_logs:
-            QueryLog.objects.bulk_create(query_logs, ignore_conflicts=True)
-
         if request_logs:
             RequestLog.objects.bulk_create(request_logs, ignore_conflicts=True)
 
+        if query_logs:
+            QueryLog.objects.bulk_create(query_logs, ignore_conflicts=True)
+
         if user_last_logs:
             for user_config, user_logs in user_last_logs.items():
                 user_config: User
@@ -186,8 +190,24 @@ def batch_save_logs(close: bool = False):
                     except Exception as e:
                         print(f'update last_activity for: {user_config.user_model} failed: {e}')
 
+
+def _writer_save(records: List[ServiceLogRecord]):
+    from django.db import close_old_connections
+    try:
+        save_log_records(records)
+    finally:
+        # the writer thread is long-lived, release the expired connections
+        close_old_connections()
+
+
+_save_lock = threading.Lock()
+log_writer = LogWriter(store.log_buffer, save=_writer_save)
+
+
+def batch_save_logs(close: bool = False):
+    # drain all the buffered logs in batches
+    log_writer.flush(save_log_records)
+
     if close:
         from django.db import connections
         connections.close_all()
-
-    return
@@ -0,0 +1,430 @@
+import random
+import threading
+from collections import deque
+from typing import List, Optional, Callable, TYPE_CHECKING
+from utilmeta.utils import parse_user_agents
+import time
+
+if TYPE_CHECKING:
+    from utilmeta.ops.models import ServiceLog, RequestLog, QueryLog
+
+__all__ = [
+    "BaseLogRecord",
+    "ServiceLogRecord",
+    "RequestLogRecord",
+    "QueryLogRecord",
+    "LogBuffer",
+    "LogWriter",
+]
+
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+SAMPLE = "sample"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, SAMPLE)
+
+
+class BaseLogRecord:
+    """
+    Compact record of a (request / response) log, which only hold the plain values to be saved,
+    the request / response objects are released right after the record is generated
+    """
+    __slots__ = ()
+    # empty containers are stored as None, and restored when generating the log model
+    __containers__ = {
+        "query": dict,
+        "request_headers": dict,
+        "response_headers": dict,
+        "messages": list,
+        "trace": list,
+    }
+
+    def __init__(self, **kwargs):
+        for key in self.__slots__:
+            value = kwargs.get(key)
+            if not value and key in self.__containers__:
+                value = None
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({getattr(self, 'method', None)} {getattr(self, 'path', None)})"
+
+    def get_fields(self, exclude=()) -> dict:
+        fields = {}
+        for key in self.__slots__:
+            if key in exclude:
+                continue
+            value = getattr(self, key)
+            if value is None and key in self.__containers__:
+                value = self.__containers__[key]()
+            fields[key] = value
+        return fields
+
+
+class RequestLogRecord(BaseLogRecord):
+    __slots__ = (
+        "time",
+        "duration",
+        "host",
+        "asynchronous",
+        "timeout",
+        "timeout_error",
+        "server_error",
+        "client_error",
+        "scheme",
+        "in_traffic",
+        "out_traffic",
+        "path",
+        "full_url",
+        "query",
+        "data",
+        "result",
+        "user_agent",
+        "status",
+        "request_type",
+        "response_type",
+        "request_headers",
+        "response_headers",
+        "length",
+        "method",
+    )
+
+    def get_alert(self):
+        from utilmeta.ops.alert.event import event
+
+        alert_event = None
+        if not self.status or self.timeout_error:
+            alert_event = event.api_timeout_outbound_request
+        elif self.status >= 400:
+            alert_event = event.api_error_outbound_request
+        if not alert_event:
+            return None
+        return alert_event(
+            None, self.time,
+            method=self.method,
+            url=self.full_url,
+            status=self.status,
+        )
+
+    def get_log(self, service: str, context_type="service_log", context_id=None) -> "RequestLog":
+        from utilmeta.ops.models import RequestLog
+        from utilmeta.ops.store import store
+
+        fields = self.get_fields(exclude=("user_agent",))
+        return RequestLog(
+            service=service,
+            node_id=store.node_id,
+            context_type=context_type,
+            context_id=context_id,
+            instance=store.instance,
+            worker=store.worker,
+            alert=self.get_alert(),
+            user_agent=parse_user_agents(self.user_agent),
+            **fields
+        )
+
+
+class QueryLogRecord(BaseLogRecord):
+    __slots__ = (
+        "time",
+        "alias",
+        "query",
+        "duration",
+        "message",
+        "operation",
+        "tables",
+        "details",
+    )
+
+    def get_log(self, context_type="service_log", context_id=None) -> Optional["QueryLog"]:
+        from utilmeta.ops.models import QueryLog
+        from utilmeta.ops.store import store
+
+        database = store.databases.get(self.alias)
+        if not database:
+            # database not tracked by the operations system
+            return None
+        return QueryLog(
+            database=database,
+            worker=store.worker,
+            context_type=context_type,
+            context_id=context_id,
+            **self.get_fields(exclude=("alias",))
+        )
+
+
+class ServiceLogRecord(BaseLogRecord):
+    __slots__ = (
+        "service",
+        "time",
+        "duration",
+        "thread_id",
+        "level",
+        "volatile",
+        "access_token_id",
+        "scheme",
+        "in_traffic",
+        "out_traffic",
+        "public",
+        "path",
+        "full_url",
+        "query",
+        "data",
+        "result",
+        "user_agent",
+        "status",
+        "request_type",
+        "response_type",
+        "request_headers",
+        "response_headers",
+        "length",
+        "method",
+        "user_id",
+        "ip",
+        "endpoint_ident",
+        "endpoint_ref",
+        "messages",
+        "trace",
+        # not fields of ServiceLog -----
+        "brief_message",
+        "user_config",
+        "request_logs",
+        "query_logs",
+    )
+
+    EXTRA_FIELDS = ("user_agent", "brief_message", "user_config", "request_logs", "query_logs")
+
+    def get_alert(self):
+        from utilmeta.ops.alert.event import event
+
+        alert_event = None
+        if self.status >= 500:
+            alert_event = event.api_5xx_response
+        elif self.status >= 400:
+            alert_event = event.api_4xx_response
+        if not alert_event:
+            return None
+        return alert_event(
+            self.endpoint_ident, self.time,
+            method=self.method,
+            url=self.full_url,
+            status=self.status,
+            result=self.result,
+            user_id=self.user_id,
+            brief_message=self.brief_message,
+        )
+
+    def get_log(self) -> "ServiceLog":
+        from utilmeta.ops.models import ServiceLog
+        from utilmeta.ops.store import store
+
+        endpoint = store.endpoints_map.get(self.endpoint_ident) if self.endpoint_ident else None
+        return ServiceLog(
+            instance=store.instance,
+            version=store.version,
+            node_id=store.node_id,
+            supervisor=store.supervisor,
+            worker=store.worker,
+            endpoint=endpoint,
+            alert=self.get_alert(),
+            user_agent=parse_user_agents(self.user_agent),
+            **self.get_fields(exclude=self.EXTRA_FIELDS)
+        )
+
+    def get_request_logs(self, context_type="service_log", context_id=None) -> List["RequestLog"]:
+        if not self.request_logs:
+            return []
+        return [
+            record.get_log(self.service, context_type=context_type, context_id=context_id)
+            for record in self.request_logs
+        ]
+
+    def get_query_logs(self, context_type="service_log", context_id=None) -> List["QueryLog"]:
+        if not self.query_logs:
+            return []
+        logs = []
+        for record in self.query_logs:
+            log = record.get_log(context_type=context_type, context_id=context_id)
+            if log:
+                logs.append(log)
+        return logs
+
+
+class LogBuffer:
+    """
+    A bounded buffer of log records, when the buffer is full
+    - drop_oldest: drop the oldest record (ring buffer)
+    - drop_newest: drop the incoming record
+    - sample: when the buffer is over half full, only keep (sample_rate) of the volatile records,
+      and drop the incoming record when full
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        overflow_policy: str = DROP_OLDEST,
+        sample_rate: float = 0.1,
+    ):
+        self.lock = threading.Lock()
+        self.records = deque()
+        self.maxsize = None
+        self.overflow_policy = None
+        self.sample_rate = None
+        self.configure(maxsize, overflow_policy=overflow_policy, sample_rate=sample_rate)
+
+        self.pushed = 0
+        self.dropped = 0
+        self.sampled = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    def __len__(self):
+        return len(self.records)
+
+    def configure(self, maxsize: int = None, overflow_policy: str = None, sample_rate: float = None):
+        if maxsize is not None:
+            if maxsize <= 0:
+                raise ValueError(f"LogBuffer: maxsize must be positive, got {maxsize}")
+            self.maxsize = maxsize
+        if overflow_policy is not None:
+            if overflow_policy not in OVERFLOW_POLICIES:
+                raise ValueError(
+                    f"LogBuffer: invalid overflow_policy: {repr(overflow_policy)}, "
+                    f"must be one of {OVERFLOW_POLICIES}"
+                )
+            self.overflow_policy = overflow_policy
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    @property
+    def depth(self) -> int:
+        return len(self.records)
+
+    def push(self, record: BaseLogRecord) -> bool:
+        with self.lock:
+            self.pushed += 1
+            depth = len(self.records)
+            if self.overflow_policy == SAMPLE and depth * 2 >= self.maxsize:
+                if getattr(record, "volatile", True) and random.random() >= self.sample_rate:
+                    self.sampled += 1
+                    return False
+            if depth >= self.maxsize:
+                self.dropped += 1
+                if self.overflow_policy != DROP_OLDEST:
+                    return False
+                self.records.popleft()
+            self.records.append(record)
+            return True
+
+    def pop_batch(self, size: int = None) -> list:
+        with self.lock:
+            if not size or size >= len(self.records):
+                batch = list(self.records)
+                self.records.clear()
+                return batch
+            return [self.records.popleft() for _ in range(size)]
+
+    def record_flush(self, count: int, latency: float):
+        with self.lock:
+            self.flushed += count
+            self.flushes += 1
+            self.last_flush_latency = latency
+            self.total_flush_latency += latency
+            if latency > self.max_flush_latency:
+                self.max_flush_latency = latency
+
+    def get_metrics(self) -> dict:
+        return dict(
+            depth=len(self.records),
+            maxsize=self.maxsize,
+            pushed=self.pushed,
+            dropped=self.dropped,
+            sampled=self.sampled,
+            flushed=self.flushed,
+            flushes=self.flushes,
+            last_flush_latency=round(self.last_flush_latency * 1000, 3),
+            max_flush_latency=round(self.max_flush_latency * 1000, 3),
+            avg_flush_latency=round(self.total_flush_latency * 1000 / self.flushes, 3) if self.flushes else 0,
+        )
+
+
+class LogWriter:
+    """
+    A long-lived writer thread that drain the log buffer in batches,
+    it is waked up when the buffer reach the batch size, or every [interval] seconds if set
+    """
+
+    def __init__(
+        self,
+        buffer: LogBuffer,
+        save: Callable[[list], None],
+        batch_size: int = 100,
+        interval: Optional[float] = None
+    ):
+        self.buffer = buffer
+        self.save = save
+        self.batch_size = batch_size
+        self.interval = interval
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def start(self):
+        if self.alive:
+            return
+        with self._lock:
+            if self.alive:
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self.run, name="LogWriter", daemon=True)
+            self._thread.start()
+
+    def notify(self):
+        if not self.alive:
+            self.start()
+        self._wakeup.set()
+
+    def stop(self, timeout: float = None):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def flush(self, save: Callable[[list], None] = None) -> int:
+        save = save or self.save
+        total = 0
+        while True:
+            batch = self.buffer.pop_batch(self.batch_size)
+            if not batch:
+                break
+            start = time.perf_counter()
+            try:
+                save(batch)
+            finally:
+                self.buffer.record_flush(len(batch), time.perf_counter() - start)
+            total += len(batch)
+            if len(batch) < self.batch_size:
+                break
+        return total
+
+    def run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"utilmeta.ops.log: save logs failed with error: {e}")
+        # drain the rest of the buffer on stop
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"utilmeta.ops.log: save logs failed with error: {e}")
@@ -0,0 +1,161 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from utilmeta.utils import time_now
+import time
+
+__all__ = [
+    "get_sql_fingerprint",
+    "get_sql_operation",
+    "get_sql_tables",
+    "QueryCapture",
+    "record_query",
+    "django_execute_wrapper",
+    "install_django_execute_wrapper",
+]
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|\$\d+|(?<![:\w]):[a-zA-Z_]\w*|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+_TABLES = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+[\"`\[]?([\w.]+)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def get_sql_fingerprint(sql: str) -> str:
+    # normalize the literals and parameters of the sql, so the same query with different params
+    # (like the N+1 queries) share a fingerprint
+    sql = _STRING.sub("?", str(sql))
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(...)", sql)
+    sql = _VALUES_LIST.sub(r"\1", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+def get_sql_operation(sql: str) -> Optional[str]:
+    parts = str(sql).lstrip(" (\n\t").split(None, 1)
+    return parts[0].lower()[:32] if parts else None
+
+
+def get_sql_tables(sql: str) -> List[str]:
+    tables = []
+    for table in _TABLES.findall(str(sql)):
+        if table not in tables:
+            tables.append(table)
+    return tables
+
+
+class QueryCapture:
+    """
+    Captured queries of a request, the queries are aggregated by (alias, fingerprint),
+    at most [max_queries] fingerprints are kept, but all the queries count in num / duration
+    """
+    __slots__ = ("max_queries", "exclude", "num", "duration", "queries", "exceeded")
+
+    def __init__(self, max_queries: int = 50, exclude: List[str] = ()):
+        self.max_queries = max_queries
+        self.exclude = exclude
+        self.num = 0
+        self.duration = 0.0
+        self.exceeded = 0
+        # (alias, fingerprint) -> [count, duration, max_duration, rows, error, time]
+        self.queries: Dict[Tuple[str, str], list] = {}
+
+    def __bool__(self):
+        return bool(self.num)
+
+    def add(self, alias: str, sql: str, duration: float, rows: int = None, error: Exception = None):
+        if alias in self.exclude:
+            return
+        self.num += 1
+        self.duration += duration
+        key = (alias, get_sql_fingerprint(sql))
+        query = self.queries.get(key)
+        if query is None:
+            if len(self.queries) >= self.max_queries:
+                self.exceeded += 1
+                return
+            self.queries[key] = query = [0, 0.0, 0.0, None, None, time_now()]
+        query[0] += 1
+        query[1] += duration
+        if duration > query[2]:
+            query[2] = duration
+        if rows is not None and rows >= 0:
+            query[3] = (query[3] or 0) + rows
+        if error is not None:
+            query[4] = f"{error.__class__.__name__}: {error}"
+
+    def get_records(self) -> list:
+        from .pipeline import QueryLogRecord
+
+        return [
+            QueryLogRecord(
+                time=ts,
+                alias=alias,
+                query=fingerprint,
+                duration=round(duration),
+                message=error or "",
+                operation=get_sql_operation(fingerprint),
+                tables=get_sql_tables(fingerprint),
+                details=dict(
+                    count=count,
+                    duration=round(duration, 3),
+                    max_duration=round(max_duration, 3),
+                    rows=rows,
+                ),
+            )
+            for (alias, fingerprint), (count, duration, max_duration, rows, error, ts) in self.queries.items()
+        ]
+
+
+def record_query(alias: str, sql: str, duration: float, rows: int = None, error: Exception = None):
+    # the query listener of the database adaptors
+    from utilmeta.ops.store import store
+
+    logger = store.logger.get(None)
+    if logger is None:
+        return
+    queries: Optional[QueryCapture] = logger.queries
+    if queries is None:
+        return
+    queries.add(alias, sql, duration, rows=rows, error=error)
+
+
+def django_execute_wrapper(execute, sql, params, many, context):
+    from utilmeta.ops.store import store
+
+    logger = store.logger.get(None)
+    queries: Optional[QueryCapture] = logger.queries if logger is not None else None
+    if queries is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    error = None
+    try:
+        return execute(sql, params, many, context)
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        cursor = context.get("cursor")
+        queries.add(
+            context["connection"].alias,
+            sql,
+            duration=(time.perf_counter() - start) * 1000,
+            rows=getattr(cursor, "rowcount", None),
+            error=error,
+        )
+
+
+def install_django_execute_wrapper(exclude: List[str] = ()):
+    # execute wrappers are bound to the connections of the current thread
+    from django.db import connections
+
+    for conn in connections.all():
+        if conn.alias in exclude:
+            continue
+        if django_execute_wrapper not in conn.execute_wrappers:
+            conn.execute_wrappers.append(django_execute_wrapper)
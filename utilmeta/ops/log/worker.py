@@ -5,7 +5,8 @@ from utilmeta.utils import (
 )
 from django.db import models
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict
+from utilmeta.ops.sketch import QuantileSketch
 
 if TYPE_CHECKING:
     from utilmeta.ops.models import Worker
@@ -26,6 +27,10 @@ class WorkerMetricsLogger:
         self._total_errors = 0
         self._total_time = 0
 
+        # request duration distribution, flushed into WorkerMonitor.metrics to calculate percentiles
+        self._duration_sketch = QuantileSketch()
+        self._endpoint_sketches: Dict[str, QuantileSketch] = {}
+
     @ignore_errors
     def log(
         self,
@@ -35,6 +40,7 @@ class WorkerMetricsLogger:
         outbound: bool = False,
         error: bool = False,
         timeout: bool = False,
+        endpoint_ident: str = None,
     ):
         self._total_in += in_traffic
         self._total_out += out_traffic
@@ -48,6 +54,12 @@ class WorkerMetricsLogger:
             self._total_requests += 1
             self._total_errors += 1 if error else 0
             self._total_time += duration
+            self._duration_sketch.add(duration)
+            if endpoint_ident:
+                sketch = self._endpoint_sketches.get(endpoint_ident)
+                if sketch is None:
+                    sketch = self._endpoint_sketches[endpoint_ident] = QuantileSketch()
+                sketch.add(duration)
 
     def reset(self):
         self._total_requests = 0
@@ -59,6 +71,18 @@ class WorkerMetricsLogger:
         self._total_outbound_request_time = 0
         self._total_outbound_errors = 0
         self._total_outbound_timeouts = 0
+        self._duration_sketch = QuantileSketch()
+        self._endpoint_sketches = {}
+
+    def get_sketches(self) -> dict:
+        if not self._duration_sketch:
+            return {}
+        return dict(
+            duration_sketch=self._duration_sketch.dump(),
+            endpoint_sketches={
+                ident: sketch.dump() for ident, sketch in self._endpoint_sketches.items()
+            },
+        )
 
     def fetch(self, interval: int):
         if not self._total_requests:
@@ -79,6 +103,7 @@ class WorkerMetricsLogger:
             outbound_rps=self._total_outbound_requests / interval,
             outbound_errors=self._total_outbound_errors,
             outbound_timeouts=self._total_outbound_timeouts,
+            metrics=self.get_sketches(),
         )
 
     @ignore_errors(default=dict)  # ignore cache errors
@@ -141,7 +166,13 @@ class WorkerMetricsLogger:
         inst.__class__.objects.filter(pk=inst.pk).update(**kwargs)
         return values
 
-    def update_worker(self, worker: "Worker", record: bool = False, interval: int = None):
+    def update_worker(
+        self,
+        worker: "Worker",
+        record: bool = False,
+        interval: int = None,
+        extra_metrics: dict = None
+    ):
         from utilmeta.ops.models import Worker, WorkerMonitor
         if not isinstance(worker, Worker):
             return
@@ -151,6 +182,8 @@ class WorkerMetricsLogger:
             interval or max(1.0, (now - worker.time).total_seconds())
         )
         self.save(worker, **sys_metrics, connected=True, time=now)
+        if extra_metrics:
+            req_metrics["metrics"] = dict(req_metrics.get("metrics") or {}, **extra_metrics)
         if record:
             WorkerMonitor.objects.create(
                 worker=worker,
@@ -0,0 +1,145 @@
+import math
+from typing import Dict, Optional, Iterable, Union
+
+__all__ = ["QuantileSketch"]
+
+NUM = Union[int, float]
+
+
+class QuantileSketch:
+    """
+    A mergeable quantile sketch (DDSketch) with bounded relative error,
+    values are counted into logarithmic bins so adding a value takes O(1)
+    and sketches from workers / hours can be merged without the raw values
+    """
+
+    DEFAULT_ACCURACY = 0.01
+    MIN_VALUE = 1e-6
+
+    def __init__(self, relative_accuracy: float = DEFAULT_ACCURACY):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError(f"QuantileSketch: relative_accuracy must in (0, 1), got {relative_accuracy}")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        # values not greater than MIN_VALUE (like 0ms durations)
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0
+        self.min: Optional[NUM] = None
+        self.max: Optional[NUM] = None
+
+    def __bool__(self):
+        return bool(self.count)
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(count={self.count}, min={self.min}, max={self.max})"
+
+    def key(self, value: NUM) -> int:
+        return int(math.ceil(math.log(value) / self._log_gamma))
+
+    def value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def add(self, value: NUM, count: int = 1):
+        if value is None or count <= 0:
+            return
+        if value <= self.MIN_VALUE:
+            self.zero_count += count
+        else:
+            key = self.key(value)
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.count += count
+        self.sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def update(self, values: Iterable[NUM]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch"):
+        if not other:
+            return self
+        if other.gamma != self.gamma:
+            raise ValueError(
+                f"QuantileSketch: cannot merge sketches with different accuracy: "
+                f"{self.relative_accuracy}, {other.relative_accuracy}"
+            )
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        if self.min is None or (other.min is not None and other.min < self.min):
+            self.min = other.min
+        if self.max is None or (other.max is not None and other.max > self.max):
+            self.max = other.max
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        if not 0 <= q <= 1:
+            raise ValueError(f"QuantileSketch: quantile must in [0, 1], got {q}")
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0 if self.min is None else min(self.min, self.MIN_VALUE)
+        cumulative = self.zero_count
+        value = self.max
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                value = self.value(key)
+                break
+        return min(max(value, self.min), self.max)
+
+    @property
+    def avg(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def dump(self) -> dict:
+        # bins are stored densely from the min key, durations are clustered so the list stays short
+        data = dict(a=self.relative_accuracy, n=self.count, s=self.sum, min=self.min, max=self.max)
+        if self.zero_count:
+            data.update(z=self.zero_count)
+        if self.bins:
+            offset = min(self.bins)
+            data.update(
+                o=offset,
+                b=[self.bins.get(key, 0) for key in range(offset, max(self.bins) + 1)],
+            )
+        return data
+
+    @classmethod
+    def load(cls, data: dict) -> Optional["QuantileSketch"]:
+        if not isinstance(data, dict) or not data.get("n"):
+            return None
+        sketch = cls(relative_accuracy=data.get("a") or cls.DEFAULT_ACCURACY)
+        offset = data.get("o") or 0
+        for i, count in enumerate(data.get("b") or []):
+            if count:
+                sketch.bins[offset + i] = count
+        sketch.zero_count = data.get("z") or 0
+        sketch.count = data["n"]
+        sketch.sum = data.get("s") or 0
+        sketch.min = data.get("min")
+        sketch.max = data.get("max")
+        return sketch
+
+    @classmethod
+    def merge_all(cls, sketches: Iterable[Optional["QuantileSketch"]]) -> Optional["QuantileSketch"]:
+        result = None
+        for sketch in sketches:
+            if not sketch:
+                continue
+            if result is None:
+                result = cls(relative_accuracy=sketch.relative_accuracy)
+            result.merge(sketch)
+        return result
@@ -5,6 +5,7 @@ from utilmeta.core.request import var, Request
 from utilmeta.utils import HTTP_METHODS_LOWER
 from utilmeta.core.api.specs.openapi import OpenAPISchema
 from utilmeta.ops.log.worker import WorkerMetricsLogger
+from utilmeta.ops.log.pipeline import LogBuffer
 from utilmeta.ops.schema import SupervisorAlertSettingsSchema, SupervisorReportSettingsSchema
 from utilmeta.ops.res.metric import BaseMetric
 import warnings
@@ -29,7 +30,7 @@ class OperationsStore(object):
         self.openapi: Optional[OpenAPISchema] = None
         self.path_prefix: str = ""
 
-        self.responses_queue: List[Response] = []
+        self.log_buffer = LogBuffer()
         self.endpoints_map: Dict[str, "Resource"] = {}
         self.endpoints_patterns: Dict[Any, Dict[str, str]] = {}
 
@@ -265,8 +266,14 @@ class OperationsStore(object):
                 self.report_metrics = report_metrics
 
     def update_worker(self, **kwargs):
+        from utilmeta.core.websocket.stats import websocket_stats
+
+        extra_metrics = dict(log_queue=self.log_buffer.get_metrics())
+        if websocket_stats.total_connections:
+            # connection counts, message rates and send queue depth of the websocket endpoints
+            extra_metrics.update(websocket=websocket_stats.get_metrics())
         self.worker_logger.update_worker(
-            self.worker, **kwargs
+            self.worker, extra_metrics=extra_metrics, **kwargs
         )
 
     def get_endpoint_ident(self, request: Request) -> Optional[str]:
@@ -170,15 +170,18 @@ def get_cache_stats(using: str) -> Optional[CacheStatus]:
     return None
 
 
+DB_CONNECTIONS_SQL = {
+    DB.PostgreSQL: "select pid, usename, client_addr, client_port, state,"  # noqa
+    " backend_start, query_start, state_change, xact_start, wait_event, query"  # noqa
+    " from pg_stat_activity WHERE datname = '%s';",  # noqa
+    DB.MySQL: "select * from information_schema.processlist where db = '%s';",  # noqa
+    DB.Oracle: "select status from v$session where username='%s';",  # noqa
+}
+
+
 @ignore_errors(default=list)
 def get_db_connections(using: str):
-    db_sql = {
-        DB.PostgreSQL: "select pid, usename, client_addr, client_port, state,"  # noqa
-        " backend_start, query_start, state_change, xact_start, wait_event, query"  # noqa
-        " from pg_stat_activity WHERE datname = '%s';",  # noqa
-        DB.MySQL: "select * from information_schema.processlist where db = '%s';",  # noqa
-        DB.Oracle: "select status from v$session where username='%s';",  # noqa
-    }
+    db_sql = DB_CONNECTIONS_SQL
     db = DatabaseConnections.get(using)
     if db.type not in db_sql:
         return []
@@ -192,62 +195,7 @@ def get_db_connections(using: str):
         if db_type == DB.Oracle:
             db_name = db.user
         cursor.execute(db_sql[db_type] % db_name)
-        result = cursor.fetchall()
-        values = []
-        if db.type == DB.PostgreSQL:
-            for (
-                pid,
-                usename,
-                client_addr,
-                client_port,
-                state,
-                backend_start,
-                query_start,
-                state_change,
-                xact_start,
-                wait_event,
-                query,
-            ) in result:
-                if usename != db.user:
-                    continue
-                if (
-                    not pid
-                    or not usename
-                    or not client_addr
-                    or not client_port
-                    or not state
-                    or not query
-                ):
-                    continue
-                # find = False
-                # for conn in current_connections:
-                #     if str(conn.get('pid')) == str(pid):    # noqa, strange behaviour for AttributeError
-                #         values.append(conn)
-                #         find = True
-                #         break
-                # if find:
-                #     continue
-                operation, tables = get_sql_info(query)
-                if not operation:
-                    continue
-                values.append(
-                    DatabaseConnection(
-                        status=state,
-                        active=state == "active",
-                        client_addr=client_addr,
-                        client_port=client_port,
-                        pid=pid,
-                        backend_start=backend_start,
-                        query_start=query_start,
-                        state_change=state_change,
-                        wait_event=wait_event,
-                        transaction_start=xact_start,
-                        query=query,
-                        operation=operation,
-                        tables=tables,
-                    )
-                )
-        return values
+        return parse_db_connections(db, cursor.fetchall())
 
 
 def get_num(res):
@@ -266,13 +214,74 @@ def get_num(res):
     return 0
 
 
+def parse_db_connections(db, result) -> list:
+    values = []
+    if db.type == DB.PostgreSQL:
+        for (
+            pid,
+            usename,
+            client_addr,
+            client_port,
+            state,
+            backend_start,
+            query_start,
+            state_change,
+            xact_start,
+            wait_event,
+            query,
+        ) in result:
+            if usename != db.user:
+                continue
+            if (
+                not pid
+                or not usename
+                or not client_addr
+                or not client_port
+                or not state
+                or not query
+            ):
+                continue
+            # find = False
+            # for conn in current_connections:
+            #     if str(conn.get('pid')) == str(pid):    # noqa, strange behaviour for AttributeError
+            #         values.append(conn)
+            #         find = True
+            #         break
+            # if find:
+            #     continue
+            operation, tables = get_sql_info(query)
+            if not operation:
+                continue
+            values.append(
+                DatabaseConnection(
+                    status=state,
+                    active=state == "active",
+                    client_addr=client_addr,
+                    client_port=client_port,
+                    pid=pid,
+                    backend_start=backend_start,
+                    query_start=query_start,
+                    state_change=state_change,
+                    wait_event=wait_event,
+                    transaction_start=xact_start,
+                    query=query,
+                    operation=operation,
+                    tables=tables,
+                )
+            )
+    return values
+
+
+DB_SERVER_CONNECTIONS_SQL = {
+    DB.PostgreSQL: "select count(*) from pg_stat_activity",  # noqa
+    DB.MySQL: "select count(*) from information_schema.processlist",  # noqa
+    DB.Oracle: "select count(*) from v$session",  # noqa
+}
+
+
 @ignore_errors(default=0)
 def get_db_server_connections(using: str):
-    db_sql = {
-        DB.PostgreSQL: "select count(*) from pg_stat_activity",  # noqa
-        DB.MySQL: "select count(*) from information_schema.processlist",  # noqa
-        DB.Oracle: "select count(*) from v$session",  # noqa
-    }
+    db_sql = DB_SERVER_CONNECTIONS_SQL
     db = DatabaseConnections.get(using)
     if db.type not in db_sql:
         return []
@@ -284,6 +293,13 @@ def get_db_server_connections(using: str):
         return get_num(cursor.fetchone())
 
 
+DB_CONNECTIONS_NUM_SQL = {
+    DB.PostgreSQL: "select state from pg_stat_activity WHERE datname = '%s';",  # noqa
+    DB.MySQL: "select command from information_schema.processlist where db = '%s';",  # noqa
+    DB.Oracle: "select status from v$session where username='%s';",  # noqa
+}
+
+
 @ignore_errors(default=0)
 def get_db_connections_num(using: str) -> Tuple[Optional[int], Optional[int]]:
     from django.db import connections
@@ -291,11 +307,7 @@ def get_db_connections_num(using: str) -> Tuple[Optional[int], Optional[int]]:
     db = DatabaseConnections.get(using)
     if not db:
         return None, None
-    db_sql = {
-        DB.PostgreSQL: "select state from pg_stat_activity WHERE datname = '%s';",  # noqa
-        DB.MySQL: "select command from information_schema.processlist where db = '%s';",  # noqa
-        DB.Oracle: "select status from v$session where username='%s';",  # noqa
-    }
+    db_sql = DB_CONNECTIONS_NUM_SQL
     if db.type not in db_sql:
         return None, None
     with connections[using].cursor() as cursor:
@@ -311,16 +323,19 @@ def get_db_connections_num(using: str) -> Tuple[Optional[int], Optional[int]]:
         return conn_count, active_count
 
 
+DB_SIZE_SQL = {
+    DB.PostgreSQL: "select pg_database_size('%s');",
+    DB.MySQL: "select sum(DATA_LENGTH)+sum(INDEX_LENGTH) "  # noqa
+    "from information_schema.tables where table_schema='%s';",  # noqa
+    DB.Oracle: "select sum(bytes) from dba_segments where owner='%s'",  # noqa
+}
+
+
 @ignore_errors(default=None)
 def get_db_size(using: str) -> int:
     from django.db import connections
 
-    db_sql = {
-        DB.PostgreSQL: "select pg_database_size('%s');",
-        DB.MySQL: "select sum(DATA_LENGTH)+sum(INDEX_LENGTH) "  # noqa
-        "from information_schema.tables where table_schema='%s';",  # noqa
-        DB.Oracle: "select sum(bytes) from dba_segments where owner='%s'",  # noqa
-    }
+    db_sql = DB_SIZE_SQL
     db = DatabaseConnections.get(using)
     if db.is_sqlite:
         return os.path.getsize(db.name)
@@ -335,17 +350,20 @@ def get_db_size(using: str) -> int:
         return get_num(cursor.fetchone())
 
 
+DB_SERVER_SIZE_SQL = {
+    DB.PostgreSQL: "select sum(pg_database_size(pg_database.datname)) from pg_database "
+                   "where has_database_privilege(datname, 'CONNECT');",  # noqa
+    # fix: InsufficientPrivilege: permission denied for database XX
+    DB.MySQL: "select sum(DATA_LENGTH)+sum(INDEX_LENGTH) from information_schema.tables;",  # noqa
+    DB.Oracle: "select sum(bytes) from dba_segments;",  # noqa
+}
+
+
 @ignore_errors(default=None)
 def get_db_server_size(using: str) -> int:
     from django.db import connections
 
-    db_sql = {
-        DB.PostgreSQL: "select sum(pg_database_size(pg_database.datname)) from pg_database "
-                       "where has_database_privilege(datname, 'CONNECT');",  # noqa
-        # fix: InsufficientPrivilege: permission denied for database XX
-        DB.MySQL: "select sum(DATA_LENGTH)+sum(INDEX_LENGTH) from information_schema.tables;",  # noqa
-        DB.Oracle: "select sum(bytes) from dba_segments;",  # noqa
-    }
+    db_sql = DB_SERVER_SIZE_SQL
     db = DatabaseConnections.get(using)
     if db.is_sqlite:
         return os.path.getsize(db.name)
@@ -357,14 +375,17 @@ def get_db_server_size(using: str) -> int:
         return get_num(cursor.fetchone())
 
 
+DB_MAX_CONNECTIONS_SQL = {
+    DB.PostgreSQL: "SHOW max_connections;",
+    DB.MySQL: 'SHOW VARIABLES LIKE "max_connections";',
+}
+
+
 @ignore_errors(default=None)
 def get_db_max_connections(using: str) -> int:
     from django.db import connections
 
-    db_sql = {
-        DB.PostgreSQL: "SHOW max_connections;",
-        DB.MySQL: 'SHOW VARIABLES LIKE "max_connections";',
-    }
+    db_sql = DB_MAX_CONNECTIONS_SQL
     with connections[using].cursor() as cursor:
         db_type: str = str(cursor.db.display_name).lower()
         if db_type not in db_sql:
@@ -373,13 +394,16 @@ def get_db_max_connections(using: str) -> int:
         return get_num(cursor.fetchone())
 
 
+DB_TRANSACTIONS_SQL = {
+    DB.PostgreSQL: "select xact_commit from pg_stat_database where datname='%s';",  # noqa
+}
+
+
 @ignore_errors(default=None)
 def get_db_transactions(using: str) -> int:
     from django.db import connections
 
-    db_sql = {
-        DB.PostgreSQL: "select xact_commit from pg_stat_database where datname='%s';",  # noqa
-    }
+    db_sql = DB_TRANSACTIONS_SQL
     db = DatabaseConnections.get(using)
     with connections[using].cursor() as cursor:
         db_type: str = str(cursor.db.display_name).lower()
@@ -387,3 +411,210 @@ def get_db_transactions(using: str) -> int:
             return 0
         cursor.execute(db_sql[db_type] % db.name)
         return get_num(cursor.fetchone())
+
+
+def get_db_metrics(using: str) -> dict:
+    connections_num = get_db_connections_num(using)
+    if not isinstance(connections_num, tuple):
+        connections_num = (None, None)
+    return dict(
+        max_connections=get_db_max_connections(using),
+        transactions=get_db_transactions(using) or 0,
+        size=get_db_size(using),
+        server_size=get_db_server_size(using),
+        connections_num=connections_num,
+        server_connections=get_db_server_connections(using),
+        connections=get_db_connections(using),
+    )
+
+
+async def aget_db_metrics(using: str) -> dict:
+    # the async version of get_db_metrics, probes are executed concurrently
+    # with a dedicated async adaptor that is bound to the current event loop
+    import asyncio
+
+    db = DatabaseConnections.get(using)
+    if db.is_sqlite:
+        size = ignore_errors(os.path.getsize, default=None)(db.name)
+        return dict(
+            max_connections=0,
+            transactions=0,
+            size=size,
+            server_size=size,
+            connections_num=(None, None),
+            server_connections=0,
+            connections=[],
+        )
+    if db.type not in (DB.PostgreSQL, DB.MySQL) or not db.async_adaptor_cls:
+        # not supported by the async adaptors
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _get_db_metrics_and_close, using)
+
+    adaptor = db.async_adaptor_cls(db, db.alias)
+    try:
+        await adaptor.connect()
+    except ImportError:
+        # async driver not installed
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _get_db_metrics_and_close, using)
+    except Exception:  # noqa
+        # database not connected
+        return dict(
+            max_connections=None,
+            transactions=0,
+            size=None,
+            server_size=None,
+            connections_num=(None, None),
+            server_connections=0,
+            connections=[],
+        )
+    db_name = db.name
+
+    async def fetch_num(sql_map: dict, default=0, *args):
+        sql = sql_map.get(db.type)
+        if not sql:
+            return 0
+        try:
+            row = await adaptor.fetchone(sql % args if args else sql)
+        except Exception:  # noqa
+            return default
+        return get_num(list(row.values()) if row else None)
+
+    async def fetch_rows(sql_map: dict):
+        sql = sql_map.get(db.type)
+        if not sql:
+            return None
+        try:
+            return [tuple(row.values()) for row in await adaptor.fetchall(sql % db_name)]
+        except Exception:  # noqa
+            return None
+
+    try:
+        (
+            max_connections,
+            transactions,
+            size,
+            server_size,
+            server_connections,
+            status_rows,
+            connection_rows,
+        ) = await asyncio.gather(
+            fetch_num(DB_MAX_CONNECTIONS_SQL, None),
+            fetch_num(DB_TRANSACTIONS_SQL, 0, db_name),
+            fetch_num(DB_SIZE_SQL, None, db_name),
+            fetch_num(DB_SERVER_SIZE_SQL, None),
+            fetch_num(DB_SERVER_CONNECTIONS_SQL, 0),
+            fetch_rows(DB_CONNECTIONS_NUM_SQL),
+            fetch_rows(DB_CONNECTIONS_SQL),
+        )
+    finally:
+        try:
+            await adaptor.disconnect()
+        except Exception:  # noqa
+            pass
+
+    connections_num = (None, None)
+    if status_rows is not None:
+        status = [str(row[0]).lower() for row in status_rows]
+        connections_num = (len(status), len([s for s in status if s in ("active", "query")]))
+
+    return dict(
+        max_connections=max_connections,
+        transactions=transactions or 0,
+        size=size,
+        server_size=server_size,
+        connections_num=connections_num,
+        server_connections=server_connections,
+        connections=ignore_errors(parse_db_connections, default=list)(db, connection_rows or []),
+    )
+
+
+def _get_db_metrics_and_close(using: str) -> dict:
+    from django.db import connections
+
+    try:
+        return get_db_metrics(using)
+    finally:
+        # executed in a pooled thread, do not leave the connection open
+        connections[using].close()
+
+
+async def aget_redis_info(cache: Cache) -> dict:
+    try:
+        from redis.asyncio import Redis
+    except (ModuleNotFoundError, ImportError):
+        return {}
+    from redis.exceptions import ConnectionError
+
+    con = Redis.from_url(cache.get_location())
+    try:
+        return dict(await con.info())
+    except ConnectionError:
+        return {}
+    finally:
+        try:
+            await con.close()
+        except Exception:  # noqa
+            pass
+
+
+async def aget_cache_stats(using: str) -> Optional[CacheStatus]:
+    import asyncio
+
+    cache = CacheConnections.get(using)
+    if not cache:
+        return None
+    if cache.type == "redis":
+        try:
+            return CacheStatus(await aget_redis_info(cache))
+        except Exception:  # noqa
+            return None
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, get_cache_stats, using)
+
+
+def get_process_metrics(pid: int, cpu_interval: float = 0.5) -> dict:
+    try:
+        proc = psutil.Process(pid)
+        return dict(
+            cpu_percent=proc.cpu_percent(cpu_interval),
+            memory_percent=proc.memory_percent(),
+            file_descriptors=proc.num_fds() if psutil.POSIX else None,
+            open_files=len(proc.open_files()),
+        )
+    except psutil.Error:
+        return {}
+
+
+def get_cache_metrics(using: str, cpu_interval: float = 0.5) -> Optional[dict]:
+    # None means the cache is not connected
+    stats = get_cache_stats(using)
+    if stats is None:
+        return None
+    data = dict(stats)
+    cache = CacheConnections.get(using)
+    pid = data.get("pid")
+    if pid and cache.local:
+        data.update(get_process_metrics(pid, cpu_interval=cpu_interval))
+    near_stats = cache.get_near_stats()
+    if near_stats:
+        data.update(metrics=dict(near_cache=near_stats))
+    return data
+
+
+async def aget_cache_metrics(using: str, cpu_interval: float = 0.5) -> Optional[dict]:
+    import asyncio
+
+    stats = await aget_cache_stats(using)
+    if stats is None:
+        return None
+    data = dict(stats)
+    cache = CacheConnections.get(using)
+    pid = data.get("pid")
+    if pid and cache.local:
+        loop = asyncio.get_running_loop()
+        data.update(await loop.run_in_executor(None, get_process_metrics, pid, cpu_interval))
+    near_stats = cache.get_near_stats()
+    if near_stats:
+        data.update(metrics=dict(near_cache=near_stats))
+    return data
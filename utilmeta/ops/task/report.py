@@ -10,6 +10,9 @@ from utilmeta.ops.log.logger import LogLevel
 from utilmeta.ops.store import store
 from utilmeta.ops.schema import SupervisorReportSettingsSchema
 from utilmeta.ops.alert.event import event
+from utilmeta.ops.sketch import QuantileSketch
+
+SKETCHES_KEY = "_sketches"
 
 
 def user_comp_hash(user_id):
@@ -65,7 +68,21 @@ def get_user_active_time(times: List[datetime], inactivity_threshold: int, sort:
     return abs(period)
 
 
+def get_report_data(data: dict) -> dict:
+    # exclude the data only stored locally (like the sketches to merge)
+    if not isinstance(data, dict):
+        return {}
+    return {k: v for k, v in data.items() if k != SKETCHES_KEY}
+
+
 class ReportGenerator:
+    PERCENTILES = dict(
+        mean_time=0.5,
+        p95_time=0.95,
+        p99_time=0.99,
+        p999_time=0.999,
+    )
+
     def __init__(
         self,
         service: str,
@@ -77,6 +94,10 @@ class ReportGenerator:
         self.to_time = to_time
         self.layer = layer
         self.settings = settings
+        # duration sketches of service (key: None) and endpoints merged from the lower layer
+        self._sketches: Optional[Dict[Optional[str], QuantileSketch]] = None
+        # the sketches of this aggregation, stored to be merged by the upper layer
+        self._result_sketches: Dict[Optional[str], QuantileSketch] = {}
 
     @property
     def timespan(self) -> timedelta:
@@ -90,6 +111,101 @@ class ReportGenerator:
     def to_date(self) -> date:
         return (self.to_time + timedelta(hours=self.settings.utcoffset)).date()
 
+    @classmethod
+    def _merge_sketch(cls, sketches: dict, ident: Optional[str], data):
+        sketch = QuantileSketch.load(data)
+        if not sketch:
+            return
+        if ident in sketches:
+            sketches[ident].merge(sketch)
+        else:
+            sketches[ident] = sketch
+
+    def load_worker_sketches(self) -> Dict[Optional[str], QuantileSketch]:
+        # the hourly sketches are merged from the ones flushed by workers
+        from utilmeta.ops.models import WorkerMonitor
+
+        sketches = {}
+        for metrics in WorkerMonitor.objects.filter(
+            worker__instance__service=self.service,
+            time__gte=self.from_time,
+            time__lt=self.to_time,
+        ).values_list("metrics", flat=True):
+            if not isinstance(metrics, dict):
+                continue
+            self._merge_sketch(sketches, None, metrics.get("duration_sketch"))
+            for ident, data in (metrics.get("endpoint_sketches") or {}).items():
+                self._merge_sketch(sketches, ident, data)
+        return sketches
+
+    def load_hourly_sketches(self) -> Dict[Optional[str], QuantileSketch]:
+        # the daily sketches are merged from the hourly aggregations
+        # so the percentiles stay accurate after the volatile logs are deleted
+        from utilmeta.ops.models import AggregationLog
+
+        sketches = {}
+        hours = set()
+        for from_time, data in AggregationLog.objects.filter(
+            service=self.service,
+            layer=0,
+            from_time__gte=self.from_time,
+            to_time__lte=self.to_time,
+        ).values_list("from_time", "data"):
+            if from_time in hours:
+                # the same hour aggregated for other supervisors
+                continue
+            stored = data.get(SKETCHES_KEY) if isinstance(data, dict) else None
+            if not isinstance(stored, dict):
+                continue
+            hours.add(from_time)
+            self._merge_sketch(sketches, None, stored.get("service"))
+            for ident, value in (stored.get("endpoints") or {}).items():
+                self._merge_sketch(sketches, ident, value)
+        return sketches
+
+    def load_sketches(self) -> Dict[Optional[str], QuantileSketch]:
+        if self._sketches is None:
+            self._sketches = self.load_worker_sketches() if self.layer == 0 else self.load_hourly_sketches()
+        return self._sketches
+
+    def get_duration_sketch(
+        self,
+        service_logs: models.QuerySet,
+        endpoint_ident: str = None,
+        user_id: str = None
+    ) -> QuantileSketch:
+        sketch = None
+        if not user_id:
+            sketch = self.load_sketches().get(endpoint_ident)
+        if not sketch:
+            # no sketches from the lower layer, count the durations in a single scan without sorting
+            sketch = QuantileSketch()
+            sketch.update(
+                service_logs.exclude(duration=None).values_list("duration", flat=True).iterator()
+            )
+        if not user_id:
+            self._result_sketches[endpoint_ident] = sketch
+        return sketch
+
+    def get_percentiles(self, sketch: Optional[QuantileSketch]) -> dict:
+        values = {}
+        for name, q in self.PERCENTILES.items():
+            value = sketch.quantile(q) if sketch else None
+            values[name] = round(value, 2) if value is not None else 0
+        return values
+
+    def dump_sketches(self) -> Optional[dict]:
+        service_sketch = self._result_sketches.get(None)
+        if not service_sketch:
+            return None
+        return dict(
+            service=service_sketch.dump(),
+            endpoints={
+                ident: sketch.dump() for ident, sketch in self._result_sketches.items()
+                if ident and sketch
+            },
+        )
+
     def aggregate_logs(
         self,
         endpoint_ident: str = None,
@@ -175,18 +291,13 @@ class ReportGenerator:
                 qs = qs.order_by("-count")[:limit]
             dict_values[field] = {val[name]: val["count"] for val in qs}
 
-        service_logs_duration = service_logs.order_by("-duration")
-        mean_time = service_logs_duration.values_list('duration', flat=True)[requests // 2] if requests else 0
-        p95_time = service_logs_duration.values_list('duration', flat=True)[requests // 20] if requests else 0
-        p99_time = service_logs_duration.values_list('duration', flat=True)[requests // 100] if requests else 0
-        p999_time = service_logs_duration.values_list('duration', flat=True)[requests // 1000] if requests else 0
+        percentiles = self.get_percentiles(
+            self.get_duration_sketch(service_logs, endpoint_ident=endpoint_ident, user_id=user_id)
+        )
 
         if not first_layer:
             return dict(
-                mean_time=mean_time,
-                p95_time=p95_time,
-                p99_time=p99_time,
-                p999_time=p999_time,
+                **percentiles,
                 **replace_null(
                     service_logs.aggregate(
                         time_stddev=models.StdDev("duration"),
@@ -203,9 +314,9 @@ class ReportGenerator:
                 requests=total_requests,
                 errors=errors,
                 avg_time=avg_time,
-                mean_time=mean_time,
-                p95_time=p95_time,
-                p99_time=p99_time,
+                mean_time=percentiles["mean_time"],
+                p95_time=percentiles["p95_time"],
+                p99_time=percentiles["p99_time"],
                 user_agent=user_agent,
                 **dict_values,
                 **replace_null(
@@ -236,11 +347,8 @@ class ReportGenerator:
             avg_time=avg_time,
             errors=errors,
             rps=round(total_requests / seconds, 2),
-            mean_time=mean_time,
-            p95_time=p95_time,
-            p99_time=p99_time,
-            p999_time=p999_time,
             max_rps=max_rps,
+            **percentiles,
             **agent_dist,
             **dict_values,
             **replace_null(
@@ -501,13 +609,14 @@ class ReportGenerator:
         if self.layer == 0 and self.settings.system_report_enabled:
             system_data = self.aggregate_monitors() or None
 
-        return pop_null(dict(
-            service=service_data,
-            system=system_data,
-            endpoints=endpoints,
-            users=users,
-            metrics=metrics
-        ))
+        return pop_null({
+            "service": service_data,
+            "system": system_data,
+            "endpoints": endpoints,
+            "users": users,
+            "metrics": metrics,
+            SKETCHES_KEY: self.dump_sketches() if service_data else None,
+        })
 
     def __call__(self):
         return self.generate()
@@ -9,9 +9,16 @@ import psutil
 from utilmeta.utils import time_now, time_midnight, replace_null, Error, normalize
 from datetime import timedelta, datetime, timezone
 from django.db import models
-from .monitor import get_sys_metrics
-from .report import ReportGenerator
-from typing import Optional, TYPE_CHECKING
+from .monitor import (
+    get_sys_metrics,
+    get_db_metrics,
+    get_cache_metrics,
+    aget_db_metrics,
+    aget_cache_metrics,
+)
+from .report import ReportGenerator, get_report_data
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, TYPE_CHECKING
 import random
 import time
 import functools
@@ -19,6 +26,9 @@ import functools
 if TYPE_CHECKING:
     from utilmeta.ops.models import AggregationLog
 
+# result of a timed-out or failed resource probe
+_SKIPPED = object()
+
 
 class BaseCycleTask:
     def __init__(self, interval: int, new_thread: bool = True):
@@ -75,6 +85,8 @@ class OperationWorkerTask(BaseCycleTask):
     report_generator_cls = ReportGenerator
     asynchronous = False
     LAYER_INTERVAL = [timedelta(hours=1), timedelta(days=1)]
+    # stages that take longer than this (in seconds) are logged as warnings
+    SLOW_STAGE_THRESHOLD = 3
 
     def __init__(self, config: Operations):
         self.config = config
@@ -87,6 +99,8 @@ class OperationWorkerTask(BaseCycleTask):
 
         from utilmeta import service
         self.service = service
+        if service.asynchronous:
+            self.asynchronous = True
 
         self.hourly_aggregation: Optional["AggregationLog"] = None
         self.daily_aggregation: Optional["AggregationLog"] = None
@@ -95,12 +109,16 @@ class OperationWorkerTask(BaseCycleTask):
         self._synced = False
         self._sync_retries = 0
         self._clear_date = None
+        # stage name -> seconds taken in the latest cycle
+        self.stage_timings: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     def __call__(self, *args, **kwargs):
         try:
-            self.worker_cycle()
             if self.asynchronous:
                 asyncio.run(self.async_worker_cycle())
+            else:
+                self.worker_cycle()
             return True
         finally:
             self.clear_connections()
@@ -147,6 +165,55 @@ class OperationWorkerTask(BaseCycleTask):
         return store.worker
 
     def worker_cycle(self):
+        self.stage_timings = {}
+        self.prepare_cycle()
+
+        if self._stopped:
+            # if this worker is stopped
+            # we exit right after collect all the memory-stored logs
+            # other process (aka. the restarted process) will be take care of the rest
+            self.log("worker cycle stopped")
+            return
+
+        if self.is_worker_primary:
+            # Is this worker the primary worker of the current instance
+            # detect the running worker with the minimum PID
+            self.sync_resources()
+            self.monitor()
+            self.primary_cycle()
+            self.log(f"worker cycle [primary] finished")
+
+        self._init_cycle = True
+        self.log_stage_timings()
+
+    async def async_worker_cycle(self):
+        # the ORM operations are executed in a dedicated thread so the event loop is never blocked,
+        # the database connections of the thread are kept during the cycle and closed at the end
+        self.stage_timings = {}
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(1, thread_name_prefix="OperationWorkerORM")
+        self._executor = executor
+        try:
+            await self.run_sync(self.prepare_cycle)
+
+            if self._stopped:
+                self.log("worker cycle stopped")
+                return
+
+            if await self.run_sync(lambda: self.is_worker_primary):
+                await self.run_sync(self.sync_resources)
+                await self.amonitor()
+                await self.run_sync(self.primary_cycle)
+                self.log(f"worker cycle [primary] finished")
+
+            self._init_cycle = True
+            self.log_stage_timings()
+        finally:
+            self._executor = None
+            await loop.run_in_executor(executor, self.clear_connections)
+            executor.shutdown(wait=False)
+
+    def prepare_cycle(self):
         if not self._last_exec:
             self._last_exec = time_now()
 
@@ -164,55 +231,87 @@ class OperationWorkerTask(BaseCycleTask):
         self.handle_func(batch_save_logs, event_type='save_log')()
         self.handle_func(self.update_workers, event_type='update_worker')()
 
-        if self._stopped:
-            # if this worker is stopped
-            # we exit right after collect all the memory-stored logs
-            # other process (aka. the restarted process) will be take care of the rest
-            self.log("worker cycle stopped")
+    def sync_resources(self):
+        if self._synced or self._sync_retries >= self.config.max_sync_retries:
             return
+        # 1st cycle
+        manager = self.config.resources_manager_cls(self.service)
+        try:
+            manager.init_service_resources(
+                self.supervisor, instance=self.instance
+            )
+            # ignore errors
+        except Exception as e:
+            self.warn(f"sync resources failed with error: {e}")
+            self._sync_retries += 1
+        else:
+            self._synced = True
 
-        if self.is_worker_primary:
-            # Is this worker the primary worker of the current instance
-            # detect the running worker with the minimum PID
-            if not self._synced and self._sync_retries < self.config.max_sync_retries:
-                # 1st cycle
-                manager = self.config.resources_manager_cls(self.service)
-                try:
-                    manager.init_service_resources(
-                        self.supervisor, instance=self.instance
-                    )
-                    # ignore errors
-                except Exception as e:
-                    self.warn(f"sync resources failed with error: {e}")
-                    self._sync_retries += 1
-                else:
-                    self._synced = True
-
-            self.monitor()
-            self.handle_func(self.heartbeat, event_type='heartbeat', level='warn')()
-            self.handle_func(self.alert, event_type='alert', level='warn')()
-            self.handle_func(self.report, event_type='report', level='warn')()
+    def primary_cycle(self):
+        self.handle_func(self.heartbeat, event_type='heartbeat', level='warn')()
+        self.handle_func(self.alert, event_type='alert', level='warn')()
+        self.handle_func(self.report, event_type='report', level='warn')()
 
-            if self.do_clear():
-                self.handle_func(self.clear, event_type='clear', level='warn')()
+        if self.do_clear():
+            self.handle_func(self.clear, event_type='clear', level='warn')()
 
-            self.log(f"worker cycle [primary] finished")
+    async def run_sync(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
 
-        self._init_cycle = True
+    def log_stage_timings(self):
+        if not self.stage_timings:
+            return
+        self.log("worker cycle stages: " + ", ".join(
+            f"{stage}={round(duration * 1000)}ms" for stage, duration in self.stage_timings.items()
+        ))
+        for stage, duration in self.stage_timings.items():
+            if duration >= self.SLOW_STAGE_THRESHOLD:
+                self.warn(f"worker cycle stage [{stage}] is slow: {round(duration, 3)}s")
 
-    async def async_worker_cycle(self):
-        pass
+    def handle_failure(self, e, event_type: str, level: str = 'error'):
+        self.handle_error(e, type=event_type, level=level)
+        event.ops_cycle_failed(self.instance, event_type=event_type)
 
     def handle_func(self, func, event_type: str, level: str = 'error'):
         @functools.wraps(func)
         def handler(*args, **kwargs):
+            start = time.perf_counter()
             try:
                 return func(*args, **kwargs)
             except Exception as e:
-                self.handle_error(e, type=event_type, level=level)
-                event.ops_cycle_failed(self.instance, event_type=event_type)
+                self.handle_failure(e, event_type=event_type, level=level)
+            finally:
+                self.stage_timings[event_type] = time.perf_counter() - start
+        return handler
+
+    def ahandle_func(self, func, event_type: str, level: str = 'error'):
+        @functools.wraps(func)
+        async def handler(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                await self.run_sync(self.handle_failure, e, event_type, level)
+            finally:
+                self.stage_timings[event_type] = time.perf_counter() - start
         return handler
 
+    async def probe(self, coro, name: str):
+        # resource probes are bounded by the probe timeout, a slow or hanging resource
+        # is skipped in this cycle instead of holding up the other monitors
+        timeout = self.config.monitor.probe_timeout
+        start = time.perf_counter()
+        try:
+            return await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.warn(f"probe [{name}] timed out after {timeout}s")
+        except Exception as e:
+            self.warn(f"probe [{name}] failed with error: {e}")
+        finally:
+            self.stage_timings[f"probe:{name}"] = time.perf_counter() - start
+        return _SKIPPED
+
     def do_clear(self):
         if not self.config.clear_daily:
             return True
@@ -356,6 +455,22 @@ class OperationWorkerTask(BaseCycleTask):
         if not self.config.monitor.cache_disabled:
             self.handle_func(self.cache_monitor, event_type='cache_monitor', level='warn')()
 
+    async def amonitor(self):
+        # the monitors are executed concurrently, only the saving of the results are queued in the ORM thread
+        tasks = []
+        if not self.config.monitor.server_disabled:
+            tasks.append(self.ahandle_func(self.aserver_monitor, event_type='server_monitor', level='warn')())
+        if not self.config.monitor.instance_disabled:
+            tasks.append(self.run_sync(
+                self.handle_func(self.instance_monitor, event_type='instance_monitor', level='warn')
+            ))
+        if not self.config.monitor.database_disabled:
+            tasks.append(self.ahandle_func(self.adatabase_monitor, event_type='database_monitor', level='warn')())
+        if not self.config.monitor.cache_disabled:
+            tasks.append(self.ahandle_func(self.acache_monitor, event_type='cache_monitor', level='warn')())
+        if tasks:
+            await asyncio.gather(*tasks)
+
     def instance_monitor(self):
         if not self.instance:
             return
@@ -383,12 +498,13 @@ class OperationWorkerTask(BaseCycleTask):
             **metrics,
         )
 
-    def server_monitor(self):
+    def server_monitor(self, metrics: dict = None):
         from utilmeta.ops.models import ServerMonitor
 
         if not self.server:
             return
-        metrics = get_sys_metrics(cpu_interval=self.config.monitor.default_cpu_interval)
+        if metrics is None:
+            metrics = get_sys_metrics(cpu_interval=self.config.monitor.default_cpu_interval)
         try:
             l1, l5, l15 = psutil.getloadavg()
         except (AttributeError, OSError):
@@ -402,16 +518,48 @@ class OperationWorkerTask(BaseCycleTask):
             **loads,
         )
 
-    def database_monitor(self):
-        from .monitor import (
-            get_db_size,
-            get_db_transactions,
-            get_db_connections,
-            get_db_server_size,
-            get_db_server_connections,
-            get_db_connections_num,
-            get_db_max_connections,
+    async def aserver_monitor(self):
+        if not self.server:
+            return
+        loop = asyncio.get_running_loop()
+        metrics = await self.probe(
+            loop.run_in_executor(None, get_sys_metrics, self.config.monitor.default_cpu_interval),
+            name="server"
         )
+        if metrics is _SKIPPED:
+            return
+        await self.run_sync(self.server_monitor, metrics)
+
+    async def adatabase_monitor(self):
+        from utilmeta.core.orm import DatabaseConnections
+
+        db_config = DatabaseConnections.config()
+        if not db_config:
+            return
+        aliases = list(db_config.databases)
+        results = await asyncio.gather(*[
+            self.probe(aget_db_metrics(alias), name=f"database:{alias}") for alias in aliases
+        ])
+        await self.run_sync(self.database_monitor, {
+            alias: result for alias, result in zip(aliases, results) if result is not _SKIPPED
+        })
+
+    async def acache_monitor(self):
+        from utilmeta.core.cache import CacheConnections
+
+        cache_config = CacheConnections.config()
+        if not cache_config:
+            return
+        aliases = list(cache_config.caches)
+        results = await asyncio.gather(*[
+            self.probe(aget_cache_metrics(alias), name=f"cache:{alias}") for alias in aliases
+        ])
+        await self.run_sync(self.cache_monitor, {
+            alias: result for alias, result in zip(aliases, results) if result is not _SKIPPED
+        })
+
+    def database_monitor(self, metrics: Dict[str, dict] = None):
+        # metrics: alias -> the probed metrics of the database, aliases not in the metrics are skipped
         from utilmeta.core.orm import DatabaseConnections
         from utilmeta.ops.models import Resource, DatabaseMonitor, DatabaseConnection
 
@@ -430,9 +578,15 @@ class OperationWorkerTask(BaseCycleTask):
             db = DatabaseConnections.get(database.ident)
             if not db:
                 continue
-            max_conn = get_db_max_connections(db.alias)
-            transactions = get_db_transactions(db.alias)
-            size = get_db_size(db.alias)
+            if metrics is None:
+                db_probe = get_db_metrics(db.alias)
+            else:
+                db_probe = metrics.get(db.alias)
+                if db_probe is None:
+                    continue
+            max_conn = db_probe["max_connections"]
+            transactions = db_probe["transactions"]
+            size = db_probe["size"]
             connected = size is not None
             db_data = dict(database.data)
             current_transactions = db_data.get("transactions") or 0
@@ -451,10 +605,10 @@ class OperationWorkerTask(BaseCycleTask):
                 # update_fields.append('data')
             # database.save(update_fields=update_fields)
             update_databases.append(database)
-            current, active = get_db_connections_num(db.alias)
+            current, active = db_probe["connections_num"]
             current_connections = current or 0
             active_connections = min(active or 0, current_connections)
-            server_connections = get_db_server_connections(db.alias) or 0
+            server_connections = db_probe["server_connections"] or 0
             server_connections_percent = min(100.0, 100 * server_connections / max_conn) if max_conn else 0
             idle_connections_percent = min(100.0, 100 * (
                     current_connections - active_connections) / current_connections) if current_connections else 0
@@ -465,7 +619,7 @@ class OperationWorkerTask(BaseCycleTask):
                     interval=self.interval,
                     time=self._last_exec,
                     used_space=size or 0,
-                    server_used_space=get_db_server_size(db.alias) or 0,
+                    server_used_space=db_probe["server_size"] or 0,
                     server_connections=server_connections,
                     server_connections_percent=server_connections_percent,
                     idle_connections_percent=idle_connections_percent,
@@ -475,7 +629,7 @@ class OperationWorkerTask(BaseCycleTask):
                     metrics=db_metrics,
                 )
             )
-            connections = get_db_connections(db.alias)
+            connections = db_probe["connections"]
 
             if connections:
                 current_connections = list(
@@ -523,8 +677,9 @@ class OperationWorkerTask(BaseCycleTask):
                 pk__in=[conn.pk for conn in create_conn + update_conn]
             ).delete()
 
-    def cache_monitor(self):
-        from .monitor import get_cache_stats
+    def cache_monitor(self, metrics: Dict[str, Optional[dict]] = None):
+        # metrics: alias -> the probed metrics of the cache (None if not connected),
+        # aliases not in the metrics are skipped
         from utilmeta.ops.models import CacheMonitor, Resource
         from utilmeta.core.cache import CacheConnections
 
@@ -541,27 +696,17 @@ class OperationWorkerTask(BaseCycleTask):
             if not cache:
                 continue
 
-            stats = get_cache_stats(cache.alias)
-            connected = stats is not None
+            if metrics is None:
+                cache_metrics = get_cache_metrics(cache.alias)
+            elif cache.alias in metrics:
+                cache_metrics = metrics[cache.alias]
+            else:
+                continue
+            connected = cache_metrics is not None
             cache_data = dict(connected=connected)
-            data = dict(stats or {})
+            data = dict(cache_metrics or {})
             pid = data.get("pid")
-            # cpu_percent = memory_percent = fds = open_files = None
             if pid and cache.local:
-                try:
-                    proc = psutil.Process(pid)
-                    cpu_percent = proc.cpu_percent(0.5)
-                    memory_percent = proc.memory_percent()
-                    fds = proc.num_fds() if psutil.POSIX else None
-                    open_files = len(proc.open_files())
-                    data.update(
-                        cpu_percent=cpu_percent,
-                        memory_percent=memory_percent,
-                        file_descriptors=fds,
-                        open_files=open_files,
-                    )
-                except psutil.Error:
-                    pass
                 cache_data.update(pid=pid)
 
             cache.updated_time = self._last_exec
@@ -846,7 +991,7 @@ class OperationWorkerTask(BaseCycleTask):
                     layer=layer,
                     interval=layer_seconds,
                     utcoffset=aggregation.utcoffset,
-                    **aggregation.data,
+                    **get_report_data(aggregation.data),
                 )
             )
             updates = {}
@@ -914,7 +1059,7 @@ class OperationWorkerTask(BaseCycleTask):
                                 layer=layer,
                                 interval=layer_seconds,
                                 utcoffset=obj.utcoffset,
-                                **obj.data,
+                                **get_report_data(obj.data),
                             )
                         )
                     if values:
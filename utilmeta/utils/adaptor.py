@@ -12,6 +12,12 @@ class BaseAdaptor:
     backend = None
     backend_name = None
 
+    # (adaptor base, dispatch key) -> dispatched adaptor class
+    # shared by all the adaptors and cleared when a new adaptor class is defined
+    __dispatch_cache__: Dict[tuple, Type["BaseAdaptor"]] = {}
+    __dispatch_hits__ = 0
+    __dispatch_misses__ = 0
+
     @classmethod
     def get_module_name(cls, obj):
         name = None
@@ -22,12 +28,58 @@ class BaseAdaptor:
 
         return name
 
+    @classmethod
+    def get_dispatch_key(cls, obj):
+        # the dispatched adaptor class should only depend on this key,
+        # adaptors that qualify by the value of the object (not the type) should override this
+        if isinstance(obj, str) or inspect.ismodule(obj):
+            return obj
+        return type(obj)
+
+    @classmethod
+    def get_dispatch_stats(cls) -> dict:
+        return dict(
+            hits=BaseAdaptor.__dispatch_hits__,
+            misses=BaseAdaptor.__dispatch_misses__,
+            size=len(BaseAdaptor.__dispatch_cache__),
+        )
+
+    @classmethod
+    def clear_dispatch_cache(cls):
+        BaseAdaptor.__dispatch_cache__.clear()
+
     @classmethod
     def dispatch(cls, obj, *args, **kwargs):
         if isinstance(obj, cls):
             # adaptor
             return obj
 
+        cache = BaseAdaptor.__dispatch_cache__
+        try:
+            key = (cls, cls.get_dispatch_key(obj))
+            impl = cache.get(key)
+        except TypeError:
+            # unhashable key
+            key = impl = None
+
+        if impl is not None:
+            # counters are not locked, they may be slightly off under concurrent dispatches
+            BaseAdaptor.__dispatch_hits__ += 1
+            return impl(obj, *args, **kwargs)  # noqa
+
+        BaseAdaptor.__dispatch_misses__ += 1
+        impl = cls.resolve_adaptor(obj)
+        if impl is None:
+            raise NotImplementedError(
+                f"{cls}: adaptor for {obj}: {repr(cls.get_module_name(obj))} is not implemented"
+            )
+        if key is not None:
+            cache[key] = impl
+        return impl(obj, *args, **kwargs)  # noqa
+
+    @classmethod
+    def resolve_adaptor(cls, obj) -> Optional[Type["BaseAdaptor"]]:
+        # find the adaptor class for the object without the dispatch cache
         name = cls.get_module_name(obj)
         if name:
             ref = (
@@ -44,29 +96,31 @@ class BaseAdaptor:
             cls.load_from_base()
 
         if cls.qualify(obj):
-            return cls(obj, *args, **kwargs)  # noqa
-        to = cls.recursively_dispatch(cls, obj, *args, **kwargs)
-        if to:
-            return to
-        raise NotImplementedError(
-            f"{cls}: adaptor for {obj}: {repr(name)} is not implemented"
-        )
+            return cls
+        return cls.recursively_resolve_adaptor(cls, obj)
 
     @classmethod
-    def recursively_dispatch(cls, base, obj, *args, **kwargs):
+    def recursively_resolve_adaptor(cls, base, obj) -> Optional[Type["BaseAdaptor"]]:
         for impl in base.__subclasses__():
             impl: Type["BaseAdaptor"]
             try:
                 if impl.qualify(obj):
-                    return impl(obj, *args, **kwargs)  # noqa
+                    return impl
             except (NotImplementedError, ModuleNotFoundError, ImportError):
                 # consider this error means that the impl is not qualified
                 continue
-            to = cls.recursively_dispatch(impl, obj)
+            to = cls.recursively_resolve_adaptor(impl, obj)
             if to:
                 return to
         return None
 
+    @classmethod
+    def recursively_dispatch(cls, base, obj, *args, **kwargs):
+        impl = cls.recursively_resolve_adaptor(base, obj)
+        if impl:
+            return impl(obj, *args, **kwargs)  # noqa
+        return None
+
     @classmethod
     def reconstruct(cls, adaptor: "BaseAdaptor"):
         raise NotImplementedError
@@ -103,3 +157,5 @@ class BaseAdaptor:
 
     def __init_subclass__(cls, **kwargs):
         cls.set_backends_pkg()
+        # a new adaptor may qualify the objects dispatched to others before
+        BaseAdaptor.__dispatch_cache__.clear()
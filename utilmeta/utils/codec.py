@@ -0,0 +1,281 @@
+import json
+from typing import Dict, Optional, Type, Union
+from utype import JSONEncoder
+from utype.utils.encode import encoder_registry
+
+__all__ = [
+    "JSONCodec",
+    "StandardJSONCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "register_json_codec",
+    "get_json_codec",
+    "json_normalize",
+]
+
+JSON_NATIVE_TYPES = (str, int, float, bool, type(None))
+
+
+def json_default(o):
+    # the type adapters of utype (datetime, Decimal, UUID, Enum, ...)
+    encoder = encoder_registry.resolve(type(o))
+    if encoder:
+        return encoder(o)
+    raise TypeError(f"Object of type {o.__class__.__name__} is not JSON serializable")
+
+
+def json_normalize(data):
+    """
+    Convert data to the structure json.loads(json.dumps(data)) will get,
+    the containers that has nothing to convert are returned as-is instead of copied
+    """
+    if type(data) in JSON_NATIVE_TYPES:
+        return data
+    if type(data) is dict:
+        result = None
+        for i, (key, val) in enumerate(data.items()):
+            new_key = key if isinstance(key, str) else _normalize_key(key)
+            new_val = json_normalize(val)
+            if result is None:
+                if new_key is key and new_val is val:
+                    continue
+                result = dict(list(data.items())[:i])
+            result[new_key] = new_val
+        return data if result is None else result
+    if type(data) is list:
+        result = None
+        for i, val in enumerate(data):
+            new_val = json_normalize(val)
+            if result is None:
+                if new_val is val:
+                    continue
+                result = list(data[:i])
+            result.append(new_val)
+        return data if result is None else result
+    if isinstance(data, dict):
+        # subclasses like Schema are converted to plain dict
+        return {
+            key if isinstance(key, str) else _normalize_key(key): json_normalize(val)
+            for key, val in data.items()
+        }
+    if isinstance(data, (list, tuple)):
+        return [json_normalize(val) for val in data]
+    try:
+        value = json_default(data)
+    except TypeError:
+        # subclasses of the native types without adapters (str Enum is adapted to the value)
+        for t in (bool, int, float, str):
+            if isinstance(data, t):
+                return t(data) if t is not str else str.__str__(data)
+        raise
+    return json_normalize(value)
+
+
+def _normalize_key(key) -> str:
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+
+class JSONCodec:
+    """
+    The JSON encoding / decoding backend used by Response, RequestAdaptor, ResponseAdaptor and json_dumps,
+    selected by Preference(json_codec=...)
+    """
+    name: str = None
+    package: str = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if not cls.package:
+            return True
+        import importlib.util
+
+        return importlib.util.find_spec(cls.package) is not None
+
+    def dumps(self, data, **kwargs) -> str:
+        raise NotImplementedError
+
+    def dumpb(self, data, **kwargs) -> bytes:
+        return self.dumps(data, **kwargs).encode("utf-8")
+
+    def loads(self, data: Union[str, bytes, bytearray]):
+        raise NotImplementedError
+
+
+class StandardJSONCodec(JSONCodec):
+    name = "json"
+
+    def dumps(self, data, **kwargs) -> str:
+        kwargs.setdefault("cls", JSONEncoder)
+        kwargs.setdefault("ensure_ascii", False)
+        return json.dumps(data, **kwargs)
+
+    def loads(self, data: Union[str, bytes, bytearray]):
+        return json.loads(data)
+
+
+standard_codec = StandardJSONCodec()
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+    package = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self.orjson = orjson
+        # leave datetime to utype adapter to keep the same output as the standard encoder
+        self.option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def get_option(self, kwargs: dict) -> Optional[int]:
+        # return None if the arguments cannot be expressed by orjson
+        option = self.option
+        for key, val in kwargs.items():
+            if key == "cls":
+                if val is not None and val is not JSONEncoder:
+                    return None
+            elif key == "ensure_ascii":
+                if val:
+                    return None
+            elif key == "sort_keys":
+                if val:
+                    option |= self.orjson.OPT_SORT_KEYS
+            elif key == "indent":
+                if val == 2:
+                    option |= self.orjson.OPT_INDENT_2
+                elif val is not None:
+                    return None
+            else:
+                return None
+        return option
+
+    def dumpb(self, data, **kwargs) -> bytes:
+        option = self.get_option(kwargs)
+        if option is None:
+            return standard_codec.dumpb(data, **kwargs)
+        try:
+            return self.orjson.dumps(data, default=json_default, option=option)
+        except TypeError:
+            # orjson.JSONEncodeError, like the integers over 64 bits, fallback to the standard encoder
+            return standard_codec.dumpb(data, **kwargs)
+
+    def dumps(self, data, **kwargs) -> str:
+        option = self.get_option(kwargs)
+        if option is None:
+            return standard_codec.dumps(data, **kwargs)
+        try:
+            return self.orjson.dumps(data, default=json_default, option=option).decode("utf-8")
+        except TypeError:
+            return standard_codec.dumps(data, **kwargs)
+
+    def loads(self, data: Union[str, bytes, bytearray]):
+        return self.orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    name = "msgspec"
+    package = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.msgspec = msgspec
+        self.encoder = msgspec.json.Encoder(enc_hook=json_default)
+        self.decoder = msgspec.json.Decoder()
+
+    @classmethod
+    def supported(cls, kwargs: dict) -> bool:
+        for key, val in kwargs.items():
+            if key == "cls":
+                if val is not None and val is not JSONEncoder:
+                    return False
+            elif key in ("ensure_ascii", "sort_keys", "indent"):
+                if val:
+                    return False
+            else:
+                return False
+        return True
+
+    def dumpb(self, data, **kwargs) -> bytes:
+        if not self.supported(kwargs):
+            return standard_codec.dumpb(data, **kwargs)
+        # msgspec encodes datetime / timedelta / Decimal natively in another format (like "Z" and "PT3S"),
+        # the data is normalized by the utype adapters first to keep the same output as the other codecs
+        try:
+            return self.encoder.encode(json_normalize(data))
+        except (TypeError, OverflowError):
+            return standard_codec.dumpb(data, **kwargs)
+
+    def dumps(self, data, **kwargs) -> str:
+        return self.dumpb(data, **kwargs).decode("utf-8")
+
+    def loads(self, data: Union[str, bytes, bytearray]):
+        try:
+            return self.decoder.decode(data)
+        except self.msgspec.DecodeError as e:
+            # keep the same error type as the standard json module
+            doc = data if isinstance(data, str) else bytes(data).decode("utf-8", errors="replace")
+            raise json.JSONDecodeError(str(e), doc, 0) from e
+
+
+json_codecs: Dict[str, Type[JSONCodec]] = {}
+_codec_instances: Dict[str, JSONCodec] = {}
+AUTO = "auto"
+
+
+def register_json_codec(codec_cls: Type[JSONCodec]):
+    if not issubclass(codec_cls, JSONCodec) or not codec_cls.name:
+        raise TypeError(f"Invalid json codec: {codec_cls}, must be a JSONCodec subclass with name")
+    json_codecs[codec_cls.name] = codec_cls
+    _codec_instances.pop(codec_cls.name, None)
+    _codec_instances.pop(AUTO, None)
+    return codec_cls
+
+
+register_json_codec(StandardJSONCodec)
+register_json_codec(OrjsonCodec)
+register_json_codec(MsgspecCodec)
+_codec_instances[StandardJSONCodec.name] = standard_codec
+
+
+def _resolve_codec(name: str) -> JSONCodec:
+    if name == AUTO:
+        for codec_name in (OrjsonCodec.name, MsgspecCodec.name):
+            codec_cls = json_codecs.get(codec_name)
+            if codec_cls and codec_cls.available():
+                return get_json_codec(codec_name)
+        return standard_codec
+    codec_cls = json_codecs.get(name)
+    if not codec_cls:
+        raise ValueError(f"json codec: {repr(name)} not registered, options are: {list(json_codecs)}")
+    if not codec_cls.available():
+        from .functional import requires
+
+        requires(codec_cls.package)
+    return codec_cls()
+
+
+def get_json_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Get the json codec by name, if name is not specified, use the json_codec in Preference,
+    "auto" will choose the fastest available one among orjson / msgspec / json
+    """
+    if not name:
+        from utilmeta.conf.preference import Preference
+
+        pref = Preference.config()
+        name = pref.json_codec if pref else None
+        if not name:
+            return standard_codec
+    codec = _codec_instances.get(name)
+    if codec is None:
+        codec = _codec_instances[name] = _resolve_codec(name)
+    return codec
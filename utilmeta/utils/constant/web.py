@@ -110,6 +110,23 @@ class WebSocketEventType(Static):
     message = "message"
 
 
+class WebSocketCloseCode(Static):
+    NORMAL = 1000
+    GOING_AWAY = 1001
+    PROTOCOL_ERROR = 1002
+    UNSUPPORTED_DATA = 1003
+    NO_STATUS = 1005
+    ABNORMAL = 1006
+    INVALID_DATA = 1007
+    POLICY_VIOLATION = 1008
+    MESSAGE_TOO_BIG = 1009
+    INTERNAL_ERROR = 1011
+    TRY_AGAIN_LATER = 1013
+    # 4000 - 4999 are reserved for the applications,
+    # the request errors are closed with 4000 + status, like 4401 / 4403 / 4404
+    APPLICATION = 4000
+
+
 class AuthScheme(Static):
     BASIC = "basic"
     DIGEST = "digest"
@@ -155,6 +172,7 @@ class Header(Static):
     LENGTH = "Content-Length"
     TYPE = "Content-Type"
     ALLOW = "Allow"
+    RETRY_AFTER = "Retry-After"
     ORIGIN = "Origin"
     ALLOW_ORIGIN = "Access-Control-Allow-Origin"
     ACCESS_MAX_AGE = "Access-Control-Max-Age"
@@ -227,6 +245,8 @@ HTTP_METHODS_LOWER = [m.lower() for m in HTTP_METHODS]
 COMMON_METHODS = CommonMethod.gen()
 META_METHODS = MetaMethod.gen()
 METHODS = COMMON_METHODS + META_METHODS
+# the method of the websocket endpoints (@api.websocket), routed with the handshake request
+WEBSOCKET = "websocket"
 SECURE_SCHEMES = {"http": "https", "ws": "wss", "ftp": "ftps"}
 STATUS_WITHOUT_BODY = (204, 205, 304)
 MESSAGE_STATUSES = list(range(100, 103))
@@ -262,6 +262,18 @@ class PreconditionRequired(RequestError):
 class TooManyRequests(RequestError):
     status = 429
 
+    def __init__(
+        self, message: str = None, retry_after: Union[int, float] = None, headers: dict = None
+    ):
+        import math
+
+        self.message = message
+        self.retry_after = retry_after
+        self.append_headers = dict(headers or {})
+        if retry_after is not None:
+            self.append_headers[Header.RETRY_AFTER] = str(int(math.ceil(max(retry_after, 0))))
+        super().__init__(message)
+
 
 class RequestHeaderFieldsTooLarge(RequestError):
     status = 431
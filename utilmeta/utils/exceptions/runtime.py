@@ -6,6 +6,18 @@ class InvalidCommand(Exception):
     pass
 
 
+class WebsocketDisconnect(Exception):
+    """
+    The websocket connection is closed (by the client or the server),
+    raised when receiving from or sending to a closed connection
+    """
+
+    def __init__(self, code: int = 1000, reason: str = None):
+        self.code = code
+        self.reason = reason
+        super().__init__(f"websocket disconnected with code: {code}" + (f", reason: {reason}" if reason else ""))
+
+
 class CombinedError(Exception):
     """
     This is an special error, when using max_retries policy in request/service/task process
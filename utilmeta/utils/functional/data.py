@@ -6,7 +6,7 @@ import hashlib
 import decimal
 from collections import OrderedDict
 from collections.abc import Mapping
-from typing import List, Dict, Callable, Union, Any
+from typing import List, Dict, Callable, Union, Any, Optional
 from xml.etree import ElementTree as ET
 
 
@@ -306,18 +306,25 @@ def order_list(data: list, orders: list, by: str, join_rest: bool = False) -> li
 
     order_map = {value: index for index, value in enumerate(orders)}
 
-    in_orders = []
+    # place the items by the index of orders instead of sorting
+    slots: List[Optional[list]] = [None] * len(orders)
     not_in_orders = []
 
     for item in data:
-        key_value = item.get(by)
-        if key_value in order_map:
-            in_orders.append((order_map[key_value], item))
-        else:
+        index = order_map.get(item.get(by))
+        if index is None:
             not_in_orders.append(item)
+            continue
+        slot = slots[index]
+        if slot is None:
+            slots[index] = [item]
+        else:
+            slot.append(item)
 
-    in_orders.sort(key=lambda x: x[0])
-    sorted_data = [item for _, item in in_orders]
+    sorted_data = []
+    for slot in slots:
+        if slot:
+            sorted_data.extend(slot)
 
     if join_rest:
         sorted_data.extend(not_in_orders)
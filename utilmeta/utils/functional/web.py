@@ -373,13 +373,11 @@ def normalize(data, _json: bool = False):
 
 
 def json_dumps(data, **kwargs) -> str:
-    from utype import JSONEncoder
+    from utilmeta.utils.codec import get_json_codec
 
     if data is None:
         return ""
-    kwargs.setdefault("cls", JSONEncoder)
-    kwargs.setdefault("ensure_ascii", False)
-    return json.dumps(data, **kwargs)
+    return get_json_codec().dumps(data, **kwargs)
 
 
 def dumps(data, exclude_types: Tuple[type, ...] = (), bulk_data: bool = False):
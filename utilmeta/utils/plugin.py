@@ -2,7 +2,7 @@ import inspect
 import warnings
 from utilmeta.utils.base import Util
 from utilmeta.utils import awaitable, function_pass
-from typing import Type, Dict, List, Callable, Iterator, Union, Tuple
+from typing import Type, Dict, List, Callable, Iterator, Union, Tuple, Optional
 from functools import partial, wraps
 from utype.parser.func import FunctionParser
 
@@ -484,6 +484,9 @@ class PluginTarget:
     __ref__: str
     _fixed_plugins: OrderedDict = OrderedDict()
     _plugins: OrderedDict = OrderedDict()
+    # derived data of the plugins (like the built handler chains)
+    # reset when the plugins of the target changed
+    _plugins_cache: Optional[dict] = None
 
     def __init_subclass__(cls, **kwargs):
         cls.__ref__ = f"{cls.__module__}.{cls.__qualname__}"
@@ -533,6 +536,7 @@ class PluginTarget:
 
         # set every class a different addr plugins
         cls._plugins = plugins
+        cls._plugins_cache = None
 
     def __init__(self, plugins=()):
         if isinstance(plugins, (list, tuple)) and plugins:
@@ -553,8 +557,15 @@ class PluginTarget:
                 f"{cls}: add invalid plugin: {plugin}, must be a {PluginBase} subclass of instance"
             )
         cls._plugins.update(plugin_dict)
+        cls._reset_plugins_cache(cls)
+
+    @staticmethod
+    def _reset_plugins_cache(target):
+        if target.__dict__.get("_plugins_cache"):
+            setattr(target, "_plugins_cache", None)
 
     def _plugin(self, plugin, setdefault=False):
+        self._reset_plugins_cache(self)
         if inspect.isclass(plugin):
             if issubclass(plugin, PluginBase):
                 if setdefault:
@@ -586,6 +597,7 @@ class PluginTarget:
         for plugin_cls in plugin_classes:
             if plugin_cls in cls._plugins:
                 cls._plugins.pop(plugin_cls)
+        cls._reset_plugins_cache(cls)
 
     def _init_plugins(self, plugins: List[Union[Type[PluginBase], PluginBase]]):
         """
@@ -605,3 +617,4 @@ class PluginTarget:
                 continue
             inst_plugins[plugin.__class__] = plugin
         self._plugins: OrderedDict[Type[PluginBase], PluginBase] = inst_plugins
+        self._reset_plugins_cache(self)
@@ -124,7 +124,9 @@ class SSEDecoder:
 
     def decode(self, line: str) -> Optional[ServerSentEvent]:
         if not line:
-            if not self._event and not self._data and not self._last_event_id and self._retry is None:
+            if not self._event and not self._data:
+                # no event to dispatch (like after the keepalive comments), the last event id is kept
+                self._retry = None
                 return None
 
             sse = ServerSentEvent(